@@ -0,0 +1,344 @@
+"""engine_scaling_benchmark.py
+
+Offline, per-engine scaling benchmark built on testbed.TestbedAirspace.
+
+Unlike deployment_regression_analysis.py (which geocodes Austin through OSM
+and only times SimulatorManager.step() as a whole), this suite needs no
+network access and no GPU.  Every case builds a synthetic ring of vertiports
+via TestbedSimulatorManager and times each engine separately.
+
+Sweep axes (cartesian product):
+  - fleet size      : --uavs            (default 100 … 20 000)
+  - vertiport count : --vertiports      (default 4, 16, 64)
+  - dynamics type   : --dynamics        (PointMass, SixDOF, TwoDVector-Holonomic)
+
+Per-case measurements (seconds are totals over the timed step loop):
+  reset_s     SimulatorManager.reset()
+  planner_s   PlannerEngine.get_plans()
+  aerbus_s    AerBus.get_actions()
+  dynamics_s  DynamicsEngine.step()
+  sensor_s    SensorEngine.get_collision_result() (all five collision categories
+              in one pass over the fleet)
+  atc_s       ATC mission cycle (step() minus _step_uavS())
+  metrics_s   MetricsCollector.record() on every step's state
+  step_s      SimulatorManager.step() end to end
+  peak_mem_kb tracemalloc peak over reset + --memory-steps steps (separate pass,
+              so tracemalloc overhead never leaks into the timings)
+
+Results are written as JSON (one record per case, keyed by case id) so a later
+run can be compared against them.  Comparison mode flags every timing or
+memory field that grew by more than --tolerance relative to the baseline and
+exits with status 1 when any regression is found.
+
+Run from the UrbanNav directory:
+    python benchmarks/engine_scaling_benchmark.py --uavs 100 1000 --steps 20 \\
+        --output benchmarks/engine_baseline.json
+    python benchmarks/engine_scaling_benchmark.py --uavs 100 1000 --steps 20 \\
+        --compare benchmarks/engine_baseline.json --tolerance 0.25
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from testbed.config_schema import TestbedAirspaceConfig, TestbedConfig
+from testbed.testbed_simulator_manager import TestbedSimulatorManager
+from urbannav.component_schema import (
+    LoggingConfig,
+    RenderingConfig,
+    UAMSimulatorConfig,
+    UAVFleetInstanceConfig,
+)
+from urbannav.metrics_collector import MetricsCollector
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ── sweep defaults ───────────────────────────────────────────────────────────
+DEFAULT_UAV_COUNTS = [100, 500, 1_000, 5_000, 10_000, 20_000]
+DEFAULT_VERTIPORT_COUNTS = [4, 16, 64]
+DEFAULT_STEPS = 20
+DEFAULT_MEMORY_STEPS = 5
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_OUTPUT = os.path.join(_DIR, 'engine_baseline.json')
+SEED = 42
+
+# Arc length between neighbouring vertiports on the generated ring; the ring
+# radius grows with vertiport count so spacing (and so sensor density around
+# each vertiport) stays comparable across the vertiport axis.
+VERTIPORT_SPACING = 3_000.0
+MIN_RING_RADIUS = 2_000.0
+
+# dynamics name -> (controller, planner, simulator mode) — one coherent
+# component stack per dynamics model, mirroring sample_config.yaml.
+DYNAMICS_STACKS: Dict[str, Tuple[str, str, str]] = {
+    'PointMass':            ('PIDPointMassController',      'PointMass-PID', '2D'),
+    'SixDOF':               ('CascadedPIDSixDOFController', 'SixDOF-PID',    '3D'),
+    'TwoDVector-Holonomic': ('PIDHolonomicController',      'Holonomic-PID', '2D'),
+}
+
+# Fields compared in --compare mode (lower is better for all of them).
+COMPARED_FIELDS = (
+    'reset_s', 'planner_s', 'aerbus_s', 'dynamics_s', 'sensor_s',
+    'atc_s', 'metrics_s', 'step_s', 'peak_mem_kb',
+)
+
+# Timings below this floor are dominated by timer noise; never flag them.
+_MIN_COMPARABLE_SECONDS = 1e-3
+
+_SENSOR_METHODS = (
+    'get_collision_result',
+)
+
+
+# ── helpers ──────────────────────────────────────────────────────────────────
+
+def case_id(n_uavs: int, n_vertiports: int, dynamics: str) -> str:
+    """Stable key identifying one sweep case in the results file."""
+    return f'uavs={n_uavs}|vertiports={n_vertiports}|dynamics={dynamics}'
+
+
+def _build_config(n_uavs: int, n_vertiports: int, dynamics: str, n_steps: int) -> TestbedConfig:
+    """Build a TestbedConfig for one case: n_vertiports on a ring, one fleet entry."""
+    controller, planner, mode = DYNAMICS_STACKS[dynamics]
+    radius = max(MIN_RING_RADIUS, VERTIPORT_SPACING * n_vertiports / (2 * math.pi))
+    return TestbedConfig(
+        simulator=UAMSimulatorConfig(dt=1.0, total_timestep=n_steps, mode=mode, seed=SEED),
+        testbed_airspace=TestbedAirspaceConfig(
+            num_vertiports=n_vertiports,
+            radius=radius,
+            landing_pad_capacity=4,
+        ),
+        fleet_composition=[UAVFleetInstanceConfig(
+            type_name='STANDARD',
+            count=n_uavs,
+            dynamics=dynamics,
+            controller=controller,
+            sensor='PartialSensor',
+            planner=planner,
+        )],
+        logging=LoggingConfig(enabled=False),
+        rendering=RenderingConfig(enabled=False),
+    )
+
+
+def _timed(fn: Callable, timings: Dict[str, float], key: str) -> Callable:
+    """Wrap fn so every call adds its wall time to timings[key]."""
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            timings[key] += time.perf_counter() - t0
+    return wrapper
+
+
+def _instrument(sm: TestbedSimulatorManager, timings: Dict[str, float]) -> None:
+    """Shadow the engine entry points on this manager's instances with timed wrappers.
+
+    Only instance attributes are replaced, so class behaviour is untouched and
+    the wrappers disappear with the manager.  Must run after reset(), which
+    rebuilds every engine.
+    """
+    sm.planner_module.get_plans = _timed(sm.planner_module.get_plans, timings, 'planner_s')
+    sm.controller_module.get_actions = _timed(sm.controller_module.get_actions, timings, 'aerbus_s')
+    sm.dynamics_module.step = _timed(sm.dynamics_module.step, timings, 'dynamics_s')
+    for name in _SENSOR_METHODS:
+        setattr(sm.sensor_module, name, _timed(getattr(sm.sensor_module, name), timings, 'sensor_s'))
+    sm._step_uavS = _timed(sm._step_uavS, timings, 'step_uavs_s')
+
+
+def _run_case(n_uavs: int, n_vertiports: int, dynamics: str,
+              n_steps: int, memory_steps: int) -> Dict[str, Any]:
+    """Time every engine for one case, then measure peak memory in a second pass."""
+    config = _build_config(n_uavs, n_vertiports, dynamics, n_steps)
+
+    timings: Dict[str, float] = {
+        'planner_s': 0.0, 'aerbus_s': 0.0, 'dynamics_s': 0.0,
+        'sensor_s': 0.0, 'step_uavs_s': 0.0, 'metrics_s': 0.0,
+    }
+
+    # ATC / engines print per-UAV progress; at 20k UAVs that console I/O
+    # would dominate every timing, so it is discarded for the whole case
+    # (into devnull, not a buffer, so it cannot inflate the memory peak either).
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        # --- timing pass ---
+        sm = TestbedSimulatorManager(config)
+        t0 = time.perf_counter()
+        sm.reset()
+        reset_s = time.perf_counter() - t0
+
+        _instrument(sm, timings)
+        collector = MetricsCollector()
+        step_s = 0.0
+        for _ in range(n_steps):
+            t0 = time.perf_counter()
+            collisions = sm.step({})
+            step_s += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            collector.record(sm.get_state(), collisions=collisions)
+            timings['metrics_s'] += time.perf_counter() - t0
+        active_uavs = len(sm.atc.uav_dict)
+        del sm, collector
+
+        # --- memory pass ---
+        tracemalloc.start()
+        sm = TestbedSimulatorManager(config)
+        sm.reset()
+        for _ in range(memory_steps):
+            sm.step({})
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del sm
+
+    return {
+        'case': case_id(n_uavs, n_vertiports, dynamics),
+        'n_uavs': n_uavs,
+        'n_vertiports': n_vertiports,
+        'dynamics': dynamics,
+        'n_steps': n_steps,
+        'active_uavs_at_end': active_uavs,
+        'reset_s': reset_s,
+        'planner_s': timings['planner_s'],
+        'aerbus_s': timings['aerbus_s'],
+        'dynamics_s': timings['dynamics_s'],
+        'sensor_s': timings['sensor_s'],
+        'atc_s': max(step_s - timings['step_uavs_s'], 0.0),
+        'metrics_s': timings['metrics_s'],
+        'step_s': step_s,
+        'peak_mem_kb': peak_bytes / 1024.0,
+    }
+
+
+def run_sweep(uav_counts: List[int], vertiport_counts: List[int], dynamics_list: List[str],
+              n_steps: int, memory_steps: int) -> Dict[str, Any]:
+    """Run every (uavs, vertiports, dynamics) case and return a results document."""
+    cases = list(itertools.product(uav_counts, vertiport_counts, dynamics_list))
+    results: Dict[str, Dict[str, Any]] = {}
+
+    for i, (n, v, dyn) in enumerate(cases, 1):
+        print(f'  [{i:>3}/{len(cases)}]  {case_id(n, v, dyn):<56} ', end='', flush=True)
+        record = _run_case(n, v, dyn, n_steps, memory_steps)
+        results[record['case']] = record
+        print(f'step={record["step_s"]:8.3f}s  reset={record["reset_s"]:7.3f}s  '
+              f'peak={record["peak_mem_kb"]:10.1f} KB')
+
+    return {
+        'metadata': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'n_steps': n_steps,
+            'memory_steps': memory_steps,
+            'seed': SEED,
+        },
+        'results': results,
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    tolerance: float) -> List[Dict[str, Any]]:
+    """Return one entry per (case, field) where current exceeds baseline by > tolerance.
+
+    Cases present in only one of the two documents are skipped — the sweep
+    grid is allowed to change between runs.  Timings under
+    _MIN_COMPARABLE_SECONDS in the baseline are ignored as timer noise.
+    """
+    regressions: List[Dict[str, Any]] = []
+    base_results = baseline.get('results', {})
+    for key, record in current.get('results', {}).items():
+        base = base_results.get(key)
+        if base is None:
+            continue
+        for field in COMPARED_FIELDS:
+            old, new = base.get(field), record.get(field)
+            if old is None or new is None:
+                continue
+            if field.endswith('_s') and old < _MIN_COMPARABLE_SECONDS:
+                continue
+            if old > 0 and new > old * (1.0 + tolerance):
+                regressions.append({
+                    'case': key,
+                    'field': field,
+                    'baseline': old,
+                    'current': new,
+                    'ratio': new / old,
+                })
+    return regressions
+
+
+def _print_table(document: Dict[str, Any]) -> None:
+    header = ('case', 'reset', 'planner', 'aerbus', 'dynamics', 'sensor', 'atc', 'metrics', 'peak KB')
+    print('\n── Results (seconds over the timed step loop) ─────────────────────────')
+    print(f'  {header[0]:<56}' + ''.join(f'{h:>10}' for h in header[1:]))
+    for key, r in document['results'].items():
+        row = [r['reset_s'], r['planner_s'], r['aerbus_s'], r['dynamics_s'],
+               r['sensor_s'], r['atc_s'], r['metrics_s']]
+        print(f'  {key:<56}' + ''.join(f'{v:>10.3f}' for v in row) + f'{r["peak_mem_kb"]:>10.0f}')
+
+
+# ── main ─────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Offline per-engine scaling benchmark on the synthetic testbed airspace.'
+    )
+    parser.add_argument('--uavs', type=int, nargs='+', default=DEFAULT_UAV_COUNTS,
+                        help='Fleet sizes to sweep')
+    parser.add_argument('--vertiports', type=int, nargs='+', default=DEFAULT_VERTIPORT_COUNTS,
+                        help='Vertiport counts to sweep')
+    parser.add_argument('--dynamics', nargs='+', default=list(DYNAMICS_STACKS),
+                        choices=list(DYNAMICS_STACKS), help='Dynamics models to sweep')
+    parser.add_argument('--steps', type=int, default=DEFAULT_STEPS,
+                        help='Timed simulator steps per case')
+    parser.add_argument('--memory-steps', type=int, default=DEFAULT_MEMORY_STEPS,
+                        help='Steps run under tracemalloc in the memory pass')
+    parser.add_argument('--output', default=None,
+                        help=f'Write results JSON here (default {DEFAULT_OUTPUT} unless --compare)')
+    parser.add_argument('--compare', default=None, metavar='BASELINE',
+                        help='Compare this run against a baseline JSON and flag regressions')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed relative growth before a field is flagged (0.25 = +25%%)')
+    args = parser.parse_args()
+
+    print(f'Engine scaling sweep: uavs={args.uavs}  vertiports={args.vertiports}  '
+          f'dynamics={args.dynamics}  steps={args.steps}\n')
+    document = run_sweep(args.uavs, args.vertiports, args.dynamics,
+                         args.steps, args.memory_steps)
+    _print_table(document)
+
+    output = args.output or (None if args.compare else DEFAULT_OUTPUT)
+    if output:
+        with open(output, 'w') as f:
+            json.dump(document, f, indent=2)
+        print(f'\n[Benchmark] Results → {output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, document, args.tolerance)
+        if not regressions:
+            print(f'\n[Benchmark] No regressions beyond +{args.tolerance:.0%} vs {args.compare}')
+            return
+        print(f'\n[Benchmark] {len(regressions)} regression(s) beyond +{args.tolerance:.0%}:')
+        for r in regressions:
+            print(f'  {r["case"]:<56} {r["field"]:<12} '
+                  f'{r["baseline"]:>10.4f} → {r["current"]:>10.4f}  (x{r["ratio"]:.2f})')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
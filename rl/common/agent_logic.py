@@ -8,13 +8,17 @@ step()/reset() loop, or once for the sole learning UAV in the single-agent env.
 from __future__ import annotations
 
 import math
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
 import numpy as np
 from gymnasium import spaces
 
+from urbannav.collision_result import (
+    NMAC, RA_COLLISION, RA_DETECT, UAV_COLLISION, UAV_DETECT,
+    CollisionResult, as_collision_result,
+)
 from urbannav.component_schema import ActionType, UAVCommand, SimulatorState
-from urbannav.utils import euclidean_distance
+from urbannav.utils import compute_pair_time_to_impact, euclidean_distance
 
 from rl.common.obs_space_definitions import get_obs_space
 
@@ -53,7 +57,7 @@ def create_observation_space(obs_type: str, n_intruder: int = 3) -> spaces.Box:
 
 def extract_observation(
     state: SimulatorState,
-    collisions: Optional[Tuple],
+    collisions: Optional[CollisionResult],
     uav_id: int,
     obs_type: str,
     n_intruder: int = 3,
@@ -63,6 +67,7 @@ def extract_observation(
     Returns a zero-vector matching the obs_type's space shape if the UAV is no
     longer in atc_state.
     """
+    collisions = as_collision_result(collisions)
     uav = state.atc_state.get(uav_id, None)
     obs_space = get_obs_space(obs_type, n_intruder)
     if uav is None:
@@ -106,9 +111,9 @@ def extract_observation(
     intruder_obs: List[float] = []
 
     if needs_intruders:
-        detected_ids: set = (
-            collisions[1].get(uav_id, set())
-            if collisions is not None else set()
+        detected_ids: List[int] = (
+            collisions.partners(UAV_DETECT, uav_id).tolist()
+            if collisions is not None else []
         )
         valid_ids = [i for i in detected_ids if i in state.atc_state]
 
@@ -141,7 +146,7 @@ def extract_observation(
     if needs_ra:
         ra_safe = (
             0.0
-            if (collisions is not None and collisions[0].get(uav_id))
+            if (collisions is not None and collisions.has(RA_DETECT, uav_id))
             else 1.0
         )
         ra_obs = [ra_safe]
@@ -181,7 +186,7 @@ def format_action(
 
 def build_info(
     state: SimulatorState,
-    collisions: Optional[Tuple],
+    collisions: Optional[CollisionResult],
     uav_id: Optional[int],
 ) -> Dict[str, Any]:
     """
@@ -195,14 +200,18 @@ def build_info(
         collision_uav    : actual collision with another UAV
         mission_complete : UAV reached goal vertiport
         dist_to_goal     : 3-D Euclidean distance to mission end point (metres)
+        min_ttc          : smallest time-to-impact (s) with any detected UAV,
+                           inf when none are detected or closing
         current_step     : simulator time step
     """
     uav = state.atc_state.get(uav_id) if uav_id is not None else None
 
-    def _has(col_idx: int) -> bool:
+    collisions = as_collision_result(collisions)
+
+    def _has(category: int) -> bool:
         return bool(
             collisions is not None and uav_id is not None
-            and collisions[col_idx].get(uav_id)
+            and collisions.has(category, uav_id)
         )
 
     if uav is None:
@@ -217,21 +226,33 @@ def build_info(
             + (uav.pz - ez) ** 2
         )
 
+    # ---- min time-to-impact over detected intruders (batched) ----
+    min_ttc = math.inf
+    if uav is not None and collisions is not None:
+        partners = [i for i in collisions.partners(UAV_DETECT, uav_id).tolist()
+                    if i in state.atc_state]
+        if partners:
+            local = {i: state.atc_state[i] for i in (uav_id, *partners)}
+            pairs = np.array([(uav_id, i) for i in partners], dtype=np.int64)
+            ttc, _, _ = compute_pair_time_to_impact(local, pairs)
+            min_ttc = float(ttc.min())
+
     return {
-        'ra_detected':      _has(0),
-        'uav_detected':     _has(1),
-        'nmac':             _has(2),
-        'collision_ra':     _has(3),
-        'collision_uav':    _has(4),
+        'ra_detected':      _has(RA_DETECT),
+        'uav_detected':     _has(UAV_DETECT),
+        'nmac':             _has(NMAC),
+        'collision_ra':     _has(RA_COLLISION),
+        'collision_uav':    _has(UAV_COLLISION),
         'mission_complete': bool(uav and uav.current_mission_complete_status),
         'dist_to_goal':     dist_3d,
+        'min_ttc':          min_ttc,
         'current_step':     state.currentstep,
     }
 
 
 def check_terminated(
     state: SimulatorState,
-    collisions: Optional[Tuple],
+    collisions: Optional[CollisionResult],
     uav_id: Optional[int],
 ) -> bool:
     """
@@ -244,10 +265,11 @@ def check_terminated(
     if uav_id is None or uav_id not in state.atc_state:
         return True  # never started or culled
 
+    collisions = as_collision_result(collisions)
     if collisions is not None:
-        if collisions[4].get(uav_id):   # uav-uav collision
+        if collisions.has(UAV_COLLISION, uav_id):
             return True
-        if collisions[3].get(uav_id):   # ra collision
+        if collisions.has(RA_COLLISION, uav_id):
             return True
 
     uav = state.atc_state[uav_id]
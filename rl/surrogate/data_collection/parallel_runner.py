@@ -8,7 +8,15 @@ Each worker runs the simulator with a distinct config (from sweep_config),
 logging episode data via the existing Logger.  Rendering is fully decoupled:
 completed episode log directories are pushed onto a queue consumed by a
 dedicated render process, so simulator throughput is never blocked by
-matplotlib I/O.
+matplotlib I/O.  With ``--render-workers N`` that process splits each
+episode's frames into N contiguous segments rendered in parallel and joined
+losslessly (Renderer.render_log).
+
+Every episode is indexed in ``<output-dir>/catalog.sqlite`` (see
+urbannav.episode_catalog): the Logger adds each saved episode with its
+flattened config and metrics, and the worker tags it with its run id and
+swept parameters, so dataset builders can select episodes by query, e.g.
+``discover_episode_dirs(root, where=["fleet_composition.0.count>=50"])``.
 
 CLI::
 
@@ -18,7 +26,7 @@ CLI::
         --output-dir logs/sweep_001 \\
         --sweep "fleet_composition.0.count=[3,5,10]" \\
         --sweep "simulator.seed=[42,123]" \\
-        --render
+        --render --render-workers 8
 """
 
 from __future__ import annotations
@@ -35,12 +43,13 @@ from typing import Any, Dict, List, Optional, Tuple
 import yaml
 
 from rl.surrogate.data_collection.sweep_config import generate_sweep, _parse_sweep_arg
+from urbannav.episode_catalog import CATALOG_FILENAME, SWEEP_CONFIG_FILENAME, EpisodeCatalog, flatten_config
 
 
 _SENTINEL = "__DONE__"
 
 
-def _run_episode(config_dict: Dict[str, Any], episode_dir: str) -> str:
+def _run_episode(config_dict: Dict[str, Any], episode_dir: str, catalog_path: str) -> str:
     """Run a single simulator episode and return the log directory path.
 
     Executed inside a worker process — imports are local to avoid issues
@@ -49,7 +58,7 @@ def _run_episode(config_dict: Dict[str, Any], episode_dir: str) -> str:
     import matplotlib
     matplotlib.use("Agg")
 
-    config_dict = _prepare_config(config_dict, episode_dir)
+    config_dict = _prepare_config(config_dict, episode_dir, catalog_path)
 
     with tempfile.NamedTemporaryFile(
         mode="w", suffix=".yaml", delete=False
@@ -70,12 +79,15 @@ def _run_episode(config_dict: Dict[str, Any], episode_dir: str) -> str:
         os.unlink(tmp_path)
 
 
-def _prepare_config(config_dict: Dict[str, Any], episode_dir: str) -> Dict[str, Any]:
+def _prepare_config(
+    config_dict: Dict[str, Any], episode_dir: str, catalog_path: str,
+) -> Dict[str, Any]:
     """Override logging/rendering settings for headless batch collection."""
     cfg = config_dict.copy()
     cfg["logging"] = {
         "enabled": True,
         "log_dir": episode_dir,
+        "catalog": catalog_path,
     }
     cfg["rendering"] = {
         "enabled": False,
@@ -93,19 +105,27 @@ def _worker(
     config_dict: Dict[str, Any],
     output_dir: str,
     render_queue: Optional[Queue],
+    sweep_keys: Tuple[str, ...] = (),
 ) -> None:
     """Worker target: run one episode, optionally enqueue for rendering."""
     episode_dir = os.path.join(output_dir, f"run_{run_id}")
     os.makedirs(episode_dir, exist_ok=True)
+    catalog_path = os.path.join(output_dir, CATALOG_FILENAME)
 
     try:
-        log_dir = _run_episode(config_dict, episode_dir)
+        log_dir = _run_episode(config_dict, episode_dir, catalog_path)
         print(f"[worker {run_id}] Episode complete → {log_dir}")
 
-        config_snapshot_path = os.path.join(episode_dir, "sweep_config.json")
+        config_snapshot_path = os.path.join(episode_dir, SWEEP_CONFIG_FILENAME)
         with open(config_snapshot_path, "w") as f:
             json.dump(config_dict, f, indent=2, default=str)
 
+        flat = flatten_config(config_dict)
+        EpisodeCatalog(catalog_path).record_run(
+            run_id, episode_dir, config_dict,
+            sweep_params={key: flat.get(key) for key in sweep_keys},
+        )
+
         if render_queue is not None:
             render_queue.put((run_id, log_dir, config_dict))
 
@@ -114,12 +134,13 @@ def _worker(
         traceback.print_exc()
 
 
-def _render_worker(render_queue: Queue, output_dir: str) -> None:
+def _render_worker(render_queue: Queue, output_dir: str, render_workers: int = 1) -> None:
     """Dedicated render process: consume log directories and produce MP4s.
 
-    Reads step_history.json from each completed episode and renders an
-    offline MP4 animation.  Runs independently so simulator workers are
-    never blocked.
+    Renders each completed episode from its step history to an offline
+    GIF / MP4 animation.  Runs independently so simulator workers are never
+    blocked; with render_workers > 1 each episode's frames are rendered in
+    parallel segments (see Renderer.render_log).
     """
     import matplotlib
     matplotlib.use("Agg")
@@ -131,7 +152,7 @@ def _render_worker(render_queue: Queue, output_dir: str) -> None:
 
         run_id, log_dir, config_dict = item
         try:
-            _render_from_logs(run_id, log_dir, config_dict, output_dir)
+            _render_from_logs(run_id, log_dir, config_dict, output_dir, render_workers)
         except Exception:
             print(f"[render {run_id}] FAILED:")
             traceback.print_exc()
@@ -142,48 +163,24 @@ def _render_from_logs(
     log_dir: str,
     config_dict: Dict[str, Any],
     output_dir: str,
+    render_workers: int = 1,
 ) -> None:
-    """Reconstruct renderer frames from step_history.json and save MP4."""
-    from urbannav.component_schema import RenderingConfig, UAMConfig, UAV_TYPE_REGISTRY
-
-    step_history_path = os.path.join(log_dir, "step_history.json")
-    if not os.path.exists(step_history_path):
-        print(f"[render {run_id}] No step_history.json in {log_dir}, skipping.")
-        return
-
-    with open(step_history_path, "r") as f:
-        steps = json.load(f)
+    """Render one episode's step history (any Logger format) to GIF / MP4."""
+    from urbannav.component_schema import RenderingConfig, UAV_TYPE_REGISTRY
+    from urbannav.episode_arrays import find_step_source
 
-    if not steps:
-        print(f"[render {run_id}] Empty step history, skipping.")
+    if find_step_source(log_dir) is None:
+        print(f"[render {run_id}] No step history in {log_dir}, skipping.")
         return
 
     fleet = config_dict.get("fleet_composition", [])
     type_name = fleet[0].get("type_name", "STANDARD") if fleet else "STANDARD"
     type_cfg = UAV_TYPE_REGISTRY.get(type_name)
-    default_radius = getattr(type_cfg, "radius", 5.0) if type_cfg else 5.0
-    default_nmac = getattr(type_cfg, "nmac_radius", 50.0) if type_cfg else 50.0
-    default_detect = getattr(type_cfg, "detection_radius", 200.0) if type_cfg else 200.0
-
-    frames = []
-    for step_record in steps:
-        uavs = {}
-        for uid_str, snap in step_record.get("uavs", {}).items():
-            uid = int(uid_str)
-            uavs[uid] = {
-                "x": snap["x"],
-                "y": snap["y"],
-                "z": snap.get("z", 0.0),
-                "heading": snap.get("heading", 0.0),
-                "radius": default_radius,
-                "nmac_radius": default_nmac,
-                "detection_radius": default_detect,
-                "mission_start": None,
-                "mission_end": None,
-                "mission_start_z": 0.0,
-                "mission_end_z": 0.0,
-            }
-        frames.append({"step": step_record["step"], "uavs": uavs})
+    uav_radii = {
+        "radius": getattr(type_cfg, "radius", 5.0) if type_cfg else 5.0,
+        "nmac_radius": getattr(type_cfg, "nmac_radius", 50.0) if type_cfg else 50.0,
+        "detection_radius": getattr(type_cfg, "detection_radius", 200.0) if type_cfg else 200.0,
+    }
 
     render_dir = os.path.join(output_dir, "renders")
     os.makedirs(render_dir, exist_ok=True)
@@ -196,15 +193,15 @@ def _render_from_logs(
         output_filename=f"run_{run_id}",
         frame_skip=0,
         mp4_only=mp4_only,
+        render_workers=render_workers,
     )
 
     from urbannav.renderer import Renderer
 
     sim_mode = config_dict.get("simulator", {}).get("mode", "2D")
     renderer = Renderer(config=render_cfg, simulator_mode=sim_mode)
-    renderer._frames = frames
-    renderer.save(episode_id=0)
-    print(f"[render {run_id}] Saved render → {render_dir}")
+    if renderer.render_log(log_dir, episode_id=0, uav_radii=uav_radii):
+        print(f"[render {run_id}] Saved render → {render_dir}")
 
 
 def run_sweep(
@@ -213,6 +210,7 @@ def run_sweep(
     output_dir: str,
     num_workers: int = 4,
     render: bool = False,
+    render_workers: int = 1,
 ) -> List[str]:
     """Run a full parameter sweep with parallel simulator instances.
 
@@ -222,6 +220,8 @@ def run_sweep(
         output_dir: Root directory for all run outputs.
         num_workers: Max simultaneous simulator processes.
         render: If True, start a dedicated render process for MP4 output.
+        render_workers: Processes the render process splits each episode's
+            frames across (0 = one per CPU core).
 
     Returns:
         List of completed episode log directory paths.
@@ -235,36 +235,37 @@ def run_sweep(
     render_proc: Optional[Process] = None
     if render:
         render_queue = Queue()
+        # Not a daemon: it may start its own pool of segment renderers
         render_proc = Process(
             target=_render_worker,
-            args=(render_queue, output_dir),
-            daemon=True,
+            args=(render_queue, output_dir, render_workers),
         )
         render_proc.start()
 
     active: List[Process] = []
     completed_dirs: List[str] = []
 
-    for run_id, config_dict in configs:
-        while len(active) >= num_workers:
-            active = [p for p in active if p.is_alive()]
-            if len(active) >= num_workers:
-                active[0].join(timeout=1.0)
-
-        p = Process(
-            target=_worker,
-            args=(run_id, config_dict, output_dir, render_queue),
-        )
-        p.start()
-        active.append(p)
-        completed_dirs.append(os.path.join(output_dir, f"run_{run_id}"))
-
-    for p in active:
-        p.join()
-
-    if render_queue is not None and render_proc is not None:
-        render_queue.put(_SENTINEL)
-        render_proc.join()
+    try:
+        for run_id, config_dict in configs:
+            while len(active) >= num_workers:
+                active = [p for p in active if p.is_alive()]
+                if len(active) >= num_workers:
+                    active[0].join(timeout=1.0)
+
+            p = Process(
+                target=_worker,
+                args=(run_id, config_dict, output_dir, render_queue, tuple(sweep_params)),
+            )
+            p.start()
+            active.append(p)
+            completed_dirs.append(os.path.join(output_dir, f"run_{run_id}"))
+
+        for p in active:
+            p.join()
+    finally:
+        if render_queue is not None and render_proc is not None:
+            render_queue.put(_SENTINEL)
+            render_proc.join()
 
     print(f"Sweep complete. {len(completed_dirs)} runs in {output_dir}")
     return completed_dirs
@@ -284,6 +285,12 @@ def main() -> None:
         help='Sweep param: key=[v1,v2,...]. Repeat for multiple params.',
     )
     parser.add_argument("--render", action="store_true", help="Enable background MP4 rendering")
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=1,
+        help="Processes rendering each episode's frame segments (0 = all cores)",
+    )
     args = parser.parse_args()
 
     sweep_params: Dict[str, List[Any]] = {}
@@ -297,6 +304,7 @@ def main() -> None:
         output_dir=args.output_dir,
         num_workers=args.num_workers,
         render=args.render,
+        render_workers=args.render_workers,
     )
 
 
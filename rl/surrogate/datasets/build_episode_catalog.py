@@ -0,0 +1,71 @@
+"""
+build_episode_catalog.py
+=========================
+Builds (or refreshes) the SQLite episode catalog of a raw-logs root —
+<logs-root>/catalog.sqlite, see urbannav.episode_catalog — from the
+episodes on disk, and optionally lists the episodes matching a query.
+
+Sweeps run through parallel_runner and Loggers with `logging.catalog` set
+keep the catalog current as they write; this script is for logs written
+without one, or after episodes were moved or deleted. Once the catalog
+exists, discovery in the prepare_*_data.py scripts reads it instead of
+walking the tree, and their --where filters select episodes by config value
+or metric.
+
+Usage::
+
+    python -m rl.surrogate.datasets.build_episode_catalog \\
+        --logs-root logs/sweep_run_Jun23
+
+    python -m rl.surrogate.datasets.build_episode_catalog \\
+        --logs-root logs/sweep_run_Jun23 --no-rebuild \\
+        --where "fleet_composition.0.count>=50" --where "metrics.total_nmac_events=0"
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from urbannav.episode_catalog import CATALOG_FILENAME, EpisodeCatalog
+
+
+def build(logs_root: str, rebuild: bool = True) -> EpisodeCatalog:
+    """Open <logs_root>/catalog.sqlite, re-scanning logs_root if asked."""
+    if not os.path.isdir(logs_root):
+        raise RuntimeError(f"Logs root {logs_root!r} does not exist.")
+    catalog = EpisodeCatalog(os.path.join(logs_root, CATALOG_FILENAME))
+    if rebuild:
+        start = time.perf_counter()
+        removed = catalog.remove_missing()
+        count = catalog.rebuild(logs_root)
+        print(
+            f"[build_episode_catalog] catalogued {count} episode(s) under {logs_root} "
+            f"({removed} stale row(s) removed) in {time.perf_counter() - start:.1f}s"
+        )
+    return catalog
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--logs-root", required=True)
+    p.add_argument("--no-rebuild", action="store_true",
+                   help="Query the existing catalog without re-scanning the logs root.")
+    p.add_argument("--where", action="append", default=None,
+                   help='Filter to list matching episodes, e.g. "metrics.total_nmac_events=0". Repeatable.')
+    return p
+
+
+def main() -> None:
+    args = _build_arg_parser().parse_args()
+    catalog = build(args.logs_root, rebuild=not args.no_rebuild)
+    if args.where:
+        dirs = catalog.select(*args.where, root=args.logs_root)
+        for ep_dir in dirs:
+            print(ep_dir)
+        print(f"[build_episode_catalog] {len(dirs)}/{len(catalog)} episode(s) match")
+
+
+if __name__ == "__main__":
+    main()
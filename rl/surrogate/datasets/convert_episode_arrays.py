@@ -0,0 +1,72 @@
+"""
+convert_episode_arrays.py
+==========================
+Converts every episode under a raw-logs root (recursively, same discovery as
+the prepare_*_data.py scripts) to the memory-mapped column format of
+urbannav.episode_arrays: one .npy file per table under <episode>/arrays/.
+
+The surrogate datasets (TrajectoryDataset, GraphFlowDataset,
+DualGraphDataset) read converted episodes through memory maps instead of
+parsing step_history.json, so dataset construction over large sweeps only
+touches the small per-step index tables. The original step history is left
+in place; already-converted episodes are skipped unless --overwrite is given.
+If the logs root holds an episode catalog, each converted episode's
+step_history_path is pointed at its arrays/ directory.
+
+Usage::
+
+    python -m rl.surrogate.datasets.convert_episode_arrays \\
+        --logs-root logs/sweep_run_Jun23
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from rl.surrogate.datasets.discovery import discover_episode_dirs
+from urbannav.episode_arrays import convert_episode, find_step_source
+from urbannav.episode_catalog import CATALOG_FILENAME, EpisodeCatalog
+
+
+def convert(logs_root: str, overwrite: bool = False) -> int:
+    """Convert every discovered episode; returns the number converted."""
+    dirs = discover_episode_dirs(logs_root)
+    if not dirs:
+        raise RuntimeError(f"No episode directories found under {logs_root!r}.")
+
+    catalog_path = os.path.join(logs_root, CATALOG_FILENAME)
+    catalog = EpisodeCatalog(catalog_path) if os.path.exists(catalog_path) else None
+
+    start = time.perf_counter()
+    converted = 0
+    for ep_dir in dirs:
+        if find_step_source(ep_dir) == "arrays" and not overwrite:
+            continue
+        target = convert_episode(ep_dir, overwrite=overwrite)
+        if catalog is not None:
+            catalog.set_paths(ep_dir, step_history_path=os.path.abspath(target))
+        converted += 1
+
+    print(
+        f"[convert_episode_arrays] converted {converted}/{len(dirs)} episode(s) "
+        f"under {logs_root} in {time.perf_counter() - start:.1f}s"
+    )
+    return converted
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--logs-root", required=True)
+    p.add_argument("--overwrite", action="store_true")
+    return p
+
+
+def main() -> None:
+    args = _build_arg_parser().parse_args()
+    convert(logs_root=args.logs_root, overwrite=args.overwrite)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,12 @@ Shared, dataset-agnostic helpers used by the per-model `prepare_*_data.py`
 scripts: recursive episode-directory discovery and seeded directory-level
 train/val/test splitting.
 
+When a logs root holds an episode catalog (catalog.sqlite, written by
+parallel_runner or any Logger with `logging.catalog` set; see
+urbannav.episode_catalog) discovery is a single query against it instead of
+a directory walk, and episodes can be filtered by config value or metric.
+Rebuild a stale or missing catalog with build_episode_catalog.py.
+
 Splitting happens at the *episode-directory* level (not at the level of
 materialized transitions/pairs) so that no two splits ever share data from
 the same episode.
@@ -14,25 +20,46 @@ from __future__ import annotations
 
 import random
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Sequence, Tuple
+
+from urbannav.episode_arrays import find_step_source
+from urbannav.episode_catalog import CATALOG_FILENAME, EpisodeCatalog
+from urbannav.episode_io import json_exists
 
-#           FOR  |  dynamics_models  |                  | value-network models |                  
-REQUIRED_FILES = ("step_history.json", "metadata.json", "episode_metrics.json")
+# Value-network models need these (either may be .gz / .zst compressed); the
+# dynamics models additionally need a step history, which may be
+# step_history.json, a chunked step_history/ or converted arrays/.
+REQUIRED_FILES = ("metadata.json", "episode_metrics.json")
 
 
-def discover_episode_dirs(root: str) -> List[str]:
+def discover_episode_dirs(root: str, where: Optional[Sequence[str]] = None) -> List[str]:
     """Recursively find every directory under root containing all of
-    REQUIRED_FILES. Handles arbitrarily nested layouts, 
+    REQUIRED_FILES and a step history. Handles arbitrarily nested layouts, 
     e.g.
     logs/sweep_run_Jun23/run_<hash>/episode_<n>_<ts>/.
+
+    Args:
+        root:  Logs root. If root/catalog.sqlite exists, episodes are read
+               from the catalog (absolute paths) instead of walking root.
+        where: Catalog filters such as "fleet_composition.0.count>=50" or
+               "metrics.total_nmac_events=0" (see EpisodeCatalog.select).
+               The catalog is built from disk first if root has none.
     """
     root_path = Path(root)
     if not root_path.exists():
         return []
+    catalog_path = root_path / CATALOG_FILENAME
+    if where or catalog_path.exists():
+        rebuild = not catalog_path.exists()
+        catalog = EpisodeCatalog(str(catalog_path))
+        if rebuild:
+            catalog.rebuild(root)
+        return catalog.select(*(where or ()), root=root, complete=True)
     dirs = {
         p.parent
-        for p in root_path.rglob(REQUIRED_FILES[0])
-        if all((p.parent / f).exists() for f in REQUIRED_FILES)
+        for p in root_path.rglob(REQUIRED_FILES[0] + "*")
+        if all(json_exists(str(p.parent / f)) for f in REQUIRED_FILES)
+        and find_step_source(str(p.parent)) is not None
     }
     return sorted(str(d) for d in dirs)
 
@@ -21,24 +21,26 @@ Edge feature tensor scaling:
       -> shape [~N*K, 4] — roughly linear.
 
 Each sample is a (hetero_graph_t, hetero_graph_t+1) pair for next-state
-prediction.  Loads from the same step_history.json files produced by
-MetricsCollector — no new logging format needed.
+prediction.  Reads the step histories produced by MetricsCollector, through
+the column tables of urbannav.episode_arrays (memory-mapped once an episode
+has been converted with convert_episode_arrays.py).
 
 Supports multiple log directories for cross-config data mixing.
 """
 
 from __future__ import annotations
 
-import json
-import os
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import torch
 from torch_geometric.data import HeteroData
 from torch.utils.data import Dataset
 
+from rl.surrogate.datasets.discovery import discover_episode_dirs
+from urbannav.episode_arrays import EpisodeArrayCache, EpisodeArrays
+from urbannav.vertiport_distances import VertiportTree
+
 # --- Feature dimensions ---
 
 UAV_NODE_KEYS: Tuple[str, ...] = (
@@ -52,39 +54,32 @@ UAV_EDGE_DIM: int = 4  # [relative_distance, dx, dy, dz]
 VP_NODE_KEYS: Tuple[str, ...] = ("x", "y", "capacity", "n_grounded", "n_landing_queue")
 VP_NODE_DIM: int = len(VP_NODE_KEYS)
 
+# Column of each VP_NODE_KEYS entry in the vertiport table (_VERTIPORT_FIELDS order)
+_VP_NODE_COLUMNS = [0, 1, 4, 2, 3]
+
 VALID_UAV_EDGE_TYPES = {"distance_threshold", "fully_connected"}
 
-#TODO: add docstring 
+
 def _build_uav_edges_fully_connected(n: int) -> torch.Tensor:
+    """All n*(n-1) directed pairs, source-major."""
     if n < 2:
         return torch.zeros((2, 0), dtype=torch.long)
-    src, dst = [], []
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                src.append(i)
-                dst.append(j)
-    return torch.tensor([src, dst], dtype=torch.long)
+    src, dst = np.nonzero(~np.eye(n, dtype=bool))
+    return torch.tensor(np.stack([src, dst]), dtype=torch.long)
 
 
 def _build_uav_edges_distance(
     positions: np.ndarray, threshold: float
 ) -> torch.Tensor:
+    """Directed pairs whose separation is <= threshold, source-major."""
     n = len(positions)
     if n < 2:
         return torch.zeros((2, 0), dtype=torch.long)
-    src, dst = [], []
-    for i in range(n):
-        for j in range(n):
-            if i == j:
-                continue
-            dist = np.linalg.norm(positions[i] - positions[j])
-            if dist <= threshold:
-                src.append(i)
-                dst.append(j)
-    if not src:
-        return torch.zeros((2, 0), dtype=torch.long)
-    return torch.tensor([src, dst], dtype=torch.long)
+    dists = np.linalg.norm(positions[:, None, :] - positions[None, :, :], axis=-1)
+    within = dists <= threshold
+    np.fill_diagonal(within, False)
+    src, dst = np.nonzero(within)
+    return torch.tensor(np.stack([src, dst]), dtype=torch.long)
 
 
 def _compute_uav_edge_attr(
@@ -93,60 +88,44 @@ def _compute_uav_edge_attr(
     n_edges = edge_index.shape[1]
     if n_edges == 0:
         return torch.zeros((0, UAV_EDGE_DIM), dtype=torch.float32)
-    attr = torch.zeros((n_edges, UAV_EDGE_DIM), dtype=torch.float32)
-    for e in range(n_edges):
-        si = int(edge_index[0, e])
-        di = int(edge_index[1, e])
-        diff = positions[di] - positions[si]
-        attr[e, 0] = float(np.linalg.norm(diff))
-        attr[e, 1] = float(diff[0])
-        attr[e, 2] = float(diff[1])
-        attr[e, 3] = float(diff[2]) if len(diff) > 2 else 0.0
-    return attr
+    src, dst = edge_index.numpy()
+    diff = positions[dst] - positions[src]
+    attr = np.zeros((n_edges, UAV_EDGE_DIM), dtype=np.float32)
+    attr[:, 0] = np.linalg.norm(diff, axis=1)
+    attr[:, 1:] = diff
+    return torch.from_numpy(attr)
 
 
 def _step_to_hetero(
-    step: Dict[str, Any],
+    arrays: EpisodeArrays,
+    k: int,
     uav_edge_type: str,
     uav_edge_distance: float,
     vp_edge_index: torch.Tensor,
+    vp_tree: Optional[VertiportTree] = None,
 ) -> HeteroData:
-    """Convert one step record into a HeteroData graph."""
+    """Convert step index k of an episode into a HeteroData graph.
+
+    vp_tree is the episode's KD-tree over vertiport positions; it is rebuilt
+    from this step's vertiports when missing or of a different size.
+    """
     data = HeteroData()
 
     # --- Vertiport nodes ---
-    vp_snap = step.get("vertiports") or {}
-    n_vp = len(vp_snap)
-    vp_x = torch.zeros((n_vp, VP_NODE_DIM), dtype=torch.float32)
-    for idx_str, info in vp_snap.items():
-        idx = int(idx_str)
-        if idx < n_vp:
-            vp_x[idx, 0] = float(info.get("x", 0.0))
-            vp_x[idx, 1] = float(info.get("y", 0.0))
-            vp_x[idx, 2] = float(info.get("capacity", 0))
-            vp_x[idx, 3] = float(info.get("n_grounded", 0))
-            vp_x[idx, 4] = float(info.get("n_landing_queue", 0))
+    vp_rows = arrays.step_rows("vertiports", k)
+    n_vp = len(vp_rows)
+    vp_x = torch.from_numpy(np.asarray(vp_rows[:, _VP_NODE_COLUMNS], dtype=np.float32))
     data["vertiport"].x = vp_x
 
     # --- Vertiport edges (static topology, passed in) ---
     data["vertiport", "connected_to", "vertiport"].edge_index = vp_edge_index
 
-    # --- UAV nodes ---
-    uav_snap = step.get("uavs") or {}
-    uav_ids = sorted(uav_snap.keys(), key=lambda k: int(k))
-    n_uav = len(uav_ids)
-    uav_x = torch.zeros((n_uav, UAV_NODE_DIM), dtype=torch.float32)
-    uav_positions = np.zeros((n_uav, 3), dtype=np.float64)
-
-    for local_idx, uid_str in enumerate(uav_ids):
-        snap = uav_snap[uid_str]
-        for feat_idx, key in enumerate(UAV_NODE_KEYS):
-            uav_x[local_idx, feat_idx] = float(snap.get(key, 0.0))
-        uav_positions[local_idx] = [
-            float(snap.get("x", 0.0)),
-            float(snap.get("y", 0.0)),
-            float(snap.get("z", 0.0)),
-        ]
+    # --- UAV nodes (ordered by UAV id) ---
+    rows = arrays.rows("uav", k)
+    order = np.argsort(arrays["uav_id"][rows], kind="stable") + rows.start
+    n_uav = len(order)
+    uav_x = torch.from_numpy(arrays.uav_matrix(UAV_NODE_KEYS, order))
+    uav_positions = arrays.uav_matrix(("x", "y", "z"), order, dtype=np.float64)
     data["uav"].x = uav_x
 
     # --- UAV-UAV edges ---
@@ -163,24 +142,16 @@ def _step_to_hetero(
     # Each UAV is connected to vertiports it is associated with (start/end).
     # step_history doesn't directly store vertiport indices per UAV, but we
     # can infer from the edge snapshots or fall back to nearest-vertiport.
-    # For now: connect each UAV to its nearest vertiport by position.
-    cross_src, cross_dst = [], []
+    # For now: connect each UAV to its nearest vertiport by position, and to
+    # the second-nearest if available (proxy for target vp).
     if n_uav > 0 and n_vp > 0:
-        vp_positions = vp_x[:, :2].numpy()
-        for ui in range(n_uav):
-            uav_pos_2d = uav_positions[ui, :2]
-            dists = np.linalg.norm(vp_positions - uav_pos_2d, axis=1)
-            nearest = int(np.argmin(dists))
-            cross_src.append(ui)
-            cross_dst.append(nearest)
-            # Also connect to second-nearest if available (proxy for target vp)
-            if n_vp > 1:
-                sorted_vps = np.argsort(dists)
-                second = int(sorted_vps[1])
-                cross_src.append(ui)
-                cross_dst.append(second)
-    if cross_src:
-        cross_ei = torch.tensor([cross_src, cross_dst], dtype=torch.long)
+        if vp_tree is None or len(vp_tree) != n_vp:
+            vp_tree = VertiportTree(vp_x[:, :2].numpy())
+        n_targets = min(2, n_vp)
+        _, nearest = vp_tree.nearest(uav_positions[:, :2], k=n_targets)
+        cross_dst = nearest.reshape(-1)
+        cross_src = np.repeat(np.arange(n_uav), n_targets)
+        cross_ei = torch.tensor(np.stack([cross_src, cross_dst]), dtype=torch.long)
     else:
         cross_ei = torch.zeros((2, 0), dtype=torch.long)
     data["uav", "assigned_to", "vertiport"].edge_index = cross_ei
@@ -194,7 +165,7 @@ def _step_to_hetero(
 
     # --- Global metadata ---
     data.total_uavs = torch.tensor([n_uav], dtype=torch.float32)
-    data.step = torch.tensor([step.get("step", 0)], dtype=torch.long)
+    data.step = torch.tensor([int(arrays["step"][k])], dtype=torch.long)
 
     return data
 
@@ -202,14 +173,20 @@ def _step_to_hetero(
 class DualGraphDataset(Dataset):
     """(hetero_graph_t, hetero_graph_t+1) pairs for dual-graph next-state prediction.
 
+    Only the pair index and each episode's vertiport topology are built at
+    construction; graphs are assembled from the episode's column tables
+    (memory-mapped for converted episodes, see urbannav.episode_arrays)
+    in __getitem__.
+
     Args:
-        episode_dirs: Directories containing step_history.json.
+        episode_dirs: Episode directories holding a step history.
         uav_edge_type: "distance_threshold" or "fully_connected".
         uav_edge_distance: Threshold distance for UAV-UAV edges (only used
             when uav_edge_type="distance_threshold").
         vp_edge_type: Edge topology for vertiport graph. Same options as
             GraphFlowDataset: "full_mesh", "distance_threshold".
         vp_edge_distance: Threshold for vertiport distance-based edges.
+        max_open_episodes: Memory-mapped episodes kept open at once.
     """
 
     def __init__(
@@ -219,6 +196,7 @@ class DualGraphDataset(Dataset):
         uav_edge_distance: float = 200.0,
         vp_edge_type: str = "full_mesh",
         vp_edge_distance: float = 0.0,
+        max_open_episodes: int = 32,
     ):
         if uav_edge_type not in VALID_UAV_EDGE_TYPES:
             raise ValueError(
@@ -229,78 +207,70 @@ class DualGraphDataset(Dataset):
         self.uav_edge_distance = uav_edge_distance
         self.vp_edge_type = vp_edge_type
         self.vp_edge_distance = vp_edge_distance
-
-        self._pairs: List[Tuple[HeteroData, HeteroData]] = []
-
-        for ep_dir in episode_dirs:
-            self._load_episode(ep_dir)
-
-    def _load_episode(self, episode_dir: str) -> None:
-        path = os.path.join(episode_dir, "step_history.json")
-        with open(path, "r") as f:
-            steps: List[Dict[str, Any]] = json.load(f)
-        steps.sort(key=lambda s: s["step"])
-        steps = [s for s in steps if s.get("vertiports") and s.get("uavs")]
+        self.episode_dirs = list(episode_dirs)
+
+        self._episodes = EpisodeArrayCache(max_open_episodes)
+        self._vp_edge_index: List[torch.Tensor] = []
+        self._vp_trees: List[Optional[VertiportTree]] = []
+        pairs: List[np.ndarray] = []
+
+        for i, ep_dir in enumerate(self.episode_dirs):
+            steps = self._index_episode(ep_dir)
+            if len(steps) >= 2:
+                pairs.append(np.stack([np.full(len(steps) - 1, i), steps[:-1], steps[1:]], axis=1))
+        # Rows of (episode, step index t, step index t+1)
+        self._pairs = np.concatenate(pairs) if pairs else np.zeros((0, 3), dtype=np.int64)
+
+    def _index_episode(self, episode_dir: str) -> np.ndarray:
+        arrays = self._episodes.get(episode_dir)
+        steps = np.flatnonzero((arrays.counts("vertiports") > 0) & (arrays.counts("uav") > 0))
         if len(steps) < 2:
-            return
+            self._vp_edge_index.append(torch.zeros((2, 0), dtype=torch.long))
+            self._vp_trees.append(None)
+            return steps
 
         # Build static vertiport edge index from first step
-        first_vp = steps[0]["vertiports"]
-        n_vp = len(first_vp)
-        if n_vp == 0:
-            return
-
-        vp_positions = np.zeros((n_vp, 2), dtype=np.float64)
-        for idx_str, info in first_vp.items():
-            idx = int(idx_str)
-            if idx < n_vp:
-                vp_positions[idx] = [info.get("x", 0.0), info.get("y", 0.0)]
-
+        vp_positions = np.asarray(arrays.step_rows("vertiports", steps[0])[:, :2], dtype=np.float64)
         if self.vp_edge_type == "full_mesh":
-            vp_edge_index = _build_uav_edges_fully_connected(n_vp)
+            vp_edge_index = _build_uav_edges_fully_connected(len(vp_positions))
         else:
             vp_edge_index = _build_uav_edges_distance(
                 vp_positions, self.vp_edge_distance
             )
-
-        for t in range(len(steps) - 1):
-            g_t = _step_to_hetero(
-                steps[t], self.uav_edge_type, self.uav_edge_distance, vp_edge_index
-            )
-            g_tp1 = _step_to_hetero(
-                steps[t + 1], self.uav_edge_type, self.uav_edge_distance, vp_edge_index
-            )
-            self._pairs.append((g_t, g_tp1))
+        self._vp_edge_index.append(vp_edge_index)
+        # Nearest-vertiport lookups for the cross-graph edges of every step
+        self._vp_trees.append(VertiportTree(vp_positions))
+        return steps
 
     def __len__(self) -> int:
         return len(self._pairs)
 
     def __getitem__(self, idx: int) -> Tuple[HeteroData, HeteroData]:
-        return self._pairs[idx]
+        ep, k_t, k_tp1 = (int(v) for v in self._pairs[idx])
+        arrays = self._episodes.get(self.episode_dirs[ep])
+        vp_edge_index = self._vp_edge_index[ep]
+        vp_tree = self._vp_trees[ep]
+        return (
+            _step_to_hetero(arrays, k_t, self.uav_edge_type, self.uav_edge_distance, vp_edge_index, vp_tree),
+            _step_to_hetero(arrays, k_tp1, self.uav_edge_type, self.uav_edge_distance, vp_edge_index, vp_tree),
+        )
 
     @classmethod
     def from_logs_root(
-        cls, logs_root: Union[str, List[str]], **kwargs
+        cls, logs_root: Union[str, List[str]], where: Optional[Sequence[str]] = None, **kwargs
     ) -> "DualGraphDataset":
-        """Build from every episode under logs_root that has step_history.json.
+        """Build from every episode under logs_root that has a step history.
 
         Args:
             logs_root: Single path or list of paths.  When a list is given,
                 episodes from all directories are merged into one dataset.
+            where: Catalog filters passed to discover_episode_dirs(), e.g.
+                "metrics.total_nmac_events=0".
         """
         if isinstance(logs_root, str):
             logs_root = [logs_root]
 
         dirs: List[str] = []
         for root_path in logs_root:
-            root = Path(root_path)
-            if not root.exists():
-                continue
-            dirs.extend(
-                sorted(
-                    str(p)
-                    for p in root.iterdir()
-                    if p.is_dir() and (p / "step_history.json").exists()
-                )
-            )
+            dirs.extend(discover_episode_dirs(root_path, where=where))
         return cls(dirs, **kwargs)
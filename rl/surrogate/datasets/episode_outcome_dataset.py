@@ -19,37 +19,24 @@ to select multiple scalars for multi-task value heads).
 
 from __future__ import annotations
 
-import json
 import os
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import torch
 from torch.utils.data import Dataset
 
+from rl.surrogate.datasets.discovery import discover_episode_dirs
+from urbannav.episode_io import read_json
+
 START_POS_DIM: int = 3  # (x, y, z) per UAV
 EPISODE_SCALAR_KEYS: Tuple[str, ...] = ('num_uavs_at_start', 'start_step')
 DEFAULT_TARGET_KEYS: Tuple[str, ...] = ('avg_dist_to_goal_final',)
 
 
-def discover_episode_dirs(logs_root: str) -> List[str]:
-    """List immediate subdirectories of logs_root that contain BOTH
-    metadata.json and episode_metrics.json."""
-    root = Path(logs_root)
-    if not root.exists():
-        return []
-    return sorted(
-        str(p) for p in root.iterdir()
-        if p.is_dir()
-        and (p / 'metadata.json').exists()
-        and (p / 'episode_metrics.json').exists()
-    )
-
-
 def _load_json(path: str) -> Dict[str, Any]:
-    with open(path, 'r') as f:
-        return json.load(f)
+    # read_json also finds logs written with LoggingConfig.compression
+    return read_json(path)
 
 
 class EpisodeOutcomeDataset(Dataset):
@@ -168,18 +155,20 @@ class EpisodeOutcomeDataset(Dataset):
 
     @classmethod
     def from_logs_root(
-        cls, logs_root: Union[str, List[str]], **kwargs
+        cls, logs_root: Union[str, List[str]], where: Optional[Sequence[str]] = None, **kwargs
     ) -> 'EpisodeOutcomeDataset':
         """Build from every episode under logs_root.
 
         Args:
             logs_root: Single path or list of paths.  When a list is given,
                 episodes from all directories are merged into one dataset.
+            where: Catalog filters passed to discover_episode_dirs(), e.g.
+                "metrics.total_nmac_events=0".
         """
         if isinstance(logs_root, str):
             logs_root = [logs_root]
 
-        all_dirs: List[str] = []
+        dirs: List[str] = []
         for root_path in logs_root:
-            all_dirs.extend(discover_episode_dirs(root_path))
-        return cls(all_dirs, **kwargs)
+            dirs.extend(discover_episode_dirs(root_path, where=where))
+        return cls(dirs, **kwargs)
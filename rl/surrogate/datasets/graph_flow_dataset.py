@@ -16,17 +16,16 @@ Supports three edge topology types via ``edge_type`` parameter:
 
 from __future__ import annotations
 
-import json
-import math
-import os
-from itertools import product
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import torch
 from torch_geometric.data import Data
 
+from rl.surrogate.datasets.discovery import discover_episode_dirs
+from urbannav.episode_arrays import EpisodeArrayCache, EpisodeArrays
+from urbannav.vertiport_distances import pairwise_distances
+
 NODE_ATTR_KEYS: Tuple[str, ...] = ("n_grounded", "n_landing_queue", "capacity")
 NODE_ATTR_DIM: int = len(NODE_ATTR_KEYS)
 
@@ -36,95 +35,94 @@ EDGE_ATTR_DIM: int = len(EDGE_DYNAMIC_KEYS) + len(EDGE_STATIC_KEYS)
 
 VALID_EDGE_TYPES = {"full_mesh", "demand_driven", "distance_threshold"}
 
+# Column of each NODE_ATTR_KEYS entry in the vertiport table (_VERTIPORT_FIELDS order)
+_VP_NODE_COLUMNS = [2, 3, 4]
+
 
 def _build_edge_index_full_mesh(n_nodes: int) -> torch.Tensor:
-    src, dst = [], []
-    for i, j in product(range(n_nodes), repeat=2):
-        if i != j:
-            src.append(i)
-            dst.append(j)
-    return torch.tensor([src, dst], dtype=torch.long)
+    src, dst = np.nonzero(~np.eye(n_nodes, dtype=bool))
+    return torch.tensor(np.stack([src, dst]), dtype=torch.long)
 
 
-def _build_edge_index_demand_driven(
-    n_nodes: int,
-    all_edge_snapshots: List[Dict[str, Dict[str, Any]]],
-) -> torch.Tensor:
-    """Edges for every OD pair that appears at least once across all steps."""
-    pairs: set = set()
-    for snap in all_edge_snapshots:
-        for entry in snap.values():
-            pairs.add((entry["src"], entry["dst"]))
-    if not pairs:
+def _build_edge_index_demand_driven(edge_rows: np.ndarray) -> torch.Tensor:
+    """Edges for every OD pair that appears at least once across all steps.
+
+    Args:
+        edge_rows: (E, 5) edge-table rows of every step, _EDGE_FIELDS order.
+    """
+    if len(edge_rows) == 0:
         return torch.zeros((2, 0), dtype=torch.long)
-    src, dst = zip(*sorted(pairs))
-    return torch.tensor([list(src), list(dst)], dtype=torch.long)
+    pairs = np.unique(np.asarray(edge_rows[:, :2], dtype=np.int64), axis=0)
+    return torch.tensor(pairs.T.copy(), dtype=torch.long)
 
 
 def _build_edge_index_distance_threshold(
-    vp_positions: np.ndarray,
+    vp_distance: np.ndarray,
     threshold: float,
 ) -> torch.Tensor:
-    n = len(vp_positions)
-    src, dst = [], []
-    for i in range(n):
-        for j in range(n):
-            if i == j:
-                continue
-            dist = np.linalg.norm(vp_positions[i] - vp_positions[j])
-            if dist <= threshold:
-                src.append(i)
-                dst.append(j)
-    return torch.tensor([src, dst], dtype=torch.long)
-
-
-def _compute_pairwise_distances(vp_positions: np.ndarray) -> Dict[Tuple[int, int], float]:
-    n = len(vp_positions)
-    dists: Dict[Tuple[int, int], float] = {}
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                dists[(i, j)] = float(np.linalg.norm(vp_positions[i] - vp_positions[j]))
+    within = vp_distance <= threshold
+    np.fill_diagonal(within, False)
+    src, dst = np.nonzero(within)
+    return torch.tensor(np.stack([src, dst]), dtype=torch.long)
+
+
+def _edge_distances(vp_distance: np.ndarray, edge_index: torch.Tensor) -> np.ndarray:
+    """Static per-edge vertiport distance (0 for self loops / unknown nodes)."""
+    src, dst = edge_index.numpy()
+    n = len(vp_distance)
+    valid = (src < n) & (dst < n) & (src != dst)
+    dists = np.zeros(len(src), dtype=np.float64)
+    dists[valid] = vp_distance[src[valid], dst[valid]]
     return dists
 
 
+def _match_edge_rows(edge_index: torch.Tensor, edge_rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Match graph edges to one step's edge-table rows by (src, dst).
+
+    Returns:
+        (edge positions with a row, matching row indices).  If a pair
+        appears more than once the last row wins.
+    """
+    if len(edge_rows) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    src, dst = edge_index.numpy()
+    row_src = edge_rows[:, 0].astype(np.int64)
+    row_dst = edge_rows[:, 1].astype(np.int64)
+    base = int(max(row_src.max(), row_dst.max(), src.max(initial=0), dst.max(initial=0))) + 1
+    row_codes = row_src * base + row_dst
+    order = np.argsort(row_codes, kind="stable")
+    sorted_codes = row_codes[order]
+    wanted = src * base + dst
+    pos = np.searchsorted(sorted_codes, wanted, side="right") - 1
+    hit = (pos >= 0) & (sorted_codes[np.maximum(pos, 0)] == wanted)
+    return np.flatnonzero(hit), order[pos[hit]]
+
+
 def _step_to_graph(
-    step: Dict[str, Any],
+    arrays: EpisodeArrays,
+    k: int,
     edge_index: torch.Tensor,
     n_nodes: int,
-    pairwise_dists: Dict[Tuple[int, int], float],
+    edge_distance: np.ndarray,
 ) -> Data:
-    """Convert one step record into a PyG Data object."""
-    vp_snap = step.get("vertiports") or {}
-    edge_snap = step.get("edges") or {}
+    """Convert step index k of an episode into a PyG Data object."""
+    vp_rows = arrays.step_rows("vertiports", k)
 
     # Node features: [n_grounded, n_landing_queue, capacity]
     x = torch.zeros((n_nodes, NODE_ATTR_DIM), dtype=torch.float32)
-    for idx_str, info in vp_snap.items():
-        idx = int(idx_str)
-        if idx < n_nodes:
-            x[idx, 0] = float(info.get("n_grounded", 0))
-            x[idx, 1] = float(info.get("n_landing_queue", 0))
-            x[idx, 2] = float(info.get("capacity", 0))
-
-    # Build a lookup for edge snapshots: (src, dst) -> snapshot
-    edge_lookup: Dict[Tuple[int, int], Dict[str, Any]] = {}
-    for entry in edge_snap.values():
-        key = (entry["src"], entry["dst"])
-        edge_lookup[key] = entry
+    n = min(len(vp_rows), n_nodes)
+    x[:n] = torch.from_numpy(np.asarray(vp_rows[:n][:, _VP_NODE_COLUMNS], dtype=np.float32))
 
     # Edge features: [n_in_transit, avg_progress, edge_distance]
-    n_edges = edge_index.shape[1]
-    edge_attr = torch.zeros((n_edges, EDGE_ATTR_DIM), dtype=torch.float32)
-    for e in range(n_edges):
-        src_i = int(edge_index[0, e])
-        dst_i = int(edge_index[1, e])
-        snap = edge_lookup.get((src_i, dst_i))
-        if snap is not None:
-            n_transit = snap["n_in_transit"]
-            edge_attr[e, 0] = float(n_transit)
-            edge_attr[e, 1] = snap["progress_sum"] / n_transit if n_transit > 0 else 0.0
-        edge_attr[e, 2] = pairwise_dists.get((src_i, dst_i), 0.0)
+    edge_rows = np.asarray(arrays.step_rows("edges", k))
+    attr = np.zeros((edge_index.shape[1], EDGE_ATTR_DIM), dtype=np.float32)
+    hit, rows = _match_edge_rows(edge_index, edge_rows)
+    n_transit = edge_rows[rows, 2]
+    progress_sum = edge_rows[rows, 3]
+    attr[hit, 0] = n_transit
+    attr[hit, 1] = np.where(n_transit > 0, progress_sum / np.where(n_transit > 0, n_transit, 1.0), 0.0)
+    attr[:, 2] = edge_distance
+    edge_attr = torch.from_numpy(attr)
 
     # Global: total UAVs (sum of grounded + landing_queue + all in-transit)
     total_grounded = x[:, 0].sum().item() + x[:, 1].sum().item()
@@ -136,7 +134,7 @@ def _step_to_graph(
         edge_index=edge_index,
         edge_attr=edge_attr,
         total_uavs=torch.tensor([total_uavs], dtype=torch.float32),
-        step=torch.tensor([step.get("step", 0)], dtype=torch.long),
+        step=torch.tensor([int(arrays["step"][k])], dtype=torch.long),
     )
     return data
 
@@ -144,11 +142,17 @@ def _step_to_graph(
 class GraphFlowDataset(torch.utils.data.Dataset):
     """(graph_t, graph_t+1) pairs for graph-level next-state prediction.
 
+    Only the pair index and each episode's static topology are built at
+    construction; graphs are assembled from the episode's column tables
+    (memory-mapped for converted episodes, see urbannav.episode_arrays)
+    in __getitem__.
+
     Args:
-        episode_dirs: Directories containing step_history.json with
+        episode_dirs: Episode directories whose step history has
             vertiport/edge snapshots (from extended MetricsCollector).
         edge_type: One of "full_mesh", "demand_driven", "distance_threshold".
         distance_threshold: Required when edge_type="distance_threshold".
+        max_open_episodes: Memory-mapped episodes kept open at once.
     """
 
     def __init__(
@@ -156,6 +160,7 @@ class GraphFlowDataset(torch.utils.data.Dataset):
         episode_dirs: List[str],
         edge_type: str = "full_mesh",
         distance_threshold: float = 0.0,
+        max_open_episodes: int = 32,
     ):
         if edge_type not in VALID_EDGE_TYPES:
             raise ValueError(f"edge_type must be one of {VALID_EDGE_TYPES}, got '{edge_type}'")
@@ -164,84 +169,78 @@ class GraphFlowDataset(torch.utils.data.Dataset):
 
         self.edge_type = edge_type
         self.distance_threshold = distance_threshold
+        self.episode_dirs = list(episode_dirs)
 
-        self._pairs: List[Tuple[Data, Data]] = []
+        self._episodes = EpisodeArrayCache(max_open_episodes)
+        # Per episode: (edge_index, edge_distance, n_nodes)
+        self._topology: List[Tuple[torch.Tensor, np.ndarray, int]] = []
+        pairs: List[np.ndarray] = []
 
-        for ep_dir in episode_dirs:
-            self._load_episode(ep_dir)
+        for i, ep_dir in enumerate(self.episode_dirs):
+            steps = self._index_episode(ep_dir)
+            if len(steps) >= 2:
+                pairs.append(np.stack([np.full(len(steps) - 1, i), steps[:-1], steps[1:]], axis=1))
+        # Rows of (episode, step index t, step index t+1)
+        self._pairs = np.concatenate(pairs) if pairs else np.zeros((0, 3), dtype=np.int64)
 
-    def _load_episode(self, episode_dir: str) -> None:
-        path = os.path.join(episode_dir, "step_history.json")
-        with open(path, "r") as f:
-            steps: List[Dict[str, Any]] = json.load(f)
-        steps.sort(key=lambda s: s["step"])
+    def _index_episode(self, episode_dir: str) -> np.ndarray:
+        arrays = self._episodes.get(episode_dir)
 
         # Filter to steps that have vertiport data
-        steps = [s for s in steps if s.get("vertiports")]
+        steps = np.flatnonzero(arrays.counts("vertiports") > 0)
         if len(steps) < 2:
-            return
+            self._topology.append((torch.zeros((2, 0), dtype=torch.long), np.zeros(0), 0))
+            return steps
 
         # Determine graph topology from first step
-        first_vp = steps[0]["vertiports"]
-        n_nodes = len(first_vp)
-        if n_nodes == 0:
-            return
-
-        # Extract vertiport positions for distance calculations
-        vp_positions = np.zeros((n_nodes, 2), dtype=np.float64)
-        for idx_str, info in first_vp.items():
-            idx = int(idx_str)
-            if idx < n_nodes:
-                vp_positions[idx] = [info.get("x", 0.0), info.get("y", 0.0)]
-
-        pairwise_dists = _compute_pairwise_distances(vp_positions)
+        vp_positions = np.asarray(arrays.step_rows("vertiports", steps[0])[:, :2], dtype=np.float64)
+        n_nodes = len(vp_positions)
+        # Vertiports are static: one distance matrix per episode, looked up below
+        vp_distance = pairwise_distances(vp_positions)
 
         # Build edge_index based on edge_type
-        all_edge_snaps = [s.get("edges") or {} for s in steps]
         if self.edge_type == "full_mesh":
             edge_index = _build_edge_index_full_mesh(n_nodes)
         elif self.edge_type == "demand_driven":
-            edge_index = _build_edge_index_demand_driven(n_nodes, all_edge_snaps)
+            step_of_row = np.repeat(np.arange(arrays.num_steps), arrays.counts("edges"))
+            edge_rows = np.asarray(arrays["edges"])[np.isin(step_of_row, steps)]
+            edge_index = _build_edge_index_demand_driven(edge_rows)
         else:
-            edge_index = _build_edge_index_distance_threshold(vp_positions, self.distance_threshold)
+            edge_index = _build_edge_index_distance_threshold(vp_distance, self.distance_threshold)
 
-        # Build consecutive (graph_t, graph_t+1) pairs
-        for t in range(len(steps) - 1):
-            g_t = _step_to_graph(steps[t], edge_index, n_nodes, pairwise_dists)
-            g_tp1 = _step_to_graph(steps[t + 1], edge_index, n_nodes, pairwise_dists)
-            self._pairs.append((g_t, g_tp1))
+        self._topology.append((edge_index, _edge_distances(vp_distance, edge_index), n_nodes))
+        return steps
 
     def __len__(self) -> int:
         return len(self._pairs)
 
     def __getitem__(self, idx: int) -> Tuple[Data, Data]:
-        return self._pairs[idx]
+        ep, k_t, k_tp1 = (int(v) for v in self._pairs[idx])
+        arrays = self._episodes.get(self.episode_dirs[ep])
+        edge_index, edge_distance, n_nodes = self._topology[ep]
+        return (
+            _step_to_graph(arrays, k_t, edge_index, n_nodes, edge_distance),
+            _step_to_graph(arrays, k_tp1, edge_index, n_nodes, edge_distance),
+        )
 
     @classmethod
     def from_logs_root(
-        cls, logs_root: Union[str, List[str]], **kwargs
+        cls, logs_root: Union[str, List[str]], where: Optional[Sequence[str]] = None, **kwargs
     ) -> "GraphFlowDataset":
-        """Build from every episode under logs_root that has step_history.json.
+        """Build from every episode under logs_root that has a step history.
 
         Args:
             logs_root: Single path or list of paths.  When a list is given,
                 all directories are scanned and their episodes are merged
                 into one dataset — this enables mixing data from different
                 simulator configurations in a single training run.
+            where: Catalog filters passed to discover_episode_dirs(), e.g.
+                "metrics.total_nmac_events=0".
         """
         if isinstance(logs_root, str):
             logs_root = [logs_root]
 
         dirs: List[str] = []
         for root_path in logs_root:
-            root = Path(root_path)
-            if not root.exists():
-                continue
-            dirs.extend(
-                sorted(
-                    str(p)
-                    for p in root.iterdir()
-                    if p.is_dir() and (p / "step_history.json").exists()
-                )
-            )
+            dirs.extend(discover_episode_dirs(root_path, where=where))
         return cls(dirs, **kwargs)
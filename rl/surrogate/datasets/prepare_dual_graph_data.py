@@ -22,6 +22,7 @@ from __future__ import annotations
 import argparse
 import json
 from pathlib import Path
+from typing import List, Optional
 
 import torch
 
@@ -38,12 +39,13 @@ def prepare(
     test_fraction: float = 0.1,
     seed: int = 0,
     allow_empty_splits: bool = False,
+    where: Optional[List[str]] = None,
     uav_edge_type: str = "distance_threshold",
     uav_edge_distance: float = 200.0,
     vp_edge_type: str = "full_mesh",
     vp_edge_distance: float = 0.0,
 ) -> None:
-    dirs = discover_episode_dirs(logs_root)
+    dirs = discover_episode_dirs(logs_root, where=where)
     if not dirs:
         raise RuntimeError(f"No episode directories found under {logs_root!r}.")
 
@@ -78,6 +80,7 @@ def prepare(
         "val_fraction": val_fraction,
         "test_fraction": test_fraction,
         "seed": seed,
+        "where": where,
         "counts": counts,
     }
     with open(out / "metadata.json", "w") as f:
@@ -94,6 +97,8 @@ def _build_arg_parser() -> argparse.ArgumentParser:
     p.add_argument("--test-fraction", type=float, default=0.1)
     p.add_argument("--seed", type=int, default=0)
     p.add_argument("--allow-empty-splits", action="store_true")
+    p.add_argument("--where", action="append", default=None,
+                   help='Episode catalog filter, e.g. "fleet_composition.0.count>=50". Repeatable.')
     p.add_argument("--uav-edge-type", default="distance_threshold", choices=sorted(VALID_UAV_EDGE_TYPES))
     p.add_argument("--uav-edge-distance", type=float, default=200.0)
     p.add_argument("--vp-edge-type", default="full_mesh", choices=list(VALID_VP_EDGE_TYPES))
@@ -110,6 +115,7 @@ def main() -> None:
         test_fraction=args.test_fraction,
         seed=args.seed,
         allow_empty_splits=args.allow_empty_splits,
+        where=args.where,
         uav_edge_type=args.uav_edge_type,
         uav_edge_distance=args.uav_edge_distance,
         vp_edge_type=args.vp_edge_type,
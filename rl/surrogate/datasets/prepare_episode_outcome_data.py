@@ -29,6 +29,7 @@ from __future__ import annotations
 import argparse
 import json
 from pathlib import Path
+from typing import List, Optional
 
 import torch
 
@@ -43,12 +44,13 @@ def prepare(
     test_fraction: float = 0.1,
     seed: int = 0,
     allow_empty_splits: bool = False,
+    where: Optional[List[str]] = None,
     max_uavs: int = None,
     target_keys=None,
 ) -> None:
     target_keys = tuple(target_keys) if target_keys else DEFAULT_TARGET_KEYS
 
-    dirs = discover_episode_dirs(logs_root)
+    dirs = discover_episode_dirs(logs_root, where=where)
     if not dirs:
         raise RuntimeError(f"No episode directories found under {logs_root!r}.")
 
@@ -87,6 +89,7 @@ def prepare(
         "val_fraction": val_fraction,
         "test_fraction": test_fraction,
         "seed": seed,
+        "where": where,
         "counts": counts,
     }
     with open(out / "metadata.json", "w") as f:
@@ -103,6 +106,8 @@ def _build_arg_parser() -> argparse.ArgumentParser:
     p.add_argument("--test-fraction", type=float, default=0.1)
     p.add_argument("--seed", type=int, default=0)
     p.add_argument("--allow-empty-splits", action="store_true")
+    p.add_argument("--where", action="append", default=None,
+                   help='Episode catalog filter, e.g. "fleet_composition.0.count>=50". Repeatable.')
     p.add_argument("--max-uavs", type=int, default=None)
     p.add_argument("--target-keys", nargs="+", default=None)
     return p
@@ -117,6 +122,7 @@ def main() -> None:
         test_fraction=args.test_fraction,
         seed=args.seed,
         allow_empty_splits=args.allow_empty_splits,
+        where=args.where,
         max_uavs=args.max_uavs,
         target_keys=args.target_keys,
     )
@@ -28,7 +28,7 @@ from __future__ import annotations
 import argparse
 import json
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import torch
 from torch_geometric.data import Data
@@ -40,10 +40,11 @@ from rl.surrogate.datasets.graph_flow_dataset import GraphFlowDataset, VALID_EDG
 def _build_episodes(
     dirs: List[str], edge_type: str, distance_threshold: float,
 ) -> List[List[Tuple[Data, Data]]]:
-    return [
-        GraphFlowDataset([d], edge_type=edge_type, distance_threshold=distance_threshold)._pairs
-        for d in dirs
-    ]
+    episodes = []
+    for d in dirs:
+        ds = GraphFlowDataset([d], edge_type=edge_type, distance_threshold=distance_threshold)
+        episodes.append([ds[i] for i in range(len(ds))])
+    return episodes
 
 
 def prepare(
@@ -53,10 +54,11 @@ def prepare(
     test_fraction: float = 0.1,
     seed: int = 0,
     allow_empty_splits: bool = False,
+    where: Optional[List[str]] = None,
     edge_type: str = "full_mesh",
     distance_threshold: float = 0.0,
 ) -> None:
-    dirs = discover_episode_dirs(logs_root)
+    dirs = discover_episode_dirs(logs_root, where=where)
     if not dirs:
         raise RuntimeError(f"No episode directories found under {logs_root!r}.")
 
@@ -88,6 +90,7 @@ def prepare(
         "val_fraction": val_fraction,
         "test_fraction": test_fraction,
         "seed": seed,
+        "where": where,
         "counts": counts,
     }
     with open(out / "metadata.json", "w") as f:
@@ -104,6 +107,8 @@ def _build_arg_parser() -> argparse.ArgumentParser:
     p.add_argument("--test-fraction", type=float, default=0.1)
     p.add_argument("--seed", type=int, default=0)
     p.add_argument("--allow-empty-splits", action="store_true")
+    p.add_argument("--where", action="append", default=None,
+                   help='Episode catalog filter, e.g. "fleet_composition.0.count>=50". Repeatable.')
     p.add_argument("--edge-type", default="full_mesh", choices=sorted(VALID_EDGE_TYPES))
     p.add_argument("--distance-threshold", type=float, default=0.0)
     return p
@@ -118,6 +123,7 @@ def main() -> None:
         test_fraction=args.test_fraction,
         seed=args.seed,
         allow_empty_splits=args.allow_empty_splits,
+        where=args.where,
         edge_type=args.edge_type,
         distance_threshold=args.distance_threshold,
     )
@@ -2,7 +2,10 @@
 trajectory_dataset.py
 ======================
 (state, action, next_state) PyTorch Dataset built from existing
-logs/<episode>/step_history.json files produced by UrbanNav's Logger.
+logs/<episode>/ step histories produced by UrbanNav's Logger. Episodes
+converted with urbannav.episode_arrays (see convert_episode_arrays.py) are
+memory-mapped; step_history.json / chunked step_history/ episodes are
+loaded into the same column layout in memory.
 
 UAV state per step is `[x, y, z, vx, vy, vz, speed, heading]` (8 features,
 read directly from MetricsCollector.record()'s uav_snapshots — no new
@@ -20,59 +23,50 @@ is present in BOTH step t and step t+1.
 
 from __future__ import annotations
 
-import json
-import os
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import torch
 from torch.utils.data import Dataset
 
+from rl.surrogate.datasets.discovery import discover_episode_dirs
+from urbannav.episode_arrays import ACTION_DIM, EpisodeArrayCache
+
 UAV_STATE_KEYS: Tuple[str, ...] = ('x', 'y', 'z', 'vx', 'vy', 'vz', 'speed', 'heading')
 UAV_STATE_DIM: int = len(UAV_STATE_KEYS)
-UAV_ACTION_DIM: int = 2
-
-
-def _extract_state(snap: Dict[str, Any]) -> np.ndarray:
-    return np.array([float(snap.get(k, 0.0) or 0.0) for k in UAV_STATE_KEYS], dtype=np.float32)
+UAV_ACTION_DIM: int = ACTION_DIM
 
 
-def _extract_action(action_entry: Any) -> np.ndarray:
-    """Coerce a logged action entry to a fixed-shape (2,) float32 array.
-    Logger serializes actions as lists/tuples or scalars — fall back to zeros."""
-    if action_entry is None:
-        return np.zeros(UAV_ACTION_DIM, dtype=np.float32)
-    if isinstance(action_entry, (list, tuple, np.ndarray)):
-        arr = np.asarray(action_entry, dtype=np.float32).flatten()
-        out = np.zeros(UAV_ACTION_DIM, dtype=np.float32)
-        n = min(len(arr), UAV_ACTION_DIM)
-        out[:n] = arr[:n]
-        return out
-    try:
-        return np.array([float(action_entry), 0.0], dtype=np.float32)
-    except (TypeError, ValueError):
-        return np.zeros(UAV_ACTION_DIM, dtype=np.float32)
+def _transition_rows(step_rows: np.ndarray, uav_id: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Pair each UAV row at step index k with the same UAV's row at k + 1.
 
+    Args:
+        step_rows: (rows,) step index of every UAV row.
+        uav_id:    (rows,) UAV id of every row.
 
-def discover_episode_dirs(logs_root: str) -> List[str]:
-    """List immediate subdirectories of logs_root that contain a step_history.json."""
-    root = Path(logs_root)
-    if not root.exists():
-        return []
-    return sorted(
-        str(p) for p in root.iterdir()
-        if p.is_dir() and (p / 'step_history.json').exists()
-    )
+    Returns:
+        (rows_t, rows_tp1) for every UAV present in both steps, in row order.
+    """
+    if len(uav_id) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    base = int(uav_id.max()) + 1
+    codes = step_rows * base + uav_id
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    wanted = codes + base                       # same UAV, next step
+    pos = np.minimum(np.searchsorted(sorted_codes, wanted), len(codes) - 1)
+    found = sorted_codes[pos] == wanted
+    return np.flatnonzero(found), order[pos[found]]
 
 
 class TrajectoryDataset(Dataset):
     """(state, action, next_state) transitions from logged step histories.
 
     Args:
-        episode_dirs: list of directories each containing step_history.json.
-                      Pass either explicit paths or use discover_episode_dirs()
-                      to scan a logs_root.
+        episode_dirs: list of episode directories, each holding a step
+                      history (converted arrays/, a chunked step_history/ or
+                      step_history.json). Pass either explicit paths or use
+                      discover_episode_dirs() to scan a logs_root.
         include_actionless: when True (default), zero-fill the action vector
                             for transitions whose step record has an empty
                             `actions` dict. UAMSimulator currently invokes
@@ -82,84 +76,79 @@ class TrajectoryDataset(Dataset):
                             require non-empty action records (useful for
                             sub-datasets gathered with controllers that DO log
                             their actions through Logger).
+        max_open_episodes: memory-mapped episodes kept open at once.
     """
 
-    def __init__(self, episode_dirs: List[str], include_actionless: bool = True):
+    def __init__(self, episode_dirs: List[str], include_actionless: bool = True,
+                 max_open_episodes: int = 32):
         self.episode_dirs = list(episode_dirs)
         self.include_actionless = include_actionless
 
-        # Materialize (state, action, next_state) triples eagerly. Episodes are
-        # small JSON files; loading once at __init__ keeps __getitem__ fast and
-        # decouples the dataset from disk I/O during training.
-        self._states: List[np.ndarray] = []
-        self._actions: List[np.ndarray] = []
-        self._next_states: List[np.ndarray] = []
-        self._source_keys: List[Tuple[str, int, int]] = []  # (episode_dir, step_t, uav_id) for debugging
-
-        for ep_dir in self.episode_dirs:
-            self._load_episode(ep_dir)
-
-    def _load_episode(self, episode_dir: str) -> None:
-        path = os.path.join(episode_dir, 'step_history.json')
-        with open(path, 'r') as f:
-            steps: List[Dict[str, Any]] = json.load(f)
-
-        # Sort by step index — logger writes in order, but be defensive.
-        steps.sort(key=lambda s: s['step'])
-
-        for t in range(len(steps) - 1):
-            s_t = steps[t]
-            s_tp1 = steps[t + 1]
-            actions_dict = s_t.get('actions') or {}
-            if not actions_dict and not self.include_actionless:
-                continue
-
-            uavs_t = s_t.get('uavs') or {}
-            uavs_tp1 = s_tp1.get('uavs') or {}
-            common = set(uavs_t.keys()) & set(uavs_tp1.keys())
-
-            for uid in common:
-                state = _extract_state(uavs_t[uid])
-                next_state = _extract_state(uavs_tp1[uid])
-                action = _extract_action(actions_dict.get(uid) if actions_dict else None)
-                self._states.append(state)
-                self._actions.append(action)
-                self._next_states.append(next_state)
-                try:
-                    uid_int = int(uid)
-                except (TypeError, ValueError):
-                    uid_int = -1
-                self._source_keys.append((episode_dir, int(s_t['step']), uid_int))
+        # Only the transition index (episode, row_t, row_t+1) is built here.
+        # State / action rows are read from each episode's column tables in
+        # __getitem__ — memory-mapped .npy files for converted episodes (see
+        # urbannav.episode_arrays), so construction cost no longer scales
+        # with the size of the step histories.
+        self._episodes = EpisodeArrayCache(max_open_episodes)
+        episode_idx, rows_t, rows_tp1 = [], [], []
+        for i, ep_dir in enumerate(self.episode_dirs):
+            r_t, r_tp1 = self._index_episode(ep_dir)
+            episode_idx.append(np.full(len(r_t), i, dtype=np.int64))
+            rows_t.append(r_t)
+            rows_tp1.append(r_tp1)
+        self._episode_idx = np.concatenate(episode_idx) if episode_idx else np.zeros(0, dtype=np.int64)
+        self._rows_t = np.concatenate(rows_t) if rows_t else np.zeros(0, dtype=np.int64)
+        self._rows_tp1 = np.concatenate(rows_tp1) if rows_tp1 else np.zeros(0, dtype=np.int64)
+
+    def _index_episode(self, episode_dir: str) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._episodes.get(episode_dir)
+        uav_id = np.asarray(arrays['uav_id'])
+        step_rows = np.repeat(np.arange(arrays.num_steps), arrays.counts('uav'))
+        rows_t, rows_tp1 = _transition_rows(step_rows, uav_id)
+        if not self.include_actionless:
+            keep = np.asarray(arrays['has_actions'])[step_rows[rows_t]]
+            rows_t, rows_tp1 = rows_t[keep], rows_tp1[keep]
+        return rows_t, rows_tp1
 
     def __len__(self) -> int:
-        return len(self._states)
+        return len(self._rows_t)
 
     def __getitem__(self, idx: int) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        arrays = self._episodes.get(self.episode_dirs[self._episode_idx[idx]])
+        rows = np.array([self._rows_t[idx], self._rows_tp1[idx]])
+        states = arrays.uav_matrix(UAV_STATE_KEYS, rows)
+        action = np.array(arrays['action'][rows[0]], dtype=np.float32)
         return (
-            torch.from_numpy(self._states[idx]),
-            torch.from_numpy(self._actions[idx]),
-            torch.from_numpy(self._next_states[idx]),
+            torch.from_numpy(states[0]),
+            torch.from_numpy(action),
+            torch.from_numpy(states[1]),
         )
 
     def get_source(self, idx: int) -> Tuple[str, int, int]:
         """Return (episode_dir, step_t, uav_id) for the transition at idx."""
-        return self._source_keys[idx]
+        ep_dir = self.episode_dirs[self._episode_idx[idx]]
+        arrays = self._episodes.get(ep_dir)
+        row = int(self._rows_t[idx])
+        k = int(np.searchsorted(arrays['uav_offsets'], row, side='right')) - 1
+        return ep_dir, int(arrays['step'][k]), int(arrays['uav_id'][row])
 
     # from LOG directories root, example: ~/Dev/UrbanNav/logs/sweep<number>/run<hash>/episode_metric.json
     @classmethod
     def from_logs_root(
-        cls, logs_root: Union[str, List[str]], **kwargs
+        cls, logs_root: Union[str, List[str]], where: Optional[Sequence[str]] = None, **kwargs
     ) -> 'TrajectoryDataset':
         """Convenience constructor: build from every episode under logs_root.
 
         Args:
             logs_root: Single path or list of paths.  When a list is given,
                 episodes from all directories are merged into one dataset.
+            where: Catalog filters passed to discover_episode_dirs(), e.g.
+                "metrics.total_nmac_events=0".
         """
         if isinstance(logs_root, str):
             logs_root = [logs_root]
 
-        all_dirs: List[str] = []
+        dirs: List[str] = []
         for root_path in logs_root:
-            all_dirs.extend(discover_episode_dirs(root_path))
-        return cls(all_dirs, **kwargs)
+            dirs.extend(discover_episode_dirs(root_path, where=where))
+        return cls(dirs, **kwargs)
@@ -52,7 +52,7 @@ def episode_logs_root(tmp_path_factory) -> str:
 
 @pytest.fixture(scope='module')
 def episode_dirs(episode_logs_root) -> List[str]:
-    from rl.surrogate.datasets.trajectory_dataset import discover_episode_dirs
+    from rl.surrogate.datasets.discovery import discover_episode_dirs
     dirs = discover_episode_dirs(episode_logs_root)
     assert dirs, f'No episode logs found under {episode_logs_root}'
     return dirs
@@ -1,11 +1,14 @@
+import shutil
+
 import torch
 
+from rl.surrogate.datasets.discovery import discover_episode_dirs
 from rl.surrogate.datasets.trajectory_dataset import (
     UAV_ACTION_DIM,
     UAV_STATE_DIM,
     TrajectoryDataset,
-    discover_episode_dirs,
 )
+from urbannav.episode_arrays import convert_episode
 
 
 class TestDiscovery:
@@ -39,3 +42,18 @@ class TestTrajectoryDataset:
     def test_from_logs_root(self, episode_logs_root):
         ds = TrajectoryDataset.from_logs_root(episode_logs_root)
         assert len(ds) > 0
+
+    def test_converted_episodes_match_json(self, episode_dirs, tmp_path):
+        copies = []
+        for i, d in enumerate(episode_dirs):
+            copy = str(tmp_path / f'ep{i}')
+            shutil.copytree(d, copy)
+            convert_episode(copy)
+            copies.append(copy)
+        ds_json = TrajectoryDataset(episode_dirs)
+        ds_arrays = TrajectoryDataset(copies)
+        assert len(ds_arrays) == len(ds_json)
+        for idx in (0, len(ds_json) // 2, len(ds_json) - 1):
+            for a, b in zip(ds_json[idx], ds_arrays[idx]):
+                assert torch.equal(a, b)
+            assert ds_json.get_source(idx)[1:] == ds_arrays.get_source(idx)[1:]
@@ -55,6 +55,14 @@ class GraphBuilder:
         self.idx_to_vertiport: Dict[int, Vertiport] = {}
         self._build_vertiport_mapping()
 
+        # Candidate distances by graph index, looked up in the airspace's
+        # cached vertiport distance matrix
+        candidates = [self.idx_to_vertiport[i] for i in range(len(self.idx_to_vertiport))]
+        self._distance = airspace.vertiport_distances.between(candidates)
+        xy = np.array([(vp.location.x, vp.location.y) for vp in candidates], dtype=float).reshape(-1, 2)
+        extent = xy.max(axis=0) - xy.min(axis=0) if len(xy) else np.zeros(2)
+        self._diagonal = float(np.hypot(*extent)) or 1.0
+
     def _build_vertiport_mapping(self):
         """Create bidirectional mapping between vertiports and indices."""
         idx = 0
@@ -66,7 +74,8 @@ class GraphBuilder:
 
     def compute_distance(self, vp1: Vertiport, vp2: Vertiport) -> float:
         """Euclidean distance between two vertiports."""
-        return vp1.location.distance(vp2.location)
+        distances = self.airspace.vertiport_distances
+        return float(distances.distance[distances.index(vp1), distances.index(vp2)])
 
     def build_graph(self, selected_vertiports: List[Vertiport]):
         """
@@ -107,27 +116,20 @@ class GraphBuilder:
     def _build_fully_connected_graph(self, selected_vertiports: List[Vertiport]):
         """Fully connected graph over all candidate vertiports."""
         num_vertiports = len(self.vertiport_to_idx)
-        all_x = [vp.location.x for vp in self.idx_to_vertiport.values()]
-        all_y = [vp.location.y for vp in self.idx_to_vertiport.values()]
-        min_x, max_x = min(all_x), max(all_x)
-        min_y, max_y = min(all_y), max(all_y)
-        diagonal = float(np.sqrt((max_x - min_x) ** 2 + (max_y - min_y) ** 2)) or 1.0
-
-        edges = []
-        edge_attrs = []
-        for i in range(num_vertiports):
-            for j in range(num_vertiports):
-                if i == j:
-                    continue
-                vp_i = self.idx_to_vertiport[i]
-                vp_j = self.idx_to_vertiport[j]
-                edges.append([i, j])
-
-                distance = self.compute_distance(vp_i, vp_j)
-                both_selected = 1.0 if (vp_i in selected_vertiports and vp_j in selected_vertiports) else 0.0
-                edge_attrs.append([distance / diagonal, both_selected])
-
-        edge_index = torch.tensor(edges, dtype=torch.long).t()
+        selected = np.zeros(num_vertiports, dtype=bool)
+        for vp in selected_vertiports:
+            idx = self.vertiport_to_idx.get(vp)
+            if idx is not None:
+                selected[idx] = True
+
+        # every ordered pair i != j, row-major
+        src, dst = np.nonzero(~np.eye(num_vertiports, dtype=bool))
+        edge_attrs = np.stack([
+            self._distance[src, dst] / self._diagonal,
+            (selected[src] & selected[dst]).astype(float),
+        ], axis=1)
+
+        edge_index = torch.tensor(np.stack([src, dst]), dtype=torch.long)
         edge_attr = torch.tensor(edge_attrs, dtype=torch.float32)
         return edge_index, edge_attr
 
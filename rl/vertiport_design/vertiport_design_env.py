@@ -131,12 +131,9 @@ class VertiportDesignEnv(Env):
 
     def _calculate_total_distance(self, selected_vertiports: List) -> float:
         """Sum of pairwise Euclidean distances between selected vertiports."""
-        total = 0.0
-        for i, vp_i in enumerate(selected_vertiports):
-            for j, vp_j in enumerate(selected_vertiports):
-                if i < j:
-                    total += self.graph_builder.compute_distance(vp_i, vp_j)
-        return float(total)
+        airspace = self.graph_builder.airspace
+        distance = airspace.vertiport_distances.between(selected_vertiports)
+        return float(np.triu(distance, k=1).sum())
 
     def _build_observation(self, action: np.ndarray) -> Dict[str, np.ndarray]:
         """Build the 'GRAPH' obs Dict from current_selected_vertiports + action."""
@@ -7,7 +7,7 @@ from geopandas import GeoSeries, GeoDataFrame
 from osmnx import features as ox_features
 from osmnx import geocode_to_gdf as geocode_to_gdf
 from osmnx import projection as ox_projection
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 import math
 from shapely import Point, Polygon
 from shapely.validation import make_valid
@@ -16,6 +16,8 @@ import random
 from sklearn.cluster import KMeans as KM 
 
 from urbannav.vertiport import Vertiport
+from urbannav.route_network import RouteNetwork, restricted_area_polygons
+from urbannav.vertiport_distances import VertiportDistanceMatrix, VertiportTree, vertiport_tree
 #! FIX:
 # this module will now handle creating objects in/on airspace
 # vertiport creation
@@ -146,6 +148,12 @@ class Airspace:
         self.max_num_vps_airspace = number_of_vertiports #! change the name of this variable
         self.vertiport_list:List[Vertiport] = []
         self.polygon_dict:Dict[str,List[Polygon]] = {} #key,value = str, Polygon #! where and why is this needed 
+        # Dense vertiport ids + distance/travel-time matrices, built on first use
+        self.vertiport_distances = VertiportDistanceMatrix(self.get_candidate_vertiports)
+        # KD-tree over vertiport_list positions, rebuilt when the list changes
+        self._vertiport_tree:Optional[VertiportTree] = None
+        # Routes around restricted areas between all candidates, built on first use
+        self._route_network:Optional[RouteNetwork] = None
 
         return None
 
@@ -225,6 +233,42 @@ class Airspace:
         vp_id_list = [vp.id for vp in self.vertiport_list]
         return vp_id_list
     
+    def get_candidate_vertiports(self) -> List[Vertiport]:
+        '''Returns vertiport_list followed by the region candidates (regions_dict)
+        not already in it - the vertiports numbered by vertiport_distances.'''
+
+        candidates = list(self.vertiport_list)
+        seen = {vp.id for vp in candidates}
+        for region_vps in getattr(self, 'regions_dict', {}).values():
+            for vp in region_vps:
+                if vp.id not in seen:
+                    seen.add(vp.id)
+                    candidates.append(vp)
+        return candidates
+
+    def get_vertiport_tree(self) -> VertiportTree:
+        '''Returns a KD-tree over vertiport_list positions for batched nearest-k
+        and radius queries; indices it returns index vertiport_list.
+        The tree is rebuilt only after vertiport_list changes.'''
+
+        self._vertiport_tree = vertiport_tree(self.vertiport_list, self._vertiport_tree)
+        return self._vertiport_tree
+
+    def get_route_network(self, clearance:float = 0.0, cache_dir:Optional[str] = None) -> RouteNetwork:
+        '''Returns shortest routes around the restricted areas between every pair
+        of candidate vertiports (get_candidate_vertiports).
+        Built once per set of candidates and clearance, and loaded from / saved
+        to cache_dir when given.'''
+
+        candidates = self.get_candidate_vertiports()
+        network = self._route_network
+        if network is None or network.key != tuple(vp.id for vp in candidates) or network.clearance != clearance:
+            self._route_network = RouteNetwork.load_or_build(candidates,
+                                                             restricted_area_polygons(self),
+                                                             clearance=clearance,
+                                                             cache_dir=cache_dir)
+        return self._route_network
+
     #TODO: create a dict that maps vp_id to vp - this will be necessary for VP design  
     
     
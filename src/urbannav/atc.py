@@ -3,7 +3,7 @@ import math
 from copy import deepcopy
 import random
 import numpy as np
-from typing import List, Tuple, Type, Dict
+from typing import Callable, List, Tuple, Type, Dict
 from shapely import Point
 from shapely.geometry import Polygon
 from urbannav.airspace import Airspace
@@ -11,6 +11,7 @@ from urbannav.uav_template import UAV_template
 from urbannav.uav import UAV
 from urbannav.vertiport import Vertiport
 from urbannav.component_schema import UAVBlueprint, UAVTypeConfig
+from urbannav.conflict_probe import ConflictProbe
 
 
 class ATC():
@@ -43,6 +44,14 @@ class ATC():
         self.sensor_map:Dict[str, List[int]] = {}
 
         self.uav_id_index = 0
+
+        # Look-ahead conflict probe (opt-in via enable_conflict_probe)
+        self.conflict_probe: ConflictProbe|None = None
+        self.predicted_conflicts: Dict[str, np.ndarray] = {}
+
+        # Mission-change listeners, called with the uav_id whenever a UAV's
+        # start/end vertiports change (see notify_mission_change)
+        self._mission_listeners: List[Callable[[int], None]] = []
         
         
    
@@ -68,6 +77,44 @@ class ATC():
 
         return None
 
+    #### MISSION EVENTS ####
+
+    def add_mission_listener(self, listener: Callable[[int], None]) -> None:
+        '''Call listener(uav_id) after every mission change (e.g. PlannerEngine.on_mission_change).'''
+        self._mission_listeners.append(listener)
+        return None
+
+    def notify_mission_change(self, uav_id: int) -> None:
+        '''Announce that a UAV's start/end vertiports changed. Called by every
+        ATC method that assigns a mission; code that calls uav.assign_start_end()
+        directly (e.g. demand-mode dispatch) must call it as well.'''
+        for listener in self._mission_listeners:
+            listener(uav_id)
+        return None
+
+    #### CONFLICT PROBE ####
+
+    def enable_conflict_probe(self, **probe_kwargs) -> None:
+        '''Attach a ConflictProbe; probe_kwargs are passed to its constructor.'''
+        self.conflict_probe = ConflictProbe(**probe_kwargs)
+        return None
+
+    def probe_conflicts(self, current_time: float) -> Dict[str, np.ndarray]:
+        '''Run the look-ahead conflict probe over the fleet for this tick.
+
+        Args:
+            current_time: Simulation time in seconds.
+
+        Returns:
+            ConflictProbe.update() result (predicted loss-of-separation pairs
+            with time to loss of separation and closest approach), or an empty
+            dict when no probe is attached.
+        '''
+        if self.conflict_probe is None:
+            return {}
+        self.predicted_conflicts = self.conflict_probe.update(self.uav_dict, current_time)
+        return self.predicted_conflicts
+
     def _set_uav(self, uav:UAV_template) -> None:
         """
         Adds a UAV to the UAV list.
@@ -213,6 +260,7 @@ class ATC():
         #self._update_start_vertiport_of_uav(uav_id, start)
         
         #self._update_end_vertiport_of_uav(uav_id, end)
+        self.notify_mission_change(uav_id)
         return None
 
     #FIX: #### START ####
@@ -360,6 +408,7 @@ class ATC():
             uav.end_vertiport = vertiport
 
         uav.update_end_point()
+        self.notify_mission_change(uav_id)
         return None
 
     def _update_start_vertiport_of_uav(
@@ -387,6 +436,7 @@ class ATC():
         
         
         uav.update_start_point()
+        self.notify_mission_change(uav_id)
     
 
         return None
@@ -400,6 +450,7 @@ class ATC():
             if end_vertiport != start_vertiport:
                 break
         uav.assign_start_end(start_vertiport, end_vertiport)
+        self.notify_mission_change(uav_id)
         print(f'Reassigned new mission to UAV id: {uav.id_}')
 
         return None
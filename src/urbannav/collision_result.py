@@ -0,0 +1,285 @@
+"""Sparse pair-array container for one step's sensor results.
+
+SimulatorManager.step() used to return a 5-tuple of Dict[int, set]
+(ra_detect, uav_detect, nmac, ra_collision, uav_collision) which every
+consumer — MetricsCollector, rl.common.agent_logic, the removal pass in
+_step_uavS — re-walked with its own Python loops.  CollisionResult stores the
+same information once as NumPy arrays:
+
+    uav_pairs  (P, 2)  directed (i, j) pairs: UAV i detects UAV j
+    nmac_mask / uav_collision_mask  (P,)  per-category subsets of uav_pairs
+    ra_pairs   (Q, 2)  (uav_id, ra_id): UAV i detects restricted area j
+    ra_collision_mask  (Q,)
+
+Rows are grouped by querying UAV, so uav_offsets / ra_offsets are CSR
+offsets into the pair arrays and a per-UAV lookup is an O(1) slice.
+
+The object still indexes and unpacks like the legacy 5-tuple
+(result[1].get(uav_id), `_, _, nmac, ra_col, uav_col = result`); each
+element is a read-only Mapping view that materialises sets on demand.
+"""
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Category ids — equal to the positions in the legacy 5-tuple
+RA_DETECT: int = 0
+UAV_DETECT: int = 1
+NMAC: int = 2
+RA_COLLISION: int = 3
+UAV_COLLISION: int = 4
+
+CATEGORY_NAMES: Tuple[str, ...] = ('ra_detect', 'uav_detect', 'nmac', 'ra_collision', 'uav_collision')
+
+_RA_CATEGORIES = (RA_DETECT, RA_COLLISION)
+
+
+def _csr_offsets(counts: Sequence[int]) -> np.ndarray:
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    if len(counts):
+        np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _pair_array(firsts: List[int], seconds: List[int]) -> np.ndarray:
+    pairs = np.empty((len(firsts), 2), dtype=np.int64)
+    pairs[:, 0] = firsts
+    pairs[:, 1] = seconds
+    return pairs
+
+
+class CollisionResult:
+    """One step's detection / NMAC / collision results as pair arrays.
+
+    Build with CollisionResult.build() from per-UAV records (what
+    SensorEngine.get_collision_result() does) or from_dicts() from the legacy
+    5-tuple of dicts.
+    """
+
+    def __init__(self,
+                 uav_ids: np.ndarray,
+                 uav_pairs: np.ndarray,
+                 uav_offsets: np.ndarray,
+                 nmac_mask: np.ndarray,
+                 uav_collision_mask: np.ndarray,
+                 ra_pairs: np.ndarray,
+                 ra_offsets: np.ndarray,
+                 ra_collision_mask: np.ndarray) -> None:
+        """
+        Args:
+            uav_ids: (N,) ids of every UAV that was queried, in slot order.
+            uav_pairs: (P, 2) detected UAV pairs, rows grouped by slot.
+            uav_offsets: (N + 1,) CSR offsets of each slot into uav_pairs.
+            nmac_mask: (P,) True where the pair is within the NMAC radius.
+            uav_collision_mask: (P,) True where the pair is in body contact.
+            ra_pairs: (Q, 2) detected (uav_id, ra_id) pairs, rows grouped by slot.
+            ra_offsets: (N + 1,) CSR offsets of each slot into ra_pairs.
+            ra_collision_mask: (Q,) True where the UAV body overlaps the RA.
+        """
+        self.uav_ids = uav_ids
+        self.uav_pairs = uav_pairs
+        self.uav_offsets = uav_offsets
+        self.nmac_mask = nmac_mask
+        self.uav_collision_mask = uav_collision_mask
+        self.ra_pairs = ra_pairs
+        self.ra_offsets = ra_offsets
+        self.ra_collision_mask = ra_collision_mask
+        self._slot: Optional[Dict[int, int]] = None   # uav_id -> slot, built on first lookup
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls,
+              uav_ids: List[int],
+              uav_partner_counts: List[int],
+              uav_partners: List[int],
+              nmac_flags: List[bool],
+              uav_collision_flags: List[bool],
+              ra_counts: List[int],
+              ra_ids: List[int],
+              ra_collision_flags: List[bool]) -> 'CollisionResult':
+        """Assemble from flat per-UAV lists (one pass over the fleet, no dicts).
+
+        Args:
+            uav_ids: Queried UAV ids, in slot order.
+            uav_partner_counts: Number of detected UAVs per slot.
+            uav_partners: Detected UAV ids, concatenated slot by slot.
+            nmac_flags / uav_collision_flags: Per-partner category flags.
+            ra_counts: Number of detected restricted areas per slot.
+            ra_ids: Detected RA ids, concatenated slot by slot.
+            ra_collision_flags: Per-RA collision flag.
+        """
+        ids = np.asarray(uav_ids, dtype=np.int64)
+        uav_offsets = _csr_offsets(uav_partner_counts)
+        ra_offsets = _csr_offsets(ra_counts)
+        owners = np.repeat(ids, uav_partner_counts)
+        ra_owners = np.repeat(ids, ra_counts)
+        return cls(
+            uav_ids=ids,
+            uav_pairs=_pair_array(owners, uav_partners),
+            uav_offsets=uav_offsets,
+            nmac_mask=np.asarray(nmac_flags, dtype=bool),
+            uav_collision_mask=np.asarray(uav_collision_flags, dtype=bool),
+            ra_pairs=_pair_array(ra_owners, ra_ids),
+            ra_offsets=ra_offsets,
+            ra_collision_mask=np.asarray(ra_collision_flags, dtype=bool),
+        )
+
+    @classmethod
+    def from_dicts(cls,
+                   ra_detect: Dict[int, set],
+                   uav_detect: Dict[int, set],
+                   nmac: Dict[int, set],
+                   ra_collision: Dict[int, set],
+                   uav_collision: Dict[int, set]) -> 'CollisionResult':
+        """Convert the legacy 5-tuple of Dict[int, set] (any dict may be empty)."""
+        uav_ids: List[int] = list(dict.fromkeys(
+            [*uav_detect, *nmac, *uav_collision, *ra_detect, *ra_collision]
+        ))
+        counts, partners, nmac_flags, col_flags = [], [], [], []
+        ra_counts, ra_ids, ra_col_flags = [], [], []
+        for uid in uav_ids:
+            nm = nmac.get(uid) or set()
+            col = uav_collision.get(uid) or set()
+            row = sorted(set(uav_detect.get(uid) or ()) | set(nm) | set(col))
+            counts.append(len(row))
+            partners.extend(row)
+            nmac_flags.extend(j in nm for j in row)
+            col_flags.extend(j in col for j in row)
+
+            ra_col = ra_collision.get(uid) or set()
+            ra_row = sorted(set(ra_detect.get(uid) or ()) | set(ra_col))
+            ra_counts.append(len(ra_row))
+            ra_ids.extend(ra_row)
+            ra_col_flags.extend(j in ra_col for j in ra_row)
+        return cls.build(uav_ids, counts, partners, nmac_flags, col_flags,
+                         ra_counts, ra_ids, ra_col_flags)
+
+    # ------------------------------------------------------------------
+    # Array access
+    # ------------------------------------------------------------------
+
+    def mask(self, category: int) -> np.ndarray:
+        """Boolean mask selecting category rows of its pair table.
+
+        UAV categories index uav_pairs; RA categories index ra_pairs.
+        """
+        if category == UAV_DETECT:
+            return np.ones(len(self.uav_pairs), dtype=bool)
+        if category == NMAC:
+            return self.nmac_mask
+        if category == UAV_COLLISION:
+            return self.uav_collision_mask
+        if category == RA_DETECT:
+            return np.ones(len(self.ra_pairs), dtype=bool)
+        if category == RA_COLLISION:
+            return self.ra_collision_mask
+        raise ValueError(f"Unknown collision category {category}. Valid: 0..4 {CATEGORY_NAMES}")
+
+    def pairs(self, category: int) -> np.ndarray:
+        """Directed (i, j) rows for category — both (a, b) and (b, a) for UAV pairs."""
+        table = self.ra_pairs if category in _RA_CATEGORIES else self.uav_pairs
+        return table[self.mask(category)]
+
+    def unique_pairs(self, category: int) -> np.ndarray:
+        """Undirected UAV pairs for category as (K, 2) rows with i < j, sorted."""
+        if category in _RA_CATEGORIES:
+            raise ValueError("unique_pairs() is for UAV-UAV categories; use uavs_with() for RA.")
+        p = np.sort(self.pairs(category), axis=1)
+        if len(p) == 0:
+            return p
+        return np.unique(p, axis=0)
+
+    def uavs_with(self, category: int) -> np.ndarray:
+        """Sorted unique ids of UAVs with at least one entry in category."""
+        return np.unique(self.pairs(category)[:, 0])
+
+    def removal_ids(self) -> np.ndarray:
+        """UAV ids involved in a UAV-UAV or restricted-area collision."""
+        uav_col = self.pairs(UAV_COLLISION)
+        return np.unique(np.concatenate([
+            uav_col[:, 0], uav_col[:, 1], self.pairs(RA_COLLISION)[:, 0],
+        ]))
+
+    # ------------------------------------------------------------------
+    # Per-UAV lookup (CSR)
+    # ------------------------------------------------------------------
+
+    def _slice(self, category: int, uav_id: int) -> Optional[slice]:
+        if self._slot is None:
+            self._slot = {uid: k for k, uid in enumerate(self.uav_ids.tolist())}
+        k = self._slot.get(uav_id)
+        if k is None:
+            return None
+        offsets = self.ra_offsets if category in _RA_CATEGORIES else self.uav_offsets
+        return slice(offsets[k], offsets[k + 1])
+
+    def partners(self, category: int, uav_id: int) -> np.ndarray:
+        """Ids (UAV or RA) paired with uav_id in category; empty if none/unknown."""
+        s = self._slice(category, uav_id)
+        table = self.ra_pairs if category in _RA_CATEGORIES else self.uav_pairs
+        if s is None:
+            return table[:0, 1]
+        return table[s, 1][self.mask(category)[s]]
+
+    def has(self, category: int, uav_id: int) -> bool:
+        """True if uav_id has at least one entry in category."""
+        s = self._slice(category, uav_id)
+        if s is None or s.start == s.stop:
+            return False
+        if category in (UAV_DETECT, RA_DETECT):
+            return True
+        return bool(self.mask(category)[s].any())
+
+    # ------------------------------------------------------------------
+    # Legacy 5-tuple compatibility
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, category: int) -> '_CategoryView':
+        if not 0 <= category < len(CATEGORY_NAMES):
+            raise IndexError(f"CollisionResult index out of range: {category}")
+        return _CategoryView(self, category)
+
+    def __iter__(self) -> Iterator['_CategoryView']:
+        return (_CategoryView(self, c) for c in range(len(CATEGORY_NAMES)))
+
+    def __len__(self) -> int:
+        return len(CATEGORY_NAMES)
+
+    def as_dicts(self) -> Tuple[Dict[int, set], ...]:
+        """Materialise the legacy 5-tuple of Dict[int, set]."""
+        return tuple(dict(view) for view in self)
+
+
+class _CategoryView(Mapping):
+    """Read-only Dict[int, set] view of one category (legacy callers)."""
+
+    def __init__(self, result: CollisionResult, category: int) -> None:
+        self._result = result
+        self._category = category
+
+    def __getitem__(self, uav_id: int) -> set:
+        if self._result._slice(self._category, uav_id) is None:
+            raise KeyError(uav_id)
+        return set(self._result.partners(self._category, uav_id).tolist())
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._result.uav_ids.tolist())
+
+    def __len__(self) -> int:
+        return len(self._result.uav_ids)
+
+    def __repr__(self) -> str:
+        return f"{CATEGORY_NAMES[self._category]}({dict(self)!r})"
+
+
+def as_collision_result(
+    collisions: Union[CollisionResult, Tuple[Dict, Dict, Dict, Dict, Dict], None]
+) -> Optional[CollisionResult]:
+    """Accept a CollisionResult or a legacy 5-tuple of dicts; None passes through."""
+    if collisions is None or isinstance(collisions, CollisionResult):
+        return collisions
+    return CollisionResult.from_dicts(*collisions)
@@ -85,9 +85,132 @@ class UAMSimulatorConfig(BaseModel):
 
 
 class LoggingConfig(BaseModel):
-    """Controls whether episode metrics are collected and where they are saved."""
+    """Controls whether episode metrics are collected and where they are saved.
+
+    step_format:
+        'json'    — keep the whole step history in memory and write one
+                    step_history.json at save().
+        'chunked' — stream the history to step_history/chunk_*.npz every
+                    flush_every steps (see episode_stream.py); memory stays
+                    bounded by one chunk.
+    flush_every:
+        Steps per chunk when step_format='chunked'.
+    background_io:
+        Write finished episodes (and chunks) on a background thread so
+        reset() does not stall on encoding and disk I/O.
+    max_pending_writes:
+        Bound on queued writes; further writes block until one finishes.
+    compression:
+        None, 'gzip' or 'zstd' (needs the zstandard package) for the JSON
+        files; chunk files are zip-deflated whenever this is set.
+
+    What is recorded (see MetricsCollector; episode metrics still cover every
+    step and field of the UAVs passing uav_types / uav_fraction):
+
+    log_every:
+        Record every log_every-th step.
+    uav_fields:
+        Per-UAV snapshot fields to record, e.g. ['x', 'y', 'z']; None = all.
+    uav_types / uav_fraction:
+        Record only UAVs whose type_name is listed (e.g. ['SINGLE_AGENT_LEARNING'])
+        and/or a stable fraction of UAV ids.
+    events_only:
+        Record only steps with an NMAC, collision or landing, and only the
+        UAVs involved (log_every is ignored).
+    log_vertiports / log_edges:
+        Record the per-step vertiport and OD edge tables.
+    keep_history:
+        False keeps only the latest step in memory and writes no step
+        history; episode metrics are still complete (computed online).
+    catalog:
+        Path of an SQLite episode catalog (episode_catalog.EpisodeCatalog)
+        to add every saved episode to; None writes no catalog.
+    """
     enabled: bool = True
     log_dir: str = 'logs'
+    step_format: str = 'json'
+    flush_every: int = 500
+    background_io: bool = True
+    max_pending_writes: int = 2
+    compression: Optional[str] = None
+    log_every: int = 1
+    uav_fields: Optional[List[str]] = None
+    uav_types: Optional[List[str]] = None
+    uav_fraction: float = 1.0
+    events_only: bool = False
+    log_vertiports: bool = True
+    log_edges: bool = True
+    keep_history: bool = True
+    catalog: Optional[str] = None
+
+
+class SensorConfig(BaseModel):
+    """Broad-phase diagnostics and tuning for PartialSensor's spatial hash.
+
+    collect_broad_phase_stats:
+        Record per-step counters (candidates examined, true detections, bucket
+        occupancy histogram, load factor) — see PartialSensor.get_broad_phase_stats().
+    auto_tune:
+        Between episodes, re-size the hash cell spacing / table size from the
+        previous episode's counters (implies collect_broad_phase_stats).
+    """
+    collect_broad_phase_stats: bool = False
+    auto_tune: bool = False
+
+
+class ConflictProbeConfig(BaseModel):
+    """Look-ahead conflict probe run by ATC every step (see conflict_probe.py).
+
+    horizon:
+        Look-ahead time in seconds over which tracks are extrapolated.
+    separation:
+        Separation minimum in metres; None uses max(nmac_radius) per pair.
+    position_tolerance / velocity_tolerance:
+        Drift from the extrapolated track (m, m/s) before a UAV's swept box is
+        rebuilt.  Larger values re-probe fewer UAVs per step.
+    """
+    enabled: bool = False
+    horizon: float = 60.0
+    separation: Optional[float] = None
+    position_tolerance: float = 5.0
+    velocity_tolerance: float = 0.5
+
+
+class FleetDispatchConfig(BaseModel):
+    """Demand-mode fleet rebalancing (see fleet_dispatcher.py).
+
+    interval:
+        Steps between dispatch ticks.
+    method:
+        'greedy'  — shortest vertiport-to-vertiport moves first.
+        'optimal' — minimum total repositioning distance (linear_sum_assignment).
+    max_distance:
+        Longest repositioning move in metres; None = any distance.
+    """
+    enabled: bool = False
+    interval: int = 10
+    method: str = 'greedy'
+    max_distance: Optional[float] = None
+
+
+class RouteNetworkConfig(BaseModel):
+    """Mission waypoints routed around restricted airspace (see route_network.py).
+
+    Only waypoint-following planners (PointMass-PID, Holonomic-PID) fly the
+    routes.  SixDOF-PID fits one min-snap segment from the start to the end
+    vertiport and ignores the corners in between; PlannerEngine warns when
+    such planners run with the network enabled.
+
+    clearance:
+        Extra distance in metres kept from every (buffered) restricted area.
+    cache_dir:
+        Directory the route network is saved to and loaded from, keyed on
+        vertiport positions, restricted areas and clearance; None = rebuild
+        for every new airspace.
+    """
+    enabled: bool = False
+    clearance: float = 0.0
+    cache_dir: Optional[str] = None
 
 
 class RenderingConfig(BaseModel):
@@ -102,6 +225,30 @@ class RenderingConfig(BaseModel):
         Increase to keep animation file sizes manageable for long episodes.
     mp4_only:
         If True, skip the GIF save and write only the MP4 (requires ffmpeg).
+    stream:
+        Offline output only.  Draw each frame into persistent artists as the
+        step happens and pipe it straight to the GIF writer / ffmpeg, instead
+        of keeping every frame and replaying them in save().  Memory stays
+        flat over the episode and each frame only redraws what moved.
+    render_workers:
+        Processes Renderer.render_log() uses to render a logged episode: its
+        frames are split into contiguous segments rendered in parallel and
+        joined losslessly.  1 = single process, 0 = one per CPU core.
+    map_cache_dir:
+        Directory caching the pre-rasterized 2D map layer per airspace and
+        view extent (map_<key>.npy).  None = rasterize once per process.
+    realtime_process:
+        Realtime output only.  Draw in a separate viewer process that reads
+        the latest fleet state from shared memory, so the simulation runs at
+        full speed while watched (frames the viewer cannot keep up with are
+        dropped).  Opt-in: the airspace must be picklable, scripts need an
+        `if __name__ == "__main__":` guard (the viewer is spawned), and the
+        window closes when the script exits.  False (default) = draw inside
+        step() with plt.pause(realtime_sleep).
+    realtime_fps:
+        Maximum frame rate of the viewer process.
+    realtime_max_uavs:
+        UAVs per shared frame; the viewer shows the first this many.
     """
     enabled: bool = False
     mode: str = 'offline'
@@ -110,6 +257,12 @@ class RenderingConfig(BaseModel):
     realtime_sleep: float = 0.01
     frame_skip: int = 4
     mp4_only: bool = False
+    stream: bool = False
+    render_workers: int = 1
+    map_cache_dir: Optional[str] = None
+    realtime_process: bool = False
+    realtime_fps: float = 10.0
+    realtime_max_uavs: int = 512
 
     @field_validator('mode')
     @classmethod
@@ -319,6 +472,10 @@ class UAMConfig(BaseModel):
     fleet_composition: List[UAVFleetInstanceConfig]
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
     rendering: RenderingConfig = Field(default_factory=RenderingConfig)
+    sensor: SensorConfig = Field(default_factory=SensorConfig)
+    conflict_probe: ConflictProbeConfig = Field(default_factory=ConflictProbeConfig)
+    fleet_dispatch: FleetDispatchConfig = Field(default_factory=FleetDispatchConfig)
+    route_network: RouteNetworkConfig = Field(default_factory=RouteNetworkConfig)
 
     @classmethod
     def load_from_yaml(cls, path: str) -> 'UAMConfig':
@@ -0,0 +1,219 @@
+import numpy as np
+from typing import Dict, Optional
+
+from urbannav.uav_template import UAV_template
+from urbannav.utils import compute_time_to_impact_batch, fleet_state_arrays
+
+
+class ConflictProbe:
+    """Look-ahead conflict probe over straight-line extrapolated UAV tracks.
+
+    Every airborne UAV is extrapolated at constant velocity from an anchor
+    state (t0, p0, v0).  Its swept axis-aligned bounding box — the segment
+    p0 -> p0 + v0 * (horizon + refresh_after), padded by its separation
+    radius and the drift tolerances — is inserted into a 2D uniform grid;
+    UAVs whose boxes share a cell and overlap in 3D become candidate pairs.  The narrow phase is the
+    batched closest-approach solve in utils.compute_time_to_impact_batch.
+
+    Incremental update:
+        A UAV keeps its anchor (and therefore its box) while it stays within
+        position_tolerance / velocity_tolerance of its extrapolated track and
+        the anchor is younger than refresh_after.  Candidate pairs between two
+        such "clean" UAVs are carried over from the previous update; the grid
+        is only searched for pairs involving a re-anchored ("dirty") UAV.
+        Because the box reaches horizon + refresh_after past its anchor and is
+        padded by the worst drift a clean UAV can accumulate over that span,
+        the window [t, t + horizon] is always covered.
+
+    Intended to run every ATC tick (SimulatorManager calls ATC.probe_conflicts)
+    and standalone over logged fleets for offline strategic deconfliction.
+    """
+
+    def __init__(self,
+                 horizon: float = 60.0,
+                 separation: Optional[float] = None,
+                 position_tolerance: float = 5.0,
+                 velocity_tolerance: float = 0.5,
+                 refresh_after: Optional[float] = None,
+                 cell_size: Optional[float] = None) -> None:
+        """
+        Args:
+            horizon: Look-ahead time in seconds.
+            separation: Separation minimum in metres.  If None, each pair uses
+                        max(nmac_radius) of its two UAVs.
+            position_tolerance: Max drift (m) from the extrapolated track
+                                before a UAV is re-anchored.
+            velocity_tolerance: Max velocity change (m/s) before re-anchoring.
+            refresh_after: Max anchor age in seconds.  Defaults to horizon / 2.
+            cell_size: Grid cell size in metres.  If None, recomputed each
+                       update as the median swept-box extent.
+        """
+        self.horizon = horizon
+        self.separation = separation
+        self.position_tolerance = position_tolerance
+        self.velocity_tolerance = velocity_tolerance
+        self.refresh_after = refresh_after if refresh_after is not None else horizon / 2.0
+        self.cell_size = cell_size
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all anchors and cached candidate pairs."""
+        # Anchor state, aligned with _anchor_ids (sorted ascending)
+        self._anchor_ids = np.zeros(0, dtype=np.int64)
+        self._anchor_t0 = np.zeros(0)
+        self._anchor_pos = np.zeros((0, 3))
+        self._anchor_vel = np.zeros((0, 3))
+        # Candidate (broad-phase) pairs carried between updates, as uav id rows
+        self._candidates = np.zeros((0, 2), dtype=np.int64)
+
+        # Last update's diagnostics
+        self.num_tracked: int = 0
+        self.num_reanchored: int = 0
+        self.num_candidates: int = 0
+
+    # ------------------------------------------------------------------
+    # Primary interface
+    # ------------------------------------------------------------------
+
+    def update(self, uav_dict: Dict[int, UAV_template], current_time: float) -> Dict[str, np.ndarray]:
+        """Re-probe the airborne fleet and return predicted losses of separation.
+
+        Args:
+            uav_dict: Mapping uav_id -> UAV.  Only UAVs with uav_in_flight
+                      set are probed.
+            current_time: Simulation time in seconds.
+
+        Returns:
+            Dict of aligned arrays, sorted by t_los:
+              pairs  (K, 2) — uav ids (i < j) predicted to lose separation
+              t_los  (K,)   — seconds until separation is lost (0 = already lost)
+              t_cpa  (K,)   — seconds until closest point of approach
+              d_cpa  (K,)   — centre distance at closest approach (m)
+        """
+        airborne = {uid: uav for uid, uav in uav_dict.items()
+                    if getattr(uav, 'uav_in_flight', False)}
+        ids, pos, vel, _ = fleet_state_arrays(airborne)
+        sep = np.array([airborne[uid].nmac_radius for uid in ids.tolist()], dtype=float)
+        if self.separation is not None:
+            sep = np.full(len(ids), float(self.separation))
+
+        dirty = self._reanchor(ids, pos, vel, current_time)
+
+        # Carry over candidates between two clean, still-airborne UAVs
+        clean_ids = ids[~dirty]
+        keep = np.isin(self._candidates, clean_ids).all(axis=1)
+        fresh = self._broad_phase(ids, sep, dirty)
+        self._candidates = np.concatenate([self._candidates[keep], fresh])
+
+        self.num_tracked = len(ids)
+        self.num_reanchored = int(dirty.sum())
+        self.num_candidates = len(self._candidates)
+
+        return self._narrow_phase(ids, pos, vel, sep)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _reanchor(self, ids: np.ndarray, pos: np.ndarray, vel: np.ndarray, t: float) -> np.ndarray:
+        """Refresh anchors of new / drifted / aged UAVs; return the dirty mask."""
+        dirty = np.ones(len(ids), dtype=bool)
+        slot = np.searchsorted(self._anchor_ids, ids)
+        slot = np.minimum(slot, max(len(self._anchor_ids) - 1, 0))
+        known = (self._anchor_ids[slot] == ids) if len(self._anchor_ids) else np.zeros(len(ids), dtype=bool)
+
+        if known.any():
+            s = slot[known]
+            age = t - self._anchor_t0[s]
+            predicted = self._anchor_pos[s] + self._anchor_vel[s] * age[:, None]
+            drift = np.linalg.norm(pos[known] - predicted, axis=1)
+            dv = np.linalg.norm(vel[known] - self._anchor_vel[s], axis=1)
+            dirty[known] = ((drift > self.position_tolerance)
+                            | (dv > self.velocity_tolerance)
+                            | (age > self.refresh_after))
+
+        t0 = np.full(len(ids), float(t))
+        p0 = pos.copy()
+        v0 = vel.copy()
+        clean = ~dirty
+        t0[clean] = self._anchor_t0[slot[clean]]
+        p0[clean] = self._anchor_pos[slot[clean]]
+        v0[clean] = self._anchor_vel[slot[clean]]
+        self._anchor_ids, self._anchor_t0, self._anchor_pos, self._anchor_vel = ids, t0, p0, v0
+        return dirty
+
+    def _boxes(self, sep: np.ndarray):
+        """Swept AABBs (lo, hi), each (N, 3), padded by separation plus worst-case drift.
+
+        A clean UAV may sit up to position_tolerance off its anchored track and
+        fly up to velocity_tolerance faster in any direction, so over the swept
+        window it can stray velocity_tolerance * (horizon + refresh_after)
+        further; the pad covers both so drift never leaves the box.
+        """
+        reach = self.horizon + self.refresh_after
+        end = self._anchor_pos + self._anchor_vel * reach
+        pad = sep + self.position_tolerance + self.velocity_tolerance * reach
+        lo = np.minimum(self._anchor_pos, end) - pad[:, None]
+        hi = np.maximum(self._anchor_pos, end) + pad[:, None]
+        return lo, hi
+
+    def _broad_phase(self, ids: np.ndarray, sep: np.ndarray, dirty: np.ndarray) -> np.ndarray:
+        """Candidate id pairs (i < j) with at least one dirty member and overlapping boxes."""
+        empty = np.zeros((0, 2), dtype=np.int64)
+        if not dirty.any() or len(ids) < 2:
+            return empty
+
+        lo, hi = self._boxes(sep)
+        cs = self.cell_size
+        if cs is None:
+            cs = max(float(np.median(np.max(hi[:, :2] - lo[:, :2], axis=1))), 1.0)
+
+        # Expand every box into the (x, y) grid cells it overlaps
+        c_lo = np.floor(lo[:, :2] / cs).astype(np.int64)
+        c_hi = np.floor(hi[:, :2] / cs).astype(np.int64)
+        span = c_hi - c_lo + 1
+        n_cells = span[:, 0] * span[:, 1]
+        owner = np.repeat(np.arange(len(ids)), n_cells)
+        local = np.arange(n_cells.sum()) - np.repeat(np.cumsum(n_cells) - n_cells, n_cells)
+        cx = c_lo[owner, 0] + local // span[owner, 1]
+        cy = c_lo[owner, 1] + local % span[owner, 1]
+        gy = int(cy.max() - cy.min() + 1)
+        keys = (cx - cx.min()) * gy + (cy - cy.min())
+
+        order = np.argsort(keys, kind='stable')
+        keys, owner = keys[order], owner[order]
+        starts = np.searchsorted(keys, keys, side='left')
+        ends = np.searchsorted(keys, keys, side='right')
+
+        # Pair every dirty entry with every other entry in its cell
+        d = np.flatnonzero(dirty[owner])
+        counts = ends[d] - starts[d]
+        rep = np.repeat(d, counts)
+        partner = np.repeat(starts[d], counts) + (np.arange(counts.sum())
+                                                  - np.repeat(np.cumsum(counts) - counts, counts))
+        a, b = owner[rep], owner[partner]
+        distinct = a != b
+        a, b = np.minimum(a[distinct], b[distinct]), np.maximum(a[distinct], b[distinct])
+        code = np.unique(a * len(ids) + b)
+        a, b = code // len(ids), code % len(ids)
+
+        overlap = ((lo[a] <= hi[b]) & (lo[b] <= hi[a])).all(axis=1)
+        if not overlap.any():
+            return empty
+        return np.stack([ids[a[overlap]], ids[b[overlap]]], axis=1)
+
+    def _narrow_phase(self, ids, pos, vel, sep) -> Dict[str, np.ndarray]:
+        pairs = self._candidates
+        i = np.searchsorted(ids, pairs[:, 0])
+        j = np.searchsorted(ids, pairs[:, 1])
+        t_los, t_cpa, d_cpa = compute_time_to_impact_batch(
+            pos[j] - pos[i], vel[j] - vel[i], np.maximum(sep[i], sep[j])
+        )
+        hit = t_los <= self.horizon
+        order = np.argsort(t_los[hit], kind='stable')
+        return {
+            'pairs': pairs[hit][order],
+            't_los': t_los[hit][order],
+            't_cpa': t_cpa[hit][order],
+            'd_cpa': d_cpa[hit][order],
+        }
@@ -1,15 +1,211 @@
-from typing import Any, Dict, List, Optional, Tuple
+import heapq
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 
+from urbannav.grow_buffer import GrowBuffer
+
+# DemandSchedule.save() / load() directory layout
+SCHEDULE_RATES_FILENAME = 'rates.npy'
+SCHEDULE_BREAKPOINTS_FILENAME = 'breakpoints.npy'
+
+# Periods reduced at a time when scanning a schedule for its bounds
+_SCAN_PERIODS = 16
+
+# One row per dispatched trip; steps not reached yet are -1
+TRIP_DTYPE = np.dtype([
+    ('uav_id', np.int64), ('o_region', np.int64), ('d_region', np.int64),
+    ('origin_vp_id', np.int64), ('dest_vp_id', np.int64),
+    ('enqueue_step', np.int64), ('depart_step', np.int64),
+    ('arrive_airspace_step', np.int64), ('land_step', np.int64),
+])
+
+
+class DemandSchedule:
+    """Piecewise-constant OD demand: one lambda matrix (trips/min) per period.
+
+    rates[k] applies from breakpoints[k] (minutes of simulation time) until
+    the next breakpoint; before the first breakpoint the first matrix
+    applies and after the last one the last matrix holds.  A static
+    lambda_matrix is a schedule with one period.
+
+    rates may be a read-only memory map (load() maps .npy files): lookups
+    return views or single elements, never copies, so a week of 15-minute
+    matrices stays on disk.  The only full pass is the one-off scan for
+    max_rates, done a few periods at a time.
+    """
+
+    def __init__(self, rates: np.ndarray, breakpoints: Sequence[float] = (0.0,)) -> None:
+        """
+        Args:
+            rates:       (T, N, N) trips/min per period, or a single (N, N) matrix.
+            breakpoints: (T,) increasing period start times in minutes.
+        """
+        if rates.ndim == 2:
+            rates = rates[None]
+        if rates.ndim != 3 or rates.shape[1] != rates.shape[2]:
+            raise ValueError(f'Demand rates must be (T, N, N) or (N, N), got shape {rates.shape}')
+        breakpoints = np.asarray(breakpoints, dtype=float)
+        if breakpoints.shape != (rates.shape[0],):
+            raise ValueError(
+                f'Expected {rates.shape[0]} breakpoints (one per period), got {breakpoints.shape}'
+            )
+        if np.any(np.diff(breakpoints) <= 0):
+            raise ValueError('Demand schedule breakpoints must be strictly increasing')
+        self.rates = rates
+        self.breakpoints = breakpoints
+        self._max_rates: Optional[np.ndarray] = None
+
+    @classmethod
+    def load(cls, path: str, interval_min: Optional[float] = None) -> 'DemandSchedule':
+        """Load a schedule.
+
+        Args:
+            path: One of
+                  - a directory written by save() (rates.npy + breakpoints.npy);
+                  - a .npy (N, N) static matrix, or (T, N, N) with interval_min;
+                  - any other file: a comma-delimited (N, N) static matrix.
+                  .npy rates are memory-mapped.
+            interval_min: Period length in minutes for a (T, N, N) .npy file.
+        """
+        if os.path.isdir(path):
+            rates = np.load(os.path.join(path, SCHEDULE_RATES_FILENAME), mmap_mode='r')
+            breakpoints = np.load(os.path.join(path, SCHEDULE_BREAKPOINTS_FILENAME))
+            return cls(rates, breakpoints)
+        if path.endswith('.npy'):
+            rates = np.load(path, mmap_mode='r')
+        else:
+            rates = np.loadtxt(path, delimiter=',')
+        if rates.ndim == 3:
+            if interval_min is None:
+                raise ValueError(
+                    f"'{path}' holds {rates.shape[0]} periods; pass interval_min or save it "
+                    f"as a schedule directory with DemandSchedule.save()"
+                )
+            return cls(rates, np.arange(rates.shape[0]) * float(interval_min))
+        return cls(rates)
+
+    def save(self, directory: str) -> str:
+        """Write the schedule as a directory load() memory-maps."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, SCHEDULE_RATES_FILENAME), self.rates)
+        np.save(os.path.join(directory, SCHEDULE_BREAKPOINTS_FILENAME), self.breakpoints)
+        return directory
+
+    @property
+    def n_regions(self) -> int:
+        return self.rates.shape[1]
+
+    @property
+    def static(self) -> bool:
+        return self.rates.shape[0] == 1
+
+    def period_at(self, t_min: float) -> int:
+        """Index of the period covering simulation time *t_min* (minutes)."""
+        k = int(np.searchsorted(self.breakpoints, t_min, side='right')) - 1
+        return min(max(k, 0), len(self.breakpoints) - 1)
+
+    def rates_at(self, t_min: float) -> np.ndarray:
+        """(N, N) lambda matrix in effect at *t_min* (a view, not a copy)."""
+        return self.rates[self.period_at(t_min)]
+
+    def rate(self, t_min: float, i: int, j: int) -> float:
+        return float(self.rates[self.period_at(t_min), i, j])
+
+    @property
+    def max_rates(self) -> np.ndarray:
+        """(N, N) highest rate of each OD pair over the schedule (computed once)."""
+        if self._max_rates is None:
+            n = self.n_regions
+            highest = np.zeros((n, n), dtype=float)
+            for k in range(0, self.rates.shape[0], _SCAN_PERIODS):
+                block = np.asarray(self.rates[k:k + _SCAN_PERIODS])
+                if block.min() < 0.0:
+                    raise ValueError('Demand rates must be non-negative')
+                np.maximum(highest, block.max(axis=0), out=highest)
+            self._max_rates = highest
+        return self._max_rates
+
+
+class DepartureQueues:
+    """FIFO trip-request queues of all vertiports, as ring buffers in two
+    shared (n_vertiports, capacity) arrays.
+
+    Each queued entry is a (dest_vertiport_id, enqueue_step) pair; push()
+    and popleft() are O(1), and lengths is the per-vertiport queue length
+    array.  All rings grow together (capacity doubles) when one is full.
+    """
+
+    def __init__(self, vertiport_ids: Sequence[int], capacity: int = 16) -> None:
+        self.vertiport_ids: List[int] = list(vertiport_ids)
+        self._index: Dict[int, int] = {vp_id: k for k, vp_id in enumerate(self.vertiport_ids)}
+        n = len(self.vertiport_ids)
+        self._dest = np.zeros((n, max(capacity, 1)), dtype=np.int64)
+        self._step = np.zeros((n, max(capacity, 1)), dtype=np.int64)
+        self._head = np.zeros(n, dtype=np.int64)
+        self.lengths = np.zeros(n, dtype=np.int64)
+
+    @property
+    def capacity(self) -> int:
+        return self._dest.shape[1]
+
+    def __contains__(self, vp_id: int) -> bool:
+        return vp_id in self._index
+
+    def __len__(self) -> int:
+        """Total number of queued trips."""
+        return int(self.lengths.sum())
+
+    def __getitem__(self, vp_id: int) -> List[Tuple[int, int]]:
+        """Queued (dest_vertiport_id, enqueue_step) entries of a vertiport, oldest first."""
+        k = self._index[vp_id]
+        cols = (self._head[k] + np.arange(self.lengths[k])) % self.capacity
+        return list(zip(self._dest[k, cols].tolist(), self._step[k, cols].tolist()))
+
+    def length(self, vp_id: int) -> int:
+        k = self._index.get(vp_id)
+        return 0 if k is None else int(self.lengths[k])
+
+    def push(self, vp_id: int, dest_vp_id: int, enqueue_step: int) -> None:
+        k = self._index[vp_id]
+        if self.lengths[k] == self.capacity:
+            self._grow()
+        col = (self._head[k] + self.lengths[k]) % self.capacity
+        self._dest[k, col] = dest_vp_id
+        self._step[k, col] = enqueue_step
+        self.lengths[k] += 1
+
+    def popleft(self, vp_id: int) -> Tuple[int, int]:
+        """Remove and return a vertiport's oldest (dest_vertiport_id, enqueue_step)."""
+        k = self._index[vp_id]
+        if self.lengths[k] == 0:
+            raise IndexError(f'Departure queue of vertiport {vp_id} is empty')
+        col = self._head[k]
+        self._head[k] = (col + 1) % self.capacity
+        self.lengths[k] -= 1
+        return int(self._dest[k, col]), int(self._step[k, col])
+
+    def _grow(self) -> None:
+        """Double the capacity, unrolling every ring to start at column 0."""
+        cap = self.capacity
+        cols = (self._head[:, None] + np.arange(cap)[None, :]) % cap
+        rows = np.arange(len(self.vertiport_ids))[:, None]
+        for name in ('_dest', '_step'):
+            grown = np.zeros((len(self.vertiport_ids), 2 * cap), dtype=np.int64)
+            grown[:, :cap] = getattr(self, name)[rows, cols]
+            setattr(self, name, grown)
+        self._head[:] = 0
+
 
 class DemandModelMixin:
     """
     Opt-in OD-demand simulation behavior for SimulatorManager.
 
     Ported from the former simulator_manager_vp_design.py. All methods here
-    read/write self.lambda_matrix / self.vertiport_region_map /
-    self.zone_region_map / self.n_regions / self._demand_rng, which
+    read/write self.lambda_matrix / self.demand_schedule /
+    self.vertiport_region_map / self.zone_region_map / self.n_regions /
+    self._demand_rng, which
     SimulatorManager's __init__ sets (defaulting to demand-mode off when no
     lambda_matrix is supplied), plus self.airspace / self.atc / self._state /
     self.dt / self.config already owned by SimulatorManager itself.
@@ -25,28 +221,35 @@ class DemandModelMixin:
         self.lambda_matrix is not None).
 
         Structures initialised:
-          departure_queues    — one FIFO list per vertiport; each entry is a
-                               (dest_vertiport_id, enqueue_step) tuple.
-          _trip_log           — list of dicts, one per COMPLETED trip.
+          departure_queues    — DepartureQueues: one FIFO ring per vertiport;
+                               each entry is a (dest_vertiport_id,
+                               enqueue_step) pair.
+          _trip_log           — growable TRIP_DTYPE array, one row per
+                               dispatched trip (-1 = step not reached yet).
+          _open_trips         — uav_id → _trip_log row of its trip in progress.
+          _repositioning      — uav_id → vertiport index of empty
+                               repositioning flights (fleet_dispatcher).
           _demand_gen_od      — (N, N) int array counting trips GENERATED this
                                episode per OD region pair. Denominator of B3.
           _trips_completed_od — (N, N) int array counting trips COMPLETED.
           _pads_occupied_sum  — (n_vp,) float; running sum of pads_occupied.
           _queue_length_sum   — (n_vp,) float; running sum of uavs_waiting.
           _uavs_in_flight_sum — int; running sum of in-flight count → B6.
+          _demand_events      — heap of (arrival_min, i, j) next candidate
+                               arrivals, one per active OD pair; built by
+                               _init_demand_events() on first use.
         Step count uses self._state.currentstep (set by step()).
         """
         n_vp = len(self.airspace.vertiport_list)
 
-        # Departure queues: vertiport_id → list of (dest_vp_id, enqueue_step)
+        # Departure queues: vertiport_id → FIFO of (dest_vp_id, enqueue_step)
         # Trips generated by the Poisson process are pushed here and popped
         # when a UAV becomes available for a mission.
-        self.departure_queues: Dict[int, List[Tuple[int, int]]] = {
-            vp.id: [] for vp in self.airspace.vertiport_list
-        }
+        self.departure_queues = DepartureQueues([vp.id for vp in self.airspace.vertiport_list])
 
-        # Trip completion log: one dict per completed trip.
-        self._trip_log: List[Dict] = []
+        # Trip log: one row per dispatched trip, completed in place on landing.
+        self._trip_log = GrowBuffer(TRIP_DTYPE, capacity=256)
+        self._open_trips: Dict[int, int] = {}
 
         # OD trip counters at region level (N×N).
         if self.n_regions > 0:
@@ -57,62 +260,104 @@ class DemandModelMixin:
             self._trips_completed_od = np.zeros((0, 0), dtype=int)
 
         # Step-level accumulators for time-averaged node features (B4, B5, B6).
-        self._vp_index_to_id: List[int] = [vp.id for vp in self.airspace.vertiport_list]
-        self._vp_id_to_vp: Dict[int, Any] = {vp.id: vp for vp in self.airspace.vertiport_list}
+        self._vp_list: List[Any] = list(self.airspace.vertiport_list)
+        self._vp_index_to_id: List[int] = [vp.id for vp in self._vp_list]
+        self._vp_id_to_vp: Dict[int, Any] = {vp.id: vp for vp in self._vp_list}
         self._pads_occupied_sum = np.zeros(n_vp, dtype=float)
         self._queue_length_sum = np.zeros(n_vp, dtype=float)
         self._uavs_in_flight_sum = 0
 
-        # Invalidate the cached region→vertiport inverse; _generate_demand
-        # rebuilds it lazily on first use each episode.
+        # Fleet rebalancing (opt-in): uav_id → vertiport index of UAVs
+        # flying empty to pick up queued trips there.
+        self._repositioning: Dict[int, int] = {}
+        self._repositions_count = 0
+        dispatcher = getattr(self, 'fleet_dispatcher', None)
+        if dispatcher is not None:
+            dispatcher.set_distances(self.airspace.vertiport_distances.between(self._vp_list))
+
+        # Invalidate the cached region→vertiport inverse and the arrival
+        # events; _generate_demand rebuilds both lazily on first use each episode.
         self._region_to_vp: Optional[Dict[int, int]] = None
+        self._demand_events: Optional[List[Tuple[float, int, int]]] = None
+
+    def _init_demand_events(self):
+        """Sample the first candidate arrival of every active OD pair into the
+        event heap.
+
+        An OD pair (i, j) is active when i != j (no intra-region demand,
+        Level 1 rule), both regions have a selected vertiport this episode
+        and its rate is positive at some point of the schedule.  Candidates
+        arrive at the pair's highest scheduled rate (demand_schedule.max_rates);
+        arrival times are in minutes from the start of the episode.
+        """
+        self._region_to_vp = {
+            region: vp_id for vp_id, region in self.vertiport_region_map.items()
+        }
+        served = np.zeros(self.n_regions, dtype=bool)
+        regions = [r for r in self._region_to_vp if 0 <= r < self.n_regions]
+        served[regions] = True
+
+        bounds = self.demand_schedule.max_rates
+        active = (bounds > 0.0) & served[:, None] & served[None, :]
+        np.fill_diagonal(active, False)
+        origins, dests = np.nonzero(active)
+        first = self._demand_rng.exponential(1.0 / bounds[origins, dests])
+
+        self._demand_events = list(zip(first.tolist(), origins.tolist(), dests.tolist()))
+        heapq.heapify(self._demand_events)
 
     def _generate_demand(self):
         """Poisson trip generation — runs once per step.
         Pushes trip requests into vertiport departure queues.
 
-        For each OD region pair (i, j) with i != j:
-          p_ij = lambda_matrix[i,j] * dt / 60   (Bernoulli probability)
-          Draw u ~ U(0,1); if u < p_ij: push a trip request into the departure
-          queue at the vertiport serving region i.
+        Each active OD region pair (i, j) is an independent Poisson process
+        with the rate demand_schedule gives it at the current simulation
+        time (trips/min), kept as its next candidate arrival in a heap.
+        Candidates arrive at the pair's highest scheduled rate and each is
+        kept with probability rate(t) / max rate (thinning), which is exact
+        across rate changes; a one-period schedule keeps every candidate.
+
+        A step pops every candidate due by the end of the step
+        (currentstep * dt), pushes each accepted trip into the departure
+        queue at the vertiport serving region i and schedules the pair's
+        next candidate.  The work per step is proportional to the trips
+        generated, not to the number of region pairs, and a pair can
+        generate several trips in one step.
         """
-        if not self._region_to_vp:
-            self._region_to_vp = {
-                region: vp_id for vp_id, region in self.vertiport_region_map.items()
-            }
-
-        dt_min = self.dt / 60.0  # convert simulator dt (seconds) to minutes
-
-        for i in range(self.n_regions):
-            origin_vp_id = self._region_to_vp.get(i)
-            if origin_vp_id is None:
-                continue  # region i has no selected vertiport this episode
-
-            for j in range(self.n_regions):
-                if i == j:
-                    continue  # no intra-region demand (Level 1 rule)
-
-                dest_vp_id = self._region_to_vp.get(j)
-                if dest_vp_id is None:
-                    continue
-
-                rate = self.lambda_matrix[i, j]  # trips/min
-                if rate <= 0.0:
-                    continue
-
-                p_ij = rate * dt_min
-                u = self._demand_rng.random()
-                if u < p_ij:
-                    self.departure_queues[origin_vp_id].append(
-                        (dest_vp_id, self._state.currentstep)
-                    )
-                    self._demand_gen_od[i, j] += 1
+        if self._demand_events is None:
+            self._init_demand_events()
+
+        schedule = self.demand_schedule
+        bounds = schedule.max_rates
+        now_min = self._state.currentstep * self.dt / 60.0  # simulator dt is in seconds
+        events = self._demand_events
+        while events and events[0][0] <= now_min:
+            arrival, i, j = events[0]
+            bound = bounds[i, j]
+            if schedule.static or self._demand_rng.random() * bound < schedule.rate(arrival, i, j):
+                self.departure_queues.push(
+                    self._region_to_vp[i], self._region_to_vp[j], self._state.currentstep
+                )
+                self._demand_gen_od[i, j] += 1
+            heapq.heapreplace(events, (arrival + self._demand_rng.exponential(1.0 / bound), i, j))
 
     def _dispatch_mission(self, uav_id: int, origin_vp_id: int, dest_vp_id: int, enqueue_step: int):
         """Assign a queued demand trip to an idle UAV and open a trip log entry."""
         o_region = self.vertiport_region_map.get(origin_vp_id, -1)
         d_region = self.vertiport_region_map.get(dest_vp_id, -1)
 
+        self._assign_leg(uav_id, origin_vp_id, dest_vp_id)
+
+        self._open_trips[uav_id] = len(self._trip_log)
+        self._trip_log.extend(np.array([(
+            uav_id, o_region, d_region, origin_vp_id, dest_vp_id,
+            enqueue_step, self._state.currentstep,
+            -1,  # arrive_airspace_step, filled by _log_arrive_airspace
+            -1,  # land_step, filled by _log_land
+        )], dtype=TRIP_DTYPE))
+
+    def _assign_leg(self, uav_id: int, origin_vp_id: int, dest_vp_id: int):
+        """Send a UAV grounded at origin_vp_id to dest_vp_id."""
         # Uses assign_start_end directly (mirrors reassign_new_mission but
         # with specific vertiports instead of random selection). Must NOT use
         # assign_mission_start_end_vertiport: that appends to uav_id_list, but
@@ -124,57 +369,82 @@ class DemandModelMixin:
             self._vp_id_to_vp[dest_vp_id],
             self.atc.airspace_mid_point_coord,
         )
+        self.atc.notify_mission_change(uav_id)
+
+    def _rebalance_fleet(self):
+        """Dispatch tick: send surplus idle UAVs empty to vertiports whose
+        queued trips outnumber their idle and inbound UAVs.
+
+        Idle UAVs are the grounded, non-operational UAVs of each vertiport;
+        the moves come from fleet_dispatcher.plan().  A repositioned UAV
+        carries no trip — on landing it takes a queued trip through the
+        ordinary same-vertiport dispatch.
+        """
+        idle_ids = [
+            [uav_id for uav_id in vp.uav_id_list
+             if not self.atc.uav_dict[uav_id].operational and not self.atc.uav_dict[uav_id].uav_in_flight]
+            for vp in self._vp_list
+        ]
+        # UAVs removed after a collision never land
+        self._repositioning = {
+            uav_id: k for uav_id, k in self._repositioning.items() if uav_id in self.atc.uav_dict
+        }
+        n_vp = len(self._vp_list)
+        idle = np.fromiter((len(ids) for ids in idle_ids), dtype=np.int64, count=n_vp)
+        inbound = np.bincount(
+            np.fromiter(self._repositioning.values(), dtype=np.int64, count=len(self._repositioning)),
+            minlength=n_vp,
+        )
+        src, dst, count = self.fleet_dispatcher.plan(idle, self.departure_queues.lengths, inbound)
 
-        self._trip_log.append({
-            'uav_id': uav_id,
-            'o_region': o_region,
-            'd_region': d_region,
-            'origin_vp_id': origin_vp_id,
-            'dest_vp_id': dest_vp_id,
-            'enqueue_step': enqueue_step,
-            'depart_step': self._state.currentstep,
-            'arrive_airspace_step': None,  # filled by _log_arrive_airspace
-            'land_step': None,  # filled by _log_land
-        })
+        for k_src, k_dst, n in zip(src.tolist(), dst.tolist(), count.tolist()):
+            # The UAVs that waited longest at k_src keep its own queued trips
+            for uav_id in idle_ids[k_src][len(idle_ids[k_src]) - n:]:
+                self._assign_leg(uav_id, self._vp_index_to_id[k_src], self._vp_index_to_id[k_dst])
+                self._repositioning[uav_id] = k_dst
+            del idle_ids[k_src][len(idle_ids[k_src]) - n:]
+        self._repositions_count += int(count.sum())
 
     def _log_arrive_airspace(self, uav_id: int):
         """Log the step at which uav_id entered the landing queue (no-op if not queued)."""
-        uav = self.atc.uav_dict.get(uav_id)
-        if uav is None:
+        row = self._open_trips.get(uav_id)
+        if row is None:
+            return
+        trips = self._trip_log.data
+        if trips['arrive_airspace_step'][row] >= 0:
             return
-        for vertiport in self.airspace.vertiport_list:
-            if uav_id in vertiport.landing_queue:
-                for entry in reversed(self._trip_log):
-                    if entry['uav_id'] == uav_id and entry['arrive_airspace_step'] is None:
-                        entry['arrive_airspace_step'] = self._state.currentstep
-                break
+        # ATC queues a UAV at its end vertiport only
+        end_vertiport = getattr(self.atc.uav_dict.get(uav_id), 'end_vertiport', None)
+        if end_vertiport is not None and uav_id in end_vertiport.landing_queue:
+            trips['arrive_airspace_step'][row] = self._state.currentstep
 
     def _log_land(self, uav_id: int, vertiport_id: int):
         """Record completed landing and increment OD counters."""
-        for entry in reversed(self._trip_log):
-            if entry['uav_id'] == uav_id and entry['land_step'] is None:
-                entry['land_step'] = self._state.currentstep
-                if entry['arrive_airspace_step'] is None:
-                    entry['arrive_airspace_step'] = self._state.currentstep
-                o = entry['o_region']
-                d = entry['d_region']
-                if 0 <= o < self.n_regions and 0 <= d < self.n_regions:
-                    self._trips_completed_od[o, d] += 1
-                break
+        self._repositioning.pop(uav_id, None)
+        row = self._open_trips.pop(uav_id, None)
+        if row is None:
+            return
+        trip = self._trip_log.data[row:row + 1]
+        trip['land_step'] = self._state.currentstep
+        if trip['arrive_airspace_step'][0] < 0:
+            trip['arrive_airspace_step'] = self._state.currentstep
+        o, d = int(trip['o_region'][0]), int(trip['d_region'][0])
+        if 0 <= o < self.n_regions and 0 <= d < self.n_regions:
+            self._trips_completed_od[o, d] += 1
 
     def _accumulate_step_metrics(self):
         """Accumulate step-level values for time-averaged metrics B4/B5/B6."""
-        for k, vp_id in enumerate(self._vp_index_to_id):
-            vertiport = self._vp_id_to_vp.get(vp_id)
-            if vertiport is None:
-                continue
-            self._pads_occupied_sum[k] += len(vertiport.uav_id_list)
-            self._queue_length_sum[k] += len(vertiport.get_landing_queue())
-
-        in_flight = sum(
-            1 for uav in self.atc.uav_dict.values() if getattr(uav, 'uav_in_flight', False)
+        n_vp = len(self._vp_list)
+        self._pads_occupied_sum += np.fromiter(
+            (len(vp.uav_id_list) for vp in self._vp_list), dtype=float, count=n_vp
+        )
+        self._queue_length_sum += np.fromiter(
+            (len(vp.get_landing_queue()) for vp in self._vp_list), dtype=float, count=n_vp
         )
-        self._uavs_in_flight_sum += in_flight
+        self._uavs_in_flight_sum += int(np.count_nonzero(np.fromiter(
+            (getattr(uav, 'uav_in_flight', False) for uav in self.atc.uav_dict.values()),
+            dtype=bool, count=len(self.atc.uav_dict),
+        )))
 
     def get_episode_metrics(self) -> Dict:
         """Aggregate all step-level logs into Group B observation features for the RL env.
@@ -182,28 +452,23 @@ class DemandModelMixin:
         Returns a dict with keys: pair_avg_trip_time, pair_avg_wait_time,
         pair_demand_served_ratio, demand_generated_od, trips_completed_od,
         utilization, queue_length, fleet_utilization, demand_served_ratio,
-        vp_index_to_id.
+        repositioning_flights, vp_index_to_id.
         """
         N = self.n_regions
         T = max(self._state.currentstep, 1)  # guard against division by zero
 
-        trip_time_sum = np.zeros((N, N), dtype=float)
-        wait_time_sum = np.zeros((N, N), dtype=float)
-        completed_count = np.zeros((N, N), dtype=int)
-
-        for entry in self._trip_log:
-            o, d = entry['o_region'], entry['d_region']
-            if not (0 <= o < N and 0 <= d < N):
-                continue
-            if entry['land_step'] is None:
-                continue  # trip not completed — skip (counts as unserved)
-
-            trip_steps = entry['land_step'] - entry['depart_step']
-            wait_steps = entry['land_step'] - entry['arrive_airspace_step']
+        # Completed trips between known regions, grouped by flat OD index;
+        # trips not completed count as unserved and are skipped
+        trips = self._trip_log.data
+        o, d = trips['o_region'], trips['d_region']
+        done = trips[(trips['land_step'] >= 0) & (o >= 0) & (o < N) & (d >= 0) & (d < N)]
+        od = done['o_region'] * N + done['d_region']
 
-            trip_time_sum[o, d] += trip_steps * self.dt
-            wait_time_sum[o, d] += wait_steps * self.dt
-            completed_count[o, d] += 1
+        trip_steps = done['land_step'] - done['depart_step']
+        wait_steps = done['land_step'] - done['arrive_airspace_step']
+        trip_time_sum = np.bincount(od, weights=trip_steps * self.dt, minlength=N * N).reshape(N, N)
+        wait_time_sum = np.bincount(od, weights=wait_steps * self.dt, minlength=N * N).reshape(N, N)
+        completed_count = np.bincount(od, minlength=N * N).reshape(N, N)
 
         pair_avg_trip_time = np.where(
             completed_count > 0, trip_time_sum / np.maximum(completed_count, 1), 0.0
@@ -241,6 +506,7 @@ class DemandModelMixin:
             'queue_length': queue_length,
             'fleet_utilization': fleet_utilization,
             'demand_served_ratio': demand_served_ratio,
+            'repositioning_flights': self._repositions_count,
             'vp_index_to_id': list(self._vp_index_to_id),
         }
 
@@ -248,3 +514,4 @@ class DemandModelMixin:
         """Update the vertiport→region mapping for the next episode. Call before reset()."""
         self.vertiport_region_map = vertiport_region_map
         self._region_to_vp = None
+        self._demand_events = None
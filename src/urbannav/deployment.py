@@ -13,7 +13,9 @@ Rendering is controlled entirely by sample_config.yaml:
 OD matrix (--od-matrix):
     Optional path to the Band 1 OD lambda matrix output (.npy or .csv).
     One-time data entry for the vertiport-design problem — the same matrix
-    is used for all episodes within a single run. If omitted, the simulator
+    is used for all episodes within a single run. A demand schedule
+    directory (DemandSchedule.save(): one matrix per time period, e.g.
+    hour of day) gives time-varying demand instead. If omitted, the simulator
     falls back to random mission assignment (demand-unaware, the default).
 """
 import argparse
@@ -30,7 +32,7 @@ def main() -> None:
         '--od-matrix',
         default=None,
         metavar='PATH',
-        help='Path to Band 1 OD lambda matrix (.npy or .csv). '
+        help='Path to Band 1 OD lambda matrix (.npy or .csv) or demand schedule directory. '
              'If omitted, simulator uses random mission assignment.'
     )
     parser.add_argument(
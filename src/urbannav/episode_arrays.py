@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from urbannav.episode_io import json_exists, read_json
+from urbannav.episode_stream import (
+    INDEX_FILENAME, STREAM_DIRNAME, _TABLE_OFFSETS, EpisodeStreamReader,
+)
+from urbannav.metrics_collector import (
+    _EDGE_FIELDS, _UAV_FIELDS, _UAV_FLOAT_FIELDS, _VERTIPORT_FIELDS,
+)
+
+# Directory (inside the episode dir) and manifest written by convert_episode()
+ARRAYS_DIRNAME = 'arrays'
+META_FILENAME = 'meta.json'
+FORMAT_VERSION = 1
+
+# Width of the per-row action vector (the surrogate datasets' action dim)
+ACTION_DIM = 2
+
+# CSR offsets key of every per-step table ('uav' names the UAV rows as a whole)
+_ROW_TABLES: Dict[str, str] = {
+    'uav': 'uav_offsets', 'uav_id': 'uav_offsets', 'action': 'uav_offsets', **_TABLE_OFFSETS,
+}
+
+
+def action_vector(entry: Any, dim: int = ACTION_DIM) -> np.ndarray:
+    """Coerce a logged action entry to a fixed-shape (dim,) float32 array.
+
+    Lists / tuples / arrays are truncated or zero-padded, scalars fill the
+    first slot and anything else (None, dicts, strings) becomes zeros.
+    """
+    out = np.zeros(dim, dtype=np.float32)
+    if entry is None:
+        return out
+    if isinstance(entry, (list, tuple, np.ndarray)):
+        arr = np.asarray(entry, dtype=np.float32).flatten()
+        n = min(len(arr), dim)
+        out[:n] = arr[:n]
+        return out
+    try:
+        out[0] = float(entry)
+    except (TypeError, ValueError):
+        pass
+    return out
+
+
+def find_step_source(episode_dir: str) -> Optional[str]:
+    """Which step history an episode directory holds, in read preference order.
+
+    Returns:
+        'arrays' (converted by convert_episode), 'stream' (chunked
+        step_history/), 'json' (step_history.json, possibly compressed) or
+        None when the directory has no step history.
+    """
+    if os.path.exists(os.path.join(episode_dir, ARRAYS_DIRNAME, META_FILENAME)):
+        return 'arrays'
+    if os.path.exists(os.path.join(episode_dir, STREAM_DIRNAME, INDEX_FILENAME)):
+        return 'stream'
+    if json_exists(os.path.join(episode_dir, 'step_history.json')):
+        return 'json'
+    return None
+
+
+class EpisodeArrays:
+    """One episode's step history as fixed-dtype column tables.
+
+    The layout is the MetricsCollector.drain() chunk layout for a whole
+    episode, with the per-step JSON actions replaced by a dense per-row
+    action table:
+
+      step (n,) int64, sorted
+      uav_offsets (n + 1,)           step k owns UAV rows [off[k], off[k + 1])
+      uav_id (rows,) int64, uav.<field> (rows,) for each recorded field
+      action (rows, ACTION_DIM) float32 (zeros where the UAV had no action)
+      has_actions (n,) bool          step carried a non-empty actions dict
+      nmac_pairs / uav_collision_pairs (M, 2), ra_collision_ids (M,)
+      vertiports (V, 5), edges (E, 5) in _VERTIPORT_FIELDS / _EDGE_FIELDS order
+      <table>_offsets (n + 1,)       CSR offsets of each of the above
+
+    On disk each table is one .npy file under ``<episode>/arrays/`` and is
+    opened with np.load(mmap_mode='r') on first access, so slicing a step
+    reads only the pages it touches.  Instances built from step_history.json
+    or a chunk stream hold the same tables in memory.
+
+    Attributes:
+        fields:    Recorded UAV snapshot fields (subset of _UAV_FIELDS).
+        directory: arrays/ directory for memory-mapped instances, else None.
+    """
+
+    def __init__(self, tables: Dict[str, np.ndarray], fields: Sequence[str],
+                 directory: Optional[str] = None) -> None:
+        self.fields: List[str] = list(fields)
+        self.directory = directory
+        self._tables = tables
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def open(cls, path: str) -> 'EpisodeArrays':
+        """Memory-map a converted episode.
+
+        Args:
+            path: Episode directory or its arrays/ directory.
+        """
+        if os.path.isdir(os.path.join(path, ARRAYS_DIRNAME)):
+            path = os.path.join(path, ARRAYS_DIRNAME)
+        with open(os.path.join(path, META_FILENAME)) as f:
+            meta = json.load(f)
+        if meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported episode arrays version {meta.get('format_version')!r} in {path}"
+            )
+        return cls({}, meta['fields'], directory=path)
+
+    @classmethod
+    def load(cls, episode_dir: str, use_arrays: bool = True) -> 'EpisodeArrays':
+        """Open an episode from the best step source it has (see find_step_source).
+
+        Args:
+            episode_dir: Logger episode directory.
+            use_arrays:  Memory-map arrays/ when present; False reads the
+                         chunk stream / step_history.json it was converted from.
+        """
+        if use_arrays and find_step_source(episode_dir) == 'arrays':
+            return cls.open(episode_dir)
+        if os.path.exists(os.path.join(episode_dir, STREAM_DIRNAME, INDEX_FILENAME)):
+            return cls.from_chunks(EpisodeStreamReader(episode_dir).iter_chunks())
+        json_path = os.path.join(episode_dir, 'step_history.json')
+        if json_exists(json_path):
+            return cls.from_steps(read_json(json_path))
+        raise FileNotFoundError(f"No step history in {episode_dir}")
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Dict[str, np.ndarray]]) -> 'EpisodeArrays':
+        """Concatenate MetricsCollector.drain() chunks into one episode."""
+        chunks = [c for c in chunks if len(c['step'])]
+        if not chunks:
+            return cls.from_steps([])
+        fields = [name for name in _UAV_FIELDS if f'uav.{name}' in chunks[0]]
+
+        tables: Dict[str, np.ndarray] = {
+            'step': np.concatenate([c['step'] for c in chunks]).astype(np.int64),
+            'uav_id': np.concatenate([c['uav_id'] for c in chunks]).astype(np.int64),
+        }
+        for name in fields:
+            tables[f'uav.{name}'] = np.concatenate([c[f'uav.{name}'] for c in chunks])
+        for name, off in {'uav_id': 'uav_offsets', **_TABLE_OFFSETS}.items():
+            if name != 'uav_id':
+                tables[name] = np.concatenate([c[name] for c in chunks])
+            # Shift each chunk's offsets by the rows of the chunks before it
+            parts, base = [np.zeros(1, dtype=np.int64)], 0
+            for c in chunks:
+                parts.append(c[off][1:] + base)
+                base += int(c[off][-1])
+            tables[off] = np.concatenate(parts).astype(np.int64)
+
+        actions = [json.loads(str(a)) for c in chunks for a in c['actions']]
+        tables['has_actions'] = np.array([bool(a) for a in actions], dtype=bool)
+        tables['action'] = _action_table(actions, tables['uav_id'], tables['uav_offsets'])
+        return cls(tables, fields)
+
+    @classmethod
+    def from_steps(cls, steps: List[Dict[str, Any]]) -> 'EpisodeArrays':
+        """Build from step records in the step_history.json format.
+
+        Snapshot values that are missing or None are stored as 0, except
+        dist_to_goal, which keeps None as NaN like MetricsCollector does.
+        """
+        steps = sorted(steps, key=lambda s: s['step'])
+        uav_maps = [s.get('uavs') or {} for s in steps]
+        present = {name for uavs in uav_maps for snap in uavs.values() for name in snap}
+        fields = [name for name in _UAV_FIELDS if name in present]
+
+        snaps = [snap for uavs in uav_maps for snap in uavs.values()]
+        tables: Dict[str, np.ndarray] = {
+            'step': np.array([s['step'] for s in steps], dtype=np.int64),
+            'uav_id': np.array([int(uid) for uavs in uav_maps for uid in uavs], dtype=np.int64),
+            'uav_offsets': _offsets([len(uavs) for uavs in uav_maps]),
+        }
+        for name in fields:
+            if name in _UAV_FLOAT_FIELDS:
+                fill = np.nan if name == 'dist_to_goal' else 0.0
+                values = [fill if snap.get(name) is None else snap[name] for snap in snaps]
+                tables[f'uav.{name}'] = np.array(values, dtype=float)
+            else:
+                tables[f'uav.{name}'] = np.array([snap.get(name) or 0 for snap in snaps], dtype=np.int64)
+
+        actions = [s.get('actions') or {} for s in steps]
+        tables['has_actions'] = np.array([bool(a) for a in actions], dtype=bool)
+        tables['action'] = _action_table(actions, tables['uav_id'], tables['uav_offsets'])
+
+        collisions = [s.get('collisions') or {} for s in steps]
+        for name, width in (('nmac_pairs', 2), ('uav_collision_pairs', 2), ('ra_collision_ids', None)):
+            rows = [c.get(name) or [] for c in collisions]
+            shape = (0, width) if width else (0,)
+            flat = [r for per_step in rows for r in per_step]
+            tables[name] = np.array(flat, dtype=np.int64) if flat else np.zeros(shape, dtype=np.int64)
+            tables[_TABLE_OFFSETS[name]] = _offsets([len(r) for r in rows])
+
+        vp_rows = [
+            [[info.get(key) or 0 for key in _VERTIPORT_FIELDS]
+             for _, info in sorted((s.get('vertiports') or {}).items(), key=lambda kv: int(kv[0]))]
+            for s in steps
+        ]
+        edge_rows = [
+            [[entry.get(key) or 0 for key in _EDGE_FIELDS] for entry in (s.get('edges') or {}).values()]
+            for s in steps
+        ]
+        for name, rows, width in (('vertiports', vp_rows, len(_VERTIPORT_FIELDS)),
+                                  ('edges', edge_rows, len(_EDGE_FIELDS))):
+            flat = [r for per_step in rows for r in per_step]
+            tables[name] = np.array(flat, dtype=float).reshape(len(flat), width)
+            tables[_TABLE_OFFSETS[name]] = _offsets([len(r) for r in rows])
+        return cls(tables, fields)
+
+    def save(self, directory: str) -> None:
+        """Write every table as <directory>/<name>.npy plus meta.json.
+
+        meta.json is written last, so a directory without it is an
+        interrupted conversion and is ignored by find_step_source().
+        """
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, META_FILENAME)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        for name in self.table_names():
+            np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(self[name]))
+        tmp = meta_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({
+                'format_version': FORMAT_VERSION,
+                'fields': self.fields,
+                'num_steps': self.num_steps,
+                'num_rows': self.num_rows,
+            }, f, indent=2)
+        os.replace(tmp, meta_path)
+
+    # ------------------------------------------------------------------
+    # Primary interface
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """Table by name; memory-mapped tables are opened on first access."""
+        if name not in self._tables:
+            if self.directory is None:
+                raise KeyError(name)
+            self._tables[name] = np.load(os.path.join(self.directory, f'{name}.npy'), mmap_mode='r')
+        return self._tables[name]
+
+    def table_names(self) -> List[str]:
+        names = ['step', 'has_actions', 'uav_id', 'action', *[f'uav.{f}' for f in self.fields]]
+        names += list(_TABLE_OFFSETS) + sorted(set(_ROW_TABLES.values()))
+        return names
+
+    @property
+    def mmapped(self) -> bool:
+        return self.directory is not None
+
+    @property
+    def num_steps(self) -> int:
+        return len(self['step'])
+
+    @property
+    def num_rows(self) -> int:
+        return len(self['uav_id'])
+
+    def rows(self, table: str, k: int) -> slice:
+        """Row slice of step index k (not step number) in a CSR table."""
+        off = self[_ROW_TABLES.get(table, table)]
+        return slice(int(off[k]), int(off[k + 1]))
+
+    def counts(self, table: str) -> np.ndarray:
+        """(n,) rows per step of a CSR table."""
+        return np.diff(self[_ROW_TABLES.get(table, table)])
+
+    def step_rows(self, table: str, k: int) -> np.ndarray:
+        """Rows of step index k in a CSR table (a view for memory-mapped tables)."""
+        return self[table][self.rows(table, k)]
+
+    def uav_matrix(self, fields: Sequence[str], rows: Any, dtype=np.float32) -> np.ndarray:
+        """(len(rows), len(fields)) matrix of UAV snapshot fields.
+
+        Fields that were not recorded come back as zeros.
+
+        Args:
+            fields: Snapshot field names, in column order.
+            rows:   Row selection (slice or index array) into the UAV table.
+            dtype:  Output dtype.
+        """
+        out = np.zeros((len(self['uav_id'][rows]), len(fields)), dtype=dtype)
+        for j, name in enumerate(fields):
+            if name in self.fields:
+                out[:, j] = self[f'uav.{name}'][rows]
+        return out
+
+    def close(self) -> None:
+        """Drop the memory maps (reopened lazily on next access)."""
+        if self.mmapped:
+            self._tables = {}
+
+
+class EpisodeArrayCache:
+    """Bounded cache of open EpisodeArrays, keyed by episode directory.
+
+    Every memory-mapped table holds a file descriptor, so a dataset over a
+    few thousand episodes cannot keep them all open.  At most max_open
+    memory-mapped episodes stay open (least recently used are closed);
+    episodes loaded into memory from JSON / chunk streams are kept, since
+    reloading them is the expensive path.
+
+    The cache is emptied when pickled (e.g. into DataLoader workers), and
+    each process reopens what it reads.
+    """
+
+    def __init__(self, max_open: int = 32) -> None:
+        self.max_open = max(int(max_open), 1)
+        self._mapped: 'OrderedDict[str, EpisodeArrays]' = OrderedDict()
+        self._in_memory: Dict[str, EpisodeArrays] = {}
+
+    def get(self, episode_dir: str) -> EpisodeArrays:
+        if episode_dir in self._in_memory:
+            return self._in_memory[episode_dir]
+        if episode_dir in self._mapped:
+            self._mapped.move_to_end(episode_dir)
+            return self._mapped[episode_dir]
+        arrays = EpisodeArrays.load(episode_dir)
+        if not arrays.mmapped:
+            self._in_memory[episode_dir] = arrays
+            return arrays
+        self._mapped[episode_dir] = arrays
+        while len(self._mapped) > self.max_open:
+            _, evicted = self._mapped.popitem(last=False)
+            evicted.close()
+        return arrays
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {'max_open': self.max_open}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state['max_open'])
+
+
+# ---------------------------------------------------------------------------
+# Conversion
+# ---------------------------------------------------------------------------
+
+def convert_episode(episode_dir: str, overwrite: bool = False) -> str:
+    """Write <episode_dir>/arrays/ from the episode's chunk stream or step_history.json.
+
+    Args:
+        episode_dir: Logger episode directory.
+        overwrite:   Reconvert even if arrays/ is already complete.
+
+    Returns:
+        The arrays/ directory.
+    """
+    target = os.path.join(episode_dir, ARRAYS_DIRNAME)
+    if find_step_source(episode_dir) != 'arrays' or overwrite:
+        EpisodeArrays.load(episode_dir, use_arrays=False).save(target)
+    return target
+
+
+def _offsets(counts: Sequence[int]) -> np.ndarray:
+    off = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=off[1:])
+    return off
+
+
+def _action_table(actions: List[Dict[str, Any]], uav_id: np.ndarray,
+                  uav_offsets: np.ndarray) -> np.ndarray:
+    """(rows, ACTION_DIM) action of each UAV row; actions dicts are keyed by str(uav_id)."""
+    table = np.zeros((len(uav_id), ACTION_DIM), dtype=np.float32)
+    for k, step_actions in enumerate(actions):
+        if not step_actions:
+            continue
+        for r in range(int(uav_offsets[k]), int(uav_offsets[k + 1])):
+            entry = step_actions.get(str(int(uav_id[r])))
+            if entry is not None:
+                table[r] = action_vector(entry)
+    return table
@@ -0,0 +1,425 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from contextlib import closing
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from urbannav.episode_arrays import ARRAYS_DIRNAME, find_step_source
+from urbannav.episode_io import COMPRESSION_SUFFIXES, json_exists, read_json
+from urbannav.episode_stream import STREAM_DIRNAME
+
+# Default catalog file name, placed at the root of a logs / sweep output tree
+CATALOG_FILENAME = 'catalog.sqlite'
+
+# Per-run config snapshot written by the surrogate parallel_runner
+SWEEP_CONFIG_FILENAME = 'sweep_config.json'
+
+# Filter prefix that addresses episode_metrics.json values instead of config values
+METRICS_PREFIX = 'metrics.'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS episodes (
+    episode_dir       TEXT PRIMARY KEY,
+    run_id            TEXT,
+    run_dir           TEXT,
+    config_hash       TEXT,
+    episode_id        INTEGER,
+    num_steps         INTEGER,
+    metadata_path     TEXT,
+    metrics_path      TEXT,
+    step_history_path TEXT
+);
+CREATE TABLE IF NOT EXISTS params (
+    episode_dir TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    num         REAL,
+    text        TEXT,
+    PRIMARY KEY (episode_dir, key)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    episode_dir TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    value       REAL,
+    PRIMARY KEY (episode_dir, key)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id       TEXT PRIMARY KEY,
+    run_dir      TEXT,
+    config_hash  TEXT,
+    sweep_params TEXT
+);
+CREATE INDEX IF NOT EXISTS params_by_num ON params (key, num);
+CREATE INDEX IF NOT EXISTS params_by_text ON params (key, text);
+CREATE INDEX IF NOT EXISTS metrics_by_value ON metrics (key, value);
+CREATE INDEX IF NOT EXISTS episodes_by_run ON episodes (run_id);
+"""
+
+_FILTER_RE = re.compile(r'^\s*([^\s<>=!]+)\s*(==|!=|>=|<=|=|<|>)\s*(.+?)\s*$')
+_SQL_OPS = {'=': '=', '==': '=', '!=': '!=', '<': '<', '<=': '<=', '>': '>', '>=': '>='}
+
+Filter = Union[str, Tuple[str, str, Any]]
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    """Short deterministic hash of a config dict (same scheme as sweep run ids)."""
+    blob = json.dumps(config, sort_keys=True, default=str).encode()
+    return hashlib.sha256(blob).hexdigest()[:10]
+
+
+def flatten_config(config: Any, prefix: str = '') -> Dict[str, Any]:
+    """Flatten nested dicts / lists into dotted keys.
+
+    List items are addressed by index, matching the sweep key syntax
+    (e.g. ``fleet_composition.0.count``).
+    """
+    if isinstance(config, dict):
+        items: Iterable[Tuple[Any, Any]] = config.items()
+    elif isinstance(config, (list, tuple)):
+        items = enumerate(config)
+    else:
+        return {prefix: config}
+    flat: Dict[str, Any] = {}
+    for key, value in items:
+        flat.update(flatten_config(value, f'{prefix}.{key}' if prefix else str(key)))
+    return flat
+
+
+def parse_filter(expr: str) -> Tuple[str, str, Any]:
+    """Parse ``'key<op>value'`` (op in = == != < <= > >=) into (key, op, value).
+
+    The value is read as JSON when possible (numbers, true/false, null,
+    quoted strings), otherwise kept as a bare string.
+    """
+    match = _FILTER_RE.match(expr)
+    if match is None:
+        raise ValueError(f"Cannot parse filter '{expr}'. Expected key<op>value, e.g. simulator.seed=42")
+    key, op, raw = match.groups()
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = raw
+    return key, op, value
+
+
+class EpisodeCatalog:
+    """SQLite index of logged episodes, queryable by config value and metric.
+
+    One row per episode directory, holding its run id / run directory (for
+    parallel_runner sweeps), config hash, episode id, step count and the
+    paths of its metadata, metrics and step history.  Every config value is
+    stored flattened (``params``: dotted key -> number or text) and every
+    numeric episode metric in ``metrics``, both indexed by (key, value), so
+    selecting episodes by configuration or outcome is a single indexed query
+    instead of a directory walk that opens each episode's files.
+
+    Writers are the Logger (one row per saved episode, when
+    LoggingConfig.catalog is set) and the surrogate parallel_runner (run id
+    and swept parameters per run).  Each call opens its own connection, so
+    an instance is safe to use from the Logger's writer thread and from
+    several worker processes sharing one file.
+
+    Usage::
+
+        catalog = EpisodeCatalog('logs/sweep_001/catalog.sqlite')
+        dirs = catalog.select('fleet_composition.0.count>=50',
+                              'metrics.total_nmac_events=0')
+    """
+
+    def __init__(self, path: str, timeout: float = 60.0) -> None:
+        """
+        Args:
+            path:    Catalog file; created (with its directory) if missing.
+            timeout: Seconds to wait on a database locked by another writer.
+        """
+        self.path = path
+        self.timeout = timeout
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def add_episode(
+        self,
+        episode_dir: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        metrics: Optional[Dict[str, Any]] = None,
+        config: Optional[Dict[str, Any]] = None,
+        paths: Optional[Dict[str, Optional[str]]] = None,
+        run_id: Optional[str] = None,
+        run_dir: Optional[str] = None,
+    ) -> None:
+        """Insert or replace one episode row with its params and metrics.
+
+        Args:
+            episode_dir: Episode directory (the row key; stored absolute).
+            metadata:    metadata.json contents (episode start metrics).
+            metrics:     episode_metrics.json contents.
+            config:      Config the episode ran with; defaults to metadata['config'].
+            paths:       metadata_path / metrics_path / step_history_path;
+                         looked up on disk when omitted.
+            run_id:      Sweep run id, if known.
+            run_dir:     Sweep run directory, if known.
+        """
+        episode_dir = os.path.abspath(episode_dir)
+        metadata = metadata or {}
+        metrics = metrics or {}
+        if config is None:
+            config = metadata.get('config') or {}
+        paths = paths if paths is not None else _episode_paths(episode_dir)
+
+        with closing(self._connect()) as conn, conn:
+            existing = conn.execute(
+                'SELECT run_id, run_dir, config_hash FROM episodes WHERE episode_dir = ?',
+                (episode_dir,),
+            ).fetchone()
+            cfg_hash = config_hash(config) if config else None
+            # Keep run information a previous record_run() attached
+            if existing is not None and existing['run_id'] is not None and run_id is None:
+                run_id, run_dir, cfg_hash = existing['run_id'], existing['run_dir'], existing['config_hash']
+            conn.execute(
+                'INSERT OR REPLACE INTO episodes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    episode_dir, run_id, run_dir, cfg_hash,
+                    metrics.get('episode_id'), metrics.get('total_steps'),
+                    paths.get('metadata_path'), paths.get('metrics_path'),
+                    paths.get('step_history_path'),
+                ),
+            )
+            conn.execute('DELETE FROM params WHERE episode_dir = ?', (episode_dir,))
+            conn.executemany(
+                'INSERT INTO params VALUES (?, ?, ?, ?)',
+                [(episode_dir, key, *_param_value(value))
+                 for key, value in flatten_config(config).items()],
+            )
+            conn.execute('DELETE FROM metrics WHERE episode_dir = ?', (episode_dir,))
+            conn.executemany(
+                'INSERT INTO metrics VALUES (?, ?, ?)',
+                [(episode_dir, key, float(value)) for key, value in metrics.items()
+                 if isinstance(value, (int, float)) and not isinstance(value, bool)],
+            )
+
+    def record_run(
+        self,
+        run_id: str,
+        run_dir: str,
+        config: Optional[Dict[str, Any]] = None,
+        sweep_params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Record a sweep run and tag every catalogued episode under run_dir with it.
+
+        Args:
+            run_id:       Sweep run id (sweep_config._run_id of the run's config).
+            run_dir:      Directory holding the run's episodes.
+            config:       The run's sweep config; its hash becomes config_hash.
+            sweep_params: Swept key -> value for this run.
+        """
+        run_dir = os.path.abspath(run_dir)
+        cfg_hash = config_hash(config) if config is not None else run_id
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?)',
+                (run_id, run_dir, cfg_hash, json.dumps(sweep_params or {}, default=str)),
+            )
+            prefix = _dir_prefix(run_dir)
+            conn.execute(
+                'UPDATE episodes SET run_id = ?, run_dir = ?, config_hash = ? '
+                'WHERE episode_dir = ? OR substr(episode_dir, 1, ?) = ?',
+                (run_id, run_dir, cfg_hash, run_dir, len(prefix), prefix),
+            )
+
+    def set_paths(self, episode_dir: str, **paths: Optional[str]) -> None:
+        """Update stored file paths (e.g. step_history_path after conversion)."""
+        unknown = set(paths) - {'metadata_path', 'metrics_path', 'step_history_path'}
+        if unknown:
+            raise ValueError(f"Unknown path columns {sorted(unknown)}")
+        if not paths:
+            return
+        assignments = ', '.join(f'{name} = ?' for name in paths)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(f'UPDATE episodes SET {assignments} WHERE episode_dir = ?',
+                         (*paths.values(), os.path.abspath(episode_dir)))
+
+    def remove_missing(self) -> int:
+        """Drop rows whose episode directory no longer exists; returns the count."""
+        gone = [d for d in self.select() if not os.path.isdir(d)]
+        with closing(self._connect()) as conn, conn:
+            for table in ('episodes', 'params', 'metrics'):
+                conn.executemany(f'DELETE FROM {table} WHERE episode_dir = ?', [(d,) for d in gone])
+        return len(gone)
+
+    def rebuild(self, root: str) -> int:
+        """Catalogue every episode under root from the files on disk.
+
+        An episode is any directory with a metadata.json (plain or
+        compressed).  A parent directory holding sweep_config.json is taken
+        as its sweep run (run id = directory name without the ``run_``
+        prefix).  Existing rows for those episodes are replaced.
+
+        Returns:
+            Number of episodes catalogued.
+        """
+        count = 0
+        runs: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        for dirpath, dirnames, filenames in os.walk(root):
+            # Do not descend into step-history payload directories
+            dirnames[:] = [d for d in dirnames if d not in (STREAM_DIRNAME, ARRAYS_DIRNAME)]
+            if not any(f == 'metadata.json' + s for f in filenames for s in COMPRESSION_SUFFIXES.values()):
+                continue
+            metadata = read_json(os.path.join(dirpath, 'metadata.json'))
+            metrics_file = os.path.join(dirpath, 'episode_metrics.json')
+            metrics = read_json(metrics_file) if json_exists(metrics_file) else {}
+            self.add_episode(dirpath, metadata, metrics)
+            count += 1
+
+            run_dir = os.path.dirname(os.path.abspath(dirpath))
+            sweep_file = os.path.join(run_dir, SWEEP_CONFIG_FILENAME)
+            if run_dir not in runs and os.path.exists(sweep_file):
+                with open(sweep_file) as f:
+                    run_config = json.load(f)
+                runs[run_dir] = (os.path.basename(run_dir).replace('run_', '', 1), run_config)
+
+        for run_dir, (run_id, run_config) in runs.items():
+            self.record_run(run_id, run_dir, run_config)
+        return count
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def select(
+        self,
+        *filters: Filter,
+        root: Optional[str] = None,
+        run_id: Optional[str] = None,
+        complete: bool = False,
+    ) -> List[str]:
+        """Episode directories matching every filter, sorted.
+
+        Args:
+            filters:  ``'key<op>value'`` strings or (key, op, value) tuples.
+                      Keys are flattened config keys (``simulator.seed``) or
+                      ``metrics.<name>`` for episode metrics.
+            root:     Only episodes under this directory.
+            run_id:   Only episodes of this sweep run.
+            complete: Only episodes with metadata, metrics and a step history.
+        """
+        clauses: List[str] = []
+        args: List[Any] = []
+        for flt in filters:
+            key, op, value = parse_filter(flt) if isinstance(flt, str) else flt
+            if op not in _SQL_OPS:
+                raise ValueError(f"Unknown filter operator '{op}'. Available: {list(_SQL_OPS)}")
+            sql_op = _SQL_OPS[op]
+            if key.startswith(METRICS_PREFIX):
+                clauses.append(f'episode_dir IN (SELECT episode_dir FROM metrics '
+                               f'WHERE key = ? AND value {sql_op} ?)')
+                args += [key[len(METRICS_PREFIX):], value]
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                clauses.append(f'episode_dir IN (SELECT episode_dir FROM params '
+                               f'WHERE key = ? AND num {sql_op} ?)')
+                args += [key, value]
+            else:
+                clauses.append(f'episode_dir IN (SELECT episode_dir FROM params '
+                               f'WHERE key = ? AND text {sql_op} ?)')
+                args += [key, _param_value(value)[1]]
+        if root is not None:
+            root = os.path.abspath(root)
+            prefix = _dir_prefix(root)
+            clauses.append('(episode_dir = ? OR substr(episode_dir, 1, ?) = ?)')
+            args += [root, len(prefix), prefix]
+        if run_id is not None:
+            clauses.append('run_id = ?')
+            args.append(run_id)
+        if complete:
+            clauses.append('metadata_path IS NOT NULL AND metrics_path IS NOT NULL '
+                           'AND step_history_path IS NOT NULL')
+
+        sql = 'SELECT episode_dir FROM episodes'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        return [row['episode_dir'] for row in self.query(sql + ' ORDER BY episode_dir', args)]
+
+    def get(self, episode_dir: str) -> Optional[Dict[str, Any]]:
+        """One episode's row with its 'params' and 'metrics' dicts, or None."""
+        episode_dir = os.path.abspath(episode_dir)
+        rows = self.query('SELECT * FROM episodes WHERE episode_dir = ?', (episode_dir,))
+        if not rows:
+            return None
+        record = dict(rows[0])
+        record['params'] = {
+            row['key']: row['text'] if row['num'] is None else row['num']
+            for row in self.query('SELECT key, num, text FROM params WHERE episode_dir = ?',
+                                  (episode_dir,))
+        }
+        record['metrics'] = {
+            row['key']: row['value']
+            for row in self.query('SELECT key, value FROM metrics WHERE episode_dir = ?',
+                                  (episode_dir,))
+        }
+        return record
+
+    def query(self, sql: str, args: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        """Run a read-only SQL query against the catalog tables."""
+        with closing(self._connect()) as conn:
+            return conn.execute(sql, tuple(args)).fetchall()
+
+    def __len__(self) -> int:
+        return self.query('SELECT COUNT(*) AS n FROM episodes')[0]['n']
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+
+def _param_value(value: Any) -> Tuple[Optional[float], Optional[str]]:
+    """(num, text) columns for a config value; bools / numbers also get text."""
+    if value is None:
+        return None, None
+    if isinstance(value, bool):
+        return float(value), json.dumps(value)
+    if isinstance(value, (int, float)):
+        return float(value), None
+    if isinstance(value, str):
+        return None, value
+    return None, json.dumps(value, default=str)
+
+
+def _dir_prefix(directory: str) -> str:
+    """Path prefix shared by everything strictly under directory."""
+    return directory.rstrip(os.sep) + os.sep
+
+
+def _episode_paths(episode_dir: str) -> Dict[str, Optional[str]]:
+    """Locate an episode's metadata, metrics and step history files on disk."""
+    def _json_path(name: str) -> Optional[str]:
+        base = os.path.join(episode_dir, name)
+        for suffix in COMPRESSION_SUFFIXES.values():
+            if os.path.exists(base + suffix):
+                return base + suffix
+        return None
+
+    source = find_step_source(episode_dir)
+    step_path = {
+        'arrays': os.path.join(episode_dir, ARRAYS_DIRNAME),
+        'stream': os.path.join(episode_dir, STREAM_DIRNAME),
+        'json':   _json_path('step_history.json'),
+    }.get(source)
+    return {
+        'metadata_path': _json_path('metadata.json'),
+        'metrics_path': _json_path('episode_metrics.json'),
+        'step_history_path': step_path,
+    }
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# File suffix appended to a .json path for each compression codec
+COMPRESSION_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+def check_compression(compression: Optional[str]) -> None:
+    """Raise if compression is unknown or its codec is not installed."""
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(
+            f"Unknown compression '{compression}'. Available: {list(COMPRESSION_SUFFIXES)}"
+        )
+    if compression == 'zstd' and zstandard is None:
+        raise ImportError("compression='zstd' requires the 'zstandard' package")
+
+
+def write_json(filepath: str, data: Any, compression: Optional[str] = None) -> str:
+    """Serialize data to JSON, optionally gzip/zstd compressed.
+
+    Uncompressed files keep the 2-space indentation of the original logger;
+    compressed files are written compact.
+
+    Args:
+        filepath:    Target .json path; the codec suffix (.gz / .zst) is appended.
+        data:        JSON-serializable Python object.
+        compression: None, 'gzip' or 'zstd'.
+
+    Returns:
+        The path actually written.
+    """
+    check_compression(compression)
+    path = filepath + COMPRESSION_SUFFIXES[compression]
+    if compression is None:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+    elif compression == 'gzip':
+        with gzip.open(path, 'wt', compresslevel=6) as f:
+            json.dump(data, f)
+    else:
+        with open(path, 'wb') as raw, zstandard.ZstdCompressor().stream_writer(raw) as zf:
+            with io.TextIOWrapper(zf, encoding='utf-8') as f:
+                json.dump(data, f)
+    return path
+
+
+def read_json(filepath: str) -> Any:
+    """Load a JSON file written by write_json(), whichever codec it used.
+
+    Args:
+        filepath: The uncompressed .json path; .gz / .zst siblings are tried
+                  when it does not exist.
+    """
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        path = filepath + suffix
+        if not os.path.exists(path):
+            continue
+        if compression is None:
+            with open(path) as f:
+                return json.load(f)
+        if compression == 'gzip':
+            with gzip.open(path, 'rt') as f:
+                return json.load(f)
+        check_compression(compression)
+        with open(path, 'rb') as raw, zstandard.ZstdDecompressor().stream_reader(raw) as zf:
+            return json.load(io.TextIOWrapper(zf, encoding='utf-8'))
+    raise FileNotFoundError(filepath)
+
+
+def json_exists(filepath: str) -> bool:
+    """True if filepath or one of its compressed (.gz / .zst) siblings exists."""
+    return any(os.path.exists(filepath + suffix) for suffix in COMPRESSION_SUFFIXES.values())
+
+
+class AsyncWriter:
+    """Runs write jobs on one background thread, in submission order.
+
+    submit() blocks once max_pending jobs are queued, so a slow disk applies
+    back-pressure instead of letting finished episodes pile up in memory.
+    An exception raised by a job is re-raised in the caller's thread on the
+    next submit(), flush() or close().
+
+    With background=False every job runs inline in submit(), which keeps a
+    single code path for the synchronous case.
+    """
+
+    def __init__(self, max_pending: int = 2, background: bool = True) -> None:
+        """
+        Args:
+            max_pending: Queue bound (jobs submitted but not yet finished).
+            background:  Run jobs on a worker thread; False runs them inline.
+        """
+        self.background = background
+        self._error: Optional[BaseException] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max(int(max_pending), 1))
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """Queue fn(*args, **kwargs) for the writer thread."""
+        self._raise_pending_error()
+        if self._closed:
+            raise RuntimeError('AsyncWriter is closed')
+        if not self.background:
+            fn(*args, **kwargs)
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='urbannav-log-writer', daemon=True)
+            self._thread.start()
+        self._queue.put((fn, args, kwargs))
+
+    def flush(self) -> None:
+        """Block until every submitted job has finished."""
+        if self._thread is not None:
+            self._queue.join()
+        self._raise_pending_error()
+
+    def close(self) -> None:
+        """Flush, then stop the writer thread.  Safe to call more than once."""
+        if self._closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self._closed = True
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                fn, args, kwargs = job
+                if self._error is None:
+                    fn(*args, **kwargs)
+            except BaseException as exc:   # surfaced on the caller's thread
+                self._error = exc
+            finally:
+                self._queue.task_done()
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            exc, self._error = self._error, None
+            raise exc
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from urbannav.metrics_collector import _UAV_FIELDS, build_step_dict
+
+# Directory (inside the episode dir) and manifest written by EpisodeStreamWriter
+STREAM_DIRNAME = 'step_history'
+INDEX_FILENAME = 'index.json'
+
+# Per-step tables stored in every chunk, and the CSR offsets key of each
+_TABLE_OFFSETS: Dict[str, str] = {
+    'nmac_pairs': 'nmac_offsets',
+    'uav_collision_pairs': 'uav_collision_offsets',
+    'ra_collision_ids': 'ra_collision_offsets',
+    'vertiports': 'vertiport_offsets',
+    'edges': 'edge_offsets',
+}
+
+
+class EpisodeStreamWriter:
+    """Append-only chunked writer for one episode's step history.
+
+    Each append() writes one chunk — the column tables produced by
+    MetricsCollector.drain() — to its own ``chunk_NNNNNN.npz`` file, then
+    rewrites ``index.json`` with the step range, row count and UAV id range
+    of every chunk written so far.  Chunks are never rewritten, so memory
+    held by the caller is bounded by the chunk size and a crashed run leaves
+    every completed chunk readable.
+
+    Layout::
+
+        episode_0_YYYY_MM_DD_HHMM/
+          step_history/
+            index.json
+            chunk_000000.npz     ← steps [0, K)
+            chunk_000001.npz     ← steps [K, 2K)
+            ...
+
+    Attributes:
+        directory: Stream directory holding the chunks and the index.
+        chunks:    Index entries written so far (see EpisodeStreamReader).
+    """
+
+    def __init__(self, directory: str, compress: bool = False) -> None:
+        """
+        Args:
+            directory: Stream directory; created if missing.  Any index
+                       already present is replaced.
+            compress:  Write chunks with np.savez_compressed (zip deflate).
+        """
+        self.directory = directory
+        self.compress = compress
+        self.chunks: List[Dict[str, Any]] = []
+        self.fields: List[str] = list(_UAV_FIELDS)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def append(self, chunk: Dict[str, np.ndarray]) -> None:
+        """Write one chunk and update the index.  Empty chunks are skipped.
+
+        Args:
+            chunk: Column tables from MetricsCollector.drain().
+        """
+        steps = chunk['step']
+        if not len(steps):
+            return
+        filename = f'chunk_{len(self.chunks):06d}.npz'
+        save = np.savez_compressed if self.compress else np.savez
+        save(os.path.join(self.directory, filename), **chunk)
+
+        uav_ids = chunk['uav_id']
+        self.chunks.append({
+            'file':       filename,
+            'first_step': int(steps[0]),
+            'last_step':  int(steps[-1]),
+            'num_steps':  len(steps),
+            'num_rows':   len(uav_ids),
+            'uav_id_min': int(uav_ids.min()) if len(uav_ids) else None,
+            'uav_id_max': int(uav_ids.max()) if len(uav_ids) else None,
+        })
+        self.fields = [name for name in _UAV_FIELDS if f'uav.{name}' in chunk]
+        self._write_index()
+
+    def _write_index(self) -> None:
+        # Write-then-rename so readers never see a half-written index
+        path = os.path.join(self.directory, INDEX_FILENAME)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'fields': self.fields, 'chunks': self.chunks}, f, indent=2)
+        os.replace(tmp, path)
+
+
+class EpisodeStreamReader:
+    """Selective reader for a chunked step history written by EpisodeStreamWriter.
+
+    Only chunks whose step range (and UAV id range) intersect the request are
+    opened, and only the requested columns are read from each chunk.
+
+    Step ranges are half-open ``(start, stop)`` on state.currentstep values;
+    either bound may be None.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Args:
+            path: Episode directory or its step_history/ stream directory.
+        """
+        if os.path.isdir(os.path.join(path, STREAM_DIRNAME)):
+            path = os.path.join(path, STREAM_DIRNAME)
+        self.directory = path
+        with open(os.path.join(path, INDEX_FILENAME)) as f:
+            index = json.load(f)
+        self.fields: List[str] = index['fields']
+        self.chunks: List[Dict[str, Any]] = index['chunks']
+
+    @property
+    def num_steps(self) -> int:
+        return sum(c['num_steps'] for c in self.chunks)
+
+    # ------------------------------------------------------------------
+    # Primary interface
+    # ------------------------------------------------------------------
+
+    def load_uav_columns(
+        self,
+        steps: Optional[Tuple[Optional[int], Optional[int]]] = None,
+        uav_ids: Optional[Sequence[int]] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Load per-UAV rows, in the MetricsCollector.get_uav_columns() layout.
+
+        Args:
+            steps:   Optional half-open (start, stop) step range.
+            uav_ids: Optional subset of UAV ids to keep.
+            fields:  Snapshot fields to load (default: all).
+
+        Returns:
+            Dict of aligned (rows,) arrays: 'step', 'uav_id' and each field.
+        """
+        fields = list(self.fields if fields is None else fields)
+        wanted = None if uav_ids is None else np.unique(np.asarray(uav_ids, dtype=np.int64))
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in ['step', 'uav_id', *fields]}
+
+        for entry in self._select_chunks(steps, wanted):
+            with np.load(os.path.join(self.directory, entry['file'])) as chunk:
+                k0, k1 = self._step_slice(chunk['step'], steps)
+                offsets = chunk['uav_offsets']
+                r0, r1 = offsets[k0], offsets[k1]
+                step_col = np.repeat(chunk['step'][k0:k1], np.diff(offsets[k0:k1 + 1]))
+                ids = chunk['uav_id'][r0:r1]
+                keep = slice(None) if wanted is None else np.isin(ids, wanted)
+                parts['step'].append(step_col[keep])
+                parts['uav_id'].append(ids[keep])
+                for name in fields:
+                    parts[name].append(chunk[f'uav.{name}'][r0:r1][keep])
+
+        empty = {'step': np.zeros(0, dtype=np.int64), 'uav_id': np.zeros(0, dtype=np.int64)}
+        return {
+            name: np.concatenate(p) if p else empty.get(name, np.zeros(0))
+            for name, p in parts.items()
+        }
+
+    def iter_steps(
+        self,
+        steps: Optional[Tuple[Optional[int], Optional[int]]] = None,
+        uav_ids: Optional[Sequence[int]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield step records in the historical step_history.json dict format.
+
+        Args:
+            steps:   Optional half-open (start, stop) step range.
+            uav_ids: Optional subset of UAV ids; restricts each record's
+                     'uavs' entry only (collisions, vertiports and edges are
+                     kept whole).
+
+        Yields:
+            One dict per step, as MetricsCollector.get_step_data() builds.
+        """
+        wanted = None if uav_ids is None else np.unique(np.asarray(uav_ids, dtype=np.int64))
+        for entry in self._select_chunks(steps, None):
+            with np.load(os.path.join(self.directory, entry['file'])) as npz:
+                chunk = {key: npz[key] for key in npz.files}
+            k0, k1 = self._step_slice(chunk['step'], steps)
+            for k in range(k0, k1):
+                yield self._step_dict(chunk, k, wanted)
+
+    def load_steps(
+        self,
+        steps: Optional[Tuple[Optional[int], Optional[int]]] = None,
+        uav_ids: Optional[Sequence[int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """List form of iter_steps()."""
+        return list(self.iter_steps(steps, uav_ids))
+
+    def iter_chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield every chunk's raw column tables (the drain() layout), in order."""
+        for entry in self.chunks:
+            with np.load(os.path.join(self.directory, entry['file'])) as npz:
+                yield {key: npz[key] for key in npz.files}
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _select_chunks(self, steps, wanted: Optional[np.ndarray]) -> List[Dict[str, Any]]:
+        start, stop = steps if steps is not None else (None, None)
+        selected = []
+        for entry in self.chunks:
+            if start is not None and entry['last_step'] < start:
+                continue
+            if stop is not None and entry['first_step'] >= stop:
+                continue
+            if wanted is not None:
+                # Skip chunks whose [uav_id_min, uav_id_max] holds none of the wanted ids
+                if entry['uav_id_min'] is None:
+                    continue
+                i = int(np.searchsorted(wanted, entry['uav_id_min']))
+                if i == len(wanted) or wanted[i] > entry['uav_id_max']:
+                    continue
+            selected.append(entry)
+        return selected
+
+    @staticmethod
+    def _step_slice(step_col: np.ndarray, steps) -> Tuple[int, int]:
+        """Index range [k0, k1) of the chunk's steps inside the requested range."""
+        start, stop = steps if steps is not None else (None, None)
+        k0 = 0 if start is None else int(np.searchsorted(step_col, start, side='left'))
+        k1 = len(step_col) if stop is None else int(np.searchsorted(step_col, stop, side='left'))
+        return k0, max(k0, k1)
+
+    def _step_dict(self, chunk: Dict[str, np.ndarray], k: int,
+                   wanted: Optional[np.ndarray]) -> Dict[str, Any]:
+        r0, r1 = chunk['uav_offsets'][k], chunk['uav_offsets'][k + 1]
+        ids = chunk['uav_id'][r0:r1]
+        keep = slice(None) if wanted is None else np.isin(ids, wanted)
+        tables = {
+            name: chunk[name][chunk[off][k]:chunk[off][k + 1]]
+            for name, off in _TABLE_OFFSETS.items()
+        }
+        return build_step_dict(
+            step=int(chunk['step'][k]),
+            actions=json.loads(str(chunk['actions'][k])),
+            uav_ids=ids[keep].tolist(),
+            uav_cols={name: chunk[f'uav.{name}'][r0:r1][keep] for name in self.fields},
+            nmac_pairs=tables['nmac_pairs'],
+            uav_collision_pairs=tables['uav_collision_pairs'],
+            ra_collision_ids=tables['ra_collision_ids'],
+            vertiport_rows=tables['vertiports'],
+            edge_rows=tables['edges'],
+        )
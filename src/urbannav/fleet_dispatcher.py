@@ -0,0 +1,151 @@
+import numpy as np
+from typing import Optional, Tuple
+
+from scipy.optimize import linear_sum_assignment
+
+from urbannav.vertiport_distances import pairwise_distances
+
+# Dispatch solvers accepted by FleetDispatcher(method=...)
+DISPATCH_METHODS = ('greedy', 'optimal')
+
+
+class FleetDispatcher:
+    """Batched repositioning of idle UAVs towards vertiports with queued trips.
+
+    Demand-mode dispatch only hands a queued trip to a UAV grounded at the
+    trip's origin vertiport.  Every `interval` steps the dispatcher looks at
+    the whole fleet at once: a vertiport's idle UAVs beyond its own queue are
+    surplus, a vertiport's queued trips beyond its idle and inbound UAVs are
+    unmet need, and surplus UAVs are sent empty to the vertiports with unmet
+    need, shortest moves first.  The trips themselves stay queued and are
+    picked up by the ordinary same-vertiport dispatch once the UAV lands.
+
+    Both solvers work on per-vertiport counts with a vertiport distance
+    matrix, so a tick costs the same for ten idle UAVs or ten thousand:
+
+        'greedy'  — repeatedly take the shortest (surplus, need) vertiport pair
+                    and move as many UAVs as both sides allow.
+        'optimal' — minimum total distance over single UAV moves
+                    (scipy linear_sum_assignment); ticks with more than
+                    OPTIMAL_MAX_UNITS moves on either side fall back to greedy.
+    """
+
+    # Largest surplus / need (in UAVs) solved exactly; the cost matrix is
+    # OPTIMAL_MAX_UNITS^2 doubles at most
+    OPTIMAL_MAX_UNITS = 2048
+
+    def __init__(self,
+                 interval: int = 10,
+                 method: str = 'greedy',
+                 max_distance: Optional[float] = None) -> None:
+        """
+        Args:
+            interval: Steps between dispatch ticks.
+            method: 'greedy' or 'optimal' (see class docstring).
+            max_distance: Longest repositioning move in metres; None = any.
+        """
+        if method not in DISPATCH_METHODS:
+            raise ValueError(f"Unknown dispatch method '{method}'. Available: {list(DISPATCH_METHODS)}")
+        if interval < 1:
+            raise ValueError(f'interval must be >= 1, got {interval}')
+        self.interval = interval
+        self.method = method
+        self.max_distance = max_distance
+        self.distance = np.zeros((0, 0))
+
+    def set_distances(self, distance: np.ndarray) -> None:
+        """Use an (n_vertiports, n_vertiports) distance matrix, rows in the
+        order of the counts passed to plan()."""
+        self.distance = np.asarray(distance, dtype=float)
+
+    def set_vertiports(self, xy: np.ndarray) -> None:
+        """Distance matrix from (n_vertiports, 2) positions."""
+        self.set_distances(pairwise_distances(xy))
+
+    def is_tick(self, step: int) -> bool:
+        return step % self.interval == 0
+
+    # ------------------------------------------------------------------
+    # Primary interface
+    # ------------------------------------------------------------------
+
+    def plan(self,
+             idle: np.ndarray,
+             queued: np.ndarray,
+             inbound: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Repositioning moves for one dispatch tick.
+
+        Args:
+            idle: (n_vertiports,) idle UAVs grounded at each vertiport.
+            queued: (n_vertiports,) queued trips at each vertiport.
+            inbound: (n_vertiports,) UAVs already repositioning to each
+                     vertiport; None = none.
+
+        Returns:
+            (src, dst, count) int arrays: move count[m] idle UAVs from
+            vertiport index src[m] to vertiport index dst[m].
+        """
+        idle = np.asarray(idle, dtype=np.int64)
+        queued = np.asarray(queued, dtype=np.int64)
+        inbound = np.zeros_like(idle) if inbound is None else np.asarray(inbound, dtype=np.int64)
+        surplus = np.maximum(idle - queued, 0)
+        need = np.maximum(queued - idle - inbound, 0)
+        src = np.flatnonzero(surplus)
+        dst = np.flatnonzero(need)
+        if len(src) == 0 or len(dst) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+
+        cost = self.distance[np.ix_(src, dst)]
+        if self.method == 'optimal' and max(surplus.sum(), need.sum()) <= self.OPTIMAL_MAX_UNITS:
+            i, j, count = self._solve_optimal(cost, surplus[src], need[dst])
+        else:
+            i, j, count = self._solve_greedy(cost, surplus[src], need[dst])
+        return src[i], dst[j], count
+
+    # ------------------------------------------------------------------
+    # Solvers — on the (surplus vertiport, need vertiport) cost block
+    # ------------------------------------------------------------------
+
+    def _solve_greedy(self, cost: np.ndarray, supply: np.ndarray,
+                      demand: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        order = np.argsort(cost, axis=None, kind='stable')
+        if self.max_distance is not None:
+            order = order[cost.ravel()[order] <= self.max_distance]
+        rows, cols = np.unravel_index(order, cost.shape)
+
+        supply, demand = supply.tolist(), demand.tolist()
+        remaining = min(sum(supply), sum(demand))
+        moves = []
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            k = min(supply[r], demand[c])
+            if k == 0:
+                continue
+            moves.append((r, c, k))
+            supply[r] -= k
+            demand[c] -= k
+            remaining -= k
+            if remaining == 0:
+                break
+        moves = np.array(moves, dtype=np.int64).reshape(-1, 3)
+        return moves[:, 0], moves[:, 1], moves[:, 2]
+
+    def _solve_optimal(self, cost: np.ndarray, supply: np.ndarray,
+                       demand: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # One row per surplus UAV, one column per unmet trip
+        rows = np.repeat(np.arange(len(supply)), supply)
+        cols = np.repeat(np.arange(len(demand)), demand)
+        unit_cost = cost[np.ix_(rows, cols)]
+        if self.max_distance is not None:
+            too_far = unit_cost > self.max_distance
+            # costlier than any set of feasible moves, so those are maximised first
+            penalty = unit_cost[~too_far].sum() + 1.0
+            unit_cost = np.where(too_far, penalty, unit_cost)
+        r, c = linear_sum_assignment(unit_cost)
+        if self.max_distance is not None:
+            keep = ~too_far[r, c]
+            r, c = r[keep], c[keep]
+
+        pairs, count = np.unique(np.stack([rows[r], cols[c]], axis=1), axis=0, return_counts=True)
+        pairs = pairs.reshape(-1, 2)
+        return pairs[:, 0], pairs[:, 1], count.astype(np.int64)
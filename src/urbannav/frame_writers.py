@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import List, Optional, Sequence
+
+import numpy as np
+from PIL import GifImagePlugin, Image
+
+
+def ffmpeg_path() -> Optional[str]:
+    """Resolved ffmpeg executable (matplotlib's animation.ffmpeg_path), or None."""
+    import matplotlib
+    return shutil.which(matplotlib.rcParams['animation.ffmpeg_path'])
+
+
+class GifStreamWriter:
+    """Incremental GIF writer: each frame is encoded and written as it arrives.
+
+    Only the bounding box of the pixels that changed since the previous
+    frame is stored, quantized to its own adaptive 256-colour palette (a
+    local colour table) and placed at its offset over the unchanged image.
+    Nothing but the previous frame is held between writes — unlike
+    PillowWriter, which keeps every frame until it finishes.
+
+    The first frame is always stored whole, so segments written with
+    header / trailer disabled in the middle of a sequence can be joined
+    byte-for-byte (concat_gif_segments) into one valid GIF.
+    """
+
+    def __init__(self, path: str, fps: int = 10, header: bool = True, trailer: bool = True) -> None:
+        """
+        Args:
+            path:    Output .gif path (truncated on the first frame).
+            fps:     Playback rate.
+            header:  Write the GIF header (False for a non-initial segment).
+            trailer: Write the GIF trailer on close (False for a non-final segment).
+        """
+        self.path = path
+        self.header = header
+        self.trailer = trailer
+        self.duration_ms = int(round(1000 / fps))
+        self.frames = 0
+        self._fp = None
+        self._previous: Optional[np.ndarray] = None
+
+    def write(self, rgba: np.ndarray) -> None:
+        """Append one (height, width, 4) uint8 RGBA frame."""
+        rgb = np.ascontiguousarray(rgba[..., :3])
+        y0, x0 = 0, 0
+        region = rgb
+        if self._previous is not None:
+            changed = np.any(rgb != self._previous, axis=2)
+            rows = np.flatnonzero(changed.any(axis=1))
+            cols = np.flatnonzero(changed.any(axis=0))
+            if len(rows):
+                y0, x0 = int(rows[0]), int(cols[0])
+                region = rgb[y0:rows[-1] + 1, x0:cols[-1] + 1]
+            else:
+                region = rgb[:1, :1]            # unchanged: 1-pixel repaint keeps the timing
+
+        frame = Image.fromarray(np.ascontiguousarray(region), 'RGB')
+        frame = frame.convert('P', palette=Image.Palette.ADAPTIVE)
+        if self._fp is None:
+            self._fp = open(self.path, 'wb')
+            if self.header:
+                header, _ = GifImagePlugin.getheader(frame, info={'loop': 0})
+                self._fp.write(b''.join(header))
+        for chunk in GifImagePlugin.getdata(frame, offset=(x0, y0), duration=self.duration_ms,
+                                            disposal=1, include_color_table=True):
+            self._fp.write(chunk)
+        self._previous = rgb.copy()
+        self.frames += 1
+
+    def close(self) -> None:
+        if self._fp is not None:
+            if self.trailer:
+                self._fp.write(b';')            # GIF trailer
+            self._fp.close()
+            self._fp = None
+        self._previous = None
+
+
+class FFmpegPipeWriter:
+    """Streams raw RGBA frames into an ffmpeg subprocess encoding an MP4.
+
+    The process is started on the first frame (its size fixes the video
+    size) and finalised by close().
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fps: int = 10,
+        bitrate: int = 5000,
+        extra_args: Sequence[str] = ('-vcodec', 'mpeg4', '-pix_fmt', 'yuv420p'),
+        title: str = 'UAM Simulation',
+        executable: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            path:       Output video path.
+            fps:        Frame rate.
+            bitrate:    Target bitrate in kbit/s.
+            extra_args: Output codec arguments.
+            title:      Container title metadata.
+            executable: ffmpeg binary; defaults to ffmpeg_path().
+        """
+        self.path = path
+        self.fps = fps
+        self.bitrate = bitrate
+        self.extra_args: List[str] = list(extra_args)
+        self.title = title
+        self.executable = executable or ffmpeg_path()
+        if self.executable is None:
+            raise RuntimeError('ffmpeg not found (set matplotlib rcParams["animation.ffmpeg_path"])')
+        self.frames = 0
+        self._proc: Optional[subprocess.Popen] = None
+
+    def write(self, rgba: np.ndarray) -> None:
+        """Append one (height, width, 4) uint8 RGBA frame."""
+        if self._proc is None:
+            height, width = rgba.shape[:2]
+            cmd = [
+                self.executable, '-y', '-loglevel', 'error',
+                '-f', 'rawvideo', '-vcodec', 'rawvideo', '-pix_fmt', 'rgba',
+                '-s', f'{width}x{height}', '-r', str(self.fps), '-i', 'pipe:',
+                *self.extra_args, '-b:v', f'{self.bitrate}k',
+                '-metadata', f'title={self.title}', self.path,
+            ]
+            self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        self._proc.stdin.write(np.ascontiguousarray(rgba).tobytes())
+        self.frames += 1
+
+    def close(self) -> None:
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        proc.stdin.close()
+        if proc.wait() != 0:
+            raise RuntimeError(f'ffmpeg exited with status {proc.returncode} writing {self.path}')
+
+
+def concat_gif_segments(paths: Sequence[str], output: str) -> None:
+    """Join GifStreamWriter segments (header only in the first, trailer only
+    in the last) into one GIF; lossless, no re-encoding."""
+    with open(output, 'wb') as out:
+        for path in paths:
+            with open(path, 'rb') as f:
+                shutil.copyfileobj(f, out)
+
+
+def concat_mp4_segments(paths: Sequence[str], output: str, executable: Optional[str] = None) -> None:
+    """Join MP4 segments with identical encoding via ffmpeg's concat demuxer
+    (stream copy; lossless, no re-encoding)."""
+    executable = executable or ffmpeg_path()
+    if executable is None:
+        raise RuntimeError('ffmpeg not found (set matplotlib rcParams["animation.ffmpeg_path"])')
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as listing:
+        for path in paths:
+            listing.write("file '{}'\n".format(os.path.abspath(path).replace("'", "'\\''")))
+    try:
+        subprocess.run(
+            [executable, '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+             '-i', listing.name, '-c', 'copy', output],
+            check=True,
+        )
+    finally:
+        os.unlink(listing.name)
@@ -0,0 +1,43 @@
+"""Append-only NumPy buffer shared by the columnar recorders.
+
+MetricsCollector keeps its per-UAV columns and pair tables in GrowBuffers,
+and the demand model keeps its structured trip log in one.  Rows are
+appended in blocks; data is a view of the filled rows.
+"""
+from typing import Optional
+
+import numpy as np
+
+
+class GrowBuffer:
+    """Append-only NumPy buffer that doubles its capacity when full."""
+
+    def __init__(self, dtype, capacity: int, width: Optional[int] = None) -> None:
+        shape = (max(capacity, 1),) if width is None else (max(capacity, 1), width)
+        self._buf = np.empty(shape, dtype=dtype)
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def data(self) -> np.ndarray:
+        return self._buf[:self._n]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._buf.dtype
+
+    def extend(self, block: np.ndarray) -> None:
+        m = len(block)
+        if self._n + m > len(self._buf):
+            new_cap = max(2 * len(self._buf), self._n + m)
+            grown = np.empty((new_cap,) + self._buf.shape[1:], dtype=self._buf.dtype)
+            grown[:self._n] = self._buf[:self._n]
+            self._buf = grown
+        self._buf[self._n:self._n + m] = block
+        self._n += m
+
+    def clear(self) -> None:
+        """Drop all rows but keep the allocated capacity."""
+        self._n = 0
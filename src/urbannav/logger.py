@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-import json
 import os
+import weakref
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
+from urbannav.collision_result import CollisionResult
 from urbannav.component_schema import LoggingConfig, SimulatorState, UAMConfig
+from urbannav.episode_catalog import EpisodeCatalog
+from urbannav.episode_io import AsyncWriter, check_compression, write_json
+from urbannav.episode_stream import STREAM_DIRNAME, EpisodeStreamReader, EpisodeStreamWriter
 from urbannav.metrics_collector import MetricsCollector, _serialize
 
 
@@ -14,7 +18,19 @@ class Logger:
 
     Wraps MetricsCollector to accumulate per-step data, computes episode-level
     summary metrics, and persists everything to JSON under a timestamped
-    directory tree.
+    directory tree.  With step_format='chunked' the step history is instead
+    streamed to disk every flush_every steps (episode_stream.EpisodeStreamWriter)
+    and only the metadata / metrics files are JSON.
+
+    Persistence runs on a background writer thread (episode_io.AsyncWriter)
+    when background_io is set: reset() hands the finished episode's collector
+    to the writer and returns immediately, so the next episode starts while
+    the previous one is encoded and written.  save() and flush() wait for
+    pending writes; close() also stops the thread.
+
+    With LoggingConfig.catalog set, every written episode is also added to
+    that SQLite episode catalog (episode_catalog.EpisodeCatalog), so episodes
+    can later be selected by config value or metric without walking log_dir.
 
     When logging is disabled via LoggingConfig (enabled=False), all record and
     save operations become no-ops so the simulation runs with zero I/O overhead.
@@ -27,6 +43,9 @@ class Logger:
             step_history.json    ← raw per-step records (positions, actions, events)
             episode_metrics.json ← aggregated episode summary
 
+    (step_format='chunked' replaces step_history.json with a step_history/
+    directory of .npz chunks; read it with EpisodeStreamReader.)
+
     Usage::
 
         logger = Logger(config)          # config: LoggingConfig from UAMConfig
@@ -38,6 +57,7 @@ class Logger:
             logger.log_step(state)
 
         logger.save()                    # flush to disk
+        logger.close()                   # wait for background writes, stop the thread
 
     Attributes:
         enabled:     Whether data collection and saving are active.
@@ -50,11 +70,36 @@ class Logger:
         cfg = config or LoggingConfig()
         self.enabled: bool = cfg.enabled
         self.log_dir: str = cfg.log_dir
+        if cfg.step_format not in ('json', 'chunked'):
+            raise ValueError(f"Unknown step_format '{cfg.step_format}'. Available: ['json', 'chunked']")
+        self.step_format: str = cfg.step_format
+        self.flush_every: int = max(int(cfg.flush_every), 1)
+        check_compression(cfg.compression)
+        self.compression: Optional[str] = cfg.compression
+        # keep_history=False: metrics only, no step history is written
+        self.keep_history: bool = cfg.keep_history
+        self.catalog: Optional[EpisodeCatalog] = (
+            EpisodeCatalog(cfg.catalog) if cfg.catalog and self.enabled else None
+        )
 
         if self.enabled:
             os.makedirs(self.log_dir, exist_ok=True)
 
-        self._metrics_collector = MetricsCollector()
+        self._writer = AsyncWriter(max_pending=cfg.max_pending_writes,
+                                   background=cfg.background_io)
+        # Drain pending writes at interpreter exit / garbage collection
+        weakref.finalize(self, self._writer.close)
+
+        self._collector_kwargs: Dict[str, Any] = dict(
+            uav_fields=cfg.uav_fields, uav_types=cfg.uav_types, uav_fraction=cfg.uav_fraction,
+            log_every=cfg.log_every, events_only=cfg.events_only,
+            log_vertiports=cfg.log_vertiports, log_edges=cfg.log_edges,
+            keep_history=cfg.keep_history,
+        )
+        self._metrics_collector = MetricsCollector(**self._collector_kwargs)
+        self._stream_writer: Optional[EpisodeStreamWriter] = None
+        # First-step snapshot, taken before any chunk is drained
+        self._start_metrics: Optional[Dict[str, Any]] = None
         self.episode_id: int = 0
         self._episode_dir: str = ''
         self._config_snapshot: Dict[str, Any] = (
@@ -80,7 +125,7 @@ class Logger:
         self,
         state: Optional[SimulatorState] = None,
         actions: Optional[Dict[int, Tuple[float, float]]] = None,
-        collisions: Optional[Tuple[Dict, Dict, Dict, Dict, Dict]] = None,
+        collisions: Optional[CollisionResult] = None,
     ) -> None:
         """Record one simulation step.
 
@@ -91,45 +136,59 @@ class Logger:
         Args:
             state:      SimulatorState snapshot for this step.
             actions:    Optional control action dict from AerBus/controller.
-            collisions: Optional 5-tuple from SimulatorManager._step_uavS().
+            collisions: Optional CollisionResult from SimulatorManager.step().
         """
         if not self.enabled or state is None:
             return
+        if self._start_metrics is None:
+            self._start_metrics = self._first_step_metrics(state)
         self._metrics_collector.record(state, actions=actions, collisions=collisions)
+        if (self.step_format == 'chunked' and self.keep_history
+                and self._metrics_collector.num_buffered_steps >= self.flush_every):
+            self._flush_chunk()
 
     # ------------------------------------------------------------------
     # Metrics access
     # ------------------------------------------------------------------
 
     def get_simulator_start_metrics(self) -> Dict[str, Any]:
-        """Return a snapshot of the very first recorded step.
+        """Return a snapshot of the very first logged step.
 
-        Uses the internal database (step history) to extract start-of-episode
-        information: initial UAV count, step index, and episode id.
+        Taken from the full fleet of the first log_step() state: initial UAV
+        count, step index, and episode id.
 
         Returns:
             Dict with episode_id, start_step, num_uavs_at_start, and
             per-UAV initial positions.
         """
-        steps = self._metrics_collector.get_step_data()
-        if not steps:
+        if self._start_metrics is None:
             return {}
-        first = steps[0]
+        return dict(self._start_metrics)
+
+    def _first_step_metrics(self, state: SimulatorState) -> Dict[str, Any]:
+        """Start-of-episode snapshot of the whole fleet in *state*.
+
+        Taken from the state itself rather than the recorded step, so
+        log_every / events_only / UAV subsampling do not thin it out.
+        """
+        uav_dict = state.atc_state or {}
         return {
             'episode_id':        self.episode_id,
-            'start_step':        first['step'],
-            'num_uavs_at_start': first['num_active_uavs'],
+            'start_step':        state.currentstep,
+            'num_uavs_at_start': len(uav_dict),
             'initial_uav_positions': {
-                uid: {'x': snap['x'], 'y': snap['y'], 'z': snap['z']} #snap aka snapshot 
-                for uid, snap in first['uavs'].items()
+                uid: {'x': float(uav.current_position.x), 'y': float(uav.current_position.y),
+                      'z': float(getattr(uav, 'pz', 0.0))}
+                for uid, uav in uav_dict.items()
             },
         }
 
     def get_simulator_end_metrics(self) -> Dict[str, Any]:
         """Compute and return end-of-episode summary metrics.
 
-        Uses the internal database (step history) to calculate aggregated
-        statistics: collisions, NMACs, missions completed, speed stats, etc.
+        The statistics (collisions, NMACs, missions completed, speed stats,
+        etc.) are maintained online by the MetricsCollector, so this is
+        cheap at any point of the episode and needs no step history.
 
         Returns:
             Dict produced by MetricsCollector.get_metrics(), plus episode_id.
@@ -148,19 +207,13 @@ class Logger:
             Ordered list of dicts, one per recorded step.
         """
         render_data = []
-        for step in self._metrics_collector.get_step_data():
+        for step in self._iter_step_data():
             render_data.append({
                 'step': step['step'],
                 'uavs': {
                     uid: {
-                        'x':       snap['x'],
-                        'y':       snap['y'],
-                        'z':       snap['z'],
-                        'heading': snap['heading'],
-                        'speed':   snap['speed'],
-                        'vx':      snap['vx'],
-                        'vy':      snap['vy'],
-                        'vz':      snap['vz'], 
+                        key: snap.get(key)
+                        for key in ('x', 'y', 'z', 'heading', 'speed', 'vx', 'vy', 'vz')
                     }
                     for uid, snap in step['uavs'].items()
                 },
@@ -179,47 +232,43 @@ class Logger:
           - step_history.json    raw per-step records
           - episode_metrics.json aggregated episode summary
 
+        With step_format='chunked', step_history.json is replaced by the
+        step_history/ chunk stream; the remaining buffered steps are flushed
+        as its last chunk.  With compression set, the JSON files get a .gz /
+        .zst suffix (read them back with episode_io.read_json).  With
+        keep_history=False no step history is written at all.
+
+        Blocks until the files are on disk, even with background_io.
         Skips writing if no steps have been recorded this episode.
         """
-        if not self.enabled:
-            return
-        steps = self._metrics_collector.get_step_data()
-        if not steps:
-            self.log('No step data to save — skipping.')
-            return
+        self._submit_episode()
+        self._writer.flush()
 
-        os.makedirs(self._episode_dir, exist_ok=True)
+    def flush(self) -> None:
+        """Block until every queued episode / chunk write has finished."""
+        self._writer.flush()
 
-        # metadata.json
-        metadata = self.get_simulator_start_metrics()
-        metadata['episode_dir'] = self._episode_dir
-        metadata['config'] = _serialize(self._config_snapshot)
-        self._write_json(os.path.join(self._episode_dir, 'metadata.json'), metadata)
-
-        # step_history.json
-        self._write_json(
-            os.path.join(self._episode_dir, 'step_history.json'),
-            _serialize(steps),
-        )
+    def close(self) -> None:
+        """Flush pending writes and stop the background writer thread.
 
-        # episode_metrics.json
-        end_metrics = self.get_simulator_end_metrics()
-        self._write_json(
-            os.path.join(self._episode_dir, 'episode_metrics.json'),
-            end_metrics,
-        )
-
-        self.log(f'Episode {self.episode_id} saved → {self._episode_dir}')
+        Does not save the current episode; call save() first if needed.
+        """
+        self._writer.close()
 
-    def reset(self) -> None:
+    def reset(self, airspace: Optional[Any] = None) -> None:
         """Save the current episode and prepare a new episode directory.
 
-        Called by UAMSimulator.reset() at the start of each episode.
+        Called by UAMSimulator.reset() at the start of each episode, with the
+        episode's airspace (edge distances come from its distance matrix).
         Persists whatever data was collected in the previous episode before
-        clearing the internal step buffer.
+        clearing the internal step buffer.  With background_io the previous
+        episode's collector is handed to the writer thread and this returns
+        without waiting for the write.
         """
-        self.save()
-        self._metrics_collector.reset()
+        self._submit_episode()
+        self._metrics_collector = MetricsCollector(**self._collector_kwargs, airspace=airspace)
+        self._stream_writer = None
+        self._start_metrics = None
         self.episode_id += 1
         self._init_episode_dir()
 
@@ -233,13 +282,83 @@ class Logger:
         dir_name = f'episode_{self.episode_id}_{ts}'
         self._episode_dir = os.path.join(self.log_dir, dir_name)
 
-    @staticmethod
-    def _write_json(filepath: str, data: Any) -> None:
-        """Serialize data to a JSON file with 2-space indentation.
+    def _flush_chunk(self) -> None:
+        """Drain the collector's buffered steps into the episode's chunk stream."""
+        if not self._metrics_collector.num_buffered_steps:
+            return
+        if self._stream_writer is None:
+            self._stream_writer = EpisodeStreamWriter(
+                os.path.join(self._episode_dir, STREAM_DIRNAME),
+                compress=self.compression is not None,
+            )
+        self._writer.submit(self._stream_writer.append, self._metrics_collector.drain())
+
+    def _submit_episode(self) -> None:
+        """Queue the current episode's files on the writer.
+
+        Everything the write needs is captured here on the caller's thread;
+        the collector itself must not be recorded into afterwards unless
+        the caller waits for the writer (save() does, reset() swaps in a
+        fresh collector).
+        """
+        if not self.enabled:
+            return
+        if not self._metrics_collector.num_steps:
+            self.log('No step data to save — skipping.')
+            return
+
+        os.makedirs(self._episode_dir, exist_ok=True)
+        metadata = self.get_simulator_start_metrics()
+        metadata['episode_dir'] = self._episode_dir
+        if self.step_format == 'chunked' and self.keep_history:
+            self._flush_chunk()
+        self._writer.submit(self._write_episode, self._metrics_collector,
+                            self._episode_dir, self.episode_id, metadata)
+
+    def _write_episode(self, collector: MetricsCollector, episode_dir: str,
+                       episode_id: int, metadata: Dict[str, Any]) -> None:
+        """Encode and write one episode's JSON files (runs on the writer thread)."""
+        # metadata.json
+        metadata['config'] = _serialize(self._config_snapshot)
+        paths = {'metadata_path': self._write_json(os.path.join(episode_dir, 'metadata.json'), metadata)}
+
+        # step_history.json (chunked episodes already streamed step_history/)
+        paths['step_history_path'] = None
+        if self.keep_history and self.step_format == 'chunked':
+            paths['step_history_path'] = os.path.join(episode_dir, STREAM_DIRNAME)
+        elif self.keep_history:
+            paths['step_history_path'] = self._write_json(
+                os.path.join(episode_dir, 'step_history.json'),
+                _serialize(collector.get_step_data()),
+            )
+
+        # episode_metrics.json
+        end_metrics = collector.get_metrics()
+        end_metrics['episode_id'] = episode_id
+        paths['metrics_path'] = self._write_json(
+            os.path.join(episode_dir, 'episode_metrics.json'), end_metrics)
+
+        if self.catalog is not None:
+            self.catalog.add_episode(episode_dir, metadata, end_metrics, paths=paths)
+
+        self.log(f'Episode {episode_id} saved → {episode_dir}')
+
+    def _iter_step_data(self):
+        """Step records of the current episode: flushed chunks first, then the buffer."""
+        if self._stream_writer is not None:
+            self._writer.flush()
+        if self._stream_writer is not None and self._stream_writer.chunks:
+            yield from EpisodeStreamReader(self._stream_writer.directory).iter_steps()
+        yield from self._metrics_collector.get_step_data()
+
+    def _write_json(self, filepath: str, data: Any) -> str:
+        """Serialize data to a JSON file (2-space indented unless compressed).
 
         Args:
-            filepath: Absolute or relative path to the output file.
+            filepath: Absolute or relative path to the output .json file.
             data:     JSON-serializable Python object.
+
+        Returns:
+            The path written (with the compression suffix, if any).
         """
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        return write_json(filepath, data, self.compression)
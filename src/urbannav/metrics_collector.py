@@ -1,11 +1,71 @@
 from __future__ import annotations
 
+import json
 import math
+from collections.abc import Sequence
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
 from urbannav.component_schema import SimulatorState
+from urbannav.grow_buffer import GrowBuffer
+from urbannav.collision_result import (
+    NMAC, RA_COLLISION, UAV_COLLISION, CollisionResult, as_collision_result,
+)
+
+# Per-UAV snapshot fields, in the order get_step_data() reproduces them.
+# Float columns store None (dist_to_goal without a mission) as NaN; the
+# remaining columns are integer (mission_complete is stored as 0/1).
+_UAV_FIELDS: Tuple[str, ...] = (
+    'x', 'y', 'z', 'speed', 'heading', 'vx', 'vy', 'vz',
+    'nmac_count', 'collision_status', 'mission_complete', 'num_missions_completed',
+    'dist_to_goal',
+)
+_UAV_FLOAT_FIELDS: Tuple[str, ...] = ('x', 'y', 'z', 'speed', 'heading', 'vx', 'vy', 'vz', 'dist_to_goal')
+_UAV_INT_FIELDS: Tuple[str, ...] = ('nmac_count', 'collision_status', 'mission_complete', 'num_missions_completed')
+# Fields OnlineMetrics reads off every selected UAV on every record() call
+_ONLINE_FIELDS: Tuple[str, ...] = ('speed', 'num_missions_completed', 'dist_to_goal')
+
+
+def _dist_to_goal(uav) -> float:
+    #TODO: remove try/except block
+    try:
+        #TODO: add this as an attr, that's updated during
+        # simulator_manager.step() -> dynamics_engine.step() ...
+        # ... -> dynamics[uav_instance].step() <update dist_2_goal> HERE
+        pos     = uav.current_position
+        end_pt  = uav.mission_end_point
+        end_z   = end_pt.z if end_pt.has_z else 0.0
+        uav_z   = getattr(uav, 'pz', 0.0)
+        return math.sqrt(
+            (pos.x - end_pt.x) ** 2 +
+            (pos.y - end_pt.y) ** 2 +
+            (uav_z - end_z)    ** 2
+        )
+    except AttributeError:
+        return math.nan
+
+
+# How record() reads each snapshot field off a UAV
+_UAV_GETTERS: Dict[str, Any] = {
+    'x':        lambda uav: uav.current_position.x,
+    'y':        lambda uav: uav.current_position.y,
+    'z':        lambda uav: getattr(uav, 'pz', 0.0),
+    'speed':    lambda uav: getattr(uav, 'current_speed', 0.0),
+    'heading':  lambda uav: getattr(uav, 'current_heading', 0.0),
+    'vx':       lambda uav: getattr(uav, 'vx', 0.0),
+    'vy':       lambda uav: getattr(uav, 'vy', 0.0),
+    'vz':       lambda uav: getattr(uav, 'vz', 0.0),
+    #TODO: fix logic for incrementing nmac_count - sensor[uav_instance].get_nmac() -> increment uav.nmac_count
+    'nmac_count':       lambda uav: getattr(uav, 'nmac_count', 0), #! sensor does not increment NMAC count
+    'collision_status': lambda uav: getattr(uav, 'collision_status', 1),
+    'mission_complete': lambda uav: bool(getattr(uav, 'current_mission_complete_status', False)),
+    'num_missions_completed': lambda uav: getattr(uav, 'num_missions_completed_in_episode', 0),
+    'dist_to_goal':     _dist_to_goal,
+}
+
+_VERTIPORT_FIELDS: Tuple[str, ...] = ('x', 'y', 'n_grounded', 'n_landing_queue', 'capacity')
+_EDGE_FIELDS: Tuple[str, ...] = ('src', 'dst', 'n_in_transit', 'progress_sum', 'edge_distance')
 
 
 class MetricsCollector:
@@ -15,17 +75,84 @@ class MetricsCollector:
     the simulator state (UAV positions, speeds, event counters) and defers all
     aggregation to _calculate_metrics() so callers only pay the cost once.
 
+    Episode metrics are maintained online (OnlineMetrics, O(active UAVs) per
+    record() call), so get_metrics() is available at any time and does not
+    depend on the retained history; with keep_history=False only the latest
+    step is kept in memory.
+
+    Storage is columnar: every per-UAV field is a chunk-grown NumPy column
+    with one row per (step, UAV), and each UAV id is mapped to a dense slot.
+    Per-step row ranges are CSR offsets.  Collisions are stored as pair
+    arrays, vertiport and edge snapshots as fixed-width row tables.
+    get_step_data() rebuilds the historical list-of-dicts format lazily.
+
+    For streaming, drain() hands the buffered steps out as a chunk of column
+    tables (see episode_stream.EpisodeStreamWriter) and empties the buffers.
+
+    What gets recorded is configurable (see LoggingConfig): only the
+    selected uav_fields get a column and are read off the UAVs, a UAV subset
+    can be chosen by type and/or a stable fraction of ids, the vertiport and
+    edge tables can be switched off, steps can be decimated (log_every), and
+    events_only keeps just the steps with an NMAC, collision or landing,
+    restricted to the UAVs involved.  Episode metrics cover every record()
+    call and every UAV passing the uav_types / uav_fraction filter, however
+    the steps and fields are decimated.
+
     Attributes:
-        _steps: Ordered list of per-step records appended by record().
+        _uav_cols: field name -> GrowBuffer column, one row per (step, UAV).
+        _uav_slot: dense UAV slot of each row; _slot_ids maps slot -> uav_id.
+        _step_numbers: state.currentstep of each recorded step.
     """
 
-    def __init__(self) -> None:
-        self._steps: List[Dict[str, Any]] = []
-        # Tracks each UAV's mission_complete status as of the previous record()
-        # call, so a new mission assigned mid-episode (which resets
-        # current_mission_complete_status back to False) doesn't get missed -
-        # only a False->True transition counts as a completed mission.
-        self._prev_mission_status: Dict[int, bool] = {}
+    def __init__(
+        self,
+        initial_rows: int = 4096,
+        uav_fields: Optional[Sequence[str]] = None,
+        uav_types: Optional[Sequence[str]] = None,
+        uav_fraction: float = 1.0,
+        log_every: int = 1,
+        events_only: bool = False,
+        log_vertiports: bool = True,
+        log_edges: bool = True,
+        keep_history: bool = True,
+        airspace: Optional[Any] = None,
+    ) -> None:
+        """
+        Args:
+            initial_rows: Initial capacity of the per-UAV row columns.  Columns
+                          double when full; size this to steps x fleet to
+                          avoid regrowth on long episodes.
+            uav_fields:   Snapshot fields to record (default: all of _UAV_FIELDS).
+            uav_types:    Only record UAVs whose type_name is listed (default: all).
+            uav_fraction: Record this fraction of UAV ids (stable per id).
+            log_every:    Record every log_every-th record() call.
+            events_only:  Record only steps with an NMAC, UAV/RA collision or
+                          landing, and only the UAVs involved (overrides log_every).
+            log_vertiports: Record the per-step vertiport table.
+            log_edges:      Record the per-step OD edge table.
+            keep_history:   Retain every recorded step.  If False only the
+                            latest step is kept (metrics stay complete).
+            airspace:       Airspace of the episode; edge distances are then
+                            looked up in airspace.vertiport_distances instead
+                            of computed from the vertiport positions.
+        """
+        fields = _UAV_FIELDS if uav_fields is None else tuple(uav_fields)
+        unknown = set(fields) - set(_UAV_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown uav_fields {sorted(unknown)}. Available: {list(_UAV_FIELDS)}")
+        if log_every < 1:
+            raise ValueError(f"log_every must be >= 1, got {log_every}")
+        self._initial_rows = initial_rows
+        self.uav_fields: Tuple[str, ...] = tuple(name for name in _UAV_FIELDS if name in fields)
+        self.uav_types = None if uav_types is None else set(uav_types)
+        self.uav_fraction = uav_fraction
+        self.log_every = log_every
+        self.events_only = events_only
+        self.log_vertiports = log_vertiports
+        self.log_edges = log_edges
+        self.keep_history = keep_history
+        self.airspace = airspace
+        self.reset()
 
     # ------------------------------------------------------------------
     # Primary interface
@@ -35,9 +162,9 @@ class MetricsCollector:
         self,
         state: SimulatorState,
         actions: Optional[Dict[int, Tuple[float, float]]] = None,
-        collisions: Optional[Tuple[Dict, Dict, Dict, Dict, Dict]] = None,
+        collisions: Optional[CollisionResult] = None,
     ) -> None:
-        """Append one step record to the internal buffer.
+        """Append one step record to the internal columns.
 
         Args:
             state:      SimulatorState snapshot for this step.  Provides
@@ -45,32 +172,20 @@ class MetricsCollector:
                         airspace_state (List[Vertiport]).
             actions:    Optional Dict[uav_id, (ax, ay) | (accel, yaw_rate)]
                         from the controller/AerBus for this step.
-            collisions: Optional 5-tuple returned by SimulatorManager._step_uavS():
-                        (ra_detect, uav_detect, nmac_dict,
-                         ra_collision_dict, uav_collision_dict).
+            collisions: Optional CollisionResult returned by SimulatorManager.step()
+                        (a legacy 5-tuple of dicts (ra_detect, uav_detect,
+                        nmac, ra_collision, uav_collision) is also accepted).
         """
         uav_dict: Dict = state.atc_state or {}
+        vertiport_list = state.airspace_state or []
 
-        # --- UAV snapshots ---
-        uav_snapshots: Dict[int, Dict[str, Any]] = {}
+        # --- Mission bookkeeping: every UAV, every call (recorded or not) ---
+        selected: List[Tuple[int, int, Any]] = []       # (uav_id, slot, uav)
+        landed: List[int] = []
         for uav_id, uav in uav_dict.items():
-            pos = uav.current_position
-            
-            #TODO: remove try/except block
-            try:
-                #TODO: add this as an attr, that's updated during
-                # simulator_manager.step() -> dynamics_engine.step() ...
-                # ... -> dynamics[uav_instance].step() <update dist_2_goal> HERE
-                end_pt  = uav.mission_end_point
-                end_z   = end_pt.z if end_pt.has_z else 0.0
-                uav_z   = getattr(uav, 'pz', 0.0)
-                dist_to_goal = math.sqrt(
-                    (pos.x - end_pt.x) ** 2 +
-                    (pos.y - end_pt.y) ** 2 +
-                    (uav_z - end_z)    ** 2
-                )
-            except AttributeError:
-                dist_to_goal = None
+            slot = self._slot_of.get(uav_id)
+            if slot is None:
+                slot = self._add_slot(uav_id, uav)
 
             # Count a mission as completed on the False->True transition of
             # current_mission_complete_status, rather than just sampling the
@@ -79,130 +194,323 @@ class MetricsCollector:
             # (assign_start_end() resets current_mission_complete_status to
             # False) would only ever show its latest mission's status, losing
             # every mission completed earlier in the episode.
-            curr_mission_complete = getattr(uav, 'current_mission_complete_status', False)
-            prev_mission_complete = self._prev_mission_status.get(uav_id, False)
-            if curr_mission_complete and not prev_mission_complete:
+            curr_mission_complete = bool(getattr(uav, 'current_mission_complete_status', False))
+            if curr_mission_complete and not self._prev_mission_status[slot]:
                 uav.num_missions_completed_in_episode = (
                     getattr(uav, 'num_missions_completed_in_episode', 0) + 1
                 )
-            self._prev_mission_status[uav_id] = curr_mission_complete
-
-            uav_snapshots[uav_id] = {
-                'x':               pos.x,
-                'y':               pos.y,
-                'z':               getattr(uav, 'pz', 0.0),
-                'speed':           getattr(uav, 'current_speed', 0.0),
-                'heading':         getattr(uav, 'current_heading', 0.0),
-                'vx':              getattr(uav, 'vx', 0.0),
-                'vy':              getattr(uav, 'vy', 0.0),
-                'vz':              getattr(uav, 'vz', 0.0),
-                #TODO: fix logic for incrementing nmac_count - sensor[uav_instance].get_nmac() -> increment uav.nmac_count
-                'nmac_count':      getattr(uav, 'nmac_count', 0), #! sensor does not increment NMAC count
-                'collision_status': getattr(uav, 'collision_status', 1),
-                'mission_complete': curr_mission_complete,
-                'num_missions_completed': getattr(uav, 'num_missions_completed_in_episode', 0),
-                'dist_to_goal':    dist_to_goal,
-            }
-
-        # --- Collision/NMAC summary ---
-        collision_summary: Dict[str, Any] = {
-            'nmac_pairs':          [],
-            'uav_collision_pairs': [],
-            'ra_collision_ids':    [],
+                landed.append(uav_id)
+            self._prev_mission_status[slot] = curr_mission_complete
+            if self._slot_selected[slot]:
+                selected.append((uav_id, slot, uav))
+
+        # --- Online episode metrics: every call, before decimation ---
+        # Read straight off the UAVs so the totals do not depend on
+        # log_every / events_only or on which uav_fields are recorded.
+        collisions = as_collision_result(collisions)
+        if collisions is not None:
+            nmac_pairs = collisions.unique_pairs(NMAC)
+            uav_collision_pairs = collisions.unique_pairs(UAV_COLLISION)
+            ra_collision_ids = collisions.uavs_with(RA_COLLISION)
+        else:
+            nmac_pairs = uav_collision_pairs = np.zeros((0, 2), dtype=np.int64)
+            ra_collision_ids = np.zeros(0, dtype=np.int64)
+        slots = np.fromiter((slot for _, slot, _ in selected), np.int64, len(selected))
+        online_cols = {
+            name: np.fromiter((_UAV_GETTERS[name](uav) for _, _, uav in selected),
+                              float if name in _UAV_FLOAT_FIELDS else np.int64, len(selected))
+            for name in _ONLINE_FIELDS
         }
+        self._metrics.update(
+            slots=slots,
+            speeds=online_cols['speed'],
+            missions=online_cols['num_missions_completed'],
+            dists=online_cols['dist_to_goal'],
+            num_nmac=len(nmac_pairs),
+            num_uav_collision=len(uav_collision_pairs),
+            num_ra_collision=len(ra_collision_ids),
+        )
+
+        # --- Decimation / event filter ---
+        self._num_calls += 1
+        rows = np.arange(len(selected))
+        if self.events_only:
+            involved = set(landed)
+            involved.update(nmac_pairs.ravel().tolist())
+            involved.update(uav_collision_pairs.ravel().tolist())
+            involved.update(ra_collision_ids.tolist())
+            if not involved:
+                return
+            rows = np.flatnonzero([entry[0] in involved for entry in selected])
+            selected = [selected[k] for k in rows.tolist()]
+        elif (self._num_calls - 1) % self.log_every:
+            return
+        if not self.keep_history:
+            self._clear_buffers()
+
+        # --- UAV snapshots (one row each, selected fields only) ---
+        uavs = [uav for _, _, uav in selected]
+        self._uav_slot.extend(slots[rows])
+        for name in self.uav_fields:
+            buf = self._uav_cols[name]
+            if name in online_cols:
+                buf.extend(online_cols[name][rows])
+            else:
+                getter = _UAV_GETTERS[name]
+                buf.extend(np.fromiter((getter(uav) for uav in uavs), buf.dtype, len(uavs)))
+
+        # --- Collision/NMAC summary (pair arrays) ---
         if collisions is not None:
-            _, _, nmac_dict, ra_collision_dict, uav_collision_dict = collisions
-
-            # NMACs: nmac_dict = { uav_id -> [partner_ids] }
-            seen_nmac: set = set()
-            for uid, partners in (nmac_dict or {}).items():
-                for pid in (partners or []):
-                    pair = tuple(sorted((uid, pid)))
-                    if pair not in seen_nmac:
-                        seen_nmac.add(pair)
-                        collision_summary['nmac_pairs'].append(list(pair))
-
-            # UAV-UAV collisions
-            seen_col: set = set()
-            for uid, partners in (uav_collision_dict or {}).items():
-                for pid in (partners or []):
-                    pair = tuple(sorted((uid, pid)))
-                    if pair not in seen_col:
-                        seen_col.add(pair)
-                        collision_summary['uav_collision_pairs'].append(list(pair))
-
-            # Restricted-area collisions
-            for uid, ra_ids in (ra_collision_dict or {}).items():
-                if ra_ids:
-                    collision_summary['ra_collision_ids'].append(uid)
+            self._nmac_pairs.extend(nmac_pairs)
+            self._uav_collision_pairs.extend(uav_collision_pairs)
+            # Restricted-area collisions: ids of UAVs touching any RA
+            self._ra_collision_ids.extend(ra_collision_ids)
 
         # --- Vertiport snapshots (graph-level surrogate data) ---
-        vertiport_snapshots: Dict[int, Dict[str, Any]] = {}
-        vertiport_list = state.airspace_state or []
-        for vp_idx, vp in enumerate(vertiport_list):
-            vertiport_snapshots[vp_idx] = {
-                'x': vp.location.x,
-                'y': vp.location.y,
-                'n_grounded': len(vp.uav_id_list),
-                'n_landing_queue': len(vp.landing_queue),
-                'capacity': vp.landing_takeoff_capacity,
-            }
-
-        # --- Edge snapshots: count in-flight UAVs per OD vertiport pair ---
-        edge_snapshots: Dict[str, Dict[str, Any]] = {}
-        vp_id_to_idx: Dict[int, int] = {id(vp): idx for idx, vp in enumerate(vertiport_list)}
-        for uav_id, uav in uav_dict.items():
-            if not getattr(uav, 'uav_in_flight', False):
-                continue
-            src_vp = getattr(uav, 'start_vertiport', None)
-            dst_vp = getattr(uav, 'end_vertiport', None)
-            if src_vp is None or dst_vp is None:
-                continue
-            src_idx = vp_id_to_idx.get(id(src_vp))
-            dst_idx = vp_id_to_idx.get(id(dst_vp))
-            if src_idx is None or dst_idx is None:
-                continue
-            edge_key = f"{src_idx}->{dst_idx}"
-            if edge_key not in edge_snapshots:
-                total_dist = src_vp.location.distance(dst_vp.location)
-                edge_snapshots[edge_key] = {
-                    'src': src_idx,
-                    'dst': dst_idx,
-                    'n_in_transit': 0,
-                    'progress_sum': 0.0,
-                    'edge_distance': total_dist,
-                }
-            entry = edge_snapshots[edge_key]
-            entry['n_in_transit'] += 1
-            total_dist = entry['edge_distance']
-            if total_dist > 0:
-                covered = uav.current_position.distance(src_vp.location)
-                entry['progress_sum'] += min(covered / total_dist, 1.0)
-
-        step_record: Dict[str, Any] = {
-            'step':            state.currentstep,
-            'num_active_uavs': len(uav_dict),
-            'uavs':            uav_snapshots,
-            'actions':         _serialize(actions or {}),
-            'collisions':      collision_summary,
-            'vertiports':      vertiport_snapshots,
-            'edges':           edge_snapshots,
-        }
-        self._steps.append(step_record)
+        if self.log_vertiports or self.log_edges:
+            vp_table = np.array([
+                (vp.location.x, vp.location.y, len(vp.uav_id_list),
+                 len(vp.landing_queue), vp.landing_takeoff_capacity)
+                for vp in vertiport_list
+            ], dtype=float).reshape(len(vertiport_list), len(_VERTIPORT_FIELDS))
+            if self.log_vertiports:
+                self._vertiport_rows.extend(vp_table)
+
+        # --- Edge snapshots: count in-flight UAVs (whole fleet) per OD vertiport pair ---
+        if self.log_edges:
+            vp_id_to_idx: Dict[int, int] = {id(vp): idx for idx, vp in enumerate(vertiport_list)}
+            edge_xy: List[Tuple[float, float]] = []
+            edge_src: List[int] = []
+            edge_dst: List[int] = []
+            for uav in uav_dict.values():
+                if not getattr(uav, 'uav_in_flight', False):
+                    continue
+                src_idx = vp_id_to_idx.get(id(getattr(uav, 'start_vertiport', None)))
+                dst_idx = vp_id_to_idx.get(id(getattr(uav, 'end_vertiport', None)))
+                if src_idx is not None and dst_idx is not None:
+                    edge_xy.append((uav.current_position.x, uav.current_position.y))
+                    edge_src.append(src_idx)
+                    edge_dst.append(dst_idx)
+            distances = getattr(self.airspace, 'vertiport_distances', None)
+            vp_dense = distances.indices(vertiport_list) if distances is not None and edge_xy else None
+            self._edge_rows.extend(self._edge_table(
+                vp_table, edge_xy, edge_src, edge_dst,
+                distance=None if vp_dense is None else distances.distance, vp_dense=vp_dense,
+            ))
+
+        self._step_numbers.append(state.currentstep)
+        self._actions.append(_serialize(actions or {}))
+        self._close_step()
 
     def reset(self) -> None:
         """Clear all accumulated step data for a new episode."""
-        self._steps = []
-        self._prev_mission_status = {}
+        rows = self._initial_rows
+        self._slot_of: Dict[int, int] = {}
+        self._slot_ids: List[int] = []
+        # Tracks each UAV's mission_complete status as of the previous record()
+        # call, so a new mission assigned mid-episode (which resets
+        # current_mission_complete_status back to False) doesn't get missed -
+        # only a False->True transition counts as a completed mission.
+        self._prev_mission_status = np.zeros(64, dtype=bool)
+        # Whether each slot's UAV passes the uav_types / uav_fraction filter
+        self._slot_selected = np.zeros(64, dtype=bool)
+        self._num_calls = 0
+
+        self._metrics = OnlineMetrics()
+
+        self._uav_slot = GrowBuffer(np.int64, rows)
+        self._uav_cols: Dict[str, GrowBuffer] = {
+            name: GrowBuffer(float if name in _UAV_FLOAT_FIELDS else np.int64, rows)
+            for name in self.uav_fields
+        }
+        self._nmac_pairs = GrowBuffer(np.int64, 256, width=2)
+        self._uav_collision_pairs = GrowBuffer(np.int64, 256, width=2)
+        self._ra_collision_ids = GrowBuffer(np.int64, 256)
+        self._vertiport_rows = GrowBuffer(float, 256, width=len(_VERTIPORT_FIELDS))
+        self._edge_rows = GrowBuffer(float, 256, width=len(_EDGE_FIELDS))
+
+        self._step_numbers: List[int] = []
+        self._actions: List[Any] = []
+        # CSR offsets into each table: step k owns rows [off[k], off[k + 1])
+        self._offsets: Dict[str, List[int]] = {
+            'uav': [0], 'nmac': [0], 'uav_collision': [0], 'ra_collision': [0],
+            'vertiport': [0], 'edge': [0],
+        }
+
+    def drain(self) -> Dict[str, np.ndarray]:
+        """Hand out every buffered step as a chunk of column tables and clear the buffers.
+
+        The drained steps still count towards get_metrics() (which is
+        maintained online); they are no longer available through
+        get_step_data() or get_uav_columns().
+
+        Returns:
+            Dict of arrays (empty tables if nothing is buffered):
+              step (n,), actions (n,) JSON strings,
+              <table>_offsets (n + 1,) CSR row offsets for each table in
+                uav, nmac, uav_collision, ra_collision, vertiport, edge,
+              uav_id (rows,) and uav.<field> (rows,) per snapshot field,
+              nmac_pairs / uav_collision_pairs (M, 2), ra_collision_ids (M,),
+              vertiports (V, 5) and edges (E, 5) in _VERTIPORT_FIELDS /
+              _EDGE_FIELDS column order.
+        """
+        cols = self.get_uav_columns()
+        chunk: Dict[str, np.ndarray] = {
+            'step': np.asarray(self._step_numbers, dtype=np.int64),
+            'actions': np.array([json.dumps(a) for a in self._actions], dtype=str),
+            'uav_id': cols['uav_id'].copy(),
+            'nmac_pairs': self._nmac_pairs.data.copy(),
+            'uav_collision_pairs': self._uav_collision_pairs.data.copy(),
+            'ra_collision_ids': self._ra_collision_ids.data.copy(),
+            'vertiports': self._vertiport_rows.data.copy(),
+            'edges': self._edge_rows.data.copy(),
+        }
+        chunk.update({f'uav.{name}': cols[name].copy() for name in self.uav_fields})
+        chunk.update({f'{key}_offsets': np.asarray(off, dtype=np.int64)
+                      for key, off in self._offsets.items()})
+        self._clear_buffers()
+        return chunk
+
+    def _clear_buffers(self) -> None:
+        """Empty every per-step table (capacity is kept)."""
+        self._uav_slot.clear()
+        for buf in (*self._uav_cols.values(), self._nmac_pairs, self._uav_collision_pairs,
+                    self._ra_collision_ids, self._vertiport_rows, self._edge_rows):
+            buf.clear()
+        self._step_numbers = []
+        self._actions = []
+        self._offsets = {key: [0] for key in self._offsets}
+
+    @property
+    def num_steps(self) -> int:
+        """Steps passed to record() this episode, recorded or decimated."""
+        return self._metrics.num_steps
+
+    @property
+    def num_buffered_steps(self) -> int:
+        """Steps held in memory since the last drain()."""
+        return len(self._step_numbers)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _add_slot(self, uav_id: int, uav: Any) -> int:
+        slot = len(self._slot_ids)
+        self._slot_of[uav_id] = slot
+        self._slot_ids.append(uav_id)
+        if slot >= len(self._prev_mission_status):
+            capacity = 2 * len(self._prev_mission_status)
+            for name in ('_prev_mission_status', '_slot_selected'):
+                grown = np.zeros(capacity, dtype=bool)
+                grown[:slot] = getattr(self, name)[:slot]
+                setattr(self, name, grown)
+        self._slot_selected[slot] = self._is_selected(uav_id, uav)
+        return slot
+
+    def _is_selected(self, uav_id: int, uav: Any) -> bool:
+        """uav_types / uav_fraction filter; the fraction test hashes the id so it is stable."""
+        if self.uav_types is not None and getattr(uav, 'type_name', None) not in self.uav_types:
+            return False
+        if self.uav_fraction >= 1.0:
+            return True
+        return ((int(uav_id) * 2654435761) & 0xFFFFFFFF) / 2.0 ** 32 < self.uav_fraction
+
+    def _close_step(self) -> None:
+        off = self._offsets
+        off['uav'].append(len(self._uav_slot))
+        off['nmac'].append(len(self._nmac_pairs))
+        off['uav_collision'].append(len(self._uav_collision_pairs))
+        off['ra_collision'].append(len(self._ra_collision_ids))
+        off['vertiport'].append(len(self._vertiport_rows))
+        off['edge'].append(len(self._edge_rows))
+
+    @staticmethod
+    def _edge_table(vp_table: np.ndarray, uav_xy: List[Tuple[float, float]],
+                    src: List[int], dst: List[int],
+                    distance: Optional[np.ndarray] = None,
+                    vp_dense: Optional[np.ndarray] = None) -> np.ndarray:
+        """Aggregate in-flight UAVs into one row per OD pair, in first-seen order.
+
+        Edge lengths are looked up as distance[vp_dense[src], vp_dense[dst]]
+        when an airspace distance matrix is given, else computed from vp_table.
+        """
+        if not uav_xy:
+            return np.zeros((0, len(_EDGE_FIELDS)))
+        src_a = np.array(src, dtype=np.int64)
+        dst_a = np.array(dst, dtype=np.int64)
+        codes = src_a * len(vp_table) + dst_a
+        uniq, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+        order = np.argsort(first)            # dict insertion order of the old format
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        edge_of_uav = rank[inverse]
+
+        e_src, e_dst = src_a[first[order]], dst_a[first[order]]
+        vp_xy = vp_table[:, :2]
+        if distance is not None:
+            edge_distance = distance[vp_dense[e_src], vp_dense[e_dst]]
+        else:
+            edge_distance = np.sqrt(((vp_xy[e_dst] - vp_xy[e_src]) ** 2).sum(axis=1))
+
+        uav_xy = np.asarray(uav_xy, dtype=float)
+        covered = np.sqrt(((uav_xy - vp_xy[src_a]) ** 2).sum(axis=1))
+        total = edge_distance[edge_of_uav]
+        progress = np.where(total > 0, np.minimum(covered / np.where(total > 0, total, 1.0), 1.0), 0.0)
+
+        table = np.empty((len(uniq), len(_EDGE_FIELDS)))
+        table[:, 0] = e_src
+        table[:, 1] = e_dst
+        table[:, 2] = np.bincount(edge_of_uav, minlength=len(uniq))
+        table[:, 3] = np.bincount(edge_of_uav, weights=progress, minlength=len(uniq))
+        table[:, 4] = edge_distance
+        return table
+
+    def _step_dict(self, k: int) -> Dict[str, Any]:
+        """Rebuild step k in the historical dict format (see get_step_data)."""
+        off = self._offsets
+        r0, r1 = off['uav'][k], off['uav'][k + 1]
+
+        def _rows(buf: GrowBuffer, key: str) -> np.ndarray:
+            return buf.data[off[key][k]:off[key][k + 1]]
+
+        return build_step_dict(
+            step=self._step_numbers[k],
+            actions=self._actions[k],
+            uav_ids=[self._slot_ids[s] for s in self._uav_slot.data[r0:r1].tolist()],
+            uav_cols={name: buf.data[r0:r1] for name, buf in self._uav_cols.items()},
+            nmac_pairs=_rows(self._nmac_pairs, 'nmac'),
+            uav_collision_pairs=_rows(self._uav_collision_pairs, 'uav_collision'),
+            ra_collision_ids=_rows(self._ra_collision_ids, 'ra_collision'),
+            vertiport_rows=_rows(self._vertiport_rows, 'vertiport'),
+            edge_rows=_rows(self._edge_rows, 'edge'),
+        )
+
+    def _column(self, name: str, dtype=float) -> np.ndarray:
+        """Recorded column, or zeros / NaN (dist_to_goal) if the field is not selected."""
+        if name in self._uav_cols:
+            return self._uav_cols[name].data
+        fill = math.nan if name == 'dist_to_goal' else 0
+        return np.full(len(self._uav_slot), fill, dtype=dtype)
+
+    def _last_rows_per_slot(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(slots, row of each slot's last buffered snapshot)."""
+        row_slot = self._uav_slot.data
+        slots, last_from_end = np.unique(row_slot[::-1], return_index=True)
+        return slots, len(row_slot) - 1 - last_from_end
 
     # ------------------------------------------------------------------
     # Metrics
     # ------------------------------------------------------------------
 
     def _calculate_metrics(self) -> Dict[str, Any]:
-        """Aggregate _steps into an episode-level metrics dictionary.
+        """Reduce the buffered columns into an episode-level metrics dictionary.
 
-        Returns an empty dict if no steps have been recorded.
+        This is the batch counterpart of OnlineMetrics and covers only the
+        steps still held in memory — the whole episode when history is kept,
+        nothing was drained or decimated and every field is recorded, in
+        which case it matches get_metrics().
+        Returns an empty dict if no steps are buffered.
 
         Returns:
             Dict with keys:
@@ -211,58 +519,42 @@ class MetricsCollector:
               avg_speed, min_speed, max_speed,
               avg_dist_to_goal_final, peak_active_uavs.
         """
-        if not self._steps:
+        n_steps = len(self._step_numbers)
+        if not n_steps:
             return {}
 
-        total_nmac_events      = sum(len(s['collisions']['nmac_pairs'])          for s in self._steps)
-        total_uav_col_events   = sum(len(s['collisions']['uav_collision_pairs'])  for s in self._steps)
-        total_ra_col_events    = sum(len(s['collisions']['ra_collision_ids'])     for s in self._steps)
-        peak_active_uavs       = max(s['num_active_uavs'] for s in self._steps)
-
-        # Aggregate per-UAV data across all steps
-        all_uav_ids: set = set()
-        for s in self._steps:
-            all_uav_ids.update(s['uavs'].keys())
+        uav_offsets = np.asarray(self._offsets['uav'])
+        has_speed = 'speed' in self._uav_cols
+        speeds = self._column('speed')
 
         # Missions completed per UAV (num_missions_completed is a running
         # count maintained on the UAV by record(), incremented on every
         # False→True transition of mission_complete - so taking each UAV's
-        # own last snapshot already reflects every mission it completed
-        # during the episode, not just its latest one).
-        mission_counts: List[int] = []
-        all_speeds: List[float] = []
+        # own last row already reflects every mission it completed during
+        # the episode, not just its latest one).
+        seen_slots, last_rows = self._last_rows_per_slot()
+        mission_counts = self._column('num_missions_completed', np.int64)[last_rows]
 
         # Final-step distance-to-goal per UAV
-        final_dists: List[float] = []
-        last_step = self._steps[-1]
-
-        for uav_id in all_uav_ids:
-            uav_step_snapshots = [
-                s['uavs'][uav_id] for s in self._steps if uav_id in s['uavs']
-            ]
-            if uav_step_snapshots:
-                mission_counts.append(uav_step_snapshots[-1]['num_missions_completed'])
-                all_speeds.extend(snap['speed'] for snap in uav_step_snapshots)
-
-            if uav_id in last_step['uavs']:
-                dist = last_step['uavs'][uav_id]['dist_to_goal']
-                if dist is not None:
-                    final_dists.append(dist)
-
-        avg_missions_completed = float(np.mean(mission_counts)) if mission_counts else 0.0
-        avg_speed = float(np.mean(all_speeds)) if all_speeds else 0.0
-        min_speed = float(np.min(all_speeds))  if all_speeds else 0.0
-        max_speed = float(np.max(all_speeds))  if all_speeds else 0.0
-        avg_dist_to_goal_final = float(np.mean(final_dists)) if final_dists else 0.0
+        final_dists = self._column('dist_to_goal')[uav_offsets[-2]:uav_offsets[-1]]
+        final_dists = final_dists[~np.isnan(final_dists)]
+
+        speed_count = len(speeds) if has_speed else 0
+
+        avg_missions_completed = float(np.mean(mission_counts)) if len(mission_counts) else 0.0
+        avg_speed = float(np.mean(speeds)) if speed_count else 0.0
+        min_speed = float(np.min(speeds))  if speed_count else 0.0
+        max_speed = float(np.max(speeds))  if speed_count else 0.0
+        avg_dist_to_goal_final = float(np.mean(final_dists)) if len(final_dists) else 0.0
 
         return {
-            'total_steps':              len(self._steps),
-            'total_nmac_events':        total_nmac_events,
-            'total_uav_collision_events': total_uav_col_events,
-            'total_ra_collision_events':  total_ra_col_events,
-            'unique_uavs':              len(all_uav_ids),
+            'total_steps':              n_steps,
+            'total_nmac_events':        len(self._nmac_pairs),
+            'total_uav_collision_events': len(self._uav_collision_pairs),
+            'total_ra_collision_events':  len(self._ra_collision_ids),
+            'unique_uavs':              len(seen_slots),
             'avg_missions_completed':   avg_missions_completed,
-            'peak_active_uavs':         peak_active_uavs,
+            'peak_active_uavs':         int(np.diff(uav_offsets).max()),
             'avg_speed':                avg_speed,
             'min_speed':                min_speed,
             'max_speed':                max_speed,
@@ -272,24 +564,222 @@ class MetricsCollector:
     def get_metrics(self) -> Dict[str, Any]:
         """Return the episode-level summary metrics dict.
 
+        Maintained online, so it covers every recorded step regardless of
+        drain() or keep_history.
+
+        Returns:
+            Dict with the keys documented in _calculate_metrics().
+        """
+        return self._metrics.result()
+
+    def get_step_data(self) -> 'StepHistoryView':
+        """Return the per-step records as a lazy, read-only sequence.
+
+        Each element is built on access in the historical record() format:
+        {'step', 'num_active_uavs', 'uavs', 'actions', 'collisions',
+        'vertiports', 'edges'}.  Indexing, slicing, len() and iteration work
+        as on the former list.
+
         Returns:
-            Dict produced by _calculate_metrics().
+            StepHistoryView over the recorded steps.
         """
-        return self._calculate_metrics()
+        return StepHistoryView(self)
 
-    def get_step_data(self) -> List[Dict[str, Any]]:
-        """Return the raw per-step records list.
+    def get_uav_columns(self) -> Dict[str, np.ndarray]:
+        """Return the per-UAV columns directly (no per-step dict building).
 
         Returns:
-            Ordered list of step record dicts appended by record().
+            Dict of aligned (rows,) arrays: 'step' (state.currentstep),
+            'uav_id', and one array per snapshot field.  dist_to_goal is NaN
+            where the UAV had no mission.  Arrays are views — copy before
+            mutating.
         """
-        return self._steps
+        counts = np.diff(np.asarray(self._offsets['uav']))
+        columns = {
+            'step': np.repeat(np.asarray(self._step_numbers, dtype=np.int64), counts),
+            'uav_id': np.asarray(self._slot_ids, dtype=np.int64)[self._uav_slot.data],
+        }
+        columns.update({name: buf.data for name, buf in self._uav_cols.items()})
+        return columns
+
+
+class OnlineMetrics:
+    """Running episode metrics, updated on every MetricsCollector.record() call.
+
+    Each update() costs O(rows in the step): counters, speed sum/min/max,
+    peak fleet size, and a per-slot array holding each UAV's latest
+    num_missions_completed.  When every step and field is recorded, result()
+    matches MetricsCollector._calculate_metrics() without needing the step
+    history.
+    """
+
+    def __init__(self) -> None:
+        self.num_steps = 0
+        self.num_nmac = 0
+        self.num_uav_collision = 0
+        self.num_ra_collision = 0
+        self.peak_active = 0
+        self.speed_total = 0.0
+        self.speed_count = 0
+        self.speed_min = math.inf
+        self.speed_max = -math.inf
+        self.final_dists = np.zeros(0)
+        self._missions = np.zeros(64, dtype=np.int64)
+        self._seen = np.zeros(64, dtype=bool)
+
+    def update(self, slots: np.ndarray, speeds: Optional[np.ndarray],
+               missions: Optional[np.ndarray], dists: Optional[np.ndarray],
+               num_nmac: int, num_uav_collision: int, num_ra_collision: int) -> None:
+        """Fold one step into the totals.
+
+        Args:
+            slots:    (rows,) dense UAV slot of each row in the step.
+            speeds, missions, dists: (rows,) columns, or None if not recorded.
+            num_nmac, num_uav_collision, num_ra_collision: event rows in the step.
+        """
+        self.num_steps += 1
+        self.num_nmac += num_nmac
+        self.num_uav_collision += num_uav_collision
+        self.num_ra_collision += num_ra_collision
+        self.peak_active = max(self.peak_active, len(slots))
+
+        if speeds is not None:
+            self.speed_total += float(np.sum(speeds))
+            self.speed_count += len(speeds)
+            if len(speeds):
+                self.speed_min = min(self.speed_min, float(np.min(speeds)))
+                self.speed_max = max(self.speed_max, float(np.max(speeds)))
+
+        if len(slots) and slots.max() >= len(self._seen):
+            capacity = max(2 * len(self._seen), int(slots.max()) + 1)
+            for name in ('_missions', '_seen'):
+                old = getattr(self, name)
+                grown = np.zeros(capacity, dtype=old.dtype)
+                grown[:len(old)] = old
+                setattr(self, name, grown)
+        self._seen[slots] = True
+        # Later rows win, as with the last-row lookup in _calculate_metrics
+        self._missions[slots] = 0 if missions is None else missions
+
+        self.final_dists = np.full(len(slots), math.nan) if dists is None else dists.copy()
+
+    def result(self) -> Dict[str, Any]:
+        """Current metrics dict ({} before the first update)."""
+        if not self.num_steps:
+            return {}
+        mission_counts = self._missions[self._seen]
+        final_dists = self.final_dists[~np.isnan(self.final_dists)]
+        return {
+            'total_steps':              self.num_steps,
+            'total_nmac_events':        self.num_nmac,
+            'total_uav_collision_events': self.num_uav_collision,
+            'total_ra_collision_events':  self.num_ra_collision,
+            'unique_uavs':              int(self._seen.sum()),
+            'avg_missions_completed':   float(np.mean(mission_counts)) if len(mission_counts) else 0.0,
+            'peak_active_uavs':         self.peak_active,
+            'avg_speed':                self.speed_total / self.speed_count if self.speed_count else 0.0,
+            'min_speed':                self.speed_min if self.speed_count else 0.0,
+            'max_speed':                self.speed_max if self.speed_count else 0.0,
+            'avg_dist_to_goal_final':   float(np.mean(final_dists)) if len(final_dists) else 0.0,
+        }
+
+
+class StepHistoryView(Sequence):
+    """Lazy list-of-dicts view over a MetricsCollector's columns."""
+
+    def __init__(self, collector: MetricsCollector) -> None:
+        self._collector = collector
+
+    def __len__(self) -> int:
+        return len(self._collector._step_numbers)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self._collector._step_dict(i) for i in range(*k.indices(len(self)))]
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError(k)
+        return self._collector._step_dict(k)
 
 
 # ---------------------------------------------------------------------------
 # Module-level helpers
 # ---------------------------------------------------------------------------
 
+def build_step_dict(
+    step: int,
+    actions: Any,
+    uav_ids: List[int],
+    uav_cols: Dict[str, np.ndarray],
+    nmac_pairs: np.ndarray,
+    uav_collision_pairs: np.ndarray,
+    ra_collision_ids: np.ndarray,
+    vertiport_rows: np.ndarray,
+    edge_rows: np.ndarray,
+) -> Dict[str, Any]:
+    """Assemble one step record in the historical step_history.json format.
+
+    Shared by MetricsCollector.get_step_data() and the chunked episode
+    reader so both produce identical dicts.
+
+    Args:
+        step:     state.currentstep of the record.
+        actions:  JSON-safe actions dict for the step.
+        uav_ids:  UAV id of each snapshot row.
+        uav_cols: field name -> (rows,) array for each recorded snapshot field
+                  (any subset of _UAV_FIELDS).
+        nmac_pairs, uav_collision_pairs: (M, 2) id pair arrays.
+        ra_collision_ids: (M,) ids of UAVs touching a restricted area.
+        vertiport_rows:   (V, 5) rows in _VERTIPORT_FIELDS order.
+        edge_rows:        (E, 5) rows in _EDGE_FIELDS order.
+
+    Returns:
+        Dict with step, num_active_uavs, uavs, actions, collisions,
+        vertiports and edges.
+    """
+    names = [name for name in _UAV_FIELDS if name in uav_cols]
+    cols = {name: np.asarray(uav_cols[name]).tolist() for name in names}
+    if 'mission_complete' in cols:
+        cols['mission_complete'] = [bool(v) for v in cols['mission_complete']]
+    if 'dist_to_goal' in cols:
+        cols['dist_to_goal'] = [None if math.isnan(v) else v for v in cols['dist_to_goal']]
+    uav_snapshots = {
+        uid: {name: cols[name][j] for name in names}
+        for j, uid in enumerate(uav_ids)
+    }
+
+    vertiport_snapshots = {}
+    for vp_idx, row in enumerate(np.asarray(vertiport_rows).tolist()):
+        x, y, n_grounded, n_landing_queue, capacity = row
+        vertiport_snapshots[vp_idx] = {
+            'x': x, 'y': y, 'n_grounded': int(n_grounded),
+            'n_landing_queue': int(n_landing_queue), 'capacity': int(capacity),
+        }
+
+    edge_snapshots = {}
+    for src, dst, n_in_transit, progress_sum, edge_distance in np.asarray(edge_rows).tolist():
+        src, dst = int(src), int(dst)
+        edge_snapshots[f"{src}->{dst}"] = {
+            'src': src, 'dst': dst, 'n_in_transit': int(n_in_transit),
+            'progress_sum': progress_sum, 'edge_distance': edge_distance,
+        }
+
+    return {
+        'step':            step,
+        'num_active_uavs': len(uav_ids),
+        'uavs':            uav_snapshots,
+        'actions':         actions,
+        'collisions': {
+            'nmac_pairs':          np.asarray(nmac_pairs).tolist(),
+            'uav_collision_pairs': np.asarray(uav_collision_pairs).tolist(),
+            'ra_collision_ids':    np.asarray(ra_collision_ids).tolist(),
+        },
+        'vertiports':      vertiport_snapshots,
+        'edges':           edge_snapshots,
+    }
+
+
 def _serialize(obj: Any) -> Any:
     """Recursively convert numpy types and tuples to JSON-safe Python primitives.
 
@@ -304,7 +794,7 @@ def _serialize(obj: Any) -> Any:
         return obj.tolist()
     if isinstance(obj, dict):
         return {str(k): _serialize(v) for k, v in obj.items()}
-    if isinstance(obj, (list, tuple)):
+    if isinstance(obj, (list, tuple, StepHistoryView)):
         return [_serialize(x) for x in obj]
     if isinstance(obj, (np.integer,)):
         return int(obj)
@@ -1,9 +1,95 @@
 import math
-from typing import List
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Tuple
 import numpy as np
 from shapely import Point
 from urbannav.plan_template import PlannerTemplate
 
+# Trajectories kept by the shared TrajectoryCache (one per start/end/max_speed)
+TRAJECTORY_CACHE_SIZE = 4096
+
+
+class MinSnapTrajectory(NamedTuple):
+    """Hover-to-hover minimum-snap trajectory; coeffs is read-only (3, 8),
+    one row of polynomial coefficients per axis x, y, z."""
+    coeffs: np.ndarray
+    duration: float
+
+
+class TrajectoryCache:
+    """Bounded LRU cache of minimum-snap trajectories shared by SixDOFPIDPlanner
+    instances.
+
+    A trajectory depends only on its start point, end point and max_speed, and
+    mission endpoints are vertiport locations, so UAVs cycling between the same
+    vertiports reuse one solved (read-only) coefficient set instead of each
+    planner solving and owning a copy.  The least recently used trajectories
+    are dropped beyond maxsize.
+    """
+
+    def __init__(self, maxsize: int = TRAJECTORY_CACHE_SIZE) -> None:
+        self.maxsize = max(int(maxsize), 1)
+        self._trajectories: 'OrderedDict[Tuple[float, ...], MinSnapTrajectory]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._trajectories)
+
+    def get(self, start: Tuple[float, float, float], end: Tuple[float, float, float],
+            max_speed: float) -> MinSnapTrajectory:
+        """Trajectory from *start* to *end* (x, y, z), solved on a miss."""
+        key = (*start, *end, max_speed)
+        trajectory = self._trajectories.get(key)
+        if trajectory is not None:
+            self.hits += 1
+            self._trajectories.move_to_end(key)
+            return trajectory
+        self.misses += 1
+        trajectory = self._trajectories[key] = solve_min_snap(start, end, max_speed)
+        while len(self._trajectories) > self.maxsize:
+            self._trajectories.popitem(last=False)
+            self.evictions += 1
+        return trajectory
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hits, misses, evictions, size, maxsize and hit_rate."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._trajectories),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        """Drop all trajectories and reset the counters."""
+        self._trajectories.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+# Peak velocity of the minimum-snap profile = 1.875 * Δp / T
+_PEAK_VEL_FACTOR: float = 1.875
+# Coefficients c4..c7 of the hover-to-hover solution, per unit Δp and T^k
+_MIN_SNAP_TERMS = np.array([35.0, -84.0, 70.0, -20.0])
+
+
+def solve_min_snap(start: Tuple[float, float, float], end: Tuple[float, float, float],
+                   max_speed: float) -> MinSnapTrajectory:
+    """Closed-form hover-to-hover minimum-snap trajectory (see SixDOFPIDPlanner)."""
+    p0 = np.asarray(start, dtype=float)
+    delta = np.asarray(end, dtype=float) - p0
+    T = max(1.0, _PEAK_VEL_FACTOR * math.sqrt(float(delta @ delta)) / max_speed)
+    coeffs = np.zeros((3, 8))
+    coeffs[:, 0] = p0
+    # c1=c2=c3=0 (zero initial velocity, acceleration, jerk)
+    coeffs[:, 4:] = delta[:, None] * (_MIN_SNAP_TERMS / T ** np.arange(4, 8))
+    coeffs.flags.writeable = False
+    return MinSnapTrajectory(coeffs, T)
+
 
 class SixDOFPIDPlanner(PlannerTemplate):
     """7th-order minimum-snap trajectory planner for SixDOF (3D) UAVs.
@@ -31,6 +117,9 @@ class SixDOFPIDPlanner(PlannerTemplate):
 
     At each get_plan() call the polynomial is evaluated at the current elapsed time
     to produce a 3D reference position (Shapely Point) for the cascaded PID controller.
+    Coefficients are solved once per (start, end, max_speed) and shared by all
+    planners through the class-level trajectory_cache (TrajectoryCache), whose
+    get_stats() reports hits and misses.
 
     The `dt` attribute must be set by the caller after instantiation (planner_engine.py
     injects self.dt via `if hasattr(instance, 'dt'): instance.dt = self.dt`).
@@ -39,13 +128,22 @@ class SixDOFPIDPlanner(PlannerTemplate):
     # Max speed fraction used for trajectory time calculation.
     # Peak velocity of the minimum-snap profile = 1.875 * Δp / T.
     # Setting T = _PEAK_VEL_FACTOR * dist / max_speed guarantees peak ≤ max_speed.
-    _PEAK_VEL_FACTOR: float = 1.875
+    _PEAK_VEL_FACTOR: float = _PEAK_VEL_FACTOR
+
+    # Solved trajectories shared by every instance — see TrajectoryCache.
+    trajectory_cache: TrajectoryCache = TrajectoryCache()
 
     def __init__(self, waypoints: List[Point]):
         # Nominal dt — overwritten by planner_engine after instantiation.
         self.dt: float = 0.1
 
-        # Polynomial coefficients per axis: [c0, c1, ..., c7]
+        # Estimate a reasonable max_speed from UAVTypeConfig defaults.
+        # If we ever have access to the UAV object here we could use uav.max_speed,
+        # but planners are initialised with only waypoints.  Use a conservative 10 m/s.
+        self.max_speed: float = 10.0
+
+        # Polynomial coefficients per axis: [c0, c1, ..., c7] — read-only views
+        # into the shared trajectory once one is computed
         self._coeffs_x: np.ndarray = np.zeros(8)
         self._coeffs_y: np.ndarray = np.zeros(8)
         self._coeffs_z: np.ndarray = np.zeros(8)
@@ -85,7 +183,7 @@ class SixDOFPIDPlanner(PlannerTemplate):
     # ------------------------------------------------------------------
 
     def _compute_trajectory(self) -> None:
-        """Compute 7th-order minimum-snap polynomial coefficients for each axis.
+        """Look up the 7th-order minimum-snap coefficients for each axis.
 
         Uses closed-form solution for the hover-to-hover single-segment case:
             c0 = p0,  c1=c2=c3=0
@@ -93,6 +191,7 @@ class SixDOFPIDPlanner(PlannerTemplate):
             c5 = -84*Δp / T^5
             c6 =  70*Δp / T^6
             c7 = -20*Δp / T^7
+        solved once per (start, end, max_speed) in the shared trajectory_cache.
         """
         if len(self._waypoints) < 2:
             # Not enough waypoints yet — leave coefficients zeroed.
@@ -101,38 +200,13 @@ class SixDOFPIDPlanner(PlannerTemplate):
         start = self._waypoints[0]
         end   = self._waypoints[-1]
 
-        p0x = start.x
-        p0y = start.y
-        p0z = start.z if start.has_z else 0.0
-
-        pTx = end.x
-        pTy = end.y
-        pTz = end.z if end.has_z else 0.0
-
-        dist_3d = math.sqrt((pTx - p0x)**2 + (pTy - p0y)**2 + (pTz - p0z)**2)
-
-        # Estimate a reasonable max_speed from UAVTypeConfig defaults.
-        # If we ever have access to the UAV object here we could use uav.max_speed,
-        # but planners are initialised with only waypoints.  Use a conservative 10 m/s.
-        _max_speed_estimate: float = 10.0
-        self._T = max(1.0, self._PEAK_VEL_FACTOR * dist_3d / _max_speed_estimate)
-
-        T = self._T
-
-        def _coeffs_for_axis(p0: float, pT: float) -> np.ndarray:
-            delta = pT - p0
-            c = np.zeros(8)
-            c[0] = p0
-            # c1=c2=c3=0 (zero initial velocity, acceleration, jerk)
-            c[4] =  35.0 * delta / (T**4)
-            c[5] = -84.0 * delta / (T**5)
-            c[6] =  70.0 * delta / (T**6)
-            c[7] = -20.0 * delta / (T**7)
-            return c
-
-        self._coeffs_x = _coeffs_for_axis(p0x, pTx)
-        self._coeffs_y = _coeffs_for_axis(p0y, pTy)
-        self._coeffs_z = _coeffs_for_axis(p0z, pTz)
+        trajectory = self.trajectory_cache.get(
+            (start.x, start.y, start.z if start.has_z else 0.0),
+            (end.x, end.y, end.z if end.has_z else 0.0),
+            self.max_speed,
+        )
+        self._T = trajectory.duration
+        self._coeffs_x, self._coeffs_y, self._coeffs_z = trajectory.coeffs
 
     # ------------------------------------------------------------------
     # Polynomial evaluation
@@ -1,13 +1,14 @@
-from typing import Dict, List
+import warnings
+from typing import Dict, List, Optional
 from shapely import Point
 from urbannav.plan_template import PlannerTemplate
-from typing import Dict, List
 from urbannav.uav_template import UAV_template
 from urbannav.uav import UAV
 from urbannav.component_schema import UAMConfig, VALID_PLANNERS
 from urbannav.plan_point_mass_pid import PointMassPIDPlanner
 from urbannav.plan_holonomic import HolonomicPlanner
 from urbannav.plan_six_dof_pid import SixDOFPIDPlanner
+from urbannav.route_network import RouteNetwork
 
 
 # Maps VALID_PLANNERS string names → PlannerTemplate subclasses.
@@ -27,7 +28,8 @@ class PlannerEngine:
     def __init__(self,
                  config: UAMConfig,
                  plan_uav_map: Dict[str, List[int]],
-                 uav_dict: Dict[int, UAV | UAV_template]):
+                 uav_dict: Dict[int, UAV | UAV_template],
+                 route_network: Optional[RouteNetwork] = None):
 
         self.config = config
         self.dt = self.config.simulator.dt
@@ -46,6 +48,17 @@ class PlannerEngine:
 
         self.plan_dict: Dict[int, List[Point]] = {}
 
+        # Precomputed vertiport-to-vertiport routes around restricted airspace;
+        # None = fly the straight line between start and end vertiport
+        self.route_network = route_network
+
+    def _mission_waypoints(self, uav: UAV | UAV_template) -> List[Point]:
+        """Waypoints of the UAV's current mission: the route-network path between
+        its start and end vertiports, or the straight line without a network."""
+        if self.route_network is not None:
+            return self.route_network.waypoints(uav.start_vertiport, uav.end_vertiport)
+        return [uav.mission_start_point, uav.mission_end_point]
+
     def register_uav_planners(self) -> None:
         """Spin up one Planner instance per UAV and map every UAV id to its planner.
 
@@ -73,10 +86,16 @@ class PlannerEngine:
                     f"Planner type '{plan_name}' is valid but has no concrete "
                     f"implementation yet. Implemented types: {sorted(PLANNER_CLASS_MAP)}"
                 )
+            if plan_name == 'SixDOF-PID' and self.route_network is not None and uav_id_list:
+                # min-snap trajectories join start and end only; corners are dropped
+                warnings.warn("route_network is enabled but SixDOF-PID planners fly the "
+                              "straight min-snap trajectory between start and end vertiport; "
+                              "their routes around restricted airspace are ignored.",
+                              stacklevel=2)
             # Each UAV gets its own planner instance (stateful — tracks current_idx).
             for uav_id in uav_id_list:
                 uav = self.uav_dict[uav_id]
-                waypoints = [uav.start_vertiport.location, uav.end_vertiport.location]
+                waypoints = self._mission_waypoints(uav)
                 instance = PLANNER_CLASS_MAP[plan_name](waypoints=waypoints)
                 if hasattr(instance, 'dt'):
                     instance.dt = self.dt   # sync simulator dt for time-aware planners
@@ -88,35 +107,37 @@ class PlannerEngine:
         """Retrieve the current target waypoint for every UAV with a registered planner.
 
         Each planner's get_plan() is called with the UAV's current_position so that
-        waypoint-advancement logic runs correctly at every step.
-
-        Also detects mission reassignment: if the planner's stored destination no longer
-        matches the UAV's current mission_end_point, the planner is reset with fresh
-        waypoints so the UAV navigates to its new goal instead of stalling at its old one.
+        waypoint-advancement logic runs correctly at every step.  Mission changes
+        are not checked here — on_mission_change() resets a planner when ATC
+        announces one.
 
         Returns:
             plan_dict: { uav_id(int) -> List[Point] } current plan for each UAV.
         """
+        uav_dict = self.uav_dict
+        plan_dict = self.plan_dict
         for uav_id, plan_model in self.plan_obj_map.items():
-            if uav_id not in self.uav_dict:   # UAV may have been removed by collision
+            uav = uav_dict.get(uav_id)
+            if uav is None:   # UAV may have been removed by collision
                 continue
-            uav = self.uav_dict[uav_id]
-
-            # Detect mission reassignment: planner's stored goal is stale.
-            # After reassign_new_mission(), uav.mission_end_point changes but the
-            # planner still holds the old waypoints (and current_idx may be past the
-            # end), causing it to return the old destination as target_pos.  That puts
-            # target at the UAV's current position → distance=0 → accel_cmd=0 → speed
-            # stays 0 forever.  Reset the planner whenever the goal diverges.
-            try:
-                if plan_model.waypoints[-1] != uav.mission_end_point:
-                    plan_model.waypoints = [uav.mission_start_point, uav.mission_end_point]
-                    plan_model.current_idx = 0
-            except AttributeError:
-                pass  # UAV not yet fully assigned; skip this step
-
-            self.plan_dict[uav_id] = plan_model.get_plan(uav.current_position)
-        return self.plan_dict
+            plan_dict[uav_id] = plan_model.get_plan(uav.current_position)
+        return plan_dict
+
+    def on_mission_change(self, uav_id: int) -> None:
+        """Mission-change listener (ATC.add_mission_listener): reset the UAV's
+        planner to its new mission.
+
+        Without the reset the planner keeps the old waypoints (and current_idx may
+        be past the end), so it returns the old destination as target_pos.  That
+        puts target at the UAV's current position → distance=0 → accel_cmd=0 →
+        speed stays 0 forever.
+        """
+        plan_model = self.plan_obj_map.get(uav_id)
+        uav = self.uav_dict.get(uav_id)
+        if plan_model is None or uav is None:   # planners are registered after the first assignment
+            return
+        plan_model.waypoints = self._mission_waypoints(uav)
+        plan_model.current_idx = 0
 
     def set_plans(self, *args, **kwargs):
         pass
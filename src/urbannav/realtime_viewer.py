@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Columns of one UAV row in a shared frame (has_start / has_end are 0 or 1)
+FRAME_FIELDS = (
+    'id', 'x', 'y', 'z', 'heading', 'radius', 'nmac_radius', 'detection_radius',
+    'has_start', 'start_x', 'start_y', 'start_z', 'has_end', 'end_x', 'end_y', 'end_z',
+)
+_COL = {name: i for i, name in enumerate(FRAME_FIELDS)}
+
+# Frame slots in the ring: the writer has to lap the ring before it can
+# overwrite the slot a reader is copying
+RING_SLOTS = 4
+
+# Shared header words
+_HEAD, _CLOSED, _DRAWN, _LAST_DRAWN = range(4)
+# Per-slot metadata words (seq is -1 while the slot is being written)
+_SEQ, _STEP, _COUNT, _EPISODE = range(4)
+
+
+def pack_frame(frame: Dict, out: np.ndarray) -> int:
+    """Write a Renderer frame's UAVs into the (max_uavs, len(FRAME_FIELDS))
+    array *out*; returns the number of rows written (extra UAVs are dropped)."""
+    n = min(len(frame['uavs']), len(out))
+    for row, (uid, d) in zip(out[:n], frame['uavs'].items()):
+        start, end = d['mission_start'], d['mission_end']
+        row[:] = (
+            uid, d['x'], d['y'], d['z'], d['heading'],
+            d['radius'], d['nmac_radius'], d['detection_radius'],
+            start is not None, *(start or (0.0, 0.0)), d['mission_start_z'],
+            end is not None, *(end or (0.0, 0.0)), d['mission_end_z'],
+        )
+    return n
+
+
+def unpack_frame(step: int, rows: np.ndarray) -> Dict:
+    """Rebuild the Renderer frame dict packed by pack_frame()."""
+    uavs = {}
+    for row in rows.tolist():
+        uavs[int(row[_COL['id']])] = {
+            'x':                row[_COL['x']],
+            'y':                row[_COL['y']],
+            'z':                row[_COL['z']],
+            'heading':          row[_COL['heading']],
+            'radius':           row[_COL['radius']],
+            'nmac_radius':      row[_COL['nmac_radius']],
+            'detection_radius': row[_COL['detection_radius']],
+            'mission_start':    (row[_COL['start_x']], row[_COL['start_y']])
+                                if row[_COL['has_start']] else None,
+            'mission_end':      (row[_COL['end_x']], row[_COL['end_y']])
+                                if row[_COL['has_end']] else None,
+            'mission_start_z':  row[_COL['start_z']],
+            'mission_end_z':    row[_COL['end_z']],
+        }
+    return {'step': step, 'uavs': uavs}
+
+
+class FrameRingBuffer:
+    """Latest fleet frames in a shared-memory ring, one writer, any readers.
+
+    The writer never waits: publish() fills the next of RING_SLOTS slots and
+    advances the head.  A reader only ever takes the newest frame, so frames
+    published while it was busy are dropped, and a slot overwritten during
+    the copy (detected by its sequence number) is skipped, not torn.
+
+    Layout of the single SharedMemory block::
+
+        header  int64[4]                       head, closed, frames drawn, last drawn seq
+        meta    int64[slots, 4]                seq, step, UAV count, episode
+        table   float64[slots, max_uavs, F]    FRAME_FIELDS per UAV
+    """
+
+    def __init__(self, max_uavs: int = 512, slots: int = RING_SLOTS,
+                 name: Optional[str] = None) -> None:
+        """
+        Args:
+            max_uavs: UAV rows per frame; UAVs beyond this are not shown.
+            slots:    Frames held in the ring.
+            name:     Attach to an existing block (reader side) instead of
+                      creating one.
+        """
+        self.max_uavs = max_uavs
+        self.slots = slots
+        header_size, meta_size = 4 * 8, slots * 4 * 8
+        size = header_size + meta_size + slots * max_uavs * len(FRAME_FIELDS) * 8
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        buf = self.shm.buf
+        self._header = np.ndarray((4,), np.int64, buf)
+        self._meta = np.ndarray((slots, 4), np.int64, buf, offset=header_size)
+        self._table = np.ndarray((slots, max_uavs, len(FRAME_FIELDS)), np.float64, buf,
+                                 offset=header_size + meta_size)
+        if self.owner:
+            self._header[:] = 0
+            self._meta[:] = 0
+        self._last_read = 0
+        self._truncated = False
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def head(self) -> int:
+        """Number of frames published so far."""
+        return int(self._header[_HEAD])
+
+    @property
+    def closed(self) -> bool:
+        return bool(self._header[_CLOSED])
+
+    @property
+    def frames_drawn(self) -> int:
+        """Frames the reader has reported drawn (see mark_drawn())."""
+        return int(self._header[_DRAWN])
+
+    @property
+    def last_drawn(self) -> int:
+        """Sequence number of the last frame reported drawn."""
+        return int(self._header[_LAST_DRAWN])
+
+    # ------------------------------------------------------------------
+    # Writer
+    # ------------------------------------------------------------------
+
+    def publish(self, frame: Dict, episode: int = 0) -> int:
+        """Copy *frame* into the next slot and make it the latest; returns its seq."""
+        seq = self.head + 1
+        slot = seq % self.slots
+        self._meta[slot, _SEQ] = -1
+        n = pack_frame(frame, self._table[slot])
+        if n < len(frame['uavs']) and not self._truncated:
+            print(f'[Renderer] Realtime viewer shows the first {n} of {len(frame["uavs"])} UAVs '
+                  f'(raise rendering.realtime_max_uavs).')
+            self._truncated = True
+        self._meta[slot, _STEP] = frame['step']
+        self._meta[slot, _COUNT] = n
+        self._meta[slot, _EPISODE] = episode
+        self._meta[slot, _SEQ] = seq
+        self._header[_HEAD] = seq
+        return seq
+
+    def mark_closed(self) -> None:
+        self._header[_CLOSED] = 1
+
+    # ------------------------------------------------------------------
+    # Reader
+    # ------------------------------------------------------------------
+
+    def read_latest(self) -> Optional[Tuple[int, int, Dict]]:
+        """Return (seq, episode, frame) of the newest frame not read yet, or None."""
+        seq = self.head
+        if seq == self._last_read:
+            return None
+        slot = seq % self.slots
+        if self._meta[slot, _SEQ] != seq:
+            return None                           # already being overwritten
+        step, n, episode = (int(v) for v in self._meta[slot, _STEP:])
+        rows = self._table[slot, :n].copy()
+        if self._meta[slot, _SEQ] != seq:
+            return None                           # overwritten during the copy
+        self._last_read = seq
+        return seq, episode, unpack_frame(step, rows)
+
+    def mark_drawn(self, seq: int) -> None:
+        self._header[_DRAWN] += 1
+        self._header[_LAST_DRAWN] = seq
+
+    def close(self) -> None:
+        """Detach; the creating side also frees the block."""
+        self._header = self._meta = self._table = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class RealtimeViewer:
+    """Realtime view of a run, drawn by a separate process.
+
+    The simulation side only publishes frames into a FrameRingBuffer, which
+    costs a copy of the fleet state per rendered step.  The viewer process
+    (started with 'spawn', so it gets a fresh GUI backend) polls the ring,
+    draws the newest frame with the renderer's realtime drawing at no more
+    than fps frames per second and drops the frames it had no time for.
+    The simulation never waits for matplotlib.
+
+    reset() sends a new episode's airspace over a queue; frames tagged with
+    a newer episode are held back until the viewer has it.
+    """
+
+    def __init__(self, renderer_cls: type, config, simulator_mode: str, airspace=None,
+                 fps: float = 10.0, max_uavs: int = 512) -> None:
+        """
+        Args:
+            renderer_cls:   Renderer class the viewer draws with.
+            config:         RenderingConfig for that renderer.
+            simulator_mode: '2D' or '3D'.
+            airspace:       Airspace of the first episode.
+            fps:            Maximum viewer frame rate.
+            max_uavs:       UAVs per shared frame.
+        """
+        self.ring = FrameRingBuffer(max_uavs=max_uavs)
+        self.episode = 0
+        self._airspace = airspace
+        ctx = mp.get_context('spawn')
+        self._control = ctx.Queue()
+        self._control.put((self.episode, airspace))
+        self._process = ctx.Process(
+            target=_viewer_main,
+            args=(self.ring.name, self.ring.max_uavs, self.ring.slots, renderer_cls, config,
+                  simulator_mode, self._control, fps),
+            name='urbannav-viewer',
+            daemon=True,
+        )
+        self._process.start()
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def publish(self, frame: Dict) -> None:
+        self.ring.publish(frame, self.episode)
+
+    def reset(self, airspace=None) -> None:
+        """Start a new episode in the viewer (trails cleared; the airspace
+        is only sent again when it changed)."""
+        self.episode += 1
+        changed = airspace is not self._airspace
+        self._airspace = airspace
+        self._control.put((self.episode, airspace if changed else _SAME_AIRSPACE))
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the viewer process and free the shared memory."""
+        if self._process is None:
+            return
+        self.ring.mark_closed()
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._process = None
+        self._control.close()
+        self._control.cancel_join_thread()        # the viewer may have left items unread
+        self.ring.close()
+
+
+# Control message payload: keep the viewer's current airspace
+_SAME_AIRSPACE = 'same'
+
+
+def _viewer_main(shm_name: str, max_uavs: int, slots: int, renderer_cls: type, config,
+                 simulator_mode: str, control, fps: float) -> None:
+    """Viewer process: draw the newest shared frame at up to *fps*."""
+    import matplotlib.pyplot as plt
+
+    ring = FrameRingBuffer(max_uavs=max_uavs, slots=slots, name=shm_name)
+    renderer = renderer_cls(config, simulator_mode)
+    renderer.realtime_sleep = 0.001               # pacing is done here
+    period = 1.0 / max(fps, 1e-3)
+    episode = -1
+    pending = None                                # frame ahead of its airspace
+    try:
+        while True:
+            tick = time.perf_counter()
+            # ---- new episodes ----
+            while True:
+                try:
+                    episode, airspace = control.get(block=False)
+                except queue.Empty:
+                    break
+                if isinstance(airspace, str):     # _SAME_AIRSPACE
+                    airspace = renderer._airspace
+                renderer.reset(airspace)
+
+            latest = ring.read_latest() or pending
+            pending = None
+            if latest is not None:
+                seq, frame_episode, frame = latest
+                if frame_episode > episode:
+                    pending = latest
+                elif frame_episode == episode:
+                    if renderer._fig is not None and not plt.fignum_exists(renderer._fig.number):
+                        break                     # window closed by the user
+                    renderer._draw_realtime(frame)
+                    ring.mark_drawn(seq)
+            elif ring.closed:
+                break
+
+            remaining = period - (time.perf_counter() - tick)
+            if renderer._fig is not None:
+                plt.pause(max(remaining, 0.001))   # keeps the window responsive
+            elif remaining > 0:
+                time.sleep(remaining)
+    finally:
+        plt.close('all')
+        ring.close()
@@ -1,17 +1,46 @@
 from __future__ import annotations
 
+import hashlib
 import math
 import os
-from typing import Dict, List, Optional, Tuple
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
 from matplotlib.patches import Circle, FancyArrowPatch
 from matplotlib.animation import FuncAnimation, PillowWriter
 from mpl_toolkits.mplot3d import Axes3D          # noqa: F401 — registers '3d' projection
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 from shapely.geometry import box as _shapely_box
 
+from urbannav.episode_arrays import EpisodeArrays
+from urbannav.frame_writers import (
+    FFmpegPipeWriter, GifStreamWriter, concat_gif_segments, concat_mp4_segments, ffmpeg_path,
+)
+from urbannav.realtime_viewer import RealtimeViewer
+
+# Animation frame rate and output resolution (10 in figure at 150 dpi)
+FPS = 10
+DPI = 150
+
+# Unit circle for the 3D detection / NMAC equatorial rings
+_RING_THETA = np.linspace(0, 2 * math.pi, 64)
+_RING_COS, _RING_SIN = np.cos(_RING_THETA), np.sin(_RING_THETA)
+
+# render_log(): smallest segment worth a separate process (startup + trail priming)
+MIN_SEGMENT_FRAMES = 50
+
+# render_log(): UAV radii drawn when the log does not carry them (STANDARD-like)
+LOG_UAV_RADII = {'radius': 5.0, 'nmac_radius': 50.0, 'detection_radius': 200.0}
+
+# Pre-rasterized 2D map layer: pixels along the longer side of the extent
+# (about the 2D axes width at DPI, so frames barely resample it)
+MAP_RASTER_PX = 1200
 
 class Renderer:
     """2D/3D renderer for UAM simulation episodes.
@@ -19,16 +48,44 @@ class Renderer:
     Supports three rendering modes (set via RenderingConfig.mode):
         'realtime'  — draws each step interactively using plt.pause().
                       Requires a GUI display (e.g. run locally, not headless).
+                      With RenderingConfig.realtime_process set, the
+                      drawing runs in a separate viewer process fed through
+                      shared memory (realtime_viewer.RealtimeViewer): each
+                      step only publishes the fleet state, and the viewer
+                      draws the newest one at realtime_fps, dropping the
+                      frames it falls behind on.  Call close() to stop it.
         'offline'   — collects lightweight frame snapshots during the run and
                       saves a GIF/MP4 animation when save() is called.
         'both'      — does both simultaneously.
 
+    With RenderingConfig.stream=True the offline output is streamed instead:
+    the first frame creates one set of artists on an off-screen Agg figure
+    (map and vertiports drawn once), every later frame only moves them, and
+    each rendered canvas is piped straight into the GIF writer and an ffmpeg
+    process as the step happens.  No frames are kept, so memory stays flat
+    over the episode; save() finalises and names the files.  With a fixed
+    extent the 2D stream is blitted: the static layer is drawn once into a
+    saved background, and each frame restores it and redraws only the
+    moving artists.
+
+    The static airspace layer is built once per airspace and extent and
+    reused by every frame and reset: in 2D the map is rasterized over the
+    extent and drawn as a single image (also cached on disk as .npy with
+    RenderingConfig.map_cache_dir); in 3D the clipped map polygons are kept
+    and drawn as one collection per layer.
+
+    render_log() renders a finished episode from its log instead of a live
+    run.  With RenderingConfig.render_workers > 1 the frames are split into
+    contiguous segments, each streamed by its own process (trails primed
+    from the earlier frames), and the segments are joined losslessly — byte
+    concatenation for the GIF, ffmpeg's concat demuxer for the MP4.
+
     The dimensionality of the render is controlled by simulator_mode:
         '2D'  — standard top-down map overlay (default).
         '3D'  — matplotlib Axes3D scene; map drawn as Poly3DCollection at z=0.
 
     Visual style (2D):
-        - Map boundary: gray fill, alpha 0.5
+        - Map boundary: gray fill, alpha 0.5 (pre-rasterized, see above)
         - Restricted areas: red fill; buffer: orange, alpha 0.3
         - Vertiports: green squares ('gs'), markersize 2
         - UAV detection radius: green dashed circle, alpha 0.3
@@ -54,6 +111,7 @@ class Renderer:
         from urbannav.component_schema import RenderingConfig
         cfg = config if config is not None else RenderingConfig()
 
+        self.config                  = cfg
         self.enabled: bool           = cfg.enabled
         self.mode: str               = cfg.mode          # 'realtime'|'offline'|'both'
         self.output_dir: str         = cfg.output_dir
@@ -61,19 +119,41 @@ class Renderer:
         self.realtime_sleep: float   = cfg.realtime_sleep
         self.frame_skip: int         = cfg.frame_skip
         self.mp4_only: bool          = cfg.mp4_only
+        self.stream: bool            = cfg.stream
+        self.render_workers: int     = cfg.render_workers
+        self.map_cache_dir: Optional[str] = cfg.map_cache_dir
+        self.realtime_process: bool  = cfg.realtime_process
+        self.realtime_fps: float     = cfg.realtime_fps
+        self.realtime_max_uavs: int  = cfg.realtime_max_uavs
 
         self._sim_mode: str          = simulator_mode    # '2D' or '3D'
         self._airspace               = None
         self._extent: Optional[Tuple[float, float, float, float]] = None  # (xmin,xmax,ymin,ymax)
+        # Static layer data built once per airspace + extent (see _static_cached)
+        self._static_cache: Dict     = {}
 
         # Offline storage
         self._frames: List[Dict]     = []
 
+        # Streaming offline output (stream=True): Agg figure, persistent
+        # artists per UAV, and the open GIF / MP4 writers with their paths
+        self._stream_fig: Optional[Figure] = None
+        self._stream_ax              = None
+        self._stream_title           = None
+        self._stream_artists: Dict   = {}
+        self._stream_traj: Dict      = {}
+        self._stream_writers: List[Tuple[object, str, str]] = []
+        self._stream_frames: int     = 0
+        # Saved static background when the 2D stream is blitted (fixed extent)
+        self._stream_background      = None
+
         # Real-time figure
         self._fig                    = None
         self._ax                     = None
         # {uav_id: [(x, y, z), ...]} — z always stored; 2D drawing ignores it
         self._rt_traj: Dict          = {}
+        # Out-of-process real-time viewer (realtime_process=True), started lazily
+        self._viewer: Optional[RealtimeViewer] = None
 
         # Internal frame counter for frame_skip logic
         self._step_counter: int      = 0
@@ -92,11 +172,18 @@ class Renderer:
         if not self.enabled:
             return
 
+        previous           = (self._airspace, self._extent)
         self._airspace     = airspace
         self._frames       = []
         self._step_counter = 0
         self._rt_traj      = {}
         self._extent       = self._compute_extent()
+        if airspace is not previous[0] or self._extent != previous[1]:
+            self._static_cache = {}
+        # An episode that was never save()d leaves partial stream files behind
+        self._close_stream()
+        if self._viewer is not None:
+            self._viewer.reset(airspace)
 
         if self._fig is not None:
             plt.close(self._fig)
@@ -119,10 +206,24 @@ class Renderer:
         frame = self._build_frame(uav_dict, step_num)
 
         if self.mode in ('offline', 'both'):
-            self._frames.append(frame)
+            self.add_frame(frame)
 
         if self.mode in ('realtime', 'both'):
-            self._draw_realtime(frame)
+            if self.realtime_process:
+                self._publish_realtime(frame)
+            else:
+                self._draw_realtime(frame)
+
+    def add_frame(self, frame: Dict) -> None:
+        """Add one offline frame (as built by _build_frame()).
+
+        Buffered until save() by default; drawn and encoded immediately when
+        streaming.  Used directly to render frames rebuilt from logs.
+        """
+        if self.stream:
+            self._stream_frame(frame)
+        else:
+            self._frames.append(frame)
 
     # ------------------------------------------------------------------
     # Offline animation save — called from UAMSimulator.render()
@@ -136,6 +237,9 @@ class Renderer:
         """
         if not self.enabled or self.mode not in ('offline', 'both'):
             return
+        if self.stream:
+            self._finish_stream(episode_id)
+            return
         if not self._frames:
             print('[Renderer] No frames collected — skipping save.')
             return
@@ -162,14 +266,14 @@ class Renderer:
             return []
 
         ani = FuncAnimation(
-            fig, animate, frames=len(frames), interval=100, blit=False
+            fig, animate, frames=len(frames), interval=1000 // FPS, blit=False
         )
 
         # --- GIF (always attempted first — no ffmpeg needed) ---
         if not self.mp4_only:
             gif_path = f'{out_base}.gif'
             try:
-                ani.save(gif_path, writer=PillowWriter(fps=10), dpi=150)
+                ani.save(gif_path, writer=PillowWriter(fps=FPS), dpi=DPI)
                 print(f'[Renderer] Saved → {gif_path}')
             except Exception as exc:
                 print(f'[Renderer] GIF save failed: {exc}')
@@ -179,22 +283,438 @@ class Renderer:
             from matplotlib.animation import FFMpegWriter
             mp4_path = f'{out_base}.mp4'
             writer = FFMpegWriter(
-                fps=10,
+                fps=FPS,
                 metadata={'title': 'UAM Simulation'},
                 bitrate=5000,
                 extra_args=['-vcodec', 'mpeg4', '-pix_fmt', 'yuv420p'],
             )
-            ani.save(mp4_path, writer=writer, dpi=150)
+            ani.save(mp4_path, writer=writer, dpi=DPI)
             print(f'[Renderer] Saved → {mp4_path}')
         except Exception as exc:
             print(f'[Renderer] MP4 save failed (ffmpeg installed?): {exc}')
 
         plt.close(fig)
 
+    # ------------------------------------------------------------------
+    # Offline render of a logged episode
+    # ------------------------------------------------------------------
+
+    def render_log(
+        self,
+        episode_dir: str,
+        episode_id: int = 0,
+        uav_radii: Optional[Dict[str, float]] = None,
+        workers: Optional[int] = None,
+    ) -> List[str]:
+        """Render a logged episode (any Logger step format) to GIF / MP4.
+
+        Frames are streamed as in stream mode, every (frame_skip + 1)-th
+        logged step.  With more than one worker the frames are split into
+        contiguous segments of at least MIN_SEGMENT_FRAMES, rendered in
+        parallel processes and concatenated without re-encoding.  The map
+        layer is drawn when an airspace was passed to reset().
+
+        Args:
+            episode_dir: Logger episode directory.
+            episode_id:  Episode number used in the output file names.
+            uav_radii:   radius / nmac_radius / detection_radius to draw
+                         (logs do not store them); default LOG_UAV_RADII.
+            workers:     Render processes; default RenderingConfig.render_workers,
+                         0 = one per CPU core.
+
+        Returns:
+            Paths written.
+        """
+        arrays = EpisodeArrays.load(episode_dir)
+        frame_ks = np.arange(0, arrays.num_steps, self.frame_skip + 1)
+        if not len(frame_ks):
+            print(f'[Renderer] No steps logged in {episode_dir} — skipping render.')
+            return []
+        radii = {**LOG_UAV_RADII, **(uav_radii or {})}
+
+        workers = self.render_workers if workers is None else workers
+        workers = workers or os.cpu_count() or 1
+        n_segments = max(1, min(workers, len(frame_ks) // MIN_SEGMENT_FRAMES))
+        bounds = np.linspace(0, len(frame_ks), n_segments + 1).astype(int)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        out_base = os.path.join(self.output_dir, f'{self.output_filename}_ep{episode_id}')
+        partial = os.path.join(self.output_dir, f'.{self.output_filename}_ep{episode_id}.{os.getpid()}')
+        jobs = [
+            (episode_dir, frame_ks, int(bounds[i]), int(bounds[i + 1]), radii,
+             f'{partial}.seg{i:03d}', i == 0, i == n_segments - 1)
+            for i in range(n_segments)
+        ]
+
+        if n_segments == 1:
+            segments = [self._render_log_segment(arrays, *jobs[0][1:])]
+        else:
+            print(f'[Renderer] Rendering {len(frame_ks)} frames in {n_segments} segments')
+            with ProcessPoolExecutor(max_workers=n_segments) as pool:
+                futures = [
+                    pool.submit(_render_log_segment, type(self), self.config, self._sim_mode,
+                                self._airspace, *job)
+                    for job in jobs
+                ]
+                segments = [f.result() for f in futures]
+
+        written = []
+        for ext, concat in (('gif', concat_gif_segments), ('mp4', concat_mp4_segments)):
+            paths = [seg[ext] for seg in segments if ext in seg]
+            if len(paths) != n_segments:
+                for path in paths:
+                    os.remove(path)
+                continue
+            try:
+                if n_segments == 1:
+                    os.replace(paths[0], f'{out_base}.{ext}')
+                else:
+                    concat(paths, f'{out_base}.{ext}')
+                written.append(f'{out_base}.{ext}')
+                print(f'[Renderer] Saved → {out_base}.{ext}')
+            except Exception as exc:
+                print(f'[Renderer] {ext.upper()} save failed: {exc}')
+            finally:
+                for path in paths:
+                    if os.path.exists(path):
+                        os.remove(path)
+        return written
+
+    def _render_log_segment(
+        self,
+        arrays: EpisodeArrays,
+        frame_ks: np.ndarray,
+        start: int,
+        stop: int,
+        radii: Dict[str, float],
+        base: str,
+        first: bool,
+        last: bool,
+    ) -> Dict[str, str]:
+        """Stream frames frame_ks[start:stop] to <base>.gif / .mp4.
+
+        Trails are primed with the positions of frame_ks[:start] so the
+        segment's frames match a render of the whole episode.
+
+        Returns:
+            {extension: path} of the segment files written.
+        """
+        self._close_stream()
+        self._open_stream(base=base, gif_header=first, gif_trailer=last)
+        self._prime_trails(arrays, frame_ks[:start])
+        fields = ('x', 'y', 'z', 'heading')
+        for k in frame_ks[start:stop]:
+            rows = arrays.rows('uav', int(k))
+            values = arrays.uav_matrix(fields, rows, dtype=np.float64)
+            uavs = {
+                int(uid): {
+                    **dict(zip(fields, map(float, row))), **radii,
+                    'mission_start': None, 'mission_end': None,
+                    'mission_start_z': 0.0, 'mission_end_z': 0.0,
+                }
+                for uid, row in zip(arrays['uav_id'][rows], values)
+            }
+            self._stream_frame({'step': int(arrays['step'][k]), 'uavs': uavs})
+
+        segment = {}
+        for writer, path, ext in self._stream_writers:
+            writer.close()
+            segment[ext] = path
+        self._stream_writers = []
+        self._close_stream()
+        return segment
+
+    def _prime_trails(self, arrays: EpisodeArrays, frame_ks: np.ndarray) -> None:
+        """Seed each UAV's trail with its positions at steps frame_ks."""
+        if not len(frame_ks):
+            return
+        mask = np.zeros(arrays.num_steps, dtype=bool)
+        mask[frame_ks] = True
+        row_mask = np.repeat(mask, arrays.counts('uav'))
+        ids = np.asarray(arrays['uav_id'][row_mask])
+        xyz = arrays.uav_matrix(('x', 'y', 'z'), row_mask, dtype=np.float64)
+        order = np.argsort(ids, kind='stable')
+        uids, starts = np.unique(ids[order], return_index=True)
+        for uid, part in zip(uids, np.split(xyz[order], starts[1:])):
+            uid = int(uid)
+            self._stream_traj[uid] = (part[:, 0].tolist(), part[:, 1].tolist(), part[:, 2].tolist())
+            art = self._make_uav_artists(uid)
+            xs, ys, zs = self._stream_traj[uid]
+            if self._sim_mode == '3D':
+                art['traj'].set_data_3d(xs, ys, zs)
+            else:
+                art['traj'].set_data(xs, ys)
+
+    # ------------------------------------------------------------------
+    # Internal — streaming offline output (stream=True)
+    # ------------------------------------------------------------------
+
+    def _stream_frame(self, frame: Dict) -> None:
+        """Move the persistent artists to *frame* and encode the canvas."""
+        if self._stream_fig is None:
+            self._open_stream()
+        if not self._stream_writers:
+            return
+
+        if self._sim_mode == '3D':
+            self._update_artists_3d(frame)
+        else:
+            self._update_artists_2d(frame)
+
+        canvas = self._stream_fig.canvas
+        if self._stream_background is not None:
+            self._blit_frame()
+        else:
+            canvas.draw()
+        rgba = np.asarray(canvas.buffer_rgba())
+        for entry in list(self._stream_writers):
+            writer, path, ext = entry
+            try:
+                writer.write(rgba)
+            except Exception as exc:
+                print(f'[Renderer] {ext.upper()} stream failed: {exc}')
+                self._stream_writers.remove(entry)
+                self._discard_writer(writer, path)
+        self._stream_frames += 1
+
+    def _open_stream(self, base: Optional[str] = None, gif_header: bool = True,
+                     gif_trailer: bool = True) -> None:
+        """Create the off-screen figure, its static layer and the writers.
+
+        Args:
+            base:        Output path without extension; default is a hidden
+                         partial name that save() renames.
+            gif_header:  See GifStreamWriter (False for a non-initial segment).
+            gif_trailer: See GifStreamWriter (False for a non-final segment).
+        """
+        fig = Figure(figsize=(10, 10), dpi=DPI)
+        FigureCanvasAgg(fig)
+        vertiports = None
+        if self._sim_mode == '3D':
+            ax = fig.add_subplot(111, projection='3d')
+            self._draw_static_3d(ax)
+            ax.set_xlabel('X (m)')
+            ax.set_ylabel('Y (m)')
+            ax.set_zlabel('Z (m)')
+            if self._extent is not None:
+                ax.set_xlim3d(self._extent[0], self._extent[1])
+                ax.set_ylim3d(self._extent[2], self._extent[3])
+        else:
+            ax = fig.add_subplot(111)
+            vertiports = self._draw_static(ax)
+            if self._extent is not None:
+                ax.set_xlim(self._extent[0], self._extent[1])
+                ax.set_ylim(self._extent[2], self._extent[3])
+        self._stream_fig, self._stream_ax = fig, ax
+        self._stream_title = ax.set_title('', fontsize=11)
+
+        # Fixed 2D view: save everything but the animated artists once.  The
+        # vertiport markers sit above the UAVs, so they are redrawn with them.
+        if self._sim_mode != '3D' and self._extent is not None:
+            self._stream_title.set_animated(True)
+            if vertiports is not None:
+                vertiports.set_animated(True)
+            fig.canvas.draw()
+            self._stream_background = fig.canvas.copy_from_bbox(fig.bbox)
+
+        # Written under a hidden partial name; save() renames to the episode name
+        os.makedirs(self.output_dir, exist_ok=True)
+        if base is None:
+            base = os.path.join(self.output_dir, f'.{self.output_filename}.{os.getpid()}.partial')
+        if not self.mp4_only:
+            writer = GifStreamWriter(f'{base}.gif', fps=FPS, header=gif_header, trailer=gif_trailer)
+            self._stream_writers.append((writer, f'{base}.gif', 'gif'))
+        if ffmpeg_path() is not None:
+            writer = FFmpegPipeWriter(f'{base}.mp4', fps=FPS, bitrate=5000)
+            self._stream_writers.append((writer, f'{base}.mp4', 'mp4'))
+        else:
+            print('[Renderer] MP4 stream skipped (ffmpeg not found).')
+
+    def _update_artists_2d(self, frame: Dict) -> None:
+        ax = self._stream_ax
+        for uid, d in frame['uavs'].items():
+            art = self._stream_artists.get(uid) or self._make_uav_artists(uid)
+            x, y = d['x'], d['y']
+            xs, ys, zs = self._stream_traj.setdefault(uid, ([], [], []))
+            xs.append(x)
+            ys.append(y)
+            zs.append(d['z'])
+            art['traj'].set_data(xs, ys)
+
+            has_mission = bool(d['mission_start'] and d['mission_end'])
+            if has_mission:
+                (sx, sy), (ex, ey) = d['mission_start'], d['mission_end']
+                art['mission'].set_data([sx, ex], [sy, ey])
+            for key, radius in (('detection', d['detection_radius']),
+                                ('nmac', d['nmac_radius']), ('body', d['radius'])):
+                art[key].set_center((x, y))
+                art[key].set_radius(radius)
+            art['label'].xy = (x, y)
+            self._show_uav(art, True, has_mission)
+
+        self._hide_absent(frame)
+        if self._extent is None:
+            self._fit_axis(ax, frame)
+        self._stream_title.set_text(f'UAM Simulation — Step {frame["step"]}')
+
+    def _update_artists_3d(self, frame: Dict) -> None:
+        ax = self._stream_ax
+        for uid, d in frame['uavs'].items():
+            art = self._stream_artists.get(uid) or self._make_uav_artists(uid)
+            x, y, z = d['x'], d['y'], d['z']
+            xs, ys, zs = self._stream_traj.setdefault(uid, ([], [], []))
+            xs.append(x)
+            ys.append(y)
+            zs.append(z)
+            art['traj'].set_data_3d(xs, ys, zs)
+
+            has_mission = bool(d['mission_start'] and d['mission_end'])
+            if has_mission:
+                (sx, sy), (ex, ey) = d['mission_start'], d['mission_end']
+                art['mission'].set_data_3d([sx, ex], [sy, ey],
+                                           [d['mission_start_z'], d['mission_end_z']])
+            ring_z = np.full_like(_RING_COS, z)
+            r_det, r_nmac = d['detection_radius'], d['nmac_radius']
+            art['detection'].set_data_3d(x + r_det * _RING_COS, y + r_det * _RING_SIN, ring_z)
+            art['nmac'].set_data_3d(x + r_nmac * _RING_COS, y + r_nmac * _RING_SIN, ring_z)
+            art['body']._offsets3d = ([x], [y], [z])
+            art['body'].set_sizes([(d['radius'] / max(r_det, 1.0) * 300) ** 2])
+            art['label'].set_position_3d((x, y, z))
+            self._show_uav(art, True, has_mission)
+
+        self._hide_absent(frame)
+        if self._extent is None:
+            self._fit_axis_3d(ax, frame)
+
+        # z limits: cover the UAV altitude range (vertiports are 1500–3500 m)
+        zs_all = [d['z'] for d in frame['uavs'].values()]
+        if zs_all:
+            ax.set_zlim3d(min(0.0, min(zs_all) - 500), max(zs_all) + 500)
+        else:
+            ax.set_zlim3d(0.0, 4000.0)
+        self._stream_title.set_text(f'UAM Simulation 3D — Step {frame["step"]}')
+
+    def _make_uav_artists(self, uid) -> Dict:
+        """Create (hidden) and register one UAV's persistent artists."""
+        ax = self._stream_ax
+        if self._sim_mode == '3D':
+            art = {
+                'traj':      ax.plot3D([], [], [], '-', color='#1f77b4', linewidth=1.5,
+                                       alpha=0.45)[0],
+                'mission':   ax.plot3D([], [], [], '--', color='gray', linewidth=1.2,
+                                       alpha=0.5)[0],
+                'detection': ax.plot(_RING_COS, _RING_SIN, 0.0, color='green', alpha=0.3,
+                                     linewidth=1.5, linestyle='--')[0],
+                'nmac':      ax.plot(_RING_COS, _RING_SIN, 0.0, color='orange', alpha=0.4,
+                                     linewidth=1.5)[0],
+                'body':      ax.scatter([0.0], [0.0], [0.0], color='blue', alpha=0.7),
+                'label':     ax.text(0.0, 0.0, 0.0, f'  {uid}', fontsize=8,
+                                     fontweight='bold', color='navy'),
+            }
+        else:
+            art = {
+                'traj':      ax.plot([], [], '-', color='#1f77b4', linewidth=1.5, alpha=0.45)[0],
+                'mission':   ax.plot([], [], '--', color='gray', linewidth=1.2, alpha=0.5,
+                                     zorder=2)[0],
+                'detection': ax.add_patch(Circle((0, 0), 1.0, fill=False, color='green', alpha=0.3,
+                                                 linewidth=1.5, linestyle='--', zorder=3)),
+                'nmac':      ax.add_patch(Circle((0, 0), 1.0, fill=False, color='orange',
+                                                 alpha=0.4, linewidth=1.5, zorder=3)),
+                'body':      ax.add_patch(Circle((0, 0), 1.0, fill=True, color='blue',
+                                                 alpha=0.7, zorder=4)),
+                'label':     ax.annotate(str(uid), (0, 0), textcoords='offset points',
+                                         xytext=(4, 4), fontsize=8, fontweight='bold',
+                                         color='navy', zorder=6),
+            }
+        if self._stream_background is not None:
+            for artist in art.values():
+                artist.set_animated(True)
+        self._show_uav(art, False, False)
+        self._stream_artists[uid] = art
+        return art
+
+    def _blit_frame(self) -> None:
+        """Restore the static background and redraw the animated artists
+        over it, in the z-order a full draw would use."""
+        ax = self._stream_ax
+        self._stream_fig.canvas.restore_region(self._stream_background)
+        animated = [a for a in ax.get_children() if a.get_animated() and a.get_visible()]
+        for artist in sorted(animated, key=lambda a: a.get_zorder()):
+            ax.draw_artist(artist)
+
+    def _hide_absent(self, frame: Dict) -> None:
+        """Hide the markers of UAVs missing from *frame*; their trails stay."""
+        for uid, art in self._stream_artists.items():
+            if uid not in frame['uavs']:
+                self._show_uav(art, False, False)
+
+    @staticmethod
+    def _show_uav(art: Dict, visible: bool, has_mission: bool) -> None:
+        for key in ('detection', 'nmac', 'body', 'label'):
+            art[key].set_visible(visible)
+        art['mission'].set_visible(visible and has_mission)
+
+    def _finish_stream(self, episode_id: int) -> None:
+        """Finalise the streamed files under the episode's output names."""
+        if not self._stream_frames:
+            print('[Renderer] No frames collected — skipping save.')
+            self._close_stream()
+            return
+        out_base = os.path.join(self.output_dir, f'{self.output_filename}_ep{episode_id}')
+        for writer, path, ext in self._stream_writers:
+            try:
+                writer.close()
+                os.replace(path, f'{out_base}.{ext}')
+                print(f'[Renderer] Saved → {out_base}.{ext}')
+            except Exception as exc:
+                print(f'[Renderer] {ext.upper()} save failed: {exc}')
+                self._discard_writer(writer, path)
+        self._stream_writers = []
+        self._close_stream()
+
+    def _close_stream(self) -> None:
+        """Drop the stream figure and artists, discarding any unfinished files."""
+        for writer, path, _ in self._stream_writers:
+            self._discard_writer(writer, path)
+        self._stream_writers = []
+        self._stream_fig     = None
+        self._stream_ax      = None
+        self._stream_title   = None
+        self._stream_artists = {}
+        self._stream_traj    = {}
+        self._stream_frames  = 0
+        self._stream_background = None
+
+    @staticmethod
+    def _discard_writer(writer, path: str) -> None:
+        try:
+            writer.close()
+        except Exception:
+            pass
+        if os.path.exists(path):
+            os.remove(path)
+
+    def close(self) -> None:
+        """Stop the real-time viewer process, if one was started."""
+        if self._viewer is not None:
+            self._viewer.close()
+            self._viewer = None
+
     # ------------------------------------------------------------------
     # Internal — real-time drawing
     # ------------------------------------------------------------------
 
+    def _publish_realtime(self, frame: Dict) -> None:
+        """Hand *frame* to the viewer process (started on the first frame)."""
+        if self._viewer is None:
+            self._viewer = RealtimeViewer(
+                type(self), self.config, self._sim_mode, self._airspace,
+                fps=self.realtime_fps, max_uavs=self.realtime_max_uavs,
+            )
+            # Stop the viewer and free its shared memory at interpreter exit
+            weakref.finalize(self, self._viewer.close)
+        self._viewer.publish(frame)
+
     def _draw_realtime(self, frame: Dict) -> None:
         if self._fig is None:
             if self._sim_mode == '3D':
@@ -244,16 +764,7 @@ class Renderer:
         # ----------------------------------------------------------------
         # 2D drawing path — unchanged from original implementation
         # ----------------------------------------------------------------
-        ax.set_aspect('equal')
-        ax.grid(True, linestyle='--', linewidth=0.5, alpha=0.4)
-
-        # ---- static map layer ----
-        self._draw_map(ax)
-
-        # ---- vertiports ----
-        if self._airspace is not None:
-            for vp in self._airspace.vertiport_list:
-                ax.plot(vp.x, vp.y, 'gs', markersize=2, zorder=5)
+        self._draw_static(ax)
 
         # ---- UAV trajectories ----
         for uid, pts in traj.items():
@@ -339,31 +850,9 @@ class Renderer:
         up_to_frame: Optional[int],
     ) -> None:
         """Draw one 3D animation frame onto a matplotlib Axes3D *ax*."""
-        ax.grid(True, linestyle='--', linewidth=0.5, alpha=0.4)
-
-        # ---- static map layer ----
-        self._draw_map_3d(ax)
-
-        # ---- vertiports ----
-        if self._airspace is not None:
-            # Box half-width proportional to map scale
-            if self._extent is not None:
-                dh = (self._extent[1] - self._extent[0]) * 0.008
-            else:
-                dh = 200.0
-            for vp in self._airspace.vertiport_list:
-                vp_z = vp.location.z if vp.location.has_z else 0.0
-                # Draw vertiport as a tower: base at z=0, top at the vertiport altitude.
-                # This roots each pad to the ground and makes altitude immediately legible.
-                ax.bar3d(
-                    vp.x - dh, vp.y - dh, 0.0,
-                    dh * 2, dh * 2, vp_z,
-                    color='green', alpha=0.7, zsort='average',
-                )
+        self._draw_static_3d(ax)
 
         # ---- UAV trajectories ----
-        _theta = np.linspace(0, 2 * math.pi, 64)
-
         for uid, pts in traj.items():
             if up_to_frame is None:
                 # real-time: pts are (x, y, z)
@@ -392,8 +881,8 @@ class Renderer:
             # Detection radius — equatorial ring (green dashed)
             r_det = d['detection_radius']
             ax.plot(
-                x + r_det * np.cos(_theta),
-                y + r_det * np.sin(_theta),
+                x + r_det * _RING_COS,
+                y + r_det * _RING_SIN,
                 z,
                 color='green', alpha=0.3, linewidth=1.5, linestyle='--',
             )
@@ -401,8 +890,8 @@ class Renderer:
             # NMAC radius — equatorial ring (orange)
             r_nmac = d['nmac_radius']
             ax.plot(
-                x + r_nmac * np.cos(_theta),
-                y + r_nmac * np.sin(_theta),
+                x + r_nmac * _RING_COS,
+                y + r_nmac * _RING_SIN,
                 z,
                 color='orange', alpha=0.4, linewidth=1.5,
             )
@@ -443,6 +932,130 @@ class Renderer:
     # Internal — map drawing helpers
     # ------------------------------------------------------------------
 
+    def _draw_static(self, ax) -> Optional[Line2D]:
+        """Draw the per-episode static 2D layer: grid, map and vertiports.
+
+        With a fixed extent the map is the pre-rendered _map_raster() image;
+        otherwise (no airspace extent) it is drawn as vectors by _draw_map().
+
+        Returns:
+            The vertiport marker Line2D, or None without vertiports.
+        """
+        ax.set_aspect('equal')
+        ax.grid(True, linestyle='--', linewidth=0.5, alpha=0.4)
+
+        # ---- static map layer ----
+        raster = self._map_raster()
+        if raster is not None:
+            # zorder 0 keeps the grid above the map, as with the vector layer
+            ax.imshow(raster, extent=self._extent, origin='upper', zorder=0)
+        else:
+            self._draw_map(ax)
+
+        # ---- vertiports ----
+        if self._airspace is None or not self._airspace.vertiport_list:
+            return None
+        xs = [vp.x for vp in self._airspace.vertiport_list]
+        ys = [vp.y for vp in self._airspace.vertiport_list]
+        return ax.plot(xs, ys, 'gs', markersize=2, zorder=5)[0]
+
+    def _draw_static_3d(self, ax) -> None:
+        """Draw the per-episode static 3D layer: grid, map and vertiport towers."""
+        ax.grid(True, linestyle='--', linewidth=0.5, alpha=0.4)
+
+        # ---- static map layer ----
+        self._draw_map_3d(ax)
+
+        # ---- vertiports ----
+        if self._airspace is not None and self._airspace.vertiport_list:
+            # Box half-width proportional to map scale
+            if self._extent is not None:
+                dh = (self._extent[1] - self._extent[0]) * 0.008
+            else:
+                dh = 200.0
+            vps = self._airspace.vertiport_list
+            xs = np.array([vp.x for vp in vps])
+            ys = np.array([vp.y for vp in vps])
+            zs = np.array([vp.location.z if vp.location.has_z else 0.0 for vp in vps])
+            # Draw each vertiport as a tower: base at z=0, top at the vertiport altitude.
+            # This roots each pad to the ground and makes altitude immediately legible.
+            ax.bar3d(
+                xs - dh, ys - dh, 0.0,
+                dh * 2, dh * 2, zs,
+                color='green', alpha=0.7, zsort='average',
+            )
+
+    def _static_cached(self, name: str, build: Callable[[], Any]) -> Any:
+        """Return static layer data *name*, calling build() on first use.
+
+        Entries live until reset() brings a different airspace or extent.
+        """
+        if name not in self._static_cache:
+            self._static_cache[name] = build()
+        return self._static_cache[name]
+
+    def _map_raster(self) -> Optional[np.ndarray]:
+        """RGBA image of _draw_map() covering the extent, or None without one.
+
+        Rendered once per airspace and extent.  With map_cache_dir set it is
+        also kept there as map_<key>.npy, so later episodes, render_log()
+        workers and runs over the same airspace load it instead.
+        """
+        if self._airspace is None or self._extent is None:
+            return None
+        return self._static_cached('map_raster', self._load_map_raster)
+
+    def _load_map_raster(self) -> np.ndarray:
+        if not self.map_cache_dir:
+            return self._rasterize_map()
+        path = os.path.join(self.map_cache_dir, f'map_{self._map_cache_key()}.npy')
+        if os.path.exists(path):
+            return np.load(path)
+        raster = self._rasterize_map()
+        os.makedirs(self.map_cache_dir, exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp.npy'
+        np.save(tmp, raster)
+        os.replace(tmp, path)
+        return raster
+
+    def _rasterize_map(self) -> np.ndarray:
+        """Draw the map on a transparent off-screen figure spanning the extent."""
+        xmin, xmax, ymin, ymax = self._extent
+        scale = MAP_RASTER_PX / max(xmax - xmin, ymax - ymin)
+        width, height = max(1, round((xmax - xmin) * scale)), max(1, round((ymax - ymin) * scale))
+        fig = Figure(figsize=(width / DPI, height / DPI), dpi=DPI)
+        fig.patch.set_alpha(0.0)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_axes((0, 0, 1, 1))
+        ax.set_axis_off()
+        self._draw_map(ax)
+        ax.set_aspect('auto')                   # GeoDataFrame.plot() sets 'equal'
+        ax.set_xlim(xmin, xmax)
+        ax.set_ylim(ymin, ymax)
+        canvas.draw()
+        return np.array(canvas.buffer_rgba())
+
+    def _map_cache_key(self) -> str:
+        """Digest of what the map raster depends on: renderer class, raster
+        size, extent and the WKB of every map geometry."""
+        digest = hashlib.sha1(repr((
+            f'{type(self).__module__}.{type(self).__qualname__}', MAP_RASTER_PX, DPI,
+            tuple(float(v) for v in self._extent),
+        )).encode())
+        layers = []
+        try:
+            layers.append(self._airspace.location_utm_gdf.geometry)
+            for tag in self._airspace.location_tags.keys():
+                layers.append(self._airspace.location_utm[tag].geometry)
+                layers.append(self._airspace.location_utm_buffer[tag].geometry)
+        except Exception:
+            pass
+        for layer in layers:
+            digest.update(b'|')
+            for geom in layer:
+                digest.update(geom.wkb)
+        return digest.hexdigest()[:16]
+
     def _draw_map(self, ax) -> None:
         """Draw airspace boundary and restricted areas onto a 2D ax."""
         if self._airspace is None:
@@ -468,14 +1081,25 @@ class Renderer:
     def _draw_map_3d(self, ax) -> None:
         """Draw airspace boundary and restricted areas onto a 3D ax at z=0.
 
-        Each polygon is clipped to the current viewport extent before being
-        added as a Poly3DCollection.  Without clipping, the full UTM boundary
-        (tens of kilometres across) extends far beyond the visible XY plane and
-        produces rendering artefacts in matplotlib's 3D projection.
+        The clipped polygons come from _map_rings_3d() (computed once per
+        airspace and extent); each layer is added as one Poly3DCollection.
         """
         if self._airspace is None:
             return
-
+        boundary, restricted = self._static_cached('map_rings_3d', self._map_rings_3d)
+        if boundary:
+            ax.add_collection3d(Poly3DCollection(boundary, alpha=0.2, color='gray', linewidth=0.6))
+        if restricted:
+            ax.add_collection3d(Poly3DCollection(restricted, alpha=0.5, color='red'))
+
+    def _map_rings_3d(self) -> Tuple[List, List]:
+        """Boundary and restricted-area rings [(x, y, 0.0), ...] for 3D.
+
+        Each polygon is clipped to the current viewport extent.  Without
+        clipping, the full UTM boundary (tens of kilometres across) extends
+        far beyond the visible XY plane and produces rendering artefacts in
+        matplotlib's 3D projection.
+        """
         # Build a Shapely clip box from the renderer extent.  Falls back to
         # a very large box (effectively no clip) when extent is not yet set.
         if self._extent is not None:
@@ -499,33 +1123,28 @@ class Renderer:
                     result.append([(cx, cy, 0.0) for cx, cy in part.exterior.coords])
             return result or None
 
+        boundary: List = []
+        restricted: List = []
+
         # Airspace boundary
         try:
             geom  = self._airspace.location_utm_gdf.geometry.iloc[0]
             polys = geom.geoms if hasattr(geom, 'geoms') else [geom]
             for poly in polys:
-                rings = _clipped_verts(poly)
-                if rings:
-                    ax.add_collection3d(
-                        Poly3DCollection(rings, alpha=0.2, color='gray', linewidth=0.6)
-                    )
+                boundary.extend(_clipped_verts(poly) or [])
         except Exception:
             pass
 
         # Restricted areas
         try:
             for tag in self._airspace.location_tags.keys():
-                for _, row in self._airspace.location_utm[tag].iterrows():
-                    geom  = row.geometry
+                for geom in self._airspace.location_utm[tag].geometry:
                     polys = geom.geoms if hasattr(geom, 'geoms') else [geom]
                     for poly in polys:
-                        rings = _clipped_verts(poly)
-                        if rings:
-                            ax.add_collection3d(
-                                Poly3DCollection(rings, alpha=0.5, color='red')
-                            )
+                        restricted.extend(_clipped_verts(poly) or [])
         except Exception:
             pass
+        return boundary, restricted
 
     # ------------------------------------------------------------------
     # Internal — frame building & utilities
@@ -602,3 +1221,19 @@ class Renderer:
         margin = max(500.0, (max(xs) - min(xs)) * 0.15, (max(ys) - min(ys)) * 0.15)
         ax.set_xlim3d(min(xs) - margin, max(xs) + margin)
         ax.set_ylim3d(min(ys) - margin, max(ys) + margin)
+
+
+def _render_log_segment(
+    renderer_cls: type,
+    config,
+    simulator_mode: str,
+    airspace,
+    episode_dir: str,
+    *segment_args,
+) -> Dict[str, str]:
+    """Process-pool target for Renderer.render_log(): render one segment."""
+    import matplotlib
+    matplotlib.use('Agg')
+    renderer = renderer_cls(config, simulator_mode)
+    renderer.reset(airspace)
+    return renderer._render_log_segment(EpisodeArrays.load(episode_dir), *segment_args)
@@ -0,0 +1,303 @@
+import hashlib
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import shapely
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from shapely import Point, STRtree
+
+from urbannav.vertiport import Vertiport
+
+# Bumped whenever the build or the saved layout changes; part of the cache key
+ROUTE_NETWORK_VERSION = 2
+
+# Cache files are named route_network_<fingerprint>.npz inside cache_dir
+ROUTE_NETWORK_PREFIX = 'route_network_'
+
+# Candidate edges tested against the obstacles per batch while building
+_EDGE_BATCH = 200_000
+
+
+def restricted_area_polygons(airspace) -> List:
+    """Restricted-area geometries of an airspace (Airspace or TestbedAirspace).
+
+    The buffered series is preferred — a route that stays out of the buffer
+    also stays out of RA detection range; without one the raw RA polygons
+    are used.  An airspace without restricted areas gives [].
+    """
+    series = getattr(airspace, 'restricted_airspace_buffer_geo_series', None)
+    if series is None:
+        series = getattr(airspace, 'restricted_airspace_geo_series', None)
+    if series is None:
+        return []
+    return [geom for geom in getattr(series, 'geometry', series) if geom is not None and not geom.is_empty]
+
+
+class RouteNetwork:
+    """Shortest obstacle-free routes between every pair of vertiports.
+
+    A visibility graph is built once over the restricted airspace: each
+    restricted area is replaced by its convex hull (grown by `clearance`),
+    overlapping hulls are merged, and the corners of every merged hull —
+    simplified to within `corner_tolerance` metres (rounded buffers would
+    otherwise give a node per arc vertex) and pushed outwards so they keep
+    `corner_margin` metres from it — become graph nodes next to the
+    vertiports.  Two nodes are joined when the segment between them does not
+    enter any hull.  Dijkstra from every vertiport then gives all routes, so
+    a planner fetches a mission's waypoints with one lookup:
+
+        network = airspace.get_route_network()
+        waypoints = network.waypoints(uav.start_vertiport, uav.end_vertiport)
+
+    A vertiport inside a hull (a courtyard, or a pad on the restricted area
+    itself) may fly straight out of that hull — only edges touching the
+    vertiport ignore it, so every other route still goes around.  Vertiport
+    pairs with no route, and vertiports the network was not built for, get
+    the straight line.
+
+    Building costs one segment test per node pair, so networks are cached
+    on disk by load_or_build(), keyed on vertiport positions, obstacles and
+    clearance.
+    """
+
+    def __init__(self,
+                 vertiports: Sequence[Vertiport],
+                 node_xy: np.ndarray,
+                 length: np.ndarray,
+                 offsets: np.ndarray,
+                 nodes: np.ndarray,
+                 clearance: float = 0.0,
+                 fingerprint: str = '') -> None:
+        """
+        Args:
+            vertiports: Vertiports of rows/columns 0..n-1 (nodes 0..n-1).
+            node_xy: (n_nodes, 2) node positions, vertiports first.
+            length: (n, n) route lengths in metres; inf where unreachable.
+            offsets: (n * n + 1,) CSR offsets into nodes, pair (i, j) at i * n + j.
+            nodes: Node indices of every route, start and end included.
+            clearance: Clearance the network was built with.
+            fingerprint: Cache key of the build inputs (see cache_key()).
+        """
+        self.vertiports = list(vertiports)
+        self.node_xy = np.asarray(node_xy, dtype=float)
+        self.length = np.asarray(length, dtype=float)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.nodes = np.asarray(nodes, dtype=np.int64)
+        self.clearance = clearance
+        self.fingerprint = fingerprint
+        self.key = tuple(vp.id for vp in self.vertiports)
+        self._index: Dict[int, int] = {vp.id: k for k, vp in enumerate(self.vertiports)}
+        self._waypoints: Dict[Tuple[int, int], List[Point]] = {}
+
+    def __len__(self) -> int:
+        return len(self.vertiports)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def path(self, start: Vertiport, end: Vertiport) -> np.ndarray:
+        """(k, 2) route positions from *start* to *end*, both included."""
+        i, j = self._index.get(start.id), self._index.get(end.id)
+        if i is None or j is None:
+            return np.array([[start.location.x, start.location.y], [end.location.x, end.location.y]])
+        pair = i * len(self) + j
+        return self.node_xy[self.nodes[self.offsets[pair]:self.offsets[pair + 1]]]
+
+    def waypoints(self, start: Vertiport, end: Vertiport) -> List[Point]:
+        """Route from *start* to *end* as planner waypoints.
+
+        The first and last waypoints are the vertiport locations themselves;
+        corners in between take an altitude interpolated along the route when
+        the vertiports have one.
+        """
+        i, j = self._index.get(start.id), self._index.get(end.id)
+        if i is None or j is None or not np.isfinite(self.length[i, j]):
+            return [start.location, end.location]
+        cached = self._waypoints.get((i, j))
+        if cached is None:
+            xy = self.path(start, end)
+            corners = xy[1:-1]
+            if start.location.has_z and end.location.has_z:
+                travelled = np.cumsum(np.hypot(*np.diff(xy, axis=0).T))
+                z0, z1 = start.location.z, end.location.z
+                z = z0 + (z1 - z0) * travelled[:-1] / max(travelled[-1], 1e-9)
+                middle = [Point(x, y, h) for (x, y), h in zip(corners.tolist(), z.tolist())]
+            else:
+                middle = [Point(x, y) for x, y in corners.tolist()]
+            cached = self._waypoints[(i, j)] = [start.location, *middle, end.location]
+        return list(cached)
+
+    def distance(self, start: Vertiport, end: Vertiport) -> float:
+        """Route length in metres (the straight line for unknown vertiports)."""
+        i, j = self._index.get(start.id), self._index.get(end.id)
+        if i is None or j is None:
+            return start.location.distance(end.location)
+        return float(self.length[i, j])
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def cache_key(vertiports: Sequence[Vertiport],
+                    obstacles: Iterable,
+                    clearance: float = 0.0,
+                    corner_margin: float = 1.0,
+                    corner_tolerance: float = 10.0) -> str:
+        """Cache key of a build: vertiport positions, obstacles and parameters."""
+        digest = hashlib.sha1()
+        digest.update(np.array([ROUTE_NETWORK_VERSION, clearance, corner_margin, corner_tolerance],
+                               dtype=float).tobytes())
+        digest.update(np.array([(vp.location.x, vp.location.y) for vp in vertiports], dtype=float).tobytes())
+        for geom in obstacles:
+            digest.update(shapely.to_wkb(geom))
+        return digest.hexdigest()[:16]
+
+    @classmethod
+    def build(cls,
+              vertiports: Sequence[Vertiport],
+              obstacles: Iterable,
+              clearance: float = 0.0,
+              corner_margin: float = 1.0,
+              corner_tolerance: float = 10.0) -> 'RouteNetwork':
+        """Build the visibility graph and every vertiport-to-vertiport route.
+
+        Args:
+            vertiports: Route endpoints.
+            obstacles: Restricted-area geometries (see restricted_area_polygons()).
+            clearance: Extra distance in metres kept from every restricted area.
+            corner_margin: Least distance in metres between a hull and its corner nodes.
+            corner_tolerance: Largest distance in metres a hull's outline may
+                move when it is simplified to corner nodes.
+        """
+        obstacles = list(obstacles)
+        fingerprint = cls.cache_key(vertiports, obstacles, clearance, corner_margin, corner_tolerance)
+        vp_xy = np.array([(vp.location.x, vp.location.y) for vp in vertiports], dtype=float).reshape(-1, 2)
+        n = len(vp_xy)
+
+        hulls = [geom.convex_hull.buffer(clearance) if clearance > 0 else geom.convex_hull
+                 for geom in obstacles]
+        hulls = [hull for hull in hulls if hull.area > 0]
+        blocks = list(shapely.get_parts(shapely.unary_union(hulls))) if hulls else []
+        tree = STRtree(blocks)
+        # (vertiport, block) codes of vertiports enclosed by a hull; edges at
+        # such a vertiport may cross that hull so routes can leave it
+        vp_in, block_in = tree.query(shapely.points(vp_xy), predicate='intersects')
+        enclosed = vp_in * len(blocks) + block_in
+
+        # simplify() moves the outline by at most corner_tolerance, so growing the
+        # simplified hull by that much again keeps its corners outside the block
+        corners = [np.asarray(block.simplify(corner_tolerance)
+                              .buffer(corner_tolerance + corner_margin, join_style='mitre')
+                              .exterior.coords)[:-1] for block in blocks]
+        corner_xy = np.concatenate(corners) if corners else np.zeros((0, 2))
+        inside = tree.query(shapely.points(corner_xy), predicate='intersects')[0]
+        corner_xy = np.delete(corner_xy, np.unique(inside), axis=0)
+        node_xy = np.concatenate([vp_xy, corner_xy])
+
+        # Visibility edges: node pairs whose segment misses every hull.  An
+        # edge that only crosses hulls enclosing one of its vertiports may
+        # leave that vertiport, or enter it as the last edge of a route: it
+        # then ends on the vertiport's terminal copy (node n_nodes + j), which
+        # has no outgoing edges, so no route passes through an enclosed pad.
+        n_nodes = len(node_xy)
+        a, b = np.triu_indices(n_nodes, k=1)
+        blocked = np.zeros(len(a), dtype=bool)
+        crosses = np.zeros(len(a), dtype=bool)
+        from_a = np.ones(len(a), dtype=bool)
+        from_b = np.ones(len(a), dtype=bool)
+        if blocks:
+            for lo in range(0, len(a), _EDGE_BATCH):
+                hi = min(lo + _EDGE_BATCH, len(a))
+                segments = shapely.linestrings(np.stack([node_xy[a[lo:hi]], node_xy[b[lo:hi]]], axis=1))
+                seg, block = tree.query(segments, predicate='intersects')
+                edge = lo + seg
+                in_a = (a[edge] < n) & np.isin(a[edge] * len(blocks) + block, enclosed)
+                in_b = (b[edge] < n) & np.isin(b[edge] * len(blocks) + block, enclosed)
+                crosses[edge] = True
+                blocked[edge[~(in_a | in_b)]] = True
+                from_a[edge[~in_a]] = False
+                from_b[edge[~in_b]] = False
+        clear = ~crosses
+        exempt = crosses & ~blocked
+        weight = np.hypot(*(node_xy[a] - node_xy[b]).T)
+        parts = [(a[clear], b[clear]), (b[clear], a[clear]),
+                 (a[exempt & from_a], b[exempt & from_a]), (b[exempt & from_b], a[exempt & from_b])]
+        weights = [weight[clear], weight[clear], weight[exempt & from_a], weight[exempt & from_b]]
+        into_b, into_a = exempt & (b < n), exempt & (a < n)
+        parts += [(a[into_b], n_nodes + b[into_b]), (b[into_a], n_nodes + a[into_a])]
+        weights += [weight[into_b], weight[into_a]]
+        rows = np.concatenate([r for r, _ in parts])
+        cols = np.concatenate([c for _, c in parts])
+        graph = csr_matrix((np.concatenate(weights), (rows, cols)), shape=(n_nodes + n, n_nodes + n))
+
+        dist, predecessors = dijkstra(graph, directed=True, indices=np.arange(n), return_predecessors=True)
+        via_terminal = dist[:, n_nodes:] < dist[:, :n]
+        length = np.where(via_terminal, dist[:, n_nodes:], dist[:, :n])
+        np.fill_diagonal(length, 0.0)
+
+        offsets = np.zeros(n * n + 1, dtype=np.int64)
+        routes = []
+        for i in range(n):
+            for j in range(n):
+                if np.isfinite(length[i, j]) and i != j:
+                    route = [n_nodes + j if via_terminal[i, j] else j]
+                    while route[-1] != i:
+                        route.append(predecessors[i, route[-1]])
+                    route[0] = j
+                    route.reverse()
+                else:
+                    route = [i, j]
+                routes.append(route)
+                offsets[i * n + j + 1] = offsets[i * n + j] + len(route)
+        nodes = np.fromiter((k for route in routes for k in route), dtype=np.int64, count=int(offsets[-1]))
+        return cls(vertiports, node_xy, length, offsets, nodes, clearance=clearance, fingerprint=fingerprint)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """Write the network to an .npz file (vertiports are stored by position)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f, node_xy=self.node_xy, length=self.length, offsets=self.offsets, nodes=self.nodes,
+                     clearance=np.float64(self.clearance), fingerprint=np.array(self.fingerprint))
+
+    @classmethod
+    def load(cls, path: str, vertiports: Sequence[Vertiport]) -> 'RouteNetwork':
+        """Read a network saved by save(); *vertiports* are the ones it was built for."""
+        with np.load(path) as data:
+            node_xy = data['node_xy']
+            if len(vertiports) > len(node_xy) or (len(node_xy) and not np.allclose(
+                    node_xy[:len(vertiports)],
+                    [(vp.location.x, vp.location.y) for vp in vertiports])):
+                raise ValueError(f'Route network {path} was built for other vertiports')
+            return cls(vertiports, node_xy, data['length'], data['offsets'], data['nodes'],
+                       clearance=float(data['clearance']), fingerprint=str(data['fingerprint']))
+
+    @classmethod
+    def load_or_build(cls,
+                      vertiports: Sequence[Vertiport],
+                      obstacles: Iterable,
+                      clearance: float = 0.0,
+                      cache_dir: Optional[str] = None,
+                      corner_margin: float = 1.0,
+                      corner_tolerance: float = 10.0) -> 'RouteNetwork':
+        """Load the cached network for these inputs from *cache_dir*, or build
+        it and save it there.  cache_dir=None always builds."""
+        obstacles = list(obstacles)
+        if cache_dir is None:
+            return cls.build(vertiports, obstacles, clearance, corner_margin, corner_tolerance)
+        fingerprint = cls.cache_key(vertiports, obstacles, clearance, corner_margin, corner_tolerance)
+        path = os.path.join(cache_dir, f'{ROUTE_NETWORK_PREFIX}{fingerprint}.npz')
+        if os.path.exists(path):
+            return cls.load(path, vertiports)
+        network = cls.build(vertiports, obstacles, clearance, corner_margin, corner_tolerance)
+        network.save(path)
+        return network
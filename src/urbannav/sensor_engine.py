@@ -1,9 +1,12 @@
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
+import numpy as np
 from urbannav.uav import UAV
 from urbannav.uav_template import UAV_template
 from urbannav.sensor_template import Sensor
 from urbannav.component_schema import VALID_SENSORS
 from urbannav.sensor_partial import PartialSensor
+from urbannav.collision_result import UAV_DETECT, CollisionResult
+from urbannav.utils import compute_pair_time_to_impact, fleet_state_arrays
 
 # Maps VALID_SENSORS string names -> Sensor subclasses.
 # Only types with a concrete implementation are listed here.
@@ -33,7 +36,8 @@ class SensorEngine:
                  config,
                  sensor_uav_map: Dict[str, List[int]],
                  uav_dict: Dict[int, UAV|UAV_template],
-                 airspace=None) -> None:
+                 airspace=None,
+                 sensor_params: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
         """
         Args:
             config: UAMConfig instance.
@@ -41,11 +45,16 @@ class SensorEngine:
             uav_dict: Mapping uav_id -> UAV instance from ATC (live reference).
             airspace: Airspace instance for restricted area data (optional;
                       RA detection is a no-op until this is provided).
+            sensor_params: Optional sensor_name -> constructor kwargs, e.g. the
+                      output of a previous engine's get_tuned_sensor_params().
         """
         self.config = config
         self.sensor_uav_map = sensor_uav_map  # mapping: sensor_name -> [uav_id, ...]
         self.uav_dict = uav_dict              # mapping: uav_id -> UAV
         self.airspace = airspace
+        self.sensor_params: Dict[str, Dict[str, Any]] = sensor_params or {}
+        # Populated by register_uav_sensors(): sensor_name -> shared Sensor instance
+        self.sensor_type_map: Dict[str, Sensor] = {}
         # Populated by register_uav_sensors(): uav_id -> Sensor instance
         self.sensor_obj_map: Dict[int, Sensor] = {}
 
@@ -83,7 +92,7 @@ class SensorEngine:
             # as max(detection_radius) across the fleet on the first step, which
             # bounds each broad-phase query to ~3x3x3 cells (see PartialSensor
             # docstring), instead of sizing cells off UAV body radius (~30x30x30 cells).
-            instance = SENSOR_CLASS_MAP[sensor_name]()
+            instance = SENSOR_CLASS_MAP[sensor_name](**self._sensor_kwargs(sensor_name))
             # Inject restricted area geometry if available
             if self.airspace is not None:
                 ra_data = getattr(self.airspace, 'restricted_airspace_geo_series', None)
@@ -97,11 +106,73 @@ class SensorEngine:
             sensor_obj = type_to_instance[sensor_name]
             for uav_id in uav_id_list:
                 self.sensor_obj_map[uav_id] = sensor_obj
+        self.sensor_type_map = type_to_instance
+
+    def _sensor_kwargs(self, sensor_name: str) -> Dict[str, Any]:
+        """Constructor kwargs for sensor_name from sensor_params and config.sensor."""
+        kwargs = dict(self.sensor_params.get(sensor_name, {}))
+        sensor_cfg = getattr(self.config, 'sensor', None)
+        if sensor_cfg is not None and (sensor_cfg.collect_broad_phase_stats or sensor_cfg.auto_tune):
+            kwargs['collect_stats'] = True
+        return kwargs
 
     # ------------------------------------------------------------------
     # Per-step query methods (called by SimulatorManager._step_uavS())
     # ------------------------------------------------------------------
 
+    def _update_sensors(self) -> None:
+        """Call update(uav_dict) once per unique Sensor instance."""
+        # Rebuild hash once per unique sensor instance (guard against shared instances)
+        seen_instances: set = set()
+        for sensor_obj in self.sensor_obj_map.values():
+            if id(sensor_obj) not in seen_instances:
+                sensor_obj.update(self.uav_dict)
+                seen_instances.add(id(sensor_obj))
+
+    def get_collision_result(self) -> CollisionResult:
+        """Rebuild spatial hashes and return all five categories as one CollisionResult.
+
+        Single pass over the fleet replacing the five get_* calls below: each
+        UAV's detection / NMAC / collision chain is queried once and written
+        straight into flat pair lists, instead of into five per-UAV dicts.
+
+        Returns:
+            CollisionResult covering ra_detect, uav_detect, nmac, ra_collision
+            and uav_collision for every UAV in uav_dict.
+        """
+        self._update_sensors()
+
+        uav_ids: List[int] = []
+        counts: List[int] = []
+        partners: List[int] = []
+        nmac_flags: List[bool] = []
+        col_flags: List[bool] = []
+        ra_counts: List[int] = []
+        ra_ids: List[int] = []
+        ra_col_flags: List[bool] = []
+
+        for uav_id in self.uav_dict:
+            sensor = self.sensor_obj_map[uav_id]
+            detected = sensor.get_uav_detection(uav_id)
+            nmac = sensor.get_nmac(uav_id)
+            collided = sensor.get_uav_collision(uav_id)
+            uav_ids.append(uav_id)
+            counts.append(len(detected))
+            for other_id in detected:
+                partners.append(other_id)
+                nmac_flags.append(other_id in nmac)
+                col_flags.append(other_id in collided)
+
+            ra_detected = sensor.get_ra_detection(uav_id)
+            ra_collided = sensor.get_ra_collision(uav_id)
+            ra_counts.append(len(ra_detected))
+            for ra_id in ra_detected:
+                ra_ids.append(ra_id)
+                ra_col_flags.append(ra_id in ra_collided)
+
+        return CollisionResult.build(uav_ids, counts, partners, nmac_flags, col_flags,
+                                     ra_counts, ra_ids, ra_col_flags)
+
     def get_detection_other_uavS(self) -> Dict[int, set]:
         """Rebuild spatial hashes then return detected UAV IDs per UAV.
 
@@ -112,12 +183,7 @@ class SensorEngine:
         Returns:
             Dict[int, List[int]]: { uav_id -> [detected_uav_id, ...] }
         """
-        # Rebuild hash once per unique sensor instance (guard against shared instances)
-        seen_instances: set = set()
-        for sensor_obj in self.sensor_obj_map.values():
-            if id(sensor_obj) not in seen_instances:
-                sensor_obj.update(self.uav_dict)
-                seen_instances.add(id(sensor_obj))
+        self._update_sensors()
 
         detection_dict: Dict[int, set] = {}
         for uav_id in self.uav_dict:
@@ -177,3 +243,49 @@ class SensorEngine:
         for uav_id in self.uav_dict:
             collision_dict[uav_id] = self.sensor_obj_map[uav_id].get_ra_collision(uav_id)
         return collision_dict
+
+    def get_time_to_impact(self,
+                           collisions: CollisionResult,
+                           category: int = UAV_DETECT) -> Dict[str, np.ndarray]:
+        """Vectorized time-to-impact / closest approach for every pair in category.
+
+        Pairs involving UAVs no longer in uav_dict (e.g. removed after a
+        collision this step) are dropped.
+
+        Args:
+            collisions: This step's CollisionResult.
+            category: UAV-UAV category whose pairs to evaluate (default: detections).
+
+        Returns:
+            Dict with 'pairs' (K, 2) undirected id pairs and aligned (K,)
+            arrays 'ttc', 't_cpa', 'd_cpa' (see utils.compute_time_to_impact_batch).
+        """
+        fleet_state = fleet_state_arrays(self.uav_dict)
+        pairs = collisions.unique_pairs(category)
+        pairs = pairs[np.isin(pairs, fleet_state[0]).all(axis=1)]
+        ttc, t_cpa, d_cpa = compute_pair_time_to_impact(self.uav_dict, pairs, fleet_state)
+        return {'pairs': pairs, 'ttc': ttc, 't_cpa': t_cpa, 'd_cpa': d_cpa}
+
+    # ------------------------------------------------------------------
+    # Broad-phase diagnostics
+    # ------------------------------------------------------------------
+
+    def get_broad_phase_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return this step's broad-phase counters per sensor type.
+
+        Returns:
+            Dict[str, dict]: { sensor_name -> Sensor.get_broad_phase_stats() }
+            for sensor types that expose counters.
+        """
+        return {name: sensor.get_broad_phase_stats()
+                for name, sensor in self.sensor_type_map.items()
+                if hasattr(sensor, 'get_broad_phase_stats')}
+
+    def get_tuned_sensor_params(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-sensor-type constructor kwargs tuned from this episode.
+
+        Pass the result as sensor_params to the next episode's SensorEngine.
+        """
+        return {name: sensor.get_tuned_params()
+                for name, sensor in self.sensor_type_map.items()
+                if hasattr(sensor, 'get_tuned_params')}
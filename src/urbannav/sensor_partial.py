@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from shapely.geometry import Point
 from urbannav.sensor_template import Sensor
 from urbannav.sensor_spatial_hash import SpatialHash, _euclidean_3d
@@ -31,9 +31,26 @@ class PartialSensor(Sensor):
     (SpatialHash class) and implemented below as get_nmac / get_uav_collision.
     Both sensor_partial.py and the future sensor_global.py import from that
     shared utility module.
+
+    Broad-phase quality counters (collect_stats=True):
+        Per step — queries issued, candidates examined (excluding self),
+        true detections, bucket occupancy histogram, load factor and hash
+        collisions — via get_broad_phase_stats().  Totals are accumulated
+        over the episode and drive get_tuned_params(), which proposes a
+        spacing / table_size for the next episode.  Dense vertiport clusters
+        are the usual reason the defaults degrade: many UAVs share one cell,
+        so each query examines far more candidates than it detects.
     """
 
-    def __init__(self, spacing: float|None = None, max_uavs: int = 200) -> None:
+    # Auto-tuning thresholds (see get_tuned_params)
+    _LOW_PRECISION: float = 0.2        # detections / candidates below this -> shrink spacing
+    _HIGH_PRECISION: float = 0.6       # above this -> grow spacing back towards max radius
+    _MIN_SPACING_FRACTION: float = 0.25  # spacing floor as a fraction of min detection_radius
+    _MAX_COLLISION_RATE: float = 0.05  # hash collisions / distinct cells above this -> double table_size
+
+    def __init__(self, spacing: float|None = None, max_uavs: int = 200,
+                 table_size: Optional[int] = None,
+                 collect_stats: bool = False) -> None:
         """
         Args:
             spacing: Grid cell size in metres.  Should be >= the largest
@@ -41,13 +58,32 @@ class PartialSensor(Sensor):
                      most a 3x3x3 block of cells.  If None, computed lazily
                      on the first update() call as max(detection_radius).
             max_uavs: Pre-allocated capacity for internal arrays.
+            table_size: Number of spatial-hash buckets.  If None, the hash
+                        uses 2 * max_uavs and grows with the fleet.
+            collect_stats: Record broad-phase quality counters each step.
         """
         super().__init__()
         self._spacing = spacing
         self._max_uavs: int = max_uavs
-        self._spatial_hash: Optional[SpatialHash] = SpatialHash(spacing, max_uavs) if spacing is not None else None
+        self._table_size: Optional[int] = table_size
+        self._collect_stats: bool = collect_stats
+        self._spatial_hash: Optional[SpatialHash] = (
+            SpatialHash(spacing, max_uavs, table_size, track_stats=collect_stats)
+            if spacing is not None else None
+        )
         self._uav_dict: Dict[int, UAV] = {}
 
+        # Broad-phase counters — per step (reset in update) and per episode
+        self._step_queries: int = 0
+        self._step_candidates: int = 0
+        self._step_detections: int = 0
+        self._episode_stats: Dict[str, float] = {
+            'steps': 0, 'queries': 0, 'candidates_examined': 0, 'true_detections': 0,
+            'hash_collisions': 0, 'distinct_cells': 0,
+        }
+        self._min_detection_radius: Optional[float] = None
+        self._max_detection_radius: Optional[float] = None
+
         # Restricted airspace spatial hash (built once — RA is static)
         self._ra_spatial_hash: Optional[SpatialHash] = None
         self._ra_hash_built: bool = False
@@ -120,6 +156,9 @@ class PartialSensor(Sensor):
         self._collision_cache.clear()
         self._ra_detection_cache.clear()
         self._ra_collision_cache.clear()
+        self._step_queries = 0
+        self._step_candidates = 0
+        self._step_detections = 0
 
         if not uav_dict:
             return
@@ -132,10 +171,26 @@ class PartialSensor(Sensor):
         current_count = len(uav_dict)
         if self._spatial_hash is None or current_count > self._max_uavs:
             self._max_uavs = max(current_count, self._max_uavs)
-            self._spatial_hash = SpatialHash(self._spacing, self._max_uavs)
+            table_size = self._table_size
+            if table_size is not None:
+                table_size = max(table_size, 2 * self._max_uavs)
+            self._spatial_hash = SpatialHash(self._spacing, self._max_uavs, table_size,
+                                             track_stats=self._collect_stats)
 
         self._spatial_hash.build(uav_dict)
 
+        if self._collect_stats:
+            radii = [uav.detection_radius for uav in uav_dict.values()]
+            lo, hi = min(radii), max(radii)
+            if self._min_detection_radius is None or lo < self._min_detection_radius:
+                self._min_detection_radius = lo
+            if self._max_detection_radius is None or hi > self._max_detection_radius:
+                self._max_detection_radius = hi
+            ep = self._episode_stats
+            ep['steps'] += 1
+            ep['hash_collisions'] += self._spatial_hash.hash_collisions()
+            ep['distinct_cells'] += self._spatial_hash.distinct_cells
+
         # Build RA spatial hash once (restricted airspace is static)
         if not self._ra_hash_built and self._ra_positions and self._spacing:
             num_ra = len(self._ra_positions)
@@ -164,26 +219,40 @@ class PartialSensor(Sensor):
             return self._detection_cache[uav_id]
 
         uav = self._uav_dict[uav_id]
+        detected: set[int] = set()
+
+        # Sensor off (near a vertiport) -> nothing detected.  Checked before the
+        # broad phase so grounded/landing UAVs packed into one vertiport cell
+        # do not pay for a query whose candidates would all be discarded.
+        if not uav.get_sensor_operational():
+            self._detection_cache[uav_id] = detected
+            return detected
+
         candidates = self._spatial_hash.query(
             (uav.px, uav.py, uav.pz), uav.detection_radius
         )
 
-        detected: set[int] = set()
-
-        # if UAV sensors are active fill the detected list
-        if uav.get_sensor_operational():
-            for candidate_id in candidates:
-                if candidate_id == uav_id:
-                    continue
-                other = self._uav_dict.get(candidate_id)
-                if other is None:
-                    continue
-                dist = _euclidean_3d(uav.px, uav.py, uav.pz,
-                                    other.px, other.py, other.pz)
-                if dist <= uav.detection_radius:
-                    detected.add(candidate_id)
-        else:
-            detected = set()
+        examined = 0
+        for candidate_id in candidates:
+            if candidate_id == uav_id:
+                continue
+            examined += 1
+            other = self._uav_dict.get(candidate_id)
+            if other is None:
+                continue
+            dist = _euclidean_3d(uav.px, uav.py, uav.pz,
+                                other.px, other.py, other.pz)
+            if dist <= uav.detection_radius:
+                detected.add(candidate_id)
+
+        if self._collect_stats:
+            self._step_queries += 1
+            self._step_candidates += examined
+            self._step_detections += len(detected)
+            ep = self._episode_stats
+            ep['queries'] += 1
+            ep['candidates_examined'] += examined
+            ep['true_detections'] += len(detected)
 
         self._detection_cache[uav_id] = detected
         return detected
@@ -330,6 +399,94 @@ class PartialSensor(Sensor):
         self._ra_collision_cache[uav_id] = collisions_ra
         return collisions_ra
 
+    # ------------------------------------------------------------------
+    # Broad-phase quality statistics and auto-tuning
+    # ------------------------------------------------------------------
+
+    def get_broad_phase_stats(self) -> Dict[str, Any]:
+        """Return broad-phase quality counters for the current step.
+
+        Counters are zero unless the sensor was built with collect_stats=True.
+
+        Returns:
+            Dict with:
+              queries              — spatial-hash queries issued this step
+              candidates_examined  — candidates returned, excluding the querying UAV
+              true_detections      — candidates that passed the narrow phase
+              precision            — true_detections / candidates_examined
+              load_factor          — entries / buckets in the UAV hash
+              occupied_buckets     — buckets holding at least one UAV
+              hash_collisions      — distinct cells sharing a bucket
+              occupancy_histogram  — list; [k] = buckets holding exactly k UAVs
+              spacing, table_size  — current hash parameters
+        """
+        sh = self._spatial_hash
+        return {
+            'queries': self._step_queries,
+            'candidates_examined': self._step_candidates,
+            'true_detections': self._step_detections,
+            'precision': (self._step_detections / self._step_candidates
+                          if self._step_candidates else 1.0),
+            'load_factor': sh.load_factor() if sh is not None else 0.0,
+            'occupied_buckets': sh.occupied_buckets() if sh is not None else 0,
+            'hash_collisions': sh.hash_collisions() if sh is not None else 0,
+            'occupancy_histogram': sh.occupancy_histogram().tolist() if sh is not None else [],
+            'spacing': self._spacing,
+            'table_size': sh.table_size if sh is not None else self._table_size,
+        }
+
+    def get_episode_broad_phase_stats(self) -> Dict[str, float]:
+        """Return the broad-phase counters accumulated since construction."""
+        return dict(self._episode_stats)
+
+    def get_tuned_params(self) -> Dict[str, Any]:
+        """Propose constructor kwargs for the next episode's PartialSensor.
+
+        Heuristic, driven by the episode counters:
+          - precision (true_detections / candidates_examined) below
+            _LOW_PRECISION -> halve spacing, floored at
+            _MIN_SPACING_FRACTION * min(detection_radius).  Queries then span
+            more, smaller cells, so a dense vertiport cluster no longer lands
+            in the same cell as every UAV passing overhead.
+          - precision above _HIGH_PRECISION -> double spacing, capped at
+            max(detection_radius) (fewer cells visited per query).
+          - hash collisions above _MAX_COLLISION_RATE of distinct cells ->
+            double table_size.  UAVs sharing one cell raise the load factor
+            without colliding, so it is reported but not used here.
+
+        Correctness does not depend on the result — query() walks every cell
+        overlapping the search box — only the broad-phase cost does.
+
+        Returns:
+            Dict with spacing, max_uavs, table_size and collect_stats.  Without
+            collected stats the current parameters are returned unchanged.
+        """
+        ep = self._episode_stats
+        spacing = self._spacing
+        table_size = (self._spatial_hash.table_size if self._spatial_hash is not None
+                      else self._table_size)
+
+        if ep['steps'] and spacing and ep['candidates_examined']:
+            precision = ep['true_detections'] / ep['candidates_examined']
+            if precision < self._LOW_PRECISION:
+                floor = self._MIN_SPACING_FRACTION * self._min_detection_radius
+                spacing = max(spacing * 0.5, floor)
+            elif precision > self._HIGH_PRECISION:
+                spacing = min(spacing * 2.0, self._max_detection_radius)
+
+        if ep['steps'] and table_size:
+            collision_rate = (ep['hash_collisions'] / ep['distinct_cells']
+                              if ep['distinct_cells'] else 0.0)
+            if collision_rate > self._MAX_COLLISION_RATE:
+                table_size *= 2
+
+        return {
+            'spacing': spacing,
+            'max_uavs': self._max_uavs,
+            'table_size': table_size,
+            'collect_stats': self._collect_stats,
+        }
+
     def _turn_off_landing_sensor(self, uav_id):
         uav = self._uav_dict[uav_id]
         if uav.current_position.distance(uav.end_vertiport.location) <= uav.sensor_shutoff_distance:
@@ -1,6 +1,6 @@
 import math
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from urbannav.uav import UAV
 
 def _euclidean_3d(x1: float, y1: float, z1: float,
@@ -29,14 +29,29 @@ class SpatialHash:
     References used in sensor_partial.py draft comments are preserved here.
     """
 
-    def __init__(self, spacing: float, max_uavs: int) -> None:
+    def __init__(self, spacing: float, max_uavs: int,
+                 table_size: Optional[int] = None, track_stats: bool = False) -> None:
+        """
+        Args:
+            spacing: Grid cell size in metres.
+            max_uavs: Capacity of the dense entry array.
+            table_size: Number of hash buckets.  Defaults to 2 * max_uavs.
+            track_stats: If True, build() also counts distinct occupied grid
+                         cells so hash_collisions() can report how many cells
+                         share a bucket.  Off by default — it adds a set
+                         insert per object to the build loop.
+        """
         self.spacing = spacing
         # Table sized at 2x UAV count to reduce hash collisions
-        self.table_size = 2 * max_uavs
+        self.table_size = table_size if table_size is not None else 2 * max_uavs
         # +1 guard index prevents out-of-bounds on the end-boundary lookup
         self.cell_start = np.zeros(self.table_size + 1, dtype=int)
         self.cell_entries = np.zeros(max_uavs, dtype=int)
 
+        self.track_stats = track_stats
+        self.num_entries: int = 0
+        self.distinct_cells: int = 0
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
@@ -80,12 +95,17 @@ class SpatialHash:
         """
         self.cell_start.fill(0)
         self.cell_entries.fill(0)
+        self.num_entries = len(positions)
 
         # Pass 1a: count entries per hash bucket
+        cells: set = set()
         for (x, y, z) in positions.values():
             xi, yi, zi = self._int_coords(x, y, z)
+            if self.track_stats:
+                cells.add((xi, yi, zi))
             h = self._hash_function(xi, yi, zi)
             self.cell_start[h] += 1
+        self.distinct_cells = len(cells)
 
         # Pass 1b: convert counts to exclusive end boundaries (prefix sum)
         total = 0
@@ -131,3 +151,32 @@ class SpatialHash:
                     for i in range(start, end):
                         candidate_ids.append(int(self.cell_entries[i]))
         return candidate_ids
+
+    # ------------------------------------------------------------------
+    # Broad-phase quality statistics
+    # ------------------------------------------------------------------
+
+    def bucket_counts(self) -> np.ndarray:
+        """Number of entries in each hash bucket after the last build()."""
+        return np.diff(self.cell_start)
+
+    def occupancy_histogram(self) -> np.ndarray:
+        """histogram[k] = number of buckets holding exactly k entries."""
+        return np.bincount(self.bucket_counts())
+
+    def load_factor(self) -> float:
+        """Entries per bucket (num_entries / table_size)."""
+        return self.num_entries / self.table_size if self.table_size else 0.0
+
+    def occupied_buckets(self) -> int:
+        """Number of buckets holding at least one entry."""
+        return int(np.count_nonzero(self.bucket_counts()))
+
+    def hash_collisions(self) -> int:
+        """Distinct grid cells that landed in an already-occupied bucket.
+
+        Only meaningful when track_stats=True; returns 0 otherwise.
+        """
+        if not self.track_stats:
+            return 0
+        return max(self.distinct_cells - self.occupied_buckets(), 0)
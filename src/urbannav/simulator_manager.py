@@ -1,17 +1,19 @@
 import datetime
 import random
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional, Union
 import numpy as np
 from urbannav.airspace import Airspace
 from urbannav.atc import ATC
 from urbannav.component_schema import UAMConfig
 from urbannav.sensor_engine import SensorEngine
+from urbannav.collision_result import CollisionResult
 from urbannav.planner_engine import PlannerEngine
 from urbannav.aer_bus import AerBus
 from urbannav.dynamics_engine import DynamicsEngine
 from urbannav.component_schema import UAVCommandBundle, ActionType, SimulatorState, build_fleet_blueprint
 from urbannav.component_schema import RESERVED_TYPE_SINGLE_AGENT_LEARNING, RESERVED_TYPE_MULTI_AGENT_LEARNING
-from urbannav.demand_model import DemandModelMixin
+from urbannav.demand_model import DemandModelMixin, DemandSchedule
+from urbannav.fleet_dispatcher import FleetDispatcher
 
 class SimulatorManager(DemandModelMixin):
     '''Primary class that orchestrates and manages assets/data_classes,
@@ -19,7 +21,7 @@ class SimulatorManager(DemandModelMixin):
 
     def __init__(self,
                  config:UAMConfig,
-                 lambda_matrix: Optional[np.ndarray] = None,
+                 lambda_matrix: Optional[Union[np.ndarray, DemandSchedule]] = None,
                  vertiport_region_map: Optional[Dict[int, int]] = None,
                  zone_region_map: Optional[Dict] = None):
         '''Initialize simulator manager
@@ -27,7 +29,9 @@ class SimulatorManager(DemandModelMixin):
                 config: UAMConfig — all existing simulator config.
                 lambda_matrix: np.ndarray of shape (N, N), units trips/min.
                     lambda_matrix[i][j] is the Poisson rate for trip requests
-                    from region i to region j. If None (default), the
+                    from region i to region j. A DemandSchedule instead
+                    gives time-varying rates (one matrix per period of
+                    simulation time). If None (default), the
                     demand-model path is off entirely and the simulator runs
                     the original random mission-assignment behavior.
                 vertiport_region_map: Dict mapping vertiport_id (int) to
@@ -51,11 +55,23 @@ class SimulatorManager(DemandModelMixin):
         # reset()/step() run zero demand-model code (default mission-sim path
         # is untouched).
         self.lambda_matrix = lambda_matrix
+        if isinstance(lambda_matrix, DemandSchedule) or lambda_matrix is None:
+            self.demand_schedule: Optional[DemandSchedule] = lambda_matrix
+        else:
+            self.demand_schedule = DemandSchedule(np.asarray(lambda_matrix))
         self.vertiport_region_map = vertiport_region_map if vertiport_region_map is not None else {}
-        self.n_regions = lambda_matrix.shape[0] if lambda_matrix is not None else 0
+        self.n_regions = self.demand_schedule.n_regions if self.demand_schedule is not None else 0
         self._demand_rng = np.random.default_rng(self.seed)
         self.zone_region_map: Dict = zone_region_map if zone_region_map is not None else {}
 
+        # Fleet rebalancing between vertiports (opt-in, demand-mode only)
+        dispatch_cfg = getattr(self.config, 'fleet_dispatch', None)
+        self.fleet_dispatcher: Optional[FleetDispatcher] = None
+        if dispatch_cfg is not None and dispatch_cfg.enabled:
+            self.fleet_dispatcher = FleetDispatcher(interval=dispatch_cfg.interval,
+                                                    method=dispatch_cfg.method,
+                                                    max_distance=dispatch_cfg.max_distance)
+
         return None
 
     def _init_airspace(self,):
@@ -67,8 +83,18 @@ class SimulatorManager(DemandModelMixin):
                             )
     
     def _init_atc(self):
-        return ATC(airspace=self.airspace, 
-                   seed=self.seed)
+        atc = ATC(airspace=self.airspace, 
+                  seed=self.seed)
+
+        # look-ahead conflict probe (opt-in); attached here so both the full
+        # and the soft (rebuild_airspace=False) reset paths keep it
+        probe_cfg = getattr(self.config, 'conflict_probe', None)
+        if probe_cfg is not None and probe_cfg.enabled:
+            atc.enable_conflict_probe(horizon=probe_cfg.horizon,
+                                      separation=probe_cfg.separation,
+                                      position_tolerance=probe_cfg.position_tolerance,
+                                      velocity_tolerance=probe_cfg.velocity_tolerance)
+        return atc
 
     def _initiate_simulator_assets(self,):
 
@@ -89,17 +115,26 @@ class SimulatorManager(DemandModelMixin):
         ##### Core components #####
         
         ### sensor ###
+        # auto_tune: carry spatial-hash parameters tuned on the previous
+        # episode's broad-phase counters into this episode's sensors
+        sensor_params = None
+        sensor_cfg = getattr(self.config, 'sensor', None)
+        if sensor_cfg is not None and sensor_cfg.auto_tune and getattr(self, 'sensor_module', None) is not None:
+            sensor_params = self.sensor_module.get_tuned_sensor_params()
         # collision_detector for COLLISION DETECTION/RESOLUTION
         self.sensor_module = SensorEngine(self.config, 
                                           self.atc.sensor_map, 
                                           self.atc.uav_dict,
-                                          airspace=self.airspace)
+                                          airspace=self.airspace,
+                                          sensor_params=sensor_params)
         
         # use config to send data to statemanager 
         ### Planner ###
         self.planner_module = PlannerEngine(self.config, 
                                             self.atc.planner_map, 
                                             self.atc.uav_dict)
+        # replan only when ATC announces a mission change
+        self.atc.add_mission_listener(self.planner_module.on_mission_change)
         
         ### Controller ###
         # AER_BUS handles state export and action import
@@ -194,6 +229,7 @@ class SimulatorManager(DemandModelMixin):
         self._create_data_class_state()
         
         self.sensor_module.register_uav_sensors()
+        self.planner_module.route_network = self._get_route_network()
         self.planner_module.register_uav_planners()
         self.controller_module.register_uav_controllers()
         self.dynamics_module.register_uav_dynamics()
@@ -217,6 +253,15 @@ class SimulatorManager(DemandModelMixin):
 
 
 
+    def _get_route_network(self,):
+        '''Route network of the current airspace when config.route_network is
+        enabled (built, or loaded from its cache_dir, once per airspace), else None.'''
+        route_cfg = getattr(self.config, 'route_network', None)
+        if route_cfg is None or not route_cfg.enabled:
+            return None
+        return self.airspace.get_route_network(clearance=route_cfg.clearance,
+                                               cache_dir=route_cfg.cache_dir)
+
     def initiate_external_systems(self,):
         return {'No external system':None}    
 
@@ -245,9 +290,13 @@ class SimulatorManager(DemandModelMixin):
         # no lambda_matrix was supplied at construction.
         if self.lambda_matrix is not None and self.vertiport_region_map:
             self._generate_demand()
+            # Fleet rebalancing tick (no-op unless fleet_dispatch.enabled):
+            # idle UAVs elsewhere head for vertiports with unserved queues
+            if self.fleet_dispatcher is not None and self.fleet_dispatcher.is_tick(self._state.currentstep):
+                self._rebalance_fleet()
 
         # stepS_uav: control_action -> dynamics -> state update
-        restricted_area_detect, uavs_detect, nmac, restricted_area_collision, uavs_collision = self._step_uavS(external_action_dict=external_control_actions_dict)
+        collisions = self._step_uavS(external_action_dict=external_control_actions_dict)
 
         #### ---------- ATC-UAV-Vertiport Mission Cycle ----------  ####
         #* PROCESS OF REACHING VERTIPROT
@@ -288,9 +337,8 @@ class SimulatorManager(DemandModelMixin):
                         # Falls back to the original random coin-flip
                         # assignment when no lambda_matrix is supplied.
                         if self.lambda_matrix is not None and self.vertiport_region_map:
-                            queue = self.departure_queues.get(vertiport.id, [])
-                            if queue:
-                                dest_vp_id, enqueue_step = queue.pop(0)
+                            if self.departure_queues.length(vertiport.id):
+                                dest_vp_id, enqueue_step = self.departure_queues.popleft(vertiport.id)
                                 self._dispatch_mission(uav_id, vertiport.id, dest_vp_id, enqueue_step)
                             else:
                                 self.atc.wait_at_vertiport(uav_id)
@@ -313,6 +361,11 @@ class SimulatorManager(DemandModelMixin):
 
         ####  ---------- ATC-UAV-Vertiport Mission Cycle ----------  ####
 
+        # Look-ahead conflict probe over the post-step fleet (no-op unless
+        # conflict_probe.enabled); result kept on atc.predicted_conflicts
+        if self.atc.conflict_probe is not None:
+            self.atc.probe_conflicts(self._state.currentstep * self.dt)
+
         # Step-level metric accumulation (opt-in; cheap no-op-equivalent
         # bookkeeping when demand-mode is off, since get_episode_metrics()
         # is only ever called by the demand-aware RL env).
@@ -321,7 +374,9 @@ class SimulatorManager(DemandModelMixin):
 
         # update: current_state.EXTERNAL_SYSTEMS
 
-        return restricted_area_detect, uavs_detect, nmac, restricted_area_collision, uavs_collision
+        # CollisionResult — unpacks/indexes like the former 5-tuple
+        # (ra_detect, uav_detect, nmac, ra_collision, uav_collision)
+        return collisions
 
 
 
@@ -366,37 +421,18 @@ class SimulatorManager(DemandModelMixin):
 
         return {**internal_plans_dict, **updated_external_plans_dict} # since internal is already unpacked, the control actions from external should be a single dict that will be unpacked in return 
     
-    def _merge_collision_dicts(
-        self,
-        collision_dict_uavS: Dict[int, set[int]],
-        collision_dict_ra: Dict[int, set[int]]
-    ) -> List[int]:
+    def _merge_collision_dicts(self, collisions: CollisionResult) -> List[int]:
         """
-        Extract all UAV IDs to remove from both collision dicts.
-
-        collision_dict_uavS: { uav_id -> [colliding_uav_id, ...] }
-            Detection is symmetric — every colliding UAV appears as a value
-            in its partner's entry, so iterating values captures all IDs.
+        Extract all UAV IDs to remove from this step's CollisionResult.
 
-        collision_dict_ra: { uav_id -> [ra_id, ...] }
-            Values are restricted area IDs (not UAV IDs). Only keys where
-            the value list is non-empty are UAV IDs to remove.
+        UAV-UAV: both members of every colliding pair (detection is
+            symmetric, so each pair appears in both directions anyway).
+        Restricted area: the UAV side of every (uav_id, ra_id) collision
+            pair — RA ids are never UAV ids.
         """
-        remove_uav_ids: set = set()
+        return collisions.removal_ids().tolist()
 
-        # UAV-UAV: values are UAV IDs (symmetric detection covers all involved UAVs)
-        for colliding_uavs in collision_dict_uavS.values():
-            if colliding_uavs:
-                remove_uav_ids.update(colliding_uavs)
-
-        # Restricted area: values are RA IDs — use keys only
-        for uav_id, ra_ids in collision_dict_ra.items():
-            if ra_ids:
-                remove_uav_ids.add(uav_id)
-
-        return list(remove_uav_ids)
-
-    def _step_uavS(self, external_action_dict: UAVCommandBundle) -> Tuple[Dict,Dict,Dict,Dict,Dict]:
+    def _step_uavS(self, external_action_dict: UAVCommandBundle) -> CollisionResult:
         '''Bring all sort of updates and execute them in this function '''
         
 
@@ -423,19 +459,14 @@ class SimulatorManager(DemandModelMixin):
         self.dynamics_module.step(actions_dict=updated_control_actions_dict)
 
         ### CHECK COLLISION ###
-        #TODO: run get_collision once - from collision operation stream out detection, nmac, and collision
-        # collision runs nmac which runs detection, so running these three means I am running detection 3 times, nmac twice and collsion once
-        detection_dict_restricted_area = self.sensor_module.get_detection_restricted_area() # <- pass uav_id_list
-        detection_dict_uavS = self.sensor_module.get_detection_other_uavS()
-        nmac_dict = self.sensor_module.get_nmac()
-        collision_dict_restricted_area = self.sensor_module.get_collision_restricted_area()
-        collision_dict_uavS = self.sensor_module.get_collision_uavS()
-        
-        #print(f'Collision ids: {collision_dict_uavS}')
+        # one pass: each UAV's detection -> nmac -> collision chain is queried
+        # once and returned as pair arrays (see collision_result.py)
+        collisions = self.sensor_module.get_collision_result()
+
         ### REMOVE UAV ###
         # remove UAVs that have collided
         #! check vertiports
-        uavs_to_remove = self._merge_collision_dicts(collision_dict_uavS, collision_dict_restricted_area)
+        uavs_to_remove = self._merge_collision_dicts(collisions)
         if self.config.simulator.persist_collided_uavs:
             self._mark_uavs_collided(uavs_to_remove)
         else:
@@ -443,7 +474,7 @@ class SimulatorManager(DemandModelMixin):
         
         # record their stats/metrics 
         
-        return detection_dict_restricted_area, detection_dict_uavS, nmac_dict, collision_dict_restricted_area, collision_dict_uavS
+        return collisions
         
 
 
@@ -3,6 +3,7 @@ from typing import List, Dict, Any, Tuple, Optional
 import numpy as np
 import pandas as pd
 from urbannav.simulator_manager import SimulatorManager
+from urbannav.demand_model import DemandSchedule
 from urbannav.renderer import Renderer
 from urbannav.logger import Logger
 from urbannav.component_schema import UAMConfig, ActionType, UAVCommand, UAVCommandBundle, SimulatorState, RESERVED_TYPE_SINGLE_AGENT_LEARNING
@@ -19,7 +20,11 @@ class UAMSimulator:
         Args:
             config_path         : path to the YAML simulator config file.
             od_matrix_path      : optional path to the Band 1 OD lambda matrix
-                                  (.npy or .csv). If None, the simulator falls
+                                  (.npy or .csv), or to a time-varying demand
+                                  schedule directory written by
+                                  DemandSchedule.save() (memory-mapped
+                                  (T, N, N) rates + period breakpoints in
+                                  minutes). If None, the simulator falls
                                   back to random mission assignment (no
                                   demand-driven dispatch) — this is the
                                   default, unchanged behavior.
@@ -37,14 +42,12 @@ class UAMSimulator:
 
         ##### Simulator Manager #####
         # Load OD demand matrix from Band 1 output if a path is supplied.
-        # Supports .npy (numpy array) and .csv (comma-delimited) formats.
+        # Supports .npy (numpy array) and .csv (comma-delimited) formats,
+        # and demand schedule directories (one matrix per time period).
         # None -> SimulatorManager runs the original random mission
         # assignment so the simulator runs unchanged in standalone use.
         if od_matrix_path is not None:
-            if od_matrix_path.endswith('.npy'):
-                lambda_matrix = np.load(od_matrix_path)
-            else:
-                lambda_matrix = np.loadtxt(od_matrix_path, delimiter=',')
+            lambda_matrix = DemandSchedule.load(od_matrix_path)
         else:
             lambda_matrix = None
 
@@ -81,7 +84,7 @@ class UAMSimulator:
 
     def _build_simulator_manager(
         self,
-        lambda_matrix: Optional[np.ndarray],
+        lambda_matrix: Optional[DemandSchedule],
         vertiport_region_map: Optional[Dict[int, int]],
         zone_region_map: Optional[Dict],
     ) -> SimulatorManager:
@@ -107,7 +110,7 @@ class UAMSimulator:
         self.simulator_manager.reset(rebuild_airspace=rebuild_airspace)
         # Pass the freshly-built airspace to the renderer so it can draw the map
         self.renderer.reset(self.simulator_manager.airspace)
-        self.logger.reset()
+        self.logger.reset(self.simulator_manager.airspace)
 
         # ---- log zero-th step ---- # 
         #TODO: call simulator_manager.get_state()
@@ -148,6 +151,13 @@ class UAMSimulator:
         self.renderer.save(episode_id=self.logger.episode_id)
 
 
+    def close(self) -> None:
+        """Wait for pending background log writes, stop the writer thread and
+        the realtime viewer process."""
+        self.logger.close()
+        self.renderer.close()
+
+
     def get_state(self):
         """Get current state snapshot"""
         return self.simulator_manager.get_state()
@@ -5,74 +5,104 @@ import numpy as np
 from shapely import Point
 
 def compute_time_to_impact(host_uav:UAV_template, other_uav:UAV_template):
-    host_pos = host_uav.current_position
-    other_pos = other_uav.current_position
-
-    host_vel = np.array([host_uav.current_speed*np.cos(host_uav.current_heading), host_uav.current_speed*np.sin(host_uav.current_heading)])
-    other_vel = np.array([other_uav.current_speed*np.cos(other_uav.current_heading), other_uav.current_speed*np.sin(other_uav.current_heading)])
-
-    combined_radius = host_uav.radius + other_uav.radius
-
-    v_rel = host_vel - other_vel
-
-    coll_cone_vec1, coll_cone_vec2 = tangent_vecs_from_external_pt(host_uav.current_position.x, 
-                                                                   host_uav.current_position.y, 
-                                                                   other_uav.current_position.x, 
-                                                                   other_uav.current_position.y, 
-                                                                   combined_radius)
-
-    if coll_cone_vec1 is None:
-        # collision already occurred ==> collision cone isn't meaningful anymore
-        return 0.0
-    else: 
-        # check if v_rel btwn coll_cone_vecs
-        # (B btwn A, C): https://stackoverflow.com/questions/13640931/how-to-determine-if-a-vector-is-between-two-other-vectors)
-
-        if (np.cross(coll_cone_vec1, v_rel) * np.cross(coll_cone_vec1, coll_cone_vec2) >= 0 and 
-            np.cross(coll_cone_vec2, v_rel) * np.cross(coll_cone_vec2, coll_cone_vec1) >= 0):
-            # quadratic eqn for soln to line from host agent pos along v_rel vector to collision circle
-            # circle: (x-a)**2 + (y-b)**2 = r**2
-            # line: y = v1/v0 *(x-px) + py
-            # solve for x: (x-a)**2 + ((v1/v0)*(x-px)+py-a)**2 = r**2
-            v0, v1 = v_rel
-            if abs(v0) < 1e-5 and abs(v1) < 1e-5:
-                # agents aren't moving toward each other ==> inf TTC
-                return np.inf
-
-            px, py = host_pos.x, host_pos.y
-            a, b = other_pos.x, other_pos.y
-            r = combined_radius
-            if abs(v0) < 1e-5: # vertical v_rel (solve for y, x known)
-                print("[warning] v0=0, and not yet handled")
-                x1 = x2 = px
-                A = 1
-                B = -2*b
-                C = b**2+(px-a)**2-r**2
-                y1 = (-B + np.sqrt(B**2 - 4*A*C)) / (2*A)
-                y2 = (-B - np.sqrt(B**2 - 4*A*C)) / (2*A)
-            else: # non-vertical v_rel (solve for x)
-                A = 1+(v1/v0)**2
-                B = -2*a + 2*(v1/v0)*(py-b-(v1/v0)*px)
-                C = a**2 - r**2 + ((v1/v0)*px - (py-b))**2
-
-                det = B**2 - 4*A*C
-                if det == 0:
-                    print("[warning] det == 0, so only one tangent pt")
-                elif det < 0:
-                    print("[warning] det < 0, so no tangent pts...")
-
-                x1 = (-B + np.sqrt(B**2 - 4*A*C)) / (2*A)
-                x2 = (-B - np.sqrt(B**2 - 4*A*C)) / (2*A)
-                y1 = (v1/v0)*(x1-px) + py
-                y2 = (v1/v0)*(x2-px) + py
-
-            d1 = np.linalg.norm([x1-px, y1-py])
-            d2 = np.linalg.norm([x2-px, y2-py])
-            d = min(d1, d2)
-            spd = np.linalg.norm(v_rel)
-            return d / spd 
-        else:
-            return np.inf
+    """Time until the two UAVs' bodies first touch, assuming constant 2D velocity.
+
+    Single-pair wrapper around compute_time_to_impact_batch(); velocities are
+    taken from current_speed / current_heading as before.
+
+    Returns:
+        0.0 if the bodies already overlap, np.inf if they never will.
+    """
+    host_vel = (host_uav.current_speed*np.cos(host_uav.current_heading),
+                host_uav.current_speed*np.sin(host_uav.current_heading))
+    other_vel = (other_uav.current_speed*np.cos(other_uav.current_heading),
+                 other_uav.current_speed*np.sin(other_uav.current_heading))
+
+    rel_pos = np.array([[other_uav.current_position.x - host_uav.current_position.x,
+                         other_uav.current_position.y - host_uav.current_position.y]])
+    rel_vel = np.array([[other_vel[0] - host_vel[0], other_vel[1] - host_vel[1]]])
+
+    ttc, _, _ = compute_time_to_impact_batch(rel_pos, rel_vel, host_uav.radius + other_uav.radius)
+    return float(ttc[0])
+
+def compute_time_to_impact_batch(rel_pos:np.ndarray, rel_vel:np.ndarray, combined_radius):
+    """Time to impact and closest point of approach for many pairs at once.
+
+    For each pair the other UAV moves relative to the host as p(t) = p + v*t.
+    Impact is the first t >= 0 with |p(t)| <= r, i.e. the smaller root of
+        (v.v) t^2 + 2 (p.v) t + (p.p - r^2) = 0
+    Degenerate pairs are resolved with masks instead of per-pair branches:
+        already overlapping (p.p <= r^2)      -> ttc = 0
+        no relative motion (v.v ~ 0)          -> ttc = inf, t_cpa = 0
+        diverging (p.v >= 0) or miss (disc<0) -> ttc = inf
+
+    Args:
+        rel_pos: (P, D) other position minus host position, D = 2 or 3.
+        rel_vel: (P, D) other velocity minus host velocity.
+        combined_radius: (P,) or scalar, sum of the two body radii.
+
+    Returns:
+        (ttc, t_cpa, d_cpa), each (P,):
+            ttc   — seconds until the bodies touch (0 if overlapping, inf if never)
+            t_cpa — seconds until closest approach, clipped to >= 0
+            d_cpa — centre distance at closest approach
+    """
+    p = np.asarray(rel_pos, dtype=float)
+    v = np.asarray(rel_vel, dtype=float)
+    r = np.broadcast_to(np.asarray(combined_radius, dtype=float), p.shape[:1])
+
+    a = np.einsum('ij,ij->i', v, v)
+    b = np.einsum('ij,ij->i', p, v)      # half of the linear coefficient
+    c = np.einsum('ij,ij->i', p, p) - r * r
+
+    moving = a > 1e-10
+    safe_a = np.where(moving, a, 1.0)
+
+    t_cpa = np.where(moving, np.maximum(-b / safe_a, 0.0), 0.0)
+    d_cpa = np.linalg.norm(p + v * t_cpa[:, None], axis=1)
+
+    disc = b * b - a * c
+    closing = moving & (b < 0.0) & (disc >= 0.0)
+    t_hit = (-b - np.sqrt(np.maximum(disc, 0.0))) / safe_a
+    ttc = np.where(c <= 0.0, 0.0, np.where(closing, t_hit, np.inf))
+
+    return ttc, t_cpa, d_cpa
+
+def fleet_state_arrays(uav_dict):
+    """Stack the fleet's 3D state for vectorized pair queries.
+
+    Args:
+        uav_dict: Mapping uav_id -> UAV.
+
+    Returns:
+        (ids, pos, vel, radius): ids (N,) sorted ascending, pos (N, 3),
+        vel (N, 3), radius (N,) — rows aligned with ids.
+    """
+    ids = np.fromiter(uav_dict.keys(), dtype=np.int64, count=len(uav_dict))
+    order = np.argsort(ids)
+    uavs = list(uav_dict.values())
+    pos = np.array([(u.px, u.py, u.pz) for u in uavs], dtype=float).reshape(-1, 3)
+    vel = np.array([(u.vx, u.vy, u.vz) for u in uavs], dtype=float).reshape(-1, 3)
+    radius = np.array([u.radius for u in uavs], dtype=float)
+    return ids[order], pos[order], vel[order], radius[order]
+
+def compute_pair_time_to_impact(uav_dict, pairs:np.ndarray, fleet_state=None):
+    """Batch TTC / CPA for (i, j) UAV id pairs, e.g. CollisionResult.unique_pairs().
+
+    Args:
+        uav_dict: Mapping uav_id -> UAV; every id in pairs must be present.
+        pairs: (P, 2) int array of UAV ids (host, other).
+        fleet_state: Optional precomputed fleet_state_arrays(uav_dict), to
+                     share the gather across several calls in one step.
+
+    Returns:
+        (ttc, t_cpa, d_cpa) as in compute_time_to_impact_batch().
+    """
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    ids, pos, vel, radius = fleet_state if fleet_state is not None else fleet_state_arrays(uav_dict)
+    i = np.searchsorted(ids, pairs[:, 0])
+    j = np.searchsorted(ids, pairs[:, 1])
+    return compute_time_to_impact_batch(pos[j] - pos[i], vel[j] - vel[i], radius[i] + radius[j])
 
 def tangent_vecs_from_external_pt(xp, yp, a, b, r):
     # http://www.ambrsoft.com/TrigoCalc/Circles2/CirclePoint/CirclePointDistance.htm
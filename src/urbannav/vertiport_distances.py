@@ -0,0 +1,180 @@
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from scipy.spatial import cKDTree
+
+from urbannav.vertiport import Vertiport
+
+
+def pairwise_distances(xy: np.ndarray) -> np.ndarray:
+    """(n, n) Euclidean distance matrix of (n, 2) positions."""
+    xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+    diff = xy[:, None, :] - xy[None, :, :]
+    return np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+
+
+class VertiportDistanceMatrix:
+    """Dense vertiport ids and cached distance / nominal travel-time matrices
+    over an airspace's candidate vertiports.
+
+    Vertiport.id is an object id, so vertiports are numbered densely here in
+    the order they are first seen; row/column k of every matrix belongs to
+    the vertiport with dense id k.  The first matrix request numbers all
+    current candidates (the airspace's vertiport_list and region candidates);
+    vertiports seen later are appended and the matrix is extended by their
+    rows only.  Positions are taken once — vertiports do not move.
+
+        table = airspace.vertiport_distances
+        d = table.distance[table.index(vp_a), table.index(vp_b)]
+        sub = table.between(selected_vertiports)         # (n, n) block
+    """
+
+    def __init__(self, candidates: Callable[[], Iterable[Vertiport]]) -> None:
+        """
+        Args:
+            candidates: Returns the airspace's current candidate vertiports.
+        """
+        self._candidates = candidates
+        self._index: Dict[int, int] = {}
+        # Held so a vertiport's object id cannot be reused while it has a dense id
+        self._vertiports: List[Vertiport] = []
+        self._xy: List[tuple] = []
+        self._distance = np.zeros((0, 0))
+        self._travel_time: Dict[float, np.ndarray] = {}
+        self._seeded = False
+
+    def __len__(self) -> int:
+        return len(self._vertiports)
+
+    @property
+    def vertiports(self) -> List[Vertiport]:
+        """Vertiports by dense id."""
+        return list(self._vertiports)
+
+    def index(self, vertiport: Vertiport) -> int:
+        """Dense id of a vertiport (numbered on first sight)."""
+        k = self._index.get(vertiport.id)
+        if k is None:
+            k = self._index[vertiport.id] = len(self._vertiports)
+            self._vertiports.append(vertiport)
+            self._xy.append((vertiport.location.x, vertiport.location.y))
+        return k
+
+    def indices(self, vertiports: Sequence[Vertiport]) -> np.ndarray:
+        return np.fromiter((self.index(vp) for vp in vertiports), dtype=np.int64, count=len(vertiports))
+
+    # ------------------------------------------------------------------
+    # Matrices
+    # ------------------------------------------------------------------
+
+    @property
+    def distance(self) -> np.ndarray:
+        """(n, n) vertiport distance matrix in metres, by dense id."""
+        if not self._seeded:
+            for vp in self._candidates():
+                self.index(vp)
+            self._seeded = True
+        if len(self._distance) < len(self._xy):
+            self._extend()
+        return self._distance
+
+    def travel_time(self, speed: float) -> np.ndarray:
+        """(n, n) nominal straight-line travel times in seconds at *speed* m/s."""
+        if speed <= 0:
+            raise ValueError(f'speed must be > 0, got {speed}')
+        distance = self.distance
+        cached = self._travel_time.get(speed)
+        if cached is None or len(cached) != len(distance):
+            cached = self._travel_time[speed] = distance / speed
+        return cached
+
+    def between(self, vertiports: Sequence[Vertiport],
+                others: Optional[Sequence[Vertiport]] = None) -> np.ndarray:
+        """Distances from *vertiports* (rows) to *others* (columns; default
+        the same vertiports)."""
+        rows = self.indices(vertiports)
+        cols = rows if others is None else self.indices(others)
+        return self.distance[np.ix_(rows, cols)]
+
+    def _extend(self) -> None:
+        """Add rows/columns for vertiports numbered since the last build."""
+        n_old, n = len(self._distance), len(self._xy)
+        xy = np.asarray(self._xy, dtype=float)
+        grown = np.empty((n, n))
+        grown[:n_old, :n_old] = self._distance
+        diff = xy[n_old:, None, :] - xy[None, :, :]
+        new_rows = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+        grown[n_old:, :] = new_rows
+        grown[:n_old, n_old:] = new_rows[:, :n_old].T
+        self._distance = grown
+
+
+class VertiportTree:
+    """KD-tree over fixed 2D vertiport positions with batched nearest-k and
+    radius queries.  Results index the positions the tree was built from.
+
+    Build one per vertiport set and keep it while the set is unchanged —
+    vertiport_tree() returns the cached tree when the vertiports are the
+    same, Airspace.get_vertiport_tree() does so for vertiport_list.
+    """
+
+    def __init__(self, xy: np.ndarray, vertiports: Optional[Sequence[Vertiport]] = None) -> None:
+        """
+        Args:
+            xy:         (n_vertiports, 2) positions (extra columns are ignored).
+            vertiports: The vertiports at those positions, if any (see
+                        vertiport_tree()).
+        """
+        xy = np.asarray(xy, dtype=float)
+        self.xy = xy[:, :2] if xy.ndim == 2 else xy.reshape(-1, 2)
+        # Held, not just their ids: Vertiport.id is an object id and could be
+        # reused by a new vertiport once the old one is freed
+        self.vertiports: Optional[Tuple[Vertiport, ...]] = None if vertiports is None else tuple(vertiports)
+        self._tree = cKDTree(self.xy) if len(self.xy) else None
+
+    def __len__(self) -> int:
+        return len(self.xy)
+
+    def nearest(self, points: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """The k nearest vertiports of every point, nearest first.
+
+        Args:
+            points: (n, 2+) query positions (extra columns are ignored).
+            k:      Neighbours per point.
+
+        Returns:
+            (distance, index) arrays of shape (n, k).  With fewer than k
+            vertiports the missing neighbours are (inf, len(self)).
+        """
+        points = np.asarray(points, dtype=float).reshape(len(points), -1)[:, :2]
+        if self._tree is None:
+            return np.full((len(points), k), np.inf), np.full((len(points), k), 0, dtype=np.int64)
+        distance, index = self._tree.query(points, k=k)
+        return distance.reshape(len(points), k), index.reshape(len(points), k).astype(np.int64)
+
+    def within(self, points: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """All (point, vertiport) pairs closer than *radius*.
+
+        Returns:
+            (point_index, vertiport_index) arrays, by point then vertiport.
+        """
+        points = np.asarray(points, dtype=float).reshape(len(points), -1)[:, :2]
+        if self._tree is None or len(points) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty.copy()
+        hits = self._tree.query_ball_point(points, r=radius, return_sorted=True)
+        counts = np.fromiter((len(h) for h in hits), dtype=np.int64, count=len(hits))
+        vp_index = np.fromiter((i for h in hits for i in h), dtype=np.int64, count=int(counts.sum()))
+        return np.repeat(np.arange(len(points)), counts), vp_index
+
+
+def vertiport_tree(vertiports: Sequence[Vertiport],
+                   cached: Optional[VertiportTree] = None) -> VertiportTree:
+    """KD-tree over the vertiports' positions; *cached* is returned as is when
+    it was built for the same vertiport objects in the same order."""
+    if (cached is not None and cached.vertiports is not None
+            and len(cached.vertiports) == len(vertiports)
+            and all(a is b for a, b in zip(cached.vertiports, vertiports))):
+        return cached
+    xy = np.array([(vp.location.x, vp.location.y) for vp in vertiports], dtype=float).reshape(-1, 2)
+    return VertiportTree(xy, vertiports=vertiports)
@@ -1,7 +1,7 @@
 """Config schema for the synthetic dense-airspace testbed.
 
-Reuses UAMSimulatorConfig / UAVFleetInstanceConfig / LoggingConfig / RenderingConfig
-from urbannav.component_schema unchanged. Replaces the OSM-driven `vertiport`/`airspace`
+Reuses UAMSimulatorConfig / UAVFleetInstanceConfig / LoggingConfig / RenderingConfig /
+SensorConfig / ConflictProbeConfig from urbannav.component_schema unchanged. Replaces the OSM-driven `vertiport`/`airspace`
 sections with a single `testbed_airspace` section describing a synthetic, offline
 vertiport/building layout (either a generated pattern or an explicit placement file).
 """
@@ -11,8 +11,11 @@ import yaml
 from pydantic import BaseModel, Field, ValidationError, field_validator
 
 from urbannav.component_schema import (
+    ConflictProbeConfig,
     LoggingConfig,
     RenderingConfig,
+    RouteNetworkConfig,
+    SensorConfig,
     UAMSimulatorConfig,
     UAVFleetInstanceConfig,
     validate_fleet_composition,
@@ -103,6 +106,9 @@ class TestbedConfig(BaseModel):
     fleet_composition: List[UAVFleetInstanceConfig]
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
     rendering: RenderingConfig = Field(default_factory=RenderingConfig)
+    sensor: SensorConfig = Field(default_factory=SensorConfig)
+    conflict_probe: ConflictProbeConfig = Field(default_factory=ConflictProbeConfig)
+    route_network: RouteNetworkConfig = Field(default_factory=RouteNetworkConfig)
 
     @classmethod
     def load_from_yaml(cls, path: str) -> 'TestbedConfig':
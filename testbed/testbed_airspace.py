@@ -11,12 +11,15 @@ populated from a generated pattern or an explicit placement file instead of OSM
     restricted_airspace_geo_series                     (SensorEngine -> set_restricted_area_data)
     restricted_airspace_buffer_geo_series               (SensorEngine -> set_restricted_area_data)
     buildings                                          (TestbedRenderer 3D extrusion)
+    vertiport_distances                                (dense vertiport ids, distance matrix)
+    get_vertiport_tree()                               (KD-tree over vertiport_list)
+    get_route_network()                                (routes around the buildings)
 
 Zero network I/O — every geometry here is built from plain numbers.
 """
 import random
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import geopandas as gpd
 import numpy as np
@@ -26,7 +29,9 @@ from shapely import Point
 
 from testbed.config_schema import BuildingConfig, TestbedAirspaceConfig
 from testbed.placement import generate_ring_placement, load_placement_file
+from urbannav.route_network import RouteNetwork, restricted_area_polygons
 from urbannav.vertiport import Vertiport
+from urbannav.vertiport_distances import VertiportDistanceMatrix, VertiportTree, vertiport_tree
 
 # Margin added around the generated vertiport/building extent when deriving the
 # synthetic boundary box in procedural (non-file) placement mode.
@@ -62,6 +67,9 @@ class TestbedAirspace:
             self._build_from_pattern(config)
 
         self._build_restricted_area_attrs()
+        self.vertiport_distances = VertiportDistanceMatrix(self.get_candidate_vertiports)
+        self._vertiport_tree = None
+        self._route_network = None
 
     # ------------------------------------------------------------------
     # Construction
@@ -171,6 +179,27 @@ class TestbedAirspace:
         """Returns list of vertiport ids."""
         return [vp.id for vp in self.vertiport_list]
 
+    def get_candidate_vertiports(self) -> List[Vertiport]:
+        """Vertiports numbered by vertiport_distances — mirrors
+        Airspace.get_candidate_vertiports() (no region candidates here)."""
+        return list(self.vertiport_list)
+
+    def get_vertiport_tree(self) -> VertiportTree:
+        """KD-tree over vertiport_list — mirrors Airspace.get_vertiport_tree()."""
+        self._vertiport_tree = vertiport_tree(self.vertiport_list, self._vertiport_tree)
+        return self._vertiport_tree
+
+    def get_route_network(self, clearance: float = 0.0, cache_dir: Optional[str] = None) -> RouteNetwork:
+        """Routes around the building buffers — mirrors Airspace.get_route_network()."""
+        network = self._route_network
+        if (network is None or network.key != tuple(vp.id for vp in self.vertiport_list)
+                or network.clearance != clearance):
+            self._route_network = RouteNetwork.load_or_build(
+                self.get_candidate_vertiports(), restricted_area_polygons(self),
+                clearance=clearance, cache_dir=cache_dir,
+            )
+        return self._route_network
+
     def get_state(self) -> List[Vertiport]:
         """Airspace state is the current vertiports — mirrors Airspace.get_state(),
         consumed by SimulatorManager._create_data_class_state() / metrics_collector.py."""
@@ -1,23 +1,37 @@
 """TestbedRenderer — adds 3D extrusion for synthetic buildings.
 
-Restricted areas are drawn flat at z=0 in the base Renderer (renderer.py:502-528) —
+Restricted areas are drawn flat at z=0 in the base Renderer (Renderer._draw_map_3d) —
 that's true for OSM-derived buildings too; no extrusion exists anywhere today. This
 subclass adds the extrusion using the same bar3d-tower technique the base Renderer
-already uses for vertiports (renderer.py:358-362: rooted at z=0, extruded up to
-altitude) — applied here to each synthetic building's sampled z_height. Everything
-else (2D rendering, UAV/trajectory drawing, animation/saving) is inherited unchanged.
+already uses for vertiports (Renderer._draw_static_3d: rooted at z=0, extruded up to
+altitude) — applied here to each synthetic building's sampled z_height, all buildings
+in one bar3d call from box arrays built once per airspace. Everything else (2D
+rendering, UAV/trajectory drawing, animation/saving) is inherited unchanged.
 """
+import numpy as np
+
 from urbannav.renderer import Renderer
 
 
 class TestbedRenderer(Renderer):
+    __test__ = False  # not a pytest test class — name just starts with "Testbed"
+
     def _draw_map_3d(self, ax) -> None:
         super()._draw_map_3d(ax)
         if self._airspace is None:
             return
-        for b in getattr(self._airspace, 'buildings', []):
-            ax.bar3d(
-                b.center[0] - b.width / 2, b.center[1] - b.depth / 2, 0.0,
-                b.width, b.depth, b.z_height,
-                color='red', alpha=0.5, zsort='average',
-            )
+        boxes = self._static_cached('building_boxes', self._building_boxes)
+        if boxes is not None:
+            ax.bar3d(*boxes, color='red', alpha=0.5, zsort='average')
+
+    def _building_boxes(self):
+        """bar3d (x, y, z, dx, dy, dz) arrays for every building, or None."""
+        buildings = getattr(self._airspace, 'buildings', [])
+        if not buildings:
+            return None
+        width = np.array([b.width for b in buildings], dtype=float)
+        depth = np.array([b.depth for b in buildings], dtype=float)
+        cx = np.array([b.center[0] for b in buildings], dtype=float)
+        cy = np.array([b.center[1] for b in buildings], dtype=float)
+        height = np.array([b.z_height for b in buildings], dtype=float)
+        return cx - width / 2, cy - depth / 2, 0.0, width, depth, height
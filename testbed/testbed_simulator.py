@@ -6,8 +6,7 @@ constructed simulator instance work against it without modification.
 """
 from typing import Dict, Optional
 
-import numpy as np
-
+from urbannav.demand_model import DemandSchedule
 from urbannav.uam_simulator import UAMSimulator
 
 from testbed.config_schema import TestbedConfig
@@ -23,7 +22,7 @@ class TestbedSimulator(UAMSimulator):
 
     def _build_simulator_manager(
         self,
-        lambda_matrix: Optional[np.ndarray],
+        lambda_matrix: Optional[DemandSchedule],
         vertiport_region_map: Optional[Dict[int, int]],
         zone_region_map: Optional[Dict],
     ) -> TestbedSimulatorManager:
@@ -0,0 +1,125 @@
+"""
+Pre-built static map layer of the Renderer, on a synthetic testbed airspace.
+
+Checks that the rasterized 2D map looks like the vector map it replaces,
+that blitted streaming gives the same frames as the buffered replay, that
+the raster is cached on disk per airspace, and that the 3D map and
+building extrusions are built once and drawn as one collection per layer.
+
+Run in isolation:
+    pytest testbed/tests/test_testbed_renderer.py -v
+"""
+import os
+
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image, ImageSequence
+
+from testbed.config_schema import BuildingConfig, TestbedAirspaceConfig
+from testbed.testbed_airspace import TestbedAirspace
+from testbed.testbed_renderer import TestbedRenderer
+from urbannav.component_schema import RenderingConfig
+
+
+def _airspace(building_x=0.0):
+    config = TestbedAirspaceConfig(
+        pattern='ring', num_vertiports=4, radius=1500.0,
+        buildings=[BuildingConfig(center=(building_x, 0.0), width=300.0, depth=300.0,
+                                  buffer_radius=200.0),
+                   BuildingConfig(center=(600.0, 700.0), width=150.0, depth=250.0)],
+    )
+    return TestbedAirspace(config, seed=1)
+
+
+def _frame(step):
+    uavs = {}
+    for uid in range(2):
+        x, y = -1200.0 + 150.0 * step + 400.0 * uid, 300.0 * uid - 100.0 * step
+        uavs[uid] = {'x': x, 'y': y, 'z': 1800.0, 'heading': 0.0, 'radius': 17.0,
+                     'nmac_radius': 150.0, 'detection_radius': 550.0,
+                     'mission_start': (-1200.0, 0.0), 'mission_end': (1200.0, 0.0),
+                     'mission_start_z': 1800.0, 'mission_end_z': 1800.0}
+    return {'step': step, 'uavs': uavs}
+
+
+def _gif_frames(path):
+    with Image.open(path) as gif:
+        return [np.asarray(f.convert('RGB'), dtype=np.int16) for f in ImageSequence.Iterator(gif)]
+
+
+def _static_image(renderer):
+    fig = Figure(figsize=(10, 10), dpi=150)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    renderer._draw_scene(ax, {'step': 0, 'uavs': {}}, {}, 0)
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba())[..., :3].astype(np.int16)
+
+
+def test_raster_map_matches_vector_map(monkeypatch):
+    renderer = TestbedRenderer(RenderingConfig(enabled=True))
+    renderer.reset(_airspace())
+    raster = _static_image(renderer)
+    assert renderer._static_cache['map_raster'].shape[-1] == 4
+
+    monkeypatch.setattr(TestbedRenderer, '_map_raster', lambda self: None)
+    vector = _static_image(renderer)
+    # only polygon edges move by a resampled pixel
+    assert (np.abs(raster - vector).max(axis=2) > 48).mean() < 2e-3
+
+
+def test_blitted_stream_matches_buffered_replay(tmp_path):
+    for stream in (False, True):
+        renderer = TestbedRenderer(RenderingConfig(enabled=True, output_dir=str(tmp_path / str(stream)),
+                                                   frame_skip=0, stream=stream))
+        renderer.reset(_airspace())
+        for step in range(5):
+            renderer.add_frame(_frame(step))
+        if stream:
+            assert renderer._stream_background is not None
+        renderer.save(episode_id=0)
+
+    buffered = _gif_frames(tmp_path / 'False' / 'episode_ep0.gif')
+    streamed = _gif_frames(tmp_path / 'True' / 'episode_ep0.gif')
+    assert len(buffered) == len(streamed) == 5
+    for a, b in zip(buffered, streamed):
+        assert (np.abs(a - b).max(axis=2) > 48).mean() < 1e-3
+
+
+def test_map_raster_disk_cache(tmp_path, monkeypatch):
+    config = RenderingConfig(enabled=True, map_cache_dir=str(tmp_path))
+    first = TestbedRenderer(config)
+    first.reset(_airspace())
+    raster = first._map_raster()
+    assert len(os.listdir(tmp_path)) == 1
+
+    # same airspace in a new renderer (or process): loaded, not redrawn
+    def _fail(self):
+        raise AssertionError('map rasterized again')
+    monkeypatch.setattr(TestbedRenderer, '_rasterize_map', _fail)
+    second = TestbedRenderer(config)
+    second.reset(_airspace())
+    np.testing.assert_array_equal(second._map_raster(), raster)
+
+    monkeypatch.undo()
+    second.reset(_airspace(building_x=-400.0))
+    second._map_raster()
+    assert len(os.listdir(tmp_path)) == 2
+
+
+@pytest.mark.parametrize('same_airspace', [True, False])
+def test_3d_static_layer_built_once(same_airspace):
+    airspace = _airspace()
+    renderer = TestbedRenderer(RenderingConfig(enabled=True), simulator_mode='3D')
+    renderer.reset(airspace)
+    fig = Figure()
+    ax = fig.add_subplot(111, projection='3d')
+    renderer._draw_static_3d(ax)
+    # boundary, restricted areas, buildings, vertiport towers
+    assert len(ax.collections) == 4
+
+    rings = renderer._static_cache['map_rings_3d']
+    renderer.reset(airspace if same_airspace else _airspace())
+    assert (renderer._static_cache.get('map_rings_3d') is rings) == same_airspace
@@ -37,12 +37,14 @@ def sim(config_path):
 # collision sequence in SimulatorManager._step_uavS (simulator_manager.py
 # lines 329-333) can be exercised deterministically.
 #
-# Used by tests/test_collision_scenario.py and tests/test_collision_performance.py.
+# Used by tests/test_collision_scenario.py and tests/test_collision_performance.py;
+# drive_logger() replays the scenario through a Logger for the logging tests.
 
 from shapely import Point
 from urbannav.uav import UAV
 from urbannav.vertiport import Vertiport
 from urbannav.sensor_engine import SensorEngine
+from urbannav.component_schema import SimulatorState
 
 # Mirrors UAV_TYPE_REGISTRY['STANDARD'] in component_schema.py
 STANDARD_RADIUS = 17.0
@@ -108,6 +110,41 @@ def set_scripted_positions(uav_dict, t: int) -> None:
         uav.current_position = Point(x, y, z)
 
 
+def set_scripted_motion(uav_dict, t: int) -> None:
+    """set_scripted_positions() plus a deterministic speed and heading.
+
+    UAV k flies at 10 * (k + 1) + t with heading 0.1 * k, so logged speed
+    columns are predictable and rendered headings are repeatable.
+    """
+    set_scripted_positions(uav_dict, t)
+    for uav_id, uav in uav_dict.items():
+        uav.current_speed = 10.0 * (uav_id + 1) + t
+        uav.current_heading = 0.1 * uav_id          # rig headings are random
+
+
+def drive_logger(logger, steps, actions=None, rig=None):
+    """Log the scripted 3-UAV scenario for each step t in *steps*.
+
+    Args:
+        logger:  Logger to feed through log_step().
+        steps:   Step numbers to log.
+        actions: Actions dict logged every step, or a callable t -> dict.
+        rig:     (uav_dict, sensor_module) to reuse; a fresh rig by default.
+
+    Returns:
+        The rig's uav_dict.
+    """
+    uav_dict, sensor_module = rig if rig is not None else build_three_uav_rig()
+    vertiports = [uav_dict[0].start_vertiport, uav_dict[0].end_vertiport]
+    for t in steps:
+        set_scripted_motion(uav_dict, t)
+        state = SimulatorState(timestamp=float(t), currentstep=t, airspace_state=vertiports,
+                               atc_state=uav_dict, external_systems={})
+        step_actions = actions(t) if callable(actions) else actions
+        logger.log_step(state, actions=step_actions, collisions=sensor_module.get_collision_result())
+    return uav_dict
+
+
 @pytest.fixture
 def three_uav_rig():
     """Function-scoped: fresh (uav_dict, sensor_module) 3-UAV rig."""
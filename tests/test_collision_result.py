@@ -0,0 +1,93 @@
+"""
+CollisionResult (pair arrays + CSR offsets) against the legacy 5 dict queries.
+
+Replays the scripted 3-UAV scenario from conftest: at every step the single
+SensorEngine.get_collision_result() pass must agree with the five per-category
+SensorEngine methods it replaces, both through its dict-compat views and
+through the array API consumed by MetricsCollector / agent_logic.
+
+Run in isolation:
+    pytest tests/test_collision_result.py -v
+"""
+import numpy as np
+import pytest
+
+from conftest import build_three_uav_rig, set_scripted_positions
+from urbannav.collision_result import (
+    NMAC, RA_COLLISION, RA_DETECT, UAV_COLLISION, UAV_DETECT,
+    CollisionResult, as_collision_result,
+)
+
+STEPS = range(0, 21)
+
+
+@pytest.fixture(scope='module')
+def paired_history():
+    """t -> (legacy 5-tuple of dicts, CollisionResult) for the scripted scenario."""
+    uav_dict, sensor_module = build_three_uav_rig()
+    history = {}
+    for t in STEPS:
+        set_scripted_positions(uav_dict, t)
+        legacy = (
+            sensor_module.get_detection_restricted_area(),
+            sensor_module.get_detection_other_uavS(),
+            sensor_module.get_nmac(),
+            sensor_module.get_collision_restricted_area(),
+            sensor_module.get_collision_uavS(),
+        )
+        history[t] = (legacy, sensor_module.get_collision_result())
+    return history
+
+
+@pytest.mark.parametrize('t', STEPS)
+def test_views_match_legacy_dicts(paired_history, t):
+    legacy, result = paired_history[t]
+    assert result.as_dicts() == legacy
+    ra_detect, uav_detect, nmac, ra_col, uav_col = result
+    assert uav_detect == legacy[1]
+    assert result[NMAC].get(0, set()) == legacy[2][0]
+
+
+@pytest.mark.parametrize('t', STEPS)
+def test_has_and_partners_match_legacy_dicts(paired_history, t):
+    legacy, result = paired_history[t]
+    for category in (RA_DETECT, UAV_DETECT, NMAC, RA_COLLISION, UAV_COLLISION):
+        for uav_id in (0, 1, 2):
+            assert result.has(category, uav_id) == bool(legacy[category][uav_id])
+            assert set(result.partners(category, uav_id).tolist()) == legacy[category][uav_id]
+
+
+def test_csr_offsets_cover_pairs(paired_history):
+    _, result = paired_history[15]
+    assert result.uav_offsets[0] == 0
+    assert result.uav_offsets[-1] == len(result.uav_pairs)
+    for k, uav_id in enumerate(result.uav_ids.tolist()):
+        rows = result.uav_pairs[result.uav_offsets[k]:result.uav_offsets[k + 1]]
+        assert (rows[:, 0] == uav_id).all()
+
+
+def test_collision_step_pairs_and_removal(paired_history):
+    # step 15: A/B in body contact (NMAC + collision); C detected by both
+    _, result = paired_history[15]
+    assert result.unique_pairs(UAV_COLLISION).tolist() == [[0, 1]]
+    assert [0, 1] in result.unique_pairs(NMAC).tolist()
+    assert result.removal_ids().tolist() == [0, 1]
+
+
+def test_quiet_step_is_empty(paired_history):
+    _, result = paired_history[0]
+    assert len(result.uav_pairs) == 0
+    assert result.unique_pairs(NMAC).shape == (0, 2)
+    assert result.removal_ids().size == 0
+    assert not result.has(UAV_DETECT, 0)
+    assert result.partners(UAV_DETECT, 99).size == 0
+
+
+def test_from_dicts_round_trip(paired_history):
+    legacy, result = paired_history[18]
+    rebuilt = as_collision_result(legacy)
+    assert isinstance(rebuilt, CollisionResult)
+    assert rebuilt.as_dicts() == result.as_dicts()
+    assert np.array_equal(rebuilt.unique_pairs(NMAC), result.unique_pairs(NMAC))
+    assert as_collision_result(result) is result
+    assert as_collision_result(None) is None
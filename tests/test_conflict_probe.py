@@ -0,0 +1,141 @@
+"""
+Look-ahead conflict probe (urbannav.conflict_probe.ConflictProbe).
+
+Checks the predicted loss-of-separation pairs against a brute-force
+all-pairs closest-approach solve while the fleet moves and some UAVs turn,
+so the incremental candidate carry-over is exercised across updates.
+
+Run in isolation:
+    pytest tests/test_conflict_probe.py -v
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from urbannav.conflict_probe import ConflictProbe
+from urbannav.utils import compute_time_to_impact_batch, fleet_state_arrays
+
+SEP = 200.0
+HORIZON = 60.0
+
+
+def _uav(x, y, vx, vy, z=100.0, in_flight=True):
+    return SimpleNamespace(px=x, py=y, pz=z, vx=vx, vy=vy, vz=0.0,
+                           radius=17.0, nmac_radius=SEP, uav_in_flight=in_flight)
+
+
+def _brute_force(uav_dict):
+    airborne = {k: u for k, u in uav_dict.items() if u.uav_in_flight}
+    ids, pos, vel, _ = fleet_state_arrays(airborne)
+    i, j = np.triu_indices(len(ids), k=1)
+    t_los, _, _ = compute_time_to_impact_batch(pos[j] - pos[i], vel[j] - vel[i], SEP)
+    hit = t_los <= HORIZON
+    return {(int(a), int(b)): float(t) for a, b, t in zip(ids[i][hit], ids[j][hit], t_los[hit])}
+
+
+def test_head_on_pair_predicted():
+    uav_dict = {
+        0: _uav(0.0, 0.0, 20.0, 0.0),
+        1: _uav(2000.0, 0.0, -20.0, 0.0),
+        2: _uav(0.0, 5000.0, 20.0, 0.0),        # parallel, far away
+        3: _uav(1000.0, 10.0, 0.0, 0.0, in_flight=False),  # grounded: ignored
+    }
+    out = ConflictProbe(horizon=HORIZON).update(uav_dict, current_time=0.0)
+    assert out['pairs'].tolist() == [[0, 1]]
+    assert out['t_los'][0] == pytest.approx((2000.0 - SEP) / 40.0)
+    assert out['t_cpa'][0] == pytest.approx(50.0)
+    assert out['d_cpa'][0] == pytest.approx(0.0)
+
+
+def test_beyond_horizon_not_reported():
+    uav_dict = {0: _uav(0.0, 0.0, 5.0, 0.0), 1: _uav(5000.0, 0.0, -5.0, 0.0)}
+    out = ConflictProbe(horizon=HORIZON).update(uav_dict, current_time=0.0)
+    assert len(out['pairs']) == 0
+
+
+def test_incremental_matches_brute_force():
+    rng = np.random.default_rng(0)
+    n, dt = 300, 1.0
+    uav_dict = {}
+    for k in range(n):
+        x, y = rng.uniform(-8000.0, 8000.0, 2)
+        heading, speed = rng.uniform(-np.pi, np.pi), rng.uniform(5.0, 30.0)
+        uav_dict[k] = _uav(x, y, speed * np.cos(heading), speed * np.sin(heading))
+
+    probe = ConflictProbe(horizon=HORIZON)
+    reanchored = []
+    for step in range(40):
+        out = probe.update(uav_dict, current_time=step * dt)
+        got = {tuple(p): t for p, t in zip(out['pairs'].tolist(), out['t_los'].tolist())}
+        expected = _brute_force(uav_dict)
+        assert got.keys() == expected.keys()
+        for pair, t in expected.items():
+            assert got[pair] == pytest.approx(t)
+        reanchored.append(probe.num_reanchored)
+
+        # advance linearly; a few UAVs turn each step
+        for uav in uav_dict.values():
+            uav.px += uav.vx * dt
+            uav.py += uav.vy * dt
+        for k in rng.choice(n, size=5, replace=False):
+            uav_dict[k].vx, uav_dict[k].vy = -uav_dict[k].vy, uav_dict[k].vx
+
+    # only turned UAVs (and aged anchors) are re-probed after the first update
+    assert reanchored[0] == n
+    assert max(reanchored[1:int(probe.refresh_after)]) <= 5
+
+
+def test_drift_within_tolerance_into_conflict():
+    # UAV 1 drifts towards UAV 0 slower than velocity_tolerance, so it is
+    # never re-anchored; its padded box must still cover the conflict.
+    sep, dt = 10.0, 1.0
+    uav_dict = {0: _uav(0.0, 0.0, 20.0, 0.0), 1: _uav(0.0, 30.0, 20.0, 0.0)}
+    probe = ConflictProbe(horizon=HORIZON, separation=sep)
+    assert len(probe.update(uav_dict, current_time=0.0)['pairs']) == 0
+
+    uav_dict[1].vy = -0.45
+    for step in range(1, 11):
+        for uav in uav_dict.values():
+            uav.px += uav.vx * dt
+            uav.py += uav.vy * dt
+        out = probe.update(uav_dict, current_time=step * dt)
+        assert probe.num_reanchored == 0
+        assert out['pairs'].tolist() == [[0, 1]]
+        assert out['t_los'][0] == pytest.approx((uav_dict[1].py - sep) / 0.45)
+
+
+_PROBE_SCENARIO_YAML = """
+simulator: {dt: 1.0, total_timestep: 20, mode: '3D', seed: 7}
+logging: {enabled: false}
+rendering: {enabled: false}
+conflict_probe: {enabled: true, horizon: 45.0}
+testbed_airspace:
+  pattern: 'ring'
+  num_vertiports: 4
+  radius: 600.0
+  landing_pad_capacity: 2
+  altitude_range: [1800.0, 1800.0]
+fleet_composition:
+  - {type_name: STANDARD, count: 3, dynamics: PointMass, controller: PIDPointMassController,
+     sensor: PartialSensor, planner: PointMass-PID}
+"""
+
+
+@pytest.mark.parametrize('rebuild_airspace', [True, False])
+def test_probe_survives_reset(tmp_path, rebuild_airspace):
+    from testbed.testbed_simulator import TestbedSimulator
+
+    config_path = tmp_path / 'probe.yaml'
+    config_path.write_text(_PROBE_SCENARIO_YAML)
+    sim = TestbedSimulator(config_path=str(config_path))
+    sim.reset()
+    first_atc = sim.simulator_manager.atc
+
+    sim.reset(rebuild_airspace=rebuild_airspace)
+    atc = sim.simulator_manager.atc
+    assert atc is not first_atc
+    assert isinstance(atc.conflict_probe, ConflictProbe)
+    assert atc.conflict_probe.horizon == 45.0
+    sim.step({})
+    assert atc.predicted_conflicts is not None
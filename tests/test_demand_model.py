@@ -0,0 +1,255 @@
+"""
+Next-event Poisson demand generation (urbannav.demand_model.DemandModelMixin)
+and time-varying demand schedules (urbannav.demand_model.DemandSchedule).
+
+Drives the mixin's demand state on a bare host object (vertiports only,
+no airspace geometry or UAVs) and checks that trip counts per OD pair
+follow the Poisson rates — including several trips per pair in one step,
+which the former per-step Bernoulli draw could not produce — that only
+pairs between distinct, served regions with a positive rate generate
+trips, that the departure queues agree with the OD counters, and that a
+new vertiport-region map takes effect.  The ring-buffer departure queues
+keep FIFO order across wraparound and growth, and episode metrics are
+aggregated from the structured trip log.  A rebalancing tick sends idle
+UAVs empty to vertiports with unserved queued trips.  Schedules are checked to switch
+rates at their breakpoints (thinned arrivals match each period's rate)
+and to be memory-mapped from disk without copying.
+
+Run in isolation:
+    pytest tests/test_demand_model.py -v
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from urbannav.demand_model import DemandModelMixin, DemandSchedule, DepartureQueues
+from urbannav.fleet_dispatcher import FleetDispatcher
+from urbannav.vertiport_distances import VertiportDistanceMatrix
+
+
+class _Vertiport(SimpleNamespace):
+    def __init__(self, vp_id, x=0.0):
+        super().__init__(id=vp_id, uav_id_list=[], landing_queue=[],
+                         location=SimpleNamespace(x=x, y=0.0))
+
+    def get_landing_queue(self):
+        return self.landing_queue
+
+
+class _UAV(SimpleNamespace):
+    def assign_start_end(self, start, end, mid_point):
+        self.start_vertiport, self.end_vertiport = start, end
+        self.operational = self.uav_in_flight = True
+
+
+class _DemandHost(DemandModelMixin):
+    """Just the attributes SimulatorManager provides to the demand mixin."""
+
+    def __init__(self, lambda_matrix, vertiport_region_map, dt=1.0, seed=0, fleet_dispatcher=None):
+        self.lambda_matrix = lambda_matrix
+        if isinstance(lambda_matrix, DemandSchedule):
+            self.demand_schedule = lambda_matrix
+        else:
+            self.demand_schedule = DemandSchedule(lambda_matrix)
+        self.n_regions = self.demand_schedule.n_regions
+        self.vertiport_region_map = vertiport_region_map
+        self.dt = dt
+        self._demand_rng = np.random.default_rng(seed)
+        self.airspace = SimpleNamespace(vertiport_list=[
+            _Vertiport(vp_id, x=1000.0 * k) for k, vp_id in enumerate(sorted(vertiport_region_map))
+        ])
+        self.airspace.vertiport_distances = VertiportDistanceMatrix(lambda: self.airspace.vertiport_list)
+        self.mission_changes = []
+        self.atc = SimpleNamespace(uav_dict={}, airspace_mid_point_coord=(0.0, 0.0),
+                                   notify_mission_change=self.mission_changes.append)
+        self.config = SimpleNamespace(airspace=SimpleNamespace(pad_capacity=2))
+        self.fleet_dispatcher = fleet_dispatcher
+        self._state = SimpleNamespace(currentstep=0)
+        self._init_demand_state()
+
+    def run(self, steps):
+        for _ in range(steps):
+            self._state.currentstep += 1
+            self._generate_demand()
+
+
+def test_counts_follow_poisson_rates():
+    n = 40
+    rates = np.random.default_rng(1).uniform(0.0, 0.5, size=(n, n))     # trips/min
+    host = _DemandHost(rates, {100 + r: r for r in range(n)}, dt=6.0)
+    host.run(1000)                                                    # 100 minutes
+
+    expected = rates * 100.0
+    np.fill_diagonal(expected, 0.0)
+    assert np.all(np.diag(host._demand_gen_od) == 0)
+    assert abs(host._demand_gen_od.sum() / expected.sum() - 1.0) < 0.02
+    # per-pair counts scatter like Poisson counts: variance ≈ mean
+    off = ~np.eye(n, dtype=bool)
+    z = (host._demand_gen_od[off] - expected[off]) / np.sqrt(expected[off])
+    assert abs(z.mean()) < 0.1 and 0.85 < z.var() < 1.15
+
+
+def test_several_trips_per_pair_in_one_step():
+    rates = np.array([[0.0, 30.0], [0.0, 0.0]])                      # 5 trips per 10 s step
+    host = _DemandHost(rates, {7: 0, 9: 1}, dt=10.0)
+    host.run(1)
+    queued = host.departure_queues[7]
+    assert len(queued) > 1
+    assert queued == [(9, 1)] * len(queued)
+    host.run(199)
+    assert abs(host._demand_gen_od[0, 1] / 1000.0 - 1.0) < 0.1
+    assert host.departure_queues[9] == []
+
+
+def test_only_served_pairs_generate_and_queues_match_counters():
+    rates = np.full((4, 4), 2.0)
+    rates[0, 2] = 0.0
+    host = _DemandHost(rates, {10: 0, 11: 1, 12: 2}, dt=5.0)          # region 3 unserved
+    host.run(240)
+
+    gen = host._demand_gen_od
+    assert gen[3].sum() == 0 and gen[:, 3].sum() == 0
+    assert gen[0, 2] == 0 and np.all(np.diag(gen) == 0)
+    for vp_id, region in host.vertiport_region_map.items():
+        queued = host.departure_queues[vp_id]
+        assert len(queued) == gen[region].sum()
+        for dest_vp_id, enqueue_step in queued:
+            assert host.vertiport_region_map[dest_vp_id] != region
+            assert 1 <= enqueue_step <= 240
+        # trips are queued in arrival order
+        assert [step for _, step in queued] == sorted(step for _, step in queued)
+
+
+def test_new_region_map_takes_effect():
+    rates = np.full((3, 3), 1.0)
+    host = _DemandHost(rates, {10: 0, 11: 1}, dt=60.0)
+    host.run(50)
+    assert host._demand_gen_od[:, 2].sum() == 0
+
+    host.update_vertiport_region_map({10: 0, 11: 1, 12: 2})
+    host.airspace.vertiport_list.append(_Vertiport(12))
+    host._init_demand_state()
+    host._state.currentstep = 0
+    host.run(50)
+    assert host._demand_gen_od[:, 2].sum() > 0 and host._demand_gen_od[2].sum() > 0
+
+
+def test_departure_queues_wrap_and_grow():
+    queues = DepartureQueues([3, 5], capacity=2)
+    queues.push(3, 5, 1)
+    queues.push(3, 5, 2)
+    assert queues.popleft(3) == (5, 1)
+    queues.push(3, 5, 3)                                              # wraps to column 0
+    queues.push(3, 5, 4)                                              # full → capacity doubles
+    queues.push(5, 3, 9)
+    assert queues.capacity == 4
+    assert queues[3] == [(5, 2), (5, 3), (5, 4)] and queues[5] == [(3, 9)]
+    assert queues.lengths.tolist() == [3, 1] and len(queues) == 4
+    assert [queues.popleft(3) for _ in range(3)] == [(5, 2), (5, 3), (5, 4)]
+    assert queues.length(3) == 0 and queues.length(99) == 0
+    with pytest.raises(IndexError):
+        queues.popleft(3)
+
+
+def test_episode_metrics_from_trip_log():
+    host = _DemandHost(np.zeros((2, 2)), {7: 0, 9: 1}, dt=2.0)
+    vp7, vp9 = host.airspace.vertiport_list
+    host.atc.uav_dict = {1: _UAV(end_vertiport=vp7, uav_in_flight=False),
+                         2: _UAV(end_vertiport=vp9, uav_in_flight=False)}
+    host._demand_gen_od[:] = [[0, 3], [1, 0]]
+
+    host._state.currentstep = 10
+    host._dispatch_mission(1, 7, 9, enqueue_step=4)                   # region 0 → 1
+    host._dispatch_mission(2, 9, 7, enqueue_step=8)                   # region 1 → 0
+    vp9.landing_queue.append(1)
+    host._state.currentstep = 30
+    host._log_arrive_airspace(1)
+    host._log_arrive_airspace(2)                                      # not queued: no-op
+    host._state.currentstep = 34
+    host._log_land(1, 9)
+    host._accumulate_step_metrics()
+
+    trips = host._trip_log.data
+    assert trips['arrive_airspace_step'].tolist() == [30, -1]
+    assert trips['land_step'].tolist() == [34, -1] and list(host._open_trips) == [2]
+    metrics = host.get_episode_metrics()
+    assert metrics['trips_completed_od'].tolist() == [[0, 1], [0, 0]]
+    assert metrics['pair_avg_trip_time'][0, 1] == pytest.approx((34 - 10) * 2.0)
+    assert metrics['pair_avg_wait_time'][0, 1] == pytest.approx((34 - 30) * 2.0)
+    assert metrics['pair_avg_trip_time'][1, 0] == 0.0
+    np.testing.assert_allclose(metrics['queue_length'], [0.0, 1.0 / 34])
+
+
+def test_rebalancing_sends_idle_uavs_to_queued_trips():
+    host = _DemandHost(np.zeros((3, 3)), {7: 0, 8: 1, 9: 2}, fleet_dispatcher=FleetDispatcher())
+    vp7, vp8, vp9 = host.airspace.vertiport_list                      # at x = 0, 1000, 2000 m
+    host.atc.uav_dict = {uav_id: _UAV(end_vertiport=vp7, operational=False, uav_in_flight=False)
+                         for uav_id in (1, 2, 3)}
+    vp7.uav_id_list.extend([1, 2, 3])
+    host.atc.uav_dict[4] = _UAV(end_vertiport=vp8, operational=True, uav_in_flight=True)
+    vp8.uav_id_list.append(4)                                         # departing, not idle
+    for dest in (9, 9, 7):
+        host.departure_queues.push(8, dest, 0)
+    host.departure_queues.push(9, 7, 0)
+
+    host._rebalance_fleet()
+    # vp8 needs 3 UAVs and vp9 one: vp7 sends its 3 idle UAVs to the
+    # nearer vp8, leaving vp9 unserved
+    assert host._repositioning == {1: 1, 2: 1, 3: 1}
+    assert all(host.atc.uav_dict[uav_id].end_vertiport is vp8 for uav_id in (1, 2, 3))
+    assert sorted(host.mission_changes) == [1, 2, 3]                  # planners are told
+    assert len(host._trip_log) == 0 and host.departure_queues.lengths.tolist() == [0, 3, 1]
+
+    host._rebalance_fleet()                                           # nothing idle: no-op
+    assert host._repositions_count == 3
+    host._log_land(1, 8)
+    assert 1 not in host._repositioning
+    assert host.get_episode_metrics()['repositioning_flights'] == 3
+
+
+def test_schedule_rates_switch_at_breakpoints():
+    n = 6
+    rates = np.zeros((3, n, n))
+    rates[1] = 2.0                                                    # trips/min, 60-120 min
+    rates[2] = 0.5                                                    # from 120 min on
+    schedule = DemandSchedule(rates, breakpoints=[0.0, 60.0, 120.0])
+    host = _DemandHost(schedule, {50 + r: r for r in range(n)}, dt=30.0)
+
+    host.run(120)                                                     # 60 minutes of zero demand
+    assert host._demand_gen_od.sum() == 0
+    host.run(120)
+    peak = host._demand_gen_od.sum()
+    host.run(480)                                                     # 240 minutes at 0.5
+    late = host._demand_gen_od.sum() - peak
+
+    pairs = n * (n - 1)
+    assert abs(peak / (pairs * 2.0 * 60.0) - 1.0) < 0.05
+    assert abs(late / (pairs * 0.5 * 240.0) - 1.0) < 0.05
+
+
+def test_schedule_lookup_and_memory_mapping(tmp_path):
+    rates = np.random.default_rng(2).uniform(0.0, 1.0, size=(96, 5, 5)).astype(np.float32)
+    schedule = DemandSchedule(rates, breakpoints=np.arange(96) * 15.0)
+    loaded = DemandSchedule.load(schedule.save(str(tmp_path / 'schedule')))
+
+    assert isinstance(loaded.rates, np.memmap)
+    assert loaded.period_at(-5.0) == 0 and loaded.period_at(29.9) == 1
+    assert loaded.period_at(15.0) == 1 and loaded.period_at(1e6) == 95
+    view = loaded.rates_at(30.0)
+    assert np.shares_memory(view, loaded.rates)
+    np.testing.assert_array_equal(view, rates[2])
+    assert loaded.rate(31.0, 1, 3) == pytest.approx(rates[2, 1, 3])
+    np.testing.assert_allclose(loaded.max_rates, rates.max(axis=0))
+
+    np.save(tmp_path / 'periods.npy', rates)
+    with pytest.raises(ValueError, match='interval_min'):
+        DemandSchedule.load(str(tmp_path / 'periods.npy'))
+    by_interval = DemandSchedule.load(str(tmp_path / 'periods.npy'), interval_min=15.0)
+    np.testing.assert_array_equal(by_interval.breakpoints, schedule.breakpoints)
+    assert DemandSchedule.load(str(tmp_path / 'schedule' / 'rates.npy'), 15.0).n_regions == 5
+
+    with pytest.raises(ValueError, match='strictly increasing'):
+        DemandSchedule(rates[:2], breakpoints=[10.0, 10.0])
+    with pytest.raises(ValueError, match='non-negative'):
+        DemandSchedule(-rates[:1]).max_rates
@@ -0,0 +1,119 @@
+"""
+Memory-mapped episode arrays (urbannav.episode_arrays).
+
+Logs the scripted 3-UAV scenario from conftest in JSON and chunked mode,
+converts both to the arrays/ .npy layout and checks that the JSON, chunk
+stream and memory-mapped readers hold identical tables, that the CSR
+offsets index the step records the JSON history has, and that the
+episode cache bounds the number of open memory maps.
+
+Run in isolation:
+    pytest tests/test_episode_arrays.py -v
+"""
+import json
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from conftest import drive_logger
+from urbannav.component_schema import LoggingConfig
+from urbannav.episode_arrays import (
+    ARRAYS_DIRNAME, EpisodeArrayCache, EpisodeArrays, action_vector, convert_episode,
+    find_step_source,
+)
+from urbannav.logger import Logger
+
+STEPS = range(0, 21)
+
+
+def _run(log_dir, **logging_kwargs):
+    logger = Logger(LoggingConfig(log_dir=str(log_dir), **logging_kwargs))
+    drive_logger(logger, STEPS, actions=lambda t: {0: (1.0, 0.5)} if t % 2 == 0 else {})
+    logger.save()
+    return logger._episode_dir
+
+
+@pytest.fixture(scope='module')
+def episodes(tmp_path_factory):
+    json_dir = _run(tmp_path_factory.mktemp('json'))
+    chunk_dir = _run(tmp_path_factory.mktemp('chunked'), step_format='chunked', flush_every=6)
+    return json_dir, chunk_dir
+
+
+def _assert_same_tables(a, b):
+    assert a.fields == b.fields
+    for name in a.table_names():
+        assert a[name].dtype == b[name].dtype, name
+        np.testing.assert_array_equal(a[name], b[name], err_msg=name)
+
+
+def test_json_and_stream_sources_agree(episodes):
+    json_dir, chunk_dir = episodes
+    assert find_step_source(json_dir) == 'json'
+    assert find_step_source(chunk_dir) == 'stream'
+    _assert_same_tables(EpisodeArrays.load(json_dir), EpisodeArrays.load(chunk_dir))
+
+
+def test_tables_index_the_step_history(episodes):
+    json_dir, _ = episodes
+    with open(os.path.join(json_dir, 'step_history.json')) as f:
+        history = json.load(f)
+    arrays = EpisodeArrays.load(json_dir)
+
+    assert arrays['step'].tolist() == [s['step'] for s in history]
+    assert arrays.counts('uav').tolist() == [3] * len(STEPS)
+    k = 15
+    rows = arrays.rows('uav', k)
+    assert arrays['uav_id'][rows].tolist() == [0, 1, 2]
+    assert arrays['uav.speed'][rows].tolist() == [s['speed'] for s in history[k]['uavs'].values()]
+    assert arrays.step_rows('uav_collision_pairs', k).tolist() == [[0, 1]]
+    assert len(arrays.step_rows('vertiports', k)) == len(history[k]['vertiports'])
+
+    states = arrays.uav_matrix(('x', 'y', 'no_such_field'), rows)
+    assert states.shape == (3, 3) and states.dtype == np.float32
+    assert np.all(states[:, 2] == 0.0)
+
+    assert arrays['has_actions'].tolist() == [t % 2 == 0 for t in STEPS]
+    assert arrays['action'][arrays.rows('uav', 2)].tolist() == [[1.0, 0.5], [0.0, 0.0], [0.0, 0.0]]
+    assert not arrays['action'][arrays.rows('uav', 3)].any()
+
+
+def test_convert_writes_memory_mapped_arrays(episodes):
+    for episode_dir in episodes:
+        in_memory = EpisodeArrays.load(episode_dir)
+        target = convert_episode(episode_dir)
+        assert target == os.path.join(episode_dir, ARRAYS_DIRNAME)
+        assert find_step_source(episode_dir) == 'arrays'
+
+        mapped = EpisodeArrays.load(episode_dir)
+        assert mapped.mmapped and isinstance(mapped['uav.x'], np.memmap)
+        _assert_same_tables(in_memory, mapped)
+        # rerunning is a no-op unless asked to overwrite
+        mtime = os.path.getmtime(os.path.join(target, 'uav.x.npy'))
+        convert_episode(episode_dir)
+        assert os.path.getmtime(os.path.join(target, 'uav.x.npy')) == mtime
+
+
+def test_cache_bounds_open_episodes(episodes):
+    for episode_dir in episodes:
+        convert_episode(episode_dir)
+    cache = EpisodeArrayCache(max_open=1)
+    first = cache.get(episodes[0])
+    first['uav.x']
+    assert first._tables
+    cache.get(episodes[1])
+    assert not first._tables                     # evicted and closed
+    assert cache.get(episodes[0]) is not first
+
+    clone = pickle.loads(pickle.dumps(cache))
+    assert clone.max_open == 1 and not clone._mapped
+
+
+def test_action_vector_coercion():
+    assert action_vector([1.0, 2.0, 3.0]).tolist() == [1.0, 2.0]
+    assert action_vector((4.0,)).tolist() == [4.0, 0.0]
+    assert action_vector(2.5).tolist() == [2.5, 0.0]
+    assert action_vector(None).tolist() == [0.0, 0.0]
+    assert action_vector({'ax': 1.0}).tolist() == [0.0, 0.0]
@@ -0,0 +1,117 @@
+"""
+SQLite episode catalog (urbannav.episode_catalog).
+
+Logs the scripted 3-UAV scenario from conftest with LoggingConfig.catalog
+set and checks that every saved episode is catalogued with its paths and
+metrics, that config and metric filters select the right episodes, that
+sweep runs tag the episodes under their directory, and that rebuilding
+from the files on disk reproduces the rows the Logger wrote.
+
+Run in isolation:
+    pytest tests/test_episode_catalog.py -v
+"""
+import json
+import os
+
+import pytest
+
+from conftest import drive_logger
+from urbannav.component_schema import LoggingConfig
+from urbannav.episode_catalog import (
+    CATALOG_FILENAME, SWEEP_CONFIG_FILENAME, EpisodeCatalog, flatten_config, parse_filter,
+)
+from urbannav.logger import Logger
+
+
+def _run(log_dir, catalog_path, steps, **logging_kwargs):
+    logger = Logger(LoggingConfig(log_dir=str(log_dir), catalog=str(catalog_path), **logging_kwargs))
+    drive_logger(logger, steps)
+    logger.save()
+    logger.close()
+    return logger._episode_dir
+
+
+@pytest.fixture()
+def logged(tmp_path):
+    catalog_path = tmp_path / CATALOG_FILENAME
+    short = _run(tmp_path / 'run_aaa', catalog_path, range(0, 5))
+    long = _run(tmp_path / 'run_bbb', catalog_path, range(0, 21), step_format='chunked')
+    return tmp_path, EpisodeCatalog(str(catalog_path)), short, long
+
+
+def test_logger_catalogues_saved_episodes(logged):
+    _, catalog, short, long = logged
+    assert len(catalog) == 2
+
+    row = catalog.get(short)
+    assert row['num_steps'] == 5 and row['metrics']['total_steps'] == 5.0
+    assert row['step_history_path'] == os.path.join(short, 'step_history.json')
+    assert row['metadata_path'] == os.path.join(short, 'metadata.json')
+    assert catalog.get(long)['step_history_path'] == os.path.join(long, 'step_history')
+
+    assert catalog.select('metrics.total_steps>10') == [long]
+    assert catalog.select('metrics.total_steps<=5') == [short]
+    assert catalog.select('metrics.no_such_metric=0') == []
+
+
+def test_select_by_config_and_root(logged):
+    root, catalog, short, long = logged
+    catalog.add_episode(short, config={'simulator': {'seed': 3, 'mode': '2D'},
+                                       'fleet_composition': [{'count': 10}]})
+    catalog.add_episode(long, metrics={'total_steps': 21},
+                        config={'simulator': {'seed': 7, 'mode': '3D'},
+                                'fleet_composition': [{'count': 50}]})
+
+    assert catalog.select('fleet_composition.0.count>=50') == [long]
+    assert catalog.select('simulator.mode=2D') == [short]
+    assert catalog.select('simulator.seed!=3', 'metrics.total_steps>1') == [long]
+    assert catalog.select(('simulator.seed', '<', 10)) == [short, long]
+    assert catalog.select(root=str(root / 'run_aaa')) == [short]
+    # a sibling directory sharing the prefix is not "under" the root
+    assert catalog.select(root=str(root / 'run_a')) == []
+    # add_episode replaces the row whole: short was re-added without metrics
+    assert catalog.get(short)['metrics'] == {}
+
+
+def test_record_run_tags_episodes(logged):
+    root, catalog, short, long = logged
+    catalog.record_run('aaa', str(root / 'run_aaa'), {'simulator': {'seed': 3}},
+                       sweep_params={'simulator.seed': 3})
+    assert catalog.select(run_id='aaa') == [short]
+    assert catalog.get(long)['run_id'] is None
+    assert json.loads(catalog.query('SELECT sweep_params FROM runs')[0]['sweep_params']) == {
+        'simulator.seed': 3}
+
+    # re-adding the episode keeps the run it was tagged with
+    catalog.add_episode(short)
+    assert catalog.get(short)['run_id'] == 'aaa'
+
+
+def test_rebuild_matches_logged_rows(logged):
+    root, catalog, short, long = logged
+    with open(root / 'run_bbb' / SWEEP_CONFIG_FILENAME, 'w') as f:
+        json.dump({'simulator': {'seed': 7}}, f)
+
+    rebuilt = EpisodeCatalog(str(root / 'rebuilt.sqlite'))
+    assert rebuilt.rebuild(str(root)) == 2
+    for episode_dir in (short, long):
+        expected, actual = catalog.get(episode_dir), rebuilt.get(episode_dir)
+        for key in ('num_steps', 'metadata_path', 'metrics_path', 'step_history_path', 'metrics'):
+            assert actual[key] == expected[key], key
+    assert rebuilt.select(run_id='bbb') == [long]
+
+    os.rename(short, short + '_moved')
+    assert rebuilt.remove_missing() == 1
+    assert rebuilt.select() == [long]
+
+
+def test_filter_parsing(tmp_path):
+    assert parse_filter('simulator.seed=42') == ('simulator.seed', '=', 42)
+    assert parse_filter(' metrics.avg_speed >= 9.5 ') == ('metrics.avg_speed', '>=', 9.5)
+    assert parse_filter('simulator.mode!=3D') == ('simulator.mode', '!=', '3D')
+    assert parse_filter('logging.enabled=true') == ('logging.enabled', '=', True)
+    with pytest.raises(ValueError, match='Cannot parse filter'):
+        parse_filter('simulator.seed')
+    with pytest.raises(ValueError, match='Unknown filter operator'):
+        EpisodeCatalog(str(tmp_path / CATALOG_FILENAME)).select(('simulator.seed', '~', 1))
+    assert flatten_config({'a': {'b': [1, {'c': 2}]}}) == {'a.b.0': 1, 'a.b.1.c': 2}
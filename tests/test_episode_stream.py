@@ -0,0 +1,97 @@
+"""
+Chunked step-history streaming (Logger step_format='chunked' + episode_stream).
+
+Logs the scripted 3-UAV scenario from conftest twice — once in the default
+JSON mode, once streamed to .npz chunks every few steps — and checks that the
+chunk reader reproduces the JSON step history, that step-range / UAV-subset
+reads only return what was asked for, and that episode metrics are unchanged
+by draining the collector mid-episode.
+
+Run in isolation:
+    pytest tests/test_episode_stream.py -v
+"""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from conftest import drive_logger
+from urbannav.component_schema import LoggingConfig
+from urbannav.episode_stream import EpisodeStreamReader
+from urbannav.logger import Logger
+
+STEPS = range(0, 21)
+FLUSH_EVERY = 6
+
+
+def _run(log_dir, **logging_kwargs):
+    logger = Logger(LoggingConfig(log_dir=str(log_dir), **logging_kwargs))
+    drive_logger(logger, STEPS, actions={0: (1.0, 0.5)})
+    render = logger.get_step_render_data()
+    logger.save()
+    return logger, render
+
+
+@pytest.fixture(scope='module')
+def episodes(tmp_path_factory):
+    json_logger, json_render = _run(tmp_path_factory.mktemp('json'))
+    chunk_logger, chunk_render = _run(tmp_path_factory.mktemp('chunked'),
+                                      step_format='chunked', flush_every=FLUSH_EVERY)
+    return json_logger, json_render, chunk_logger, chunk_render
+
+
+def _load_json(episode_dir, name):
+    with open(os.path.join(episode_dir, name)) as f:
+        return json.load(f)
+
+
+def test_layout(episodes):
+    _, _, chunk_logger, _ = episodes
+    files = sorted(os.listdir(chunk_logger._episode_dir))
+    assert files == ['episode_metrics.json', 'metadata.json', 'step_history']
+    reader = EpisodeStreamReader(chunk_logger._episode_dir)
+    assert reader.num_steps == len(STEPS)
+    assert [c['num_steps'] for c in reader.chunks] == [6, 6, 6, 3]
+    # the collector never held more than one chunk
+    assert chunk_logger._metrics_collector.num_buffered_steps == 0
+
+
+def test_chunks_reproduce_json_history(episodes):
+    json_logger, json_render, chunk_logger, chunk_render = episodes
+    expected = _load_json(json_logger._episode_dir, 'step_history.json')
+    streamed = EpisodeStreamReader(chunk_logger._episode_dir).load_steps()
+    assert json.loads(json.dumps(streamed)) == expected
+    assert chunk_render == json_render
+
+
+def test_metrics_and_metadata_unchanged(episodes):
+    json_logger, _, chunk_logger, _ = episodes
+    for name in ('episode_metrics.json', 'metadata.json'):
+        a = _load_json(json_logger._episode_dir, name)
+        b = _load_json(chunk_logger._episode_dir, name)
+        a.pop('episode_dir', None)
+        b.pop('episode_dir', None)
+        assert a == b
+
+
+def test_step_range_and_uav_subset(episodes):
+    _, _, chunk_logger, _ = episodes
+    reader = EpisodeStreamReader(chunk_logger._episode_dir)
+
+    cols = reader.load_uav_columns(steps=(5, 13), uav_ids=[1], fields=['x', 'speed'])
+    assert set(cols) == {'step', 'uav_id', 'x', 'speed'}
+    assert cols['step'].tolist() == list(range(5, 13))
+    assert np.all(cols['uav_id'] == 1)
+    assert cols['speed'].tolist() == [20.0 + t for t in range(5, 13)]
+
+    steps = reader.load_steps(steps=(12, None), uav_ids=[0, 2])
+    assert [s['step'] for s in steps] == list(range(12, 21))
+    assert all(set(s['uavs']) == {0, 2} for s in steps)
+
+    assert len(reader.load_uav_columns(uav_ids=[99])['uav_id']) == 0
+
+
+def test_unknown_step_format_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Logger(LoggingConfig(log_dir=str(tmp_path), step_format='parquet'))
@@ -0,0 +1,82 @@
+"""
+Fleet rebalancing solver (urbannav.fleet_dispatcher.FleetDispatcher).
+
+Checks on small vertiport layouts that surplus idle UAVs are moved to the
+vertiports whose queued trips they cannot otherwise serve — nearest first
+for 'greedy', minimum total distance for 'optimal' — that inbound UAVs and
+max_distance are respected, and that a tick with thousands of idle UAVs
+and queued trips is solved on per-vertiport counts.
+
+Run in isolation:
+    pytest tests/test_fleet_dispatcher.py -v
+"""
+import time
+
+import numpy as np
+import pytest
+
+from urbannav.fleet_dispatcher import FleetDispatcher
+
+
+def _line_dispatcher(method, **kwargs):
+    dispatcher = FleetDispatcher(method=method, **kwargs)
+    dispatcher.set_vertiports([(0.0, 0.0), (1000.0, 0.0), (2500.0, 0.0), (2600.0, 0.0)])
+    return dispatcher
+
+
+def _moves(plan):
+    return sorted(zip(*(a.tolist() for a in plan)))
+
+
+def test_greedy_moves_surplus_to_nearest_need():
+    dispatcher = _line_dispatcher('greedy')
+    idle = [3, 0, 2, 0]
+    queued = [1, 2, 0, 1]
+    # vp0 and vp2 have 2 spare UAVs each; vp1 needs 2, vp3 needs 1
+    assert _moves(dispatcher.plan(idle, queued)) == [(0, 1, 2), (2, 3, 1)]
+    # a UAV already flying to vp1 covers one of its trips
+    assert _moves(dispatcher.plan(idle, queued, inbound=[0, 1, 0, 0])) == [(0, 1, 1), (2, 3, 1)]
+    assert _moves(dispatcher.plan([1, 0, 0, 0], [1, 3, 0, 0])) == []
+
+
+def test_optimal_minimises_total_distance():
+    dispatcher = FleetDispatcher(method='optimal')
+    # greedy pairs the closest (1, 2) first and is left with 0 → 3 (31 m in total)
+    dispatcher.set_vertiports([(0.0, 0.0), (10.0, 0.0), (10.0, 1.0), (30.0, 0.0)])
+    idle, queued = [1, 1, 0, 0], [0, 0, 1, 1]
+    assert _moves(dispatcher.plan(idle, queued)) == [(0, 2, 1), (1, 3, 1)]
+    dispatcher.method = 'greedy'
+    assert _moves(dispatcher.plan(idle, queued)) == [(0, 3, 1), (1, 2, 1)]
+
+
+@pytest.mark.parametrize('method', ['greedy', 'optimal'])
+def test_max_distance(method):
+    dispatcher = _line_dispatcher(method, max_distance=1200.0)
+    assert _moves(dispatcher.plan([2, 0, 0, 0], [0, 1, 0, 1])) == [(0, 1, 1)]
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError, match="Unknown dispatch method 'lp'"):
+        FleetDispatcher(method='lp')
+
+
+@pytest.mark.parametrize('method', ['greedy', 'optimal'])
+def test_thousands_of_uavs_in_one_tick(method):
+    rng = np.random.default_rng(0)
+    n_vp = 200
+    dispatcher = FleetDispatcher(method=method)
+    dispatcher.set_vertiports(rng.uniform(0.0, 20000.0, size=(n_vp, 2)))
+    idle = rng.integers(0, 40, n_vp)
+    queued = rng.integers(0, 40, n_vp)
+
+    t0 = time.perf_counter()
+    src, dst, count = dispatcher.plan(idle, queued)
+    elapsed = time.perf_counter() - t0
+
+    surplus = np.maximum(idle - queued, 0)
+    need = np.maximum(queued - idle, 0)
+    assert idle.sum() > 2000 and queued.sum() > 2000
+    assert count.sum() == min(surplus.sum(), need.sum())
+    assert np.all(np.bincount(src, count, n_vp) <= surplus)
+    assert np.all(np.bincount(dst, count, n_vp) <= need)
+    assert elapsed < 5.0
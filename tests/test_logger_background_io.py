@@ -0,0 +1,86 @@
+"""
+Background Logger persistence (LoggingConfig.background_io / compression).
+
+Runs two short scripted episodes through Logger.reset() with the writer
+thread on and off, and checks that both produce the same files, that
+compressed JSON round-trips through episode_io.read_json, and that an
+exception raised on the writer thread surfaces on the caller's thread.
+
+Run in isolation:
+    pytest tests/test_logger_background_io.py -v
+"""
+import os
+import threading
+
+import pytest
+
+from conftest import build_three_uav_rig, drive_logger
+from urbannav.component_schema import LoggingConfig
+from urbannav.episode_io import AsyncWriter, read_json
+from urbannav.logger import Logger
+
+STEPS = range(0, 16)
+
+
+def _run_two_episodes(log_dir, **logging_kwargs):
+    logger = Logger(LoggingConfig(log_dir=str(log_dir), **logging_kwargs))
+    rig = build_three_uav_rig()
+    episode_dirs = []
+    for _ in range(2):
+        drive_logger(logger, STEPS, rig=rig)
+        episode_dirs.append(logger._episode_dir)
+        logger.reset()
+    logger.close()
+    return episode_dirs
+
+
+def _contents(episode_dir, names=('metadata.json', 'step_history.json', 'episode_metrics.json')):
+    out = {name: read_json(os.path.join(episode_dir, name)) for name in names}
+    out['metadata.json'].pop('episode_dir')
+    return out
+
+
+def test_background_matches_synchronous(tmp_path):
+    sync_dirs = _run_two_episodes(tmp_path / 'sync', background_io=False)
+    async_dirs = _run_two_episodes(tmp_path / 'async', background_io=True)
+    for a, b in zip(sync_dirs, async_dirs):
+        assert _contents(a) == _contents(b)
+    assert _contents(async_dirs[1])['episode_metrics.json']['episode_id'] == 1
+
+
+@pytest.mark.parametrize('compression', ['gzip', 'zstd'])
+def test_compressed_json_round_trips(tmp_path, compression):
+    if compression == 'zstd':
+        pytest.importorskip('zstandard')
+    plain = _run_two_episodes(tmp_path / 'plain')
+    packed = _run_two_episodes(tmp_path / 'packed', compression=compression)
+    assert not os.path.exists(os.path.join(packed[0], 'step_history.json'))
+    assert _contents(plain[0]) == _contents(packed[0])
+
+
+def test_writer_runs_jobs_in_order_off_thread():
+    writer = AsyncWriter(max_pending=1)
+    seen = []
+    for k in range(5):
+        writer.submit(lambda k=k: seen.append((k, threading.current_thread().name)))
+    writer.flush()
+    assert [k for k, _ in seen] == list(range(5))
+    assert all(name != threading.current_thread().name for _, name in seen)
+    writer.close()
+
+
+def test_writer_error_surfaces_on_flush():
+    writer = AsyncWriter()
+
+    def _fail():
+        raise OSError('disk full')
+
+    writer.submit(_fail)
+    with pytest.raises(OSError, match='disk full'):
+        writer.flush()
+    writer.close()
+
+
+def test_unknown_compression_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Logger(LoggingConfig(log_dir=str(tmp_path), compression='lz4'))
@@ -0,0 +1,248 @@
+"""
+Columnar MetricsCollector: array-backed storage, lazy get_step_data() view.
+
+Records the scripted 3-UAV scenario from conftest (no OSM / ATC needed) into
+a collector with a deliberately tiny initial capacity so the columns must
+grow, then checks that the compatibility view, the raw columns and the
+episode metrics all agree.
+
+Run in isolation:
+    pytest tests/test_metrics_collector.py -v
+"""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from conftest import build_three_uav_rig, drive_logger, set_scripted_positions
+from urbannav.component_schema import LoggingConfig, SimulatorState
+from urbannav.episode_io import read_json
+from urbannav.logger import Logger
+from urbannav.metrics_collector import MetricsCollector, _serialize
+
+STEPS = range(0, 21)
+
+
+@pytest.fixture(scope='module')
+def collector():
+    uav_dict, sensor_module = build_three_uav_rig()
+    vertiports = [uav_dict[0].start_vertiport, uav_dict[0].end_vertiport]
+    mc = MetricsCollector(initial_rows=4)
+    for t in STEPS:
+        set_scripted_positions(uav_dict, t)
+        for uav_id, uav in uav_dict.items():
+            uav.current_speed = 10.0 * (uav_id + 1) + t
+        collisions = sensor_module.get_collision_result()
+        state = SimulatorState(timestamp=float(t), currentstep=t, airspace_state=vertiports,
+                               atc_state=uav_dict, external_systems={})
+        mc.record(state, actions={0: (1.0, 0.5)}, collisions=collisions)
+    return mc
+
+
+def test_step_view_format(collector):
+    steps = collector.get_step_data()
+    assert len(steps) == len(STEPS)
+    first = steps[0]
+    assert set(first) == {'step', 'num_active_uavs', 'uavs', 'actions',
+                          'collisions', 'vertiports', 'edges'}
+    assert first['num_active_uavs'] == 3
+    assert list(first['uavs'][0]) == [
+        'x', 'y', 'z', 'speed', 'heading', 'vx', 'vy', 'vz', 'nmac_count',
+        'collision_status', 'mission_complete', 'num_missions_completed', 'dist_to_goal',
+    ]
+    assert first['uavs'][1]['x'] == pytest.approx(750.0)
+    assert first['actions'] == {'0': [1.0, 0.5]}
+    assert steps[-1]['step'] == STEPS[-1]
+    assert [s['step'] for s in steps[2:5]] == [2, 3, 4]
+
+
+def test_collision_pairs(collector):
+    steps = collector.get_step_data()
+    assert steps[15]['collisions']['uav_collision_pairs'] == [[0, 1]]
+    assert [0, 1] in steps[13]['collisions']['nmac_pairs']
+    assert steps[0]['collisions']['nmac_pairs'] == []
+
+
+def test_view_is_json_serializable(collector):
+    payload = json.dumps(_serialize(collector.get_step_data()))
+    assert len(json.loads(payload)) == len(STEPS)
+
+
+def test_columns_align_with_view(collector):
+    cols = collector.get_uav_columns()
+    assert len(cols['uav_id']) == 3 * len(STEPS)
+    steps = collector.get_step_data()
+    for row in (0, 17, len(cols['uav_id']) - 1):
+        snap = steps[int(cols['step'][row])]['uavs'][int(cols['uav_id'][row])]
+        assert snap['speed'] == cols['speed'][row]
+        assert snap['x'] == cols['x'][row]
+
+
+def test_metrics_match_step_view(collector):
+    steps = collector.get_step_data()
+    metrics = collector.get_metrics()
+    speeds = [snap['speed'] for s in steps for snap in s['uavs'].values()]
+    assert metrics['total_steps'] == len(STEPS)
+    assert metrics['total_nmac_events'] == sum(len(s['collisions']['nmac_pairs']) for s in steps)
+    assert metrics['total_uav_collision_events'] == sum(
+        len(s['collisions']['uav_collision_pairs']) for s in steps)
+    assert metrics['unique_uavs'] == 3
+    assert metrics['peak_active_uavs'] == 3
+    assert metrics['avg_speed'] == pytest.approx(np.mean(speeds))
+    assert metrics['max_speed'] == max(speeds)
+    final = [snap['dist_to_goal'] for snap in steps[-1]['uavs'].values()]
+    assert metrics['avg_dist_to_goal_final'] == pytest.approx(np.mean(final))
+
+
+def test_reset_clears(collector):
+    mc = MetricsCollector()
+    assert mc.get_metrics() == {}
+    assert len(mc.get_step_data()) == 0
+
+
+# ---------------------------------------------------------------------------
+# Recording options (LoggingConfig decimation / selection)
+# ---------------------------------------------------------------------------
+
+def _record(mc, landing_step=None):
+    uav_dict, sensor_module = build_three_uav_rig()
+    vertiports = [uav_dict[0].start_vertiport, uav_dict[0].end_vertiport]
+    for t in STEPS:
+        set_scripted_positions(uav_dict, t)
+        for uav_id, uav in uav_dict.items():
+            uav.current_speed = 10.0 * (uav_id + 1) + t
+        uav_dict[2].current_mission_complete_status = landing_step is not None and t >= landing_step
+        state = SimulatorState(timestamp=float(t), currentstep=t, airspace_state=vertiports,
+                               atc_state=uav_dict, external_systems={})
+        mc.record(state, collisions=sensor_module.get_collision_result())
+    return uav_dict
+
+
+def test_field_and_table_selection():
+    mc = MetricsCollector(uav_fields=['x', 'y'], log_vertiports=False, log_edges=False)
+    _record(mc)
+    assert set(mc._uav_cols) == {'x', 'y'}
+    step = mc.get_step_data()[0]
+    assert list(step['uavs'][0]) == ['x', 'y']
+    assert step['vertiports'] == {} and step['edges'] == {}
+    # metrics read speed off the UAVs, not from the (unrecorded) speed column
+    full = MetricsCollector()
+    _record(full)
+    assert mc.get_metrics() == full.get_metrics()
+    assert mc.get_metrics()['avg_speed'] > 0.0
+    with pytest.raises(ValueError):
+        MetricsCollector(uav_fields=['altitude'])
+
+
+def test_log_every_decimates():
+    mc = MetricsCollector(log_every=5)
+    _record(mc)
+    assert [s['step'] for s in mc.get_step_data()] == [0, 5, 10, 15, 20]
+    # collisions are only kept on recorded steps
+    assert mc.get_step_data()[3]['collisions']['uav_collision_pairs'] == [[0, 1]]
+
+
+@pytest.mark.parametrize('options', [{'log_every': 5}, {'events_only': True}])
+def test_decimation_keeps_episode_totals(options):
+    full, decimated = MetricsCollector(), MetricsCollector(**options)
+    _record(full, landing_step=7)
+    _record(decimated, landing_step=7)
+    assert decimated.num_buffered_steps < full.num_buffered_steps
+    assert decimated.num_steps == len(STEPS)
+    metrics = decimated.get_metrics()
+    assert metrics['total_nmac_events'] > 0 and metrics['total_uav_collision_events'] > 0
+    assert metrics == full.get_metrics()
+
+
+@pytest.mark.parametrize('options', [{'events_only': True}, {'uav_fraction': 0.5, 'log_every': 5}])
+def test_start_metadata_covers_whole_fleet(tmp_path, options):
+    logger = Logger(LoggingConfig(log_dir=str(tmp_path), background_io=False, **options))
+    drive_logger(logger, STEPS)
+    logger.save()
+    logger.close()
+    metadata = read_json(os.path.join(logger._episode_dir, 'metadata.json'))
+    assert metadata['episode_id'] == logger.episode_id
+    assert metadata['start_step'] == 0
+    assert metadata['num_uavs_at_start'] == 3
+    assert metadata['initial_uav_positions'] == {
+        '0': {'x': -750.0, 'y': 0.0, 'z': 0.0},
+        '1': {'x': 750.0, 'y': 0.0, 'z': 0.0},
+        '2': {'x': 0.0, 'y': 1200.0, 'z': 0.0},
+    }
+
+
+def test_uav_subset_by_fraction_and_type():
+    uav_dict, _ = build_three_uav_rig()
+    kept = MetricsCollector(uav_fraction=0.5)
+    _record(kept)
+    ids = set(kept.get_uav_columns()['uav_id'].tolist())
+    assert ids == {uid for uid in uav_dict if kept._is_selected(uid, uav_dict[uid])}
+    assert ids < set(uav_dict)
+
+    typed = MetricsCollector(uav_types=['NO_SUCH_TYPE'])
+    _record(typed)
+    assert len(typed.get_uav_columns()['uav_id']) == 0
+    assert typed.get_metrics()['total_steps'] == len(STEPS)
+
+
+def test_events_only_keeps_involved_uavs():
+    mc = MetricsCollector(events_only=True)
+    uav_dict = _record(mc, landing_step=18)
+    steps = mc.get_step_data()
+    nmac_steps = [s['step'] for s in steps if s['collisions']['nmac_pairs']]
+    assert all(s['collisions']['nmac_pairs'] or s['step'] == 18 for s in steps)
+    assert nmac_steps and min(nmac_steps) == 13
+    assert set(steps[0]['uavs']) == {0, 1}
+    assert set(next(s for s in steps if s['step'] == 18)['uavs']) >= {2}
+    # mission bookkeeping on the UAVs runs on every call, recorded or not
+    assert uav_dict[2].num_missions_completed_in_episode == 1
+
+
+# ---------------------------------------------------------------------------
+# Online metrics (OnlineMetrics) vs the batch reduction
+# ---------------------------------------------------------------------------
+
+def test_online_metrics_match_batch_reduction(collector):
+    online, batch = collector.get_metrics(), collector._calculate_metrics()
+    assert online.keys() == batch.keys()
+    for key, value in batch.items():
+        assert online[key] == pytest.approx(value), key
+
+
+def test_online_metrics_without_history(collector):
+    mc = MetricsCollector(keep_history=False)
+    uav_dict, sensor_module = build_three_uav_rig()
+    vertiports = [uav_dict[0].start_vertiport, uav_dict[0].end_vertiport]
+    for t in STEPS:
+        set_scripted_positions(uav_dict, t)
+        for uav_id, uav in uav_dict.items():
+            uav.current_speed = 10.0 * (uav_id + 1) + t
+        state = SimulatorState(timestamp=float(t), currentstep=t, airspace_state=vertiports,
+                               atc_state=uav_dict, external_systems={})
+        mc.record(state, actions={0: (1.0, 0.5)}, collisions=sensor_module.get_collision_result())
+        assert mc.num_buffered_steps == 1
+    assert mc.num_steps == len(STEPS)
+    assert mc.get_metrics() == collector.get_metrics()
+
+
+def test_online_metrics_survive_drain():
+    mc = MetricsCollector()
+    _record(mc, landing_step=7)
+    full = mc.get_metrics()
+    assert full['avg_missions_completed'] == pytest.approx(1 / 3)
+
+    drained = MetricsCollector()
+    uav_dict, sensor_module = build_three_uav_rig()
+    vertiports = [uav_dict[0].start_vertiport, uav_dict[0].end_vertiport]
+    for t in STEPS:
+        set_scripted_positions(uav_dict, t)
+        for uav_id, uav in uav_dict.items():
+            uav.current_speed = 10.0 * (uav_id + 1) + t
+        uav_dict[2].current_mission_complete_status = t >= 7
+        state = SimulatorState(timestamp=float(t), currentstep=t, airspace_state=vertiports,
+                               atc_state=uav_dict, external_systems={})
+        drained.record(state, collisions=sensor_module.get_collision_result())
+        if t % 4 == 3:
+            drained.drain()
+    assert drained.get_metrics() == full
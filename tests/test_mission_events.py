@@ -0,0 +1,79 @@
+"""
+Event-driven replanning (ATC mission-change listeners -> PlannerEngine).
+
+Checks that a planner is reset as soon as ATC assigns its UAV a new
+mission, that get_plans() itself never replans (a mission changed behind
+ATC's back is not picked up), and that over a testbed run with random
+mission reassignment every live UAV's planner always heads for its
+current end vertiport.
+
+Run in isolation:
+    pytest tests/test_mission_events.py -v
+"""
+import pytest
+
+from testbed.testbed_simulator import TestbedSimulator
+
+_SCENARIO_YAML = """
+simulator: {dt: 1.0, total_timestep: 600, mode: '3D', seed: 123}
+logging: {enabled: false}
+rendering: {enabled: false}
+route_network: {enabled: true}
+testbed_airspace:
+  pattern: 'ring'
+  num_vertiports: 4
+  radius: 600.0
+  start_angle: 0.7853981633974483
+  landing_pad_capacity: 2
+  altitude_range: [1800.0, 1800.0]
+  buildings: [{center: [0.0, 0.0], width: 100.0, depth: 100.0, buffer_radius: 50.0}]
+fleet_composition:
+  - {type_name: STANDARD, count: 1, dynamics: PointMass, controller: PIDPointMassController,
+     sensor: PartialSensor, planner: PointMass-PID}
+"""
+
+
+@pytest.fixture
+def sim(tmp_path):
+    config_path = tmp_path / 'missions.yaml'
+    config_path.write_text(_SCENARIO_YAML)
+    sim = TestbedSimulator(config_path=str(config_path))
+    sim.reset()
+    return sim
+
+
+def _goal(manager, uav_id):
+    return manager.planner_module.plan_obj_map[uav_id].waypoints[-1]
+
+
+def test_reassignment_resets_planner_immediately(sim):
+    manager = sim.simulator_manager
+    atc, planners = manager.atc, manager.planner_module.plan_obj_map
+    uav = atc.uav_dict[0]
+    planners[0].current_idx = 5
+
+    atc.reassign_new_mission(0)
+    assert _goal(manager, 0) is uav.end_vertiport.location
+    assert planners[0].current_idx == 0
+    assert planners[0].waypoints == manager.planner_module.route_network.waypoints(
+        uav.start_vertiport, uav.end_vertiport)
+
+    # get_plans() only evaluates: a mission changed without the ATC event stays unseen
+    other = next(vp for vp in manager.airspace.vertiport_list if vp is not uav.end_vertiport)
+    uav.assign_start_end(uav.end_vertiport, other)
+    manager.planner_module.get_plans()
+    assert _goal(manager, 0) is not other.location
+    atc.notify_mission_change(0)
+    assert _goal(manager, 0) is other.location
+
+
+def test_planners_follow_missions_over_a_run(sim):
+    manager = sim.simulator_manager
+    events = []
+    manager.atc.add_mission_listener(events.append)
+
+    for _ in range(sim.total_timestep):
+        sim.step({})
+        for uav_id, uav in manager.atc.uav_dict.items():
+            assert _goal(manager, uav_id) == uav.end_vertiport.location
+    assert events                                 # missions were reassigned during the run
@@ -0,0 +1,111 @@
+"""
+Out-of-process realtime viewer (urbannav.realtime_viewer).
+
+Packs frames of the scripted 3-UAV scenario from conftest into the shared
+frame ring and checks that they unpack to the Renderer's own frames, that
+a reader only gets the newest frame, and that a Renderer in realtime mode
+publishes to a viewer process (Agg backend here) which draws the frames
+of each episode while the simulation side never draws, and that close()
+stops it and frees the shared memory.
+
+Run in isolation:
+    pytest tests/test_realtime_viewer.py -v
+"""
+import time
+from multiprocessing import shared_memory
+
+import pytest
+
+from conftest import build_three_uav_rig, set_scripted_positions
+from urbannav.component_schema import RenderingConfig
+from urbannav.realtime_viewer import FrameRingBuffer
+from urbannav.renderer import Renderer
+
+
+def _rig_frames(steps):
+    renderer = Renderer(RenderingConfig(enabled=True))
+    uav_dict, _ = build_three_uav_rig()
+    frames = []
+    for t in steps:
+        set_scripted_positions(uav_dict, t)
+        frames.append(renderer._build_frame(uav_dict, t))
+    return frames
+
+
+def _wait_until(condition, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'viewer did not catch up'
+        time.sleep(0.05)
+
+
+def test_ring_round_trip_and_latest_only():
+    frames = _rig_frames(range(0, 6))
+    ring = FrameRingBuffer(max_uavs=8, slots=4)
+    reader = FrameRingBuffer(max_uavs=8, slots=4, name=ring.name)
+    try:
+        assert reader.read_latest() is None
+        ring.publish(frames[0], episode=2)
+        seq, episode, frame = reader.read_latest()
+        assert (seq, episode) == (1, 2)
+        assert frame == frames[0]
+        assert reader.read_latest() is None               # nothing new
+
+        # a reader that fell behind skips straight to the newest frame
+        for f in frames[1:]:
+            ring.publish(f)
+        seq, _, frame = reader.read_latest()
+        assert seq == len(frames) and frame == frames[-1]
+
+        reader.mark_drawn(seq)
+        assert ring.frames_drawn == 1 and ring.last_drawn == seq
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_ring_truncates_to_capacity():
+    frame = _rig_frames([0])[0]
+    ring = FrameRingBuffer(max_uavs=2)
+    try:
+        ring.publish(frame)
+        _, _, got = ring.read_latest()
+        assert list(got['uavs']) == list(frame['uavs'])[:2]
+    finally:
+        ring.close()
+
+
+def test_viewer_process_is_opt_in(monkeypatch):
+    drawn = []
+    renderer = Renderer(RenderingConfig(enabled=True, mode='realtime', frame_skip=0))
+    monkeypatch.setattr(renderer, '_draw_realtime', drawn.append)
+    renderer.reset()
+    uav_dict, _ = build_three_uav_rig()
+    renderer.render_step(uav_dict, 0)
+    assert len(drawn) == 1 and renderer._viewer is None
+
+
+def test_renderer_publishes_to_viewer_process(monkeypatch):
+    monkeypatch.setenv('MPLBACKEND', 'Agg')               # inherited by the viewer
+    renderer = Renderer(RenderingConfig(enabled=True, mode='realtime', frame_skip=0,
+                                        realtime_process=True, realtime_fps=50.0))
+    renderer.reset()
+    uav_dict, _ = build_three_uav_rig()
+    try:
+        for episode in range(2):
+            for t in range(0, 6):
+                set_scripted_positions(uav_dict, t)
+                renderer.render_step(uav_dict, t)
+            ring = renderer._viewer.ring
+            _wait_until(lambda: ring.last_drawn == ring.head)
+            assert renderer._viewer.alive
+            assert 1 <= ring.frames_drawn <= ring.head
+            renderer.reset()
+        assert renderer._fig is None                      # nothing drawn in this process
+    finally:
+        name = renderer._viewer.ring.name
+        process = renderer._viewer._process
+        renderer.close()
+    assert not process.is_alive()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
@@ -0,0 +1,180 @@
+"""
+Vertiport route network around restricted airspace (urbannav.route_network).
+
+Checks that every precomputed route stays clear of the restricted-area
+hulls and is never longer than needed (the straight line when that is
+clear), that a vertiport inside a hull does not open that hull to the
+other routes, that PlannerEngine warns when SixDOF planners (which drop
+route corners) run with a network, that planner waypoints carry the vertiport endpoints and an
+interpolated altitude, that networks are saved to and loaded from the
+cache directory by their build inputs, and that the dense testbed
+scenario — four vertiports around a building — has no RA collision once
+its planners fly the network's routes.
+
+Run in isolation:
+    pytest tests/test_route_network.py -v
+"""
+import os
+
+import numpy as np
+import pytest
+import shapely
+from shapely import Point
+
+from urbannav.route_network import ROUTE_NETWORK_PREFIX, RouteNetwork
+from urbannav.vertiport import Vertiport
+
+
+def _ring(n=4, radius=1500.0, z=1800.0):
+    angles = np.pi / 4 + np.arange(n) * 2 * np.pi / n
+    return [Vertiport(Point(radius * np.cos(a), radius * np.sin(a), z)) for a in angles]
+
+
+def _random_layout(seed=0):
+    rng = np.random.default_rng(seed)
+    obstacles = [shapely.box(x, y, x + w, y + h)
+                 for x, y, w, h in zip(*rng.uniform(-3000, 3000, (2, 12)), *rng.uniform(100, 600, (2, 12)))]
+    blocked = shapely.unary_union(obstacles)
+    vertiports = []
+    while len(vertiports) < 10:
+        p = Point(*rng.uniform(-4000, 4000, 2))
+        if not blocked.intersects(p):
+            vertiports.append(Vertiport(p))
+    return vertiports, obstacles
+
+
+def test_routes_avoid_restricted_areas():
+    vertiports, obstacles = _random_layout()
+    network = RouteNetwork.build(vertiports, obstacles)
+    hulls = shapely.unary_union([o.convex_hull for o in obstacles])
+    assert len(network) == 10
+
+    for a in vertiports:
+        for b in vertiports:
+            if a is b:
+                continue
+            xy = network.path(a, b)
+            np.testing.assert_allclose(xy[[0, -1]], [[a.location.x, a.location.y], [b.location.x, b.location.y]])
+            assert not shapely.LineString(xy).intersects(hulls)
+            straight = a.location.distance(b.location)
+            assert network.distance(a, b) == pytest.approx(np.hypot(*np.diff(xy, axis=0).T).sum())
+            assert network.distance(a, b) >= straight - 1e-6
+            if not shapely.LineString([a.location, b.location]).intersects(hulls):
+                assert len(xy) == 2
+    np.testing.assert_allclose(network.length, network.length.T)
+
+
+def test_waypoints():
+    vertiports = _ring()
+    vertiports[2] = Vertiport(Point(vertiports[2].location.x, vertiports[2].location.y, 1000.0))
+    network = RouteNetwork.build(vertiports, [shapely.box(-350, -350, 350, 350)])
+
+    across = network.waypoints(vertiports[0], vertiports[2])
+    assert across[0] is vertiports[0].location and across[-1] is vertiports[2].location
+    assert len(across) > 2
+    heights = [p.z for p in across]
+    assert heights == sorted(heights, reverse=True) and 1000.0 < heights[1] < 1800.0
+    assert network.waypoints(vertiports[0], vertiports[2]) == across
+    assert len(network.waypoints(vertiports[0], vertiports[1])) == 2      # ring side is clear
+
+    elsewhere = Vertiport(Point(0.0, 5000.0))
+    assert network.waypoints(vertiports[0], elsewhere) == [vertiports[0].location, elsewhere.location]
+    assert network.distance(vertiports[0], elsewhere) == pytest.approx(
+        vertiports[0].location.distance(elsewhere.location))
+
+
+def test_vertiport_inside_hull_keeps_obstacle():
+    # U-shaped building with a vertiport in its courtyard: the courtyard pad
+    # may leave through the hull, but routes between the others go around
+    u_shape = shapely.box(-100, -100, 100, 100).difference(shapely.box(-60, -60, 60, 100))
+    a, b, courtyard = Vertiport(Point(-300.0, 0.0)), Vertiport(Point(300.0, 0.0)), Vertiport(Point(0.0, 0.0))
+    without = RouteNetwork.build([a, b], [u_shape])
+    network = RouteNetwork.build([a, b, courtyard], [u_shape])
+
+    xy = network.path(a, b)
+    assert len(xy) > 2
+    assert not shapely.LineString(xy).intersects(u_shape.convex_hull)
+    np.testing.assert_allclose(xy, without.path(a, b))
+    assert network.distance(a, b) == pytest.approx(without.distance(a, b))
+    for other in (a, b):
+        assert np.isfinite(network.distance(courtyard, other))
+        assert np.isfinite(network.distance(other, courtyard))
+    np.testing.assert_allclose(network.length, network.length.T)
+
+
+@pytest.mark.parametrize('planner, warns', [('SixDOF-PID', True), ('PointMass-PID', False)])
+def test_planner_engine_warns_for_six_dof(planner, warns, recwarn):
+    from types import SimpleNamespace
+    from urbannav.planner_engine import PlannerEngine
+
+    vertiports = _ring()
+    network = RouteNetwork.build(vertiports, [shapely.box(-350, -350, 350, 350)])
+    uav = SimpleNamespace(start_vertiport=vertiports[0], end_vertiport=vertiports[2])
+    config = SimpleNamespace(simulator=SimpleNamespace(dt=1.0))
+    engine = PlannerEngine(config, {planner: [0]}, {0: uav}, route_network=network)
+    engine.register_uav_planners()
+    messages = [str(w.message) for w in recwarn if 'route_network' in str(w.message)]
+    assert bool(messages) == warns
+
+
+def test_cache_dir_round_trip(tmp_path, monkeypatch):
+    vertiports, obstacles = _random_layout(seed=1)
+    built = RouteNetwork.load_or_build(vertiports, obstacles, cache_dir=str(tmp_path))
+    files = os.listdir(tmp_path)
+    assert files == [f'{ROUTE_NETWORK_PREFIX}{built.fingerprint}.npz']
+
+    def _no_build(*args, **kwargs):
+        raise AssertionError('cached network was rebuilt')
+
+    monkeypatch.setattr(RouteNetwork, 'build', _no_build)
+    loaded = RouteNetwork.load_or_build(vertiports, obstacles, cache_dir=str(tmp_path))
+    np.testing.assert_array_equal(loaded.length, built.length)
+    assert loaded.waypoints(vertiports[0], vertiports[5]) == built.waypoints(vertiports[0], vertiports[5])
+    with pytest.raises(ValueError, match='other vertiports'):
+        RouteNetwork.load(os.path.join(tmp_path, files[0]), vertiports[::-1])
+
+    monkeypatch.undo()
+    RouteNetwork.load_or_build(vertiports, obstacles, clearance=50.0, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_dense_testbed_scenario_avoids_building(tmp_path):
+    from testbed.testbed_simulator import TestbedSimulator
+
+    yaml_text = """
+simulator: {dt: 1.0, total_timestep: 200, mode: '3D', seed: 123}
+logging: {enabled: false}
+rendering: {enabled: false}
+route_network: {enabled: true, cache_dir: '%s'}
+testbed_airspace:
+  pattern: 'ring'
+  num_vertiports: 4
+  radius: 1500.0
+  start_angle: 0.7853981633974483
+  landing_pad_capacity: 1
+  altitude_range: [1800.0, 1800.0]
+  buildings: [{center: [0.0, 0.0], width: 300.0, depth: 300.0, buffer_radius: 200.0}]
+fleet_composition:
+  - {type_name: STANDARD, count: 4, dynamics: PointMass, controller: PIDPointMassController,
+     sensor: PartialSensor, planner: PointMass-PID}
+""" % (tmp_path / 'routes')
+    config_path = tmp_path / 'routed.yaml'
+    config_path.write_text(yaml_text)
+    sim = TestbedSimulator(config_path=str(config_path))
+    sim.reset()
+
+    manager = sim.simulator_manager
+    network = manager.planner_module.route_network
+    assert network is manager.airspace.get_route_network(cache_dir=str(tmp_path / 'routes'))
+    assert len(os.listdir(tmp_path / 'routes')) == 1
+    for uav_id, planner in manager.planner_module.plan_obj_map.items():
+        uav = manager.atc.uav_dict[uav_id]
+        assert planner.waypoints == network.waypoints(uav.start_vertiport, uav.end_vertiport)
+
+    ra_collisions = 0
+    for _ in range(sim.total_timestep):
+        if not manager.atc.uav_dict:
+            break
+        _, _, _, ra_collision_dict, _ = sim.step({})
+        ra_collisions += sum(bool(v) for v in ra_collision_dict.values())
+    assert ra_collisions == 0
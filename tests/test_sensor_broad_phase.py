@@ -0,0 +1,100 @@
+"""
+Broad-phase quality counters and auto-tuning for PartialSensor's spatial hash.
+
+Reuses the scripted 3-UAV rig from conftest (no OSM / ATC needed): the
+counters must agree with the narrow-phase results, the occupancy histogram
+must account for every bucket and entry, and get_tuned_params() must only
+ever move spacing / table_size within its documented bounds.
+
+Run in isolation:
+    pytest tests/test_sensor_broad_phase.py -v
+"""
+from conftest import (
+    STANDARD_DETECTION_RADIUS,
+    build_three_uav_rig,
+    set_scripted_positions,
+)
+from urbannav.sensor_engine import SensorEngine
+from urbannav.sensor_partial import PartialSensor
+
+
+def _stats_rig(**params):
+    uav_dict, _ = build_three_uav_rig()
+    sensor_module = SensorEngine(
+        config=None,
+        sensor_uav_map={'PartialSensor': [0, 1, 2]},
+        uav_dict=uav_dict,
+        airspace=None,
+        sensor_params={'PartialSensor': {'collect_stats': True, **params}},
+    )
+    sensor_module.register_uav_sensors()
+    return uav_dict, sensor_module
+
+
+def test_counters_match_detections():
+    uav_dict, sensor_module = _stats_rig()
+    for t in range(0, 21):
+        set_scripted_positions(uav_dict, t)
+        detections = sensor_module.get_detection_other_uavS()
+        stats = sensor_module.get_broad_phase_stats()['PartialSensor']
+
+        assert stats['queries'] == len(uav_dict)
+        assert stats['true_detections'] == sum(len(v) for v in detections.values())
+        assert stats['candidates_examined'] >= stats['true_detections']
+
+
+def test_histogram_accounts_for_every_bucket_and_entry():
+    uav_dict, sensor_module = _stats_rig()
+    set_scripted_positions(uav_dict, 15)
+    sensor_module.get_detection_other_uavS()
+    stats = sensor_module.get_broad_phase_stats()['PartialSensor']
+
+    hist = stats['occupancy_histogram']
+    assert sum(hist) == stats['table_size']
+    assert sum(k * n for k, n in enumerate(hist)) == len(uav_dict)
+    assert stats['load_factor'] == len(uav_dict) / stats['table_size']
+    assert stats['occupied_buckets'] == stats['table_size'] - hist[0]
+
+
+def test_counters_off_by_default(three_uav_rig):
+    uav_dict, sensor_module = three_uav_rig
+    set_scripted_positions(uav_dict, 12)
+    sensor_module.get_detection_other_uavS()
+    stats = sensor_module.get_broad_phase_stats()['PartialSensor']
+    assert stats['queries'] == 0
+    assert stats['candidates_examined'] == 0
+
+
+def _tuned_after(steps, **params):
+    uav_dict, sensor_module = _stats_rig(**params)
+    for t in steps:
+        set_scripted_positions(uav_dict, t)
+        sensor_module.get_detection_other_uavS()
+    return sensor_module.get_tuned_sensor_params()['PartialSensor']
+
+
+def test_tuned_params_respect_bounds():
+    # Oversized cells: every UAV shares a cell, so precision is low -> spacing
+    # shrinks.  One shared cell is not a hash collision, so the table stays.
+    tuned = _tuned_after(range(0, 8), spacing=10 * STANDARD_DETECTION_RADIUS, table_size=2)
+    assert tuned['spacing'] < 10 * STANDARD_DETECTION_RADIUS
+    assert tuned['spacing'] >= PartialSensor._MIN_SPACING_FRACTION * STANDARD_DETECTION_RADIUS
+    assert tuned['table_size'] == 2
+
+    # Three distinct cells in two buckets: every step collides -> table grows.
+    tuned = _tuned_after(range(0, 8), spacing=STANDARD_DETECTION_RADIUS, table_size=2)
+    assert tuned['table_size'] == 4
+
+
+def test_tuned_params_preserve_results():
+    uav_dict, baseline = _stats_rig()
+    expected = {}
+    for t in range(0, 21):
+        set_scripted_positions(uav_dict, t)
+        expected[t] = baseline.get_detection_other_uavS()
+
+    tuned = {'spacing': 0.3 * STANDARD_DETECTION_RADIUS, 'table_size': 64}
+    uav_dict, sensor_module = _stats_rig(**tuned)
+    for t in range(0, 21):
+        set_scripted_positions(uav_dict, t)
+        assert sensor_module.get_detection_other_uavS() == expected[t]
@@ -0,0 +1,63 @@
+"""
+Shared minimum-snap trajectory cache (urbannav.plan_six_dof_pid.TrajectoryCache).
+
+Checks that cached coefficients equal the closed-form hover-to-hover
+solution, that planners flying the same vertiport pair reference one
+read-only coefficient set, that mission changes back to a known pair are
+cache hits, and that the cache is bounded with least-recently-used
+eviction and hit/miss counters.
+
+Run in isolation:
+    pytest tests/test_trajectory_cache.py -v
+"""
+import numpy as np
+import pytest
+from shapely import Point
+
+from urbannav.plan_six_dof_pid import SixDOFPIDPlanner, TrajectoryCache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = TrajectoryCache(maxsize=2)
+    monkeypatch.setattr(SixDOFPIDPlanner, 'trajectory_cache', cache)
+    return cache
+
+
+def test_coefficients_match_closed_form(cache):
+    start, end = Point(0.0, 0.0, 100.0), Point(300.0, -400.0, 100.0)
+    planner = SixDOFPIDPlanner([start, end])
+    T = 1.875 * 500.0 / 10.0
+    expected_x = np.array([0, 0, 0, 0, 35 * 300 / T**4, -84 * 300 / T**5, 70 * 300 / T**6, -20 * 300 / T**7])
+    assert planner._T == pytest.approx(T)
+    np.testing.assert_allclose(planner._coeffs_x, expected_x)
+    np.testing.assert_allclose(planner._coeffs_y, expected_x * -4 / 3)
+    np.testing.assert_allclose(planner._coeffs_z, [100, 0, 0, 0, 0, 0, 0, 0])
+
+    assert planner.get_plan(start)[0].equals(start)
+    planner._t_elapsed = planner._T
+    final = planner.get_plan(end)[0]
+    assert (final.x, final.y, final.z) == pytest.approx((300.0, -400.0, 100.0))
+
+
+def test_planners_share_read_only_coefficients(cache):
+    a, b, c = Point(0.0, 0.0, 50.0), Point(1000.0, 0.0, 50.0), Point(0.0, 800.0, 50.0)
+    first, second = SixDOFPIDPlanner([a, b]), SixDOFPIDPlanner([a, b])
+    assert np.shares_memory(first._coeffs_x, second._coeffs_x)
+    with pytest.raises(ValueError):
+        first._coeffs_x[0] = 1.0
+    assert cache.get_stats() == {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1, 'maxsize': 2, 'hit_rate': 0.5}
+
+    second.waypoints = [b, c]                 # mission change: new pair is a miss
+    second.waypoints = [a, b]                 # and back: a hit, clock restarted
+    assert second._t_elapsed == 0.0
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    SixDOFPIDPlanner([c, a])                  # third pair evicts the least recent (b, c)
+    assert cache.evictions == 1 and len(cache) == 2
+    SixDOFPIDPlanner([a, b])
+    SixDOFPIDPlanner([b, c])
+    assert (cache.hits, cache.misses) == (3, 4)
+
+    cache.clear()
+    assert cache.get_stats()['size'] == 0 and cache.get_stats()['hit_rate'] == 0.0
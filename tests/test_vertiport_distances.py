@@ -0,0 +1,211 @@
+"""
+Cached vertiport distance matrices (urbannav.vertiport_distances).
+
+Checks that vertiports get dense ids in first-seen order, that the matrix
+covers all candidates on first use and grows by new rows only, that travel
+times and sub-blocks are lookups into it, and that its consumers —
+MetricsCollector edge snapshots, GraphBuilder edge features and the
+vertiport-design total distance — give the same numbers as the geometry
+calls they replace.  The vertiport KD-tree is checked against brute-force
+nearest / radius lookups, the airspaces' cached tree against changes of
+vertiport_list, and the dual-graph cross edges against the argsort they
+replace.
+
+Run in isolation:
+    pytest tests/test_vertiport_distances.py -v
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from shapely import Point
+
+from conftest import build_three_uav_rig, set_scripted_positions
+from urbannav.component_schema import LoggingConfig, SimulatorState
+from urbannav.logger import Logger
+from urbannav.metrics_collector import MetricsCollector
+from urbannav.vertiport import Vertiport
+from urbannav.vertiport_distances import (
+    VertiportDistanceMatrix, VertiportTree, pairwise_distances, vertiport_tree,
+)
+
+
+def _vertiports(n, seed=0):
+    xy = np.random.default_rng(seed).uniform(-5000.0, 5000.0, size=(n, 2))
+    return [Vertiport(Point(x, y)) for x, y in xy]
+
+
+def _shapely_distances(rows, cols):
+    return np.array([[a.location.distance(b.location) for b in cols] for a in rows])
+
+
+def test_dense_ids_and_lazy_growth():
+    candidates = _vertiports(5)
+    table = VertiportDistanceMatrix(lambda: candidates)
+    assert len(table) == 0                                            # nothing built yet
+
+    np.testing.assert_allclose(table.distance, _shapely_distances(candidates, candidates))
+    assert [table.index(vp) for vp in candidates] == list(range(5))
+    first = table.distance
+
+    extra = _vertiports(3, seed=1)
+    assert table.indices(extra[::-1]).tolist() == [5, 6, 7]
+    grown = table.distance
+    np.testing.assert_array_equal(grown[:5, :5], first)
+    everything = candidates + extra[::-1]
+    np.testing.assert_allclose(grown, _shapely_distances(everything, everything))
+    assert table.distance is grown                                   # cached until new vertiports
+
+    sub = table.between(extra, candidates[:2])
+    np.testing.assert_allclose(sub, _shapely_distances(extra, candidates[:2]))
+    np.testing.assert_allclose(table.travel_time(50.0), grown / 50.0)
+    assert table.travel_time(50.0) is table.travel_time(50.0)
+    with pytest.raises(ValueError, match='speed'):
+        table.travel_time(0.0)
+
+
+def test_testbed_airspace_owns_matrix():
+    from testbed.config_schema import TestbedAirspaceConfig
+    from testbed.testbed_airspace import TestbedAirspace
+
+    airspace = TestbedAirspace(TestbedAirspaceConfig(pattern='ring', num_vertiports=6, radius=1000.0))
+    vps = airspace.vertiport_list
+    distances = airspace.vertiport_distances
+    np.testing.assert_allclose(distances.distance, _shapely_distances(vps, vps))
+    # ring of radius 1000: neighbours are one chord apart
+    assert distances.distance[distances.index(vps[0]), distances.index(vps[1])] == pytest.approx(1000.0)
+
+
+def test_metrics_collector_edges_use_airspace_matrix():
+    vps = _vertiports(2)
+    airspace = SimpleNamespace(vertiport_distances=VertiportDistanceMatrix(lambda: vps))
+    tables = []
+    for mc in (MetricsCollector(), MetricsCollector(airspace=airspace)):
+        uav_dict, _ = build_three_uav_rig()
+        for uav in uav_dict.values():
+            uav.assign_start_end(vps[0], vps[1])
+        for t in range(3):
+            set_scripted_positions(uav_dict, t)
+            mc.record(SimulatorState(timestamp=float(t), currentstep=t, airspace_state=vps,
+                                     atc_state=uav_dict, external_systems={}))
+        tables.append(mc.get_step_data()[-1]['edges'])
+    computed, looked_up = tables
+    assert list(looked_up) == list(computed) == ['0->1']
+    assert looked_up['0->1'] == pytest.approx(computed['0->1'])
+    assert looked_up['0->1']['edge_distance'] == pytest.approx(vps[0].location.distance(vps[1].location))
+
+
+def test_graph_builder_and_total_distance_match_geometry():
+    pytest.importorskip('torch')
+    from rl.vertiport_design.graph_builder import GraphBuilder
+    from rl.vertiport_design.vertiport_design_env import VertiportDesignEnv
+
+    candidates = _vertiports(9, seed=2)
+    regions = {r: candidates[3 * r:3 * r + 3] for r in range(3)}
+    airspace = SimpleNamespace(regions_dict=regions, vertiport_list=[])
+    # a vertiport numbered before the candidates: graph and dense ids differ
+    airspace.vertiport_distances = VertiportDistanceMatrix(lambda: _vertiports(1, seed=3) + candidates)
+    builder = GraphBuilder(airspace)
+    selected = [regions[0][1], regions[1][0], regions[2][2]]
+    _, edge_index, edge_attr = builder.build_graph(selected)
+
+    xy = np.array([(vp.x, vp.y) for vp in candidates])
+    diagonal = np.hypot(*(xy.max(axis=0) - xy.min(axis=0)))
+    src, dst = edge_index.numpy()
+    assert len(src) == 9 * 8 and not np.any(src == dst)
+    expected = _shapely_distances(candidates, candidates)[src, dst] / diagonal
+    np.testing.assert_allclose(edge_attr[:, 0].numpy(), expected, rtol=1e-6)
+    both = np.isin(src, [1, 3, 8]) & np.isin(dst, [1, 3, 8])
+    np.testing.assert_array_equal(edge_attr[:, 1].numpy(), both.astype(np.float32))
+    assert builder.compute_distance(candidates[0], candidates[4]) == pytest.approx(
+        candidates[0].location.distance(candidates[4].location))
+
+    env = SimpleNamespace(graph_builder=builder)
+    total = VertiportDesignEnv._calculate_total_distance(env, selected)
+    assert total == pytest.approx(np.triu(_shapely_distances(selected, selected), 1).sum())
+
+
+def test_pairwise_distances():
+    xy = np.array([[0.0, 0.0], [3.0, 4.0], [-3.0, 0.0]])
+    np.testing.assert_allclose(pairwise_distances(xy), [[0, 5, 3], [5, 0, np.hypot(6, 4)], [3, np.hypot(6, 4), 0]])
+
+
+def test_tree_matches_brute_force():
+    rng = np.random.default_rng(4)
+    vp_xy = rng.uniform(-5000.0, 5000.0, size=(40, 2))
+    points = np.column_stack([rng.uniform(-6000.0, 6000.0, size=(300, 2)), rng.uniform(0, 100, 300)])
+    brute = np.linalg.norm(points[:, None, :2] - vp_xy[None, :, :], axis=-1)
+    tree = VertiportTree(vp_xy)
+
+    distance, index = tree.nearest(points, k=3)
+    np.testing.assert_array_equal(index, np.argsort(brute, axis=1)[:, :3])
+    np.testing.assert_allclose(distance, np.sort(brute, axis=1)[:, :3])
+    assert tree.nearest(points[:1], k=1)[1].shape == (1, 1)
+
+    point_index, vp_index = tree.within(points, 1500.0)
+    expected = np.argwhere(brute < 1500.0)
+    np.testing.assert_array_equal(np.column_stack([point_index, vp_index]), expected)
+
+    # fewer vertiports than k: missing neighbours are (inf, len)
+    distance, index = VertiportTree(vp_xy[:1]).nearest(points[:2], k=2)
+    assert np.all(np.isinf(distance[:, 1])) and np.all(index[:, 1] == 1)
+
+
+def test_airspace_tree_rebuilt_only_when_list_changes():
+    from testbed.config_schema import TestbedAirspaceConfig
+    from testbed.testbed_airspace import TestbedAirspace
+
+    airspace = TestbedAirspace(TestbedAirspaceConfig(pattern='ring', num_vertiports=6, radius=1000.0))
+    tree = airspace.get_vertiport_tree()
+    assert airspace.get_vertiport_tree() is tree
+    _, index = tree.nearest([[1000.0 * 1.01, 0.0]], k=1)
+    vp = airspace.vertiport_list[index[0, 0]]
+    assert vp.location.distance(Point(1010.0, 0.0)) == pytest.approx(10.0, abs=1e-6)
+
+    airspace.vertiport_list = airspace.vertiport_list[::-1]
+    reordered = airspace.get_vertiport_tree()
+    assert reordered is not tree and len(reordered) == 6
+    assert airspace.vertiport_list[reordered.nearest([[1010.0, 0.0]])[1][0, 0]] is vp
+    assert vertiport_tree(airspace.vertiport_list, reordered) is reordered
+
+
+def test_tree_cache_checks_vertiport_identity():
+    # Vertiport.id is id(self): a rebuilt list may reuse freed ids, so the
+    # cache must match the vertiport objects, not their ids
+    vertiports = [Vertiport(Point(0.0, 0.0)), Vertiport(Point(100.0, 0.0))]
+    tree = vertiport_tree(vertiports)
+    assert tree.vertiports == tuple(vertiports)
+    assert vertiport_tree(list(vertiports), tree) is tree
+
+    moved = [Vertiport(Point(5000.0, 0.0)), Vertiport(Point(100.0, 0.0))]
+    rebuilt = vertiport_tree(moved, tree)
+    assert rebuilt is not tree
+    np.testing.assert_allclose(rebuilt.xy, [[5000.0, 0.0], [100.0, 0.0]])
+
+    # new vertiports that happen to get the old ids must not hit the cache
+    reused = [SimpleNamespace(id=vp.id, location=Point(-3000.0, 0.0)) for vp in vertiports]
+    assert vertiport_tree(reused, tree).xy[0, 0] == -3000.0
+
+
+def test_dual_graph_cross_edges_use_tree(tmp_path):
+    pytest.importorskip('torch_geometric')
+    from rl.surrogate.datasets.dual_graph_dataset import DualGraphDataset
+
+    logger = Logger(LoggingConfig(log_dir=str(tmp_path)))
+    uav_dict, _ = build_three_uav_rig()
+    vps = _vertiports(5, seed=5)
+    for t in range(4):
+        set_scripted_positions(uav_dict, t)
+        logger.log_step(SimulatorState(timestamp=float(t), currentstep=t, airspace_state=vps,
+                                       atc_state=uav_dict, external_systems={}))
+    logger.save()
+
+    dataset = DualGraphDataset([logger._episode_dir])
+    assert len(dataset) == 3
+    graph, _ = dataset[1]
+    vp_xy = graph['vertiport'].x[:, :2].numpy().astype(float)
+    uav_xy = graph['uav'].x[:, :2].numpy().astype(float)
+    brute = np.linalg.norm(uav_xy[:, None, :] - vp_xy[None, :, :], axis=-1)
+    src, dst = graph['uav', 'assigned_to', 'vertiport'].edge_index.numpy()
+    np.testing.assert_array_equal(src, np.repeat(np.arange(len(uav_xy)), 2))
+    np.testing.assert_array_equal(dst.reshape(-1, 2), np.argsort(brute, axis=1)[:, :2])